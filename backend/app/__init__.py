@@ -1,6 +1,8 @@
 from flask import Flask, jsonify
 from .config import Config
 from .extensions import db, migrate, cors, jwt
+from .replicas import init_replicas
+from .instrumentation import init_query_stats
 # from .model.models import User # Mantenemos esto comentado aquí
 
 from .controller.auth_controller import auth_bp
@@ -8,6 +10,8 @@ from .controller.client_controller import client_bp
 from .controller.admin_controller import admin_bp
 from .controller.telemetry_controller import telemetry_bp
 from .controller.chatbot_controller import chatbot_bp
+from .controller.jobs_controller import jobs_bp
+from .cli import register_cli
 
 import logging # Import logging
 
@@ -26,7 +30,8 @@ def create_app(config_object: type[Config] | str = Config):
     log.info(f"DEBUG (Antes Init): Valor de JWT_TOKEN_LOCATION cargado: {app.config.get('JWT_TOKEN_LOCATION')}")
     # --- FIN Debug ---
 
-    # Extensiones
+    # Extensiones (las réplicas de lectura se registran como binds antes de db.init_app)
+    init_replicas(app)
     db.init_app(app)
     migrate.init_app(app, db)
     cors.init_app(
@@ -40,28 +45,16 @@ def create_app(config_object: type[Config] | str = Config):
 
     @jwt.user_lookup_loader
     def user_lookup_callback(_jwt_header, jwt_data):
-        log.info("\n--- INICIO USER LOADER ---")
-        from .model.models import User # Importación local
-        identity = jwt_data.get("sub")
-        if not identity:
-            log.error("USER_LOADER_ERROR: No se encontró 'sub' (identity) en el token.")
-            return None
-        try:
-            user_id = int(identity)
-            log.info(f"USER_LOADER_INFO: Buscando usuario con ID: {user_id} (Tipo: {type(user_id)})")
-            user = User.query.get(user_id)
-            if not user:
-                log.warning(f"USER_LOADER_WARNING: Usuario con ID {user_id} no encontrado en la BD.")
-                return None
-            log.info(f"USER_LOADER_SUCCESS: Usuario {user.email} cargado exitosamente.")
-            log.info("--- FIN USER LOADER ---\n")
-            return user
-        except ValueError:
-            log.error(f"USER_LOADER_ERROR: 'sub' del token no era un entero válido: {identity}")
-            return None
-        except Exception as e:
-            log.error(f"USER_LOADER_ERROR: Error inesperado al cargar usuario: {e}")
-            return None
+        # Identity desde una caché por worker (services/identity_service.py), sin consultar
+        # users por request; el claim `ver` del token se valida contra esa copia.
+        from .services.identity_service import IdentityService # Importación local
+        return IdentityService().resolve(jwt_data)
+
+    @jwt.user_lookup_error_loader
+    def _stale_identity(jwt_header, jwt_payload):
+        # Usuario borrado o token revocado (cambió su rol): nuevo login
+        log.info(f"JWT User Lookup: token del usuario {jwt_payload.get('sub')} ya no es válido.")
+        return jsonify({"message": "Sesión desactualizada, vuelva a iniciar sesión."}), 401
 
     # --- Handlers de errores JWT con Logging Adicional ---
     @jwt.unauthorized_loader
@@ -94,6 +87,13 @@ def create_app(config_object: type[Config] | str = Config):
     app.register_blueprint(admin_bp, url_prefix="/api/v1/admin")
     app.register_blueprint(telemetry_bp, url_prefix="/api/v1")
     app.register_blueprint(chatbot_bp, url_prefix="/api/v1/chatbot")
+    app.register_blueprint(jobs_bp, url_prefix="/api/v1/admin/jobs")
+
+    # Sentencias SQL por request (muestreado): Server-Timing y log
+    init_query_stats(app)
+
+    # Comandos CLI (jobs programados)
+    register_cli(app)
 
     @app.get("/health")
     def health():
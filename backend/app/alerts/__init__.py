@@ -0,0 +1,16 @@
+# backend/app/alerts/__init__.py
+
+"""
+Generación de alertas por umbral.
+
+Cada par (paciente, métrica) tiene una máquina de estados (ok → pending → firing →
+cooldown) con histéresis, duración mínima, cooldown y escalamiento de severidad,
+de modo que un episodio real produce una sola fila en `alerts` que se va
+actualizando (ocurrencias, último visto, pico) en vez de una alerta por lectura.
+Las alertas graves que nadie reconoce se escalan con los plazos de `escalation`.
+"""
+
+from .state_machine import (
+    METRIC_RULES, AlertRules, EpisodeState, AlertStateTable, step, severity_rank,
+)
+from .escalation import EscalationPolicy, TimerHeap
@@ -0,0 +1,248 @@
+# backend/app/alerts/engine.py
+
+"""
+Evaluación vectorizada (NumPy) de umbrales sobre lotes de lecturas.
+
+Misma semántica que la máquina de estados (state_machine.step): duración mínima,
+histéresis, cooldown que reabre el episodio y escalamiento de severidad, pero
+calculada con operaciones sobre arrays para todo el lote a la vez. Se usa en
+backfills y re-evaluaciones (parte siempre de estado 'ok') y como prefiltro en la
+ingesta batch (si un lote no cruza ningún umbral no se recorre fila por fila).
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from .state_machine import METRIC_RULES, SEVERITIES, AlertRules, episode_message
+
+# Orden de las columnas de métricas en todos los arrays (N, M) / (P, M)
+METRICS: Tuple[str, ...] = tuple(METRIC_RULES)
+_COLUMNS = tuple(METRIC_RULES[m]["column"] for m in METRICS)
+_HYSTERESIS = np.array([METRIC_RULES[m]["hysteresis"] for m in METRICS], dtype=np.float64)
+_STEPS = np.array([METRIC_RULES[m]["steps"] for m in METRICS], dtype=np.float64)   # (M, 3)
+_INT64_MIN = np.iinfo(np.int64).min
+
+
+def _us(td) -> int:
+    return int(td.total_seconds() * 1_000_000)
+
+
+@dataclass
+class ReadingArrays:
+    """Lote de lecturas en columnas: device_id (N,), ts (N,) datetime64[us], values (N, M) con NaN = sin dato."""
+    device_id: np.ndarray
+    ts: np.ndarray
+    values: np.ndarray
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Mapping[str, Any]]) -> "ReadingArrays":
+        """Desde dicts con las columnas de Reading (como los entrega la ingesta batch)."""
+        rows = list(rows)
+        values = np.array([[np.nan if r.get(c) is None else float(r[c]) for c in _COLUMNS] for r in rows],
+                          dtype=np.float64).reshape(len(rows), len(METRICS))
+        return cls(
+            device_id=np.fromiter((r["device_id"] for r in rows), dtype=np.int64, count=len(rows)),
+            ts=np.array([r["ts"] for r in rows], dtype="datetime64[us]"),
+            values=values,
+        )
+
+    def __len__(self) -> int:
+        return len(self.device_id)
+
+
+class ThresholdTable:
+    """Umbrales efectivos por paciente: `lo` / `hi` con forma (P, M); NaN = sin límite."""
+
+    def __init__(self, patient_ids: np.ndarray, lo: np.ndarray, hi: np.ndarray):
+        order = np.argsort(patient_ids)
+        self.patient_ids = np.asarray(patient_ids, dtype=np.int64)[order]
+        self.lo = np.asarray(lo, dtype=np.float64)[order]
+        self.hi = np.asarray(hi, dtype=np.float64)[order]
+
+    @classmethod
+    def from_limits(cls, limits: Mapping[int, Mapping[str, Tuple[Optional[float], Optional[float]]]]) -> "ThresholdTable":
+        """Desde {patient_id: {metric: (min, max)}} (ver AlertEvaluationService.limits_for)."""
+        ids = np.fromiter(limits.keys(), dtype=np.int64, count=len(limits))
+        lo = np.full((len(ids), len(METRICS)), np.nan)
+        hi = np.full((len(ids), len(METRICS)), np.nan)
+        for i, per_metric in enumerate(limits.values()):
+            for m, metric in enumerate(METRICS):
+                mn, mx = per_metric.get(metric, (None, None))
+                lo[i, m] = np.nan if mn is None else mn
+                hi[i, m] = np.nan if mx is None else mx
+        return cls(ids, lo, hi)
+
+    def rows_for(self, patient_ids: np.ndarray) -> np.ndarray:
+        """Fila de la tabla de cada patient_id (-1 si el paciente no está en la tabla)."""
+        if not len(self.patient_ids):
+            return np.full(len(patient_ids), -1, dtype=np.int64)
+        pos = np.clip(np.searchsorted(self.patient_ids, patient_ids), 0, len(self.patient_ids) - 1)
+        return np.where(self.patient_ids[pos] == patient_ids, pos, -1)
+
+
+class AlertEngine:
+    """Calcula episodios de alerta para lotes completos de lecturas."""
+
+    def __init__(self, rules: AlertRules | None = None):
+        self.rules = rules or AlertRules()
+
+    @staticmethod
+    def breaches(values: np.ndarray, lo: np.ndarray, hi: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Máscaras (N, M) de valores sobre el máximo / bajo el mínimo (lo/hi se difunden por broadcasting)."""
+        with np.errstate(invalid="ignore"):
+            return values > hi, values < lo
+
+    def evaluate(self, readings: ReadingArrays, device_patient: Mapping[int, Optional[int]],
+                 thresholds: ThresholdTable) -> List[Dict[str, Any]]:
+        """
+        Episodios del lote como filas listas para `insert(Alert)` (una por episodio).
+        Las lecturas de dispositivos sin paciente o sin umbrales se ignoran.
+        """
+        if not len(readings):
+            return []
+        devices = np.array(sorted(device_patient), dtype=np.int64)
+        owners = np.array([-1 if device_patient[d] is None else device_patient[d] for d in devices.tolist()],
+                          dtype=np.int64)
+        patient_id = np.full(len(readings), -1, dtype=np.int64)
+        if len(devices):
+            pos = np.clip(np.searchsorted(devices, readings.device_id), 0, len(devices) - 1)
+            hit = devices[pos] == readings.device_id
+            patient_id[hit] = owners[pos[hit]]
+        prow = thresholds.rows_for(patient_id)
+        keep = (patient_id >= 0) & (prow >= 0)
+
+        t = readings.ts.astype("datetime64[us]").astype(np.int64)[keep]
+        prow = prow[keep]
+        order = np.lexsort((t, prow))          # por paciente y luego por ts (estable)
+        t, prow = t[order], prow[order]
+        values = readings.values[keep][order]
+        lo, hi = thresholds.lo[prow], thresholds.hi[prow]          # (N, M)
+        high, low = self.breaches(values, lo, hi)
+
+        alerts: List[Dict[str, Any]] = []
+        for m, metric in enumerate(METRICS):
+            sel = np.flatnonzero(~np.isnan(values[:, m]))
+            # Muestras repetidas (mismo paciente y ts): cuenta solo la primera, como step()
+            dup = np.zeros(len(sel), dtype=bool)
+            dup[1:] = (prow[sel[1:]] == prow[sel[:-1]]) & (t[sel[1:]] == t[sel[:-1]])
+            sel = sel[~dup]
+            p, tm, v = prow[sel], t[sel], values[sel, m]
+            hm, lm = high[sel, m], low[sel, m]
+            for direction, sign, limit, breach, opp in (("high", 1.0, hi[sel, m], hm, lm),
+                                                        ("low", -1.0, -lo[sel, m], lm, hm)):
+                if not breach.any():
+                    continue
+                eps = self._episodes(p, tm, sign * v, limit, breach, opp, _HYSTERESIS[m])
+                if eps is not None:
+                    alerts.extend(self._rows(eps, thresholds, metric, m, direction, sign))
+        return alerts
+
+    def _episodes(self, p, t, x, limit, breach, opp, band) -> Optional[Dict[str, np.ndarray]]:
+        """
+        Episodios de un canal (métrica + lado) en espacio "x > límite" (el lado 'low' se
+        pasa negado). Arrays ordenados por (paciente, ts); devuelve None si no hay ninguno.
+        """
+        n = len(x)
+        idx = np.arange(n)
+        newp = np.ones(n, dtype=bool)
+        newp[1:] = p[1:] != p[:-1]
+        with np.errstate(invalid="ignore"):
+            clear = ~(x > limit - band)   # volvió al rango con histéresis (o no hay límite)
+
+        # Fase 'pending': rachas de muestras fuera de rango seguidas; dispara al durar min_duration
+        prev = np.zeros(n, dtype=bool)
+        prev[1:] = breach[:-1]
+        strict_first = np.maximum.accumulate(np.where(breach & (newp | ~prev), idx, 0))
+        armed = breach & (t - t[strict_first] >= _us(self.rules.min_duration))
+
+        # Siguiente muestra fuera de rango (>= i) y cruces al lado opuesto acumulados
+        next_breach = np.minimum.accumulate(np.where(breach, idx, n)[::-1])[::-1]
+        opp_before = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(opp, out=opp_before[1:])
+
+        # 'firing' se mantiene (forward fill) desde un disparo hasta una muestra 'clear'.
+        # Un cruce dentro del cooldown tras el cierre reabre el episodio: se agrega como
+        # disparo y se recalcula hasta que no aparezcan reaperturas nuevas.
+        reopen = np.zeros(n, dtype=bool)
+        while True:
+            sig = np.where(armed, 1, np.where(clear | newp, 0, -1))
+            active = sig[np.maximum.accumulate(np.where(sig >= 0, idx, 0))] == 1
+            closes = np.flatnonzero(active[:-1] & ~active[1:] & ~newp[1:]) + 1
+            cand = next_breach[closes]
+            ok = cand < n
+            closes, cand = closes[ok], cand[ok]
+            ok = ((p[cand] == p[closes])
+                  & (t[cand] - t[closes] < _us(self.rules.cooldown))
+                  & (opp_before[cand] == opp_before[closes])
+                  & ~reopen[cand])
+            if not ok.any():
+                break
+            armed[cand[ok]] = True
+            reopen[cand[ok]] = True
+
+        if not active.any():
+            return None
+        prev_active = np.zeros(n, dtype=bool)
+        prev_active[1:] = active[:-1]
+        next_inactive = np.ones(n, dtype=bool)
+        next_inactive[:-1] = newp[1:] | ~active[1:]
+        run_start = np.flatnonzero(active & (newp | ~prev_active))
+        run_end = np.flatnonzero(active & next_inactive)
+        first_run = np.flatnonzero(~reopen[run_start])          # las reaperturas se suman al episodio anterior
+        last_run = np.append(first_run[1:] - 1, len(run_start) - 1)
+        ep_lo = strict_first[run_start[first_run]]              # incluye las muestras 'pending'
+        ep_hi = run_end[last_run]
+
+        bounds = np.empty(2 * len(ep_lo), dtype=np.int64)
+        bounds[0::2], bounds[1::2] = ep_lo, ep_hi + 1
+
+        def segment(ufunc, arr, pad):
+            return ufunc.reduceat(np.append(arr, pad), bounds)[0::2]
+
+        close = ep_hi + 1
+        has_close = close < n
+        has_close[has_close] = p[close[has_close]] == p[ep_hi[has_close]]
+        return {
+            "prow": p[ep_lo],
+            "started": t[ep_lo],
+            "last_seen": segment(np.maximum, np.where(breach, t, _INT64_MIN), _INT64_MIN),
+            "occurrences": segment(np.add, breach.astype(np.int64), 0),
+            "peak": segment(np.maximum, np.where(breach, x, -np.inf), -np.inf),
+            "limit": limit[ep_lo],
+            "resolved": np.where(has_close, t[np.minimum(close, n - 1)], _INT64_MIN),
+        }
+
+    def _rows(self, eps, thresholds: ThresholdTable, metric: str, m: int,
+              direction: str, sign: float) -> List[Dict[str, Any]]:
+        """Convierte episodios (arrays) a filas de `alerts`; la severidad se calcula por broadcasting."""
+        excess = eps["peak"] - eps["limit"]
+        level = (excess[:, None] >= _STEPS[m][None, :]).sum(axis=1)
+        level += (eps["last_seen"] - eps["started"]) >= _us(self.rules.escalate_after)
+        severity = np.asarray(SEVERITIES)[np.minimum(level, len(SEVERITIES) - 1)]
+        peak = np.round(sign * eps["peak"], 2)
+        lo, hi = thresholds.lo[eps["prow"], m], thresholds.hi[eps["prow"], m]
+        alert_type = METRIC_RULES[metric]["types"][direction]
+
+        def dt(us) -> datetime:
+            return np.datetime64(int(us), "us").astype(datetime)
+
+        rows = []
+        for i in range(len(peak)):
+            rows.append({
+                "patient_id": int(thresholds.patient_ids[eps["prow"][i]]),
+                "metric": metric,
+                "type": alert_type,
+                "severity": str(severity[i]),
+                "ts": dt(eps["started"][i]),
+                "last_seen_at": dt(eps["last_seen"][i]),
+                "occurrences": int(eps["occurrences"][i]),
+                "peak_value": float(peak[i]),
+                "resolved_at": dt(eps["resolved"][i]) if eps["resolved"][i] != _INT64_MIN else None,
+                "message": episode_message(metric, direction, float(peak[i]),
+                                           None if np.isnan(lo[i]) else float(lo[i]),
+                                           None if np.isnan(hi[i]) else float(hi[i])),
+            })
+        return rows
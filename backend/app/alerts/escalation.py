@@ -0,0 +1,106 @@
+# backend/app/alerts/escalation.py
+
+"""
+Escalamiento de alertas que siguen sin reconocer.
+
+Cuando una alerta queda pendiente con severidad >= ESCALATION_MIN_SEVERITY se
+"arma" su primer plazo (`alerts.escalation_due_at`). Al vencer cada plazo la
+alerta sube un nivel de severidad (hasta critical), se notifica y se arma el
+siguiente plazo de ESCALATION_DELAYS_MIN, contados desde que quedó pendiente.
+
+Aquí solo está la parte pura (política y heap de timers); el bucle que los
+dispara está en app/alerts/scheduler.py.
+"""
+
+import heapq
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Hashable, List, Optional, Tuple
+from .state_machine import SEVERITIES, severity_rank
+
+
+@dataclass(frozen=True)
+class EscalationPolicy:
+    """Plazos acumulados desde que la alerta quedó pendiente, p. ej. (15m, 30m, 60m)."""
+    delays: Tuple[timedelta, ...] = ()
+    min_severity: str = "critical"
+
+    @classmethod
+    def from_config(cls, config) -> "EscalationPolicy":
+        minutes = [float(m) for m in str(config.get("ESCALATION_DELAYS_MIN", "")).split(",") if m.strip()]
+        return cls(delays=tuple(timedelta(minutes=m) for m in sorted(minutes)),
+                   min_severity=config.get("ESCALATION_MIN_SEVERITY", "critical"))
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.delays)
+
+    def applies_to(self, severity: Optional[str]) -> bool:
+        return self.enabled and severity_rank(severity) >= severity_rank(self.min_severity)
+
+    def first_due(self, now: datetime) -> datetime:
+        # Sin microsegundos: el scheduler compara el plazo leído de la BD por igualdad
+        # y DATETIME de MySQL los redondea
+        return now.replace(microsecond=0) + self.delays[0]
+
+    def next_due(self, level: int, due: datetime) -> Optional[datetime]:
+        """Plazo siguiente tras disparar el nivel `level` (0 = primero), o None si era el último."""
+        if level + 1 >= len(self.delays):
+            return None
+        return due + (self.delays[level + 1] - self.delays[level])
+
+    @staticmethod
+    def bumped(severity: str) -> str:
+        return SEVERITIES[min(severity_rank(severity) + 1, len(SEVERITIES) - 1)]
+
+
+class TimerHeap:
+    """
+    Timers (vencimiento, clave, nivel) en un heap con cancelación perezosa: volver a
+    armar una clave deja la entrada anterior en el heap pero marcada como vieja, y se
+    descarta al llegar a la cima. push/pop en O(log n), sin recorrer los timers.
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[datetime, Hashable, int]] = []
+        self._armed: Dict[Hashable, Tuple[datetime, int]] = {}
+
+    def push(self, key: Hashable, due: datetime, level: int) -> bool:
+        """Arma (o re-arma) el timer de `key`. False si ya estaba armado igual."""
+        if self._armed.get(key) == (due, level):
+            return False
+        self._armed[key] = (due, level)
+        heapq.heappush(self._heap, (due, key, level))
+        return True
+
+    def discard(self, key: Hashable) -> None:
+        self._armed.pop(key, None)
+
+    def _prune(self) -> None:
+        while self._heap:
+            due, key, level = self._heap[0]
+            if self._armed.get(key) == (due, level):
+                return
+            heapq.heappop(self._heap)
+
+    def next_due(self) -> Optional[datetime]:
+        self._prune()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: datetime, limit: int) -> List[Tuple[Hashable, int, datetime]]:
+        """Saca hasta `limit` timers vencidos como (clave, nivel, vencimiento)."""
+        fired = []
+        while len(fired) < limit:
+            self._prune()
+            if not self._heap or self._heap[0][0] > now:
+                break
+            due, key, level = heapq.heappop(self._heap)
+            del self._armed[key]
+            fired.append((key, level, due))
+        return fired
+
+    def __len__(self) -> int:
+        return len(self._armed)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._armed
@@ -0,0 +1,97 @@
+# backend/app/alerts/scheduler.py
+
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+from flask import Flask
+from ..extensions import db, worker_session
+from .escalation import EscalationPolicy, TimerHeap
+
+logger = logging.getLogger(__name__)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class EscalationScheduler:
+    """
+    Proceso `flask alerts escalation-worker`: mantiene en un TimerHeap los plazos de
+    escalamiento que vencen en la ventana próxima y duerme hasta el siguiente
+    vencimiento. No consulta `alerts` cada segundo: cada ESCALATION_SYNC_S lee por
+    índice solo los timers que vencen antes de ahora + 2 * ESCALATION_SYNC_S (al
+    arrancar, eso rehidrata también los vencidos durante una caída). Los niveles
+    siguientes los arma él mismo al disparar.
+    """
+
+    def __init__(self, app: Flask, service=None, policy: EscalationPolicy | None = None,
+                 clock: Callable[[], datetime] = _utcnow):
+        from ..services.escalation_service import EscalationService
+        cfg = app.config
+        self.app = app
+        self.service = service or EscalationService()
+        self.policy = policy or EscalationPolicy.from_config(cfg)
+        self.sync_every = float(cfg["ESCALATION_SYNC_S"])
+        self.lookahead = timedelta(seconds=2 * self.sync_every)
+        self.batch_size = cfg["ESCALATION_BATCH"]
+        self.timers = TimerHeap()
+        self._clock = clock
+        self._stop = threading.Event()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def sync(self) -> int:
+        """Arma en memoria los timers de la ventana que aún no estaban. Devuelve cuántos."""
+        timers = self.service.due_timers(self._clock() + self.lookahead)
+        return sum(self.timers.push(alert_id, due, level) for alert_id, level, due in timers)
+
+    def fire_due(self) -> int:
+        """Dispara los timers vencidos en lotes de ESCALATION_BATCH. Devuelve cuántos salieron del heap."""
+        total = 0
+        while True:
+            now = self._clock()
+            batch = self.timers.pop_due(now, self.batch_size)
+            if not batch:
+                return total
+            total += len(batch)
+            try:
+                following = self.service.fire(batch, self.policy)
+            except Exception as e:
+                # Siguen armados en la BD: la próxima sincronización los vuelve a cargar
+                db.session.rollback()
+                logger.error(f"Error escalando {len(batch)} alertas: {e}", exc_info=True)
+                return total
+            for alert_id, level, due in following:
+                if due <= now + self.lookahead:
+                    self.timers.push(alert_id, due, level)
+
+    def _seconds_until(self, when: Optional[datetime]) -> float:
+        if when is None:
+            return float("inf")
+        return max(0.0, (when - self._clock()).total_seconds())
+
+    def run(self, once: bool = False) -> None:
+        """Ejecuta el bucle (o una sincronización + disparo con `once`)."""
+        if not self.policy.enabled:
+            logger.warning("ESCALATION_DELAYS_MIN vacío: no hay escalamientos que programar.")
+            return
+        with worker_session():
+            next_sync = 0.0
+            while not self._stop.is_set():
+                if time.monotonic() >= next_sync:
+                    try:
+                        armed = self.sync()
+                        if armed:
+                            logger.info(f"{armed} timers de escalamiento armados ({len(self.timers)} en memoria).")
+                    except Exception as e:
+                        db.session.rollback()
+                        logger.error(f"Error sincronizando timers de escalamiento: {e}", exc_info=True)
+                    next_sync = time.monotonic() + self.sync_every
+                self.fire_due()
+                if once:
+                    break
+                # Duerme hasta el próximo vencimiento o la próxima sincronización
+                self._stop.wait(min(self._seconds_until(self.timers.next_due()), next_sync - time.monotonic()))
@@ -0,0 +1,220 @@
+# backend/app/alerts/state_machine.py
+
+"""
+Máquina de estados de alertas por (paciente, métrica).
+
+    ok ──fuera de rango──> pending ──dura >= min_duration──> firing
+    firing ──vuelve al rango con histéresis──> cooldown ──pasa el cooldown──> ok
+    cooldown ──vuelve a salir del rango──> firing (misma alerta, se reabre)
+
+`step()` es puro (no toca la BD): muta el EpisodeState y devuelve los efectos que
+el servicio debe aplicar sobre la fila de `alerts` del episodio.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+OK, PENDING, FIRING, COOLDOWN = "ok", "pending", "firing", "cooldown"
+
+SEVERITIES = ("low", "moderate", "high", "critical")
+
+# Reglas por métrica (clave = Threshold.metric):
+#   column     -> columna de Reading que se evalúa
+#   types      -> Alert.type según el lado del umbral que se cruzó
+#   hysteresis -> para cerrar el episodio el valor debe volver a (max - margen) / (min + margen)
+#   steps      -> exceso sobre el umbral desde el que la severidad es moderate / high / critical
+METRIC_RULES: Dict[str, Dict] = {
+    "heart_rate": {
+        "column": "heart_rate_bpm", "label": "Frecuencia cardiaca", "unit": "bpm",
+        "types": {"high": "tachycardia", "low": "bradycardia"},
+        "hysteresis": 5, "steps": (10, 25, 40),
+    },
+    "spo2": {
+        "column": "spo2_pct", "label": "SpO2", "unit": "%",
+        "types": {"high": "custom", "low": "hypoxia"},
+        "hysteresis": 1, "steps": (2, 5, 10),
+    },
+    "temperature": {
+        "column": "temp_c", "label": "Temperatura", "unit": "°C",
+        "types": {"high": "fever", "low": "custom"},
+        "hysteresis": 0.3, "steps": (0.5, 1.5, 2.5),
+    },
+}
+
+
+@dataclass(frozen=True)
+class AlertRules:
+    """Parámetros temporales de la máquina de estados (ALERT_* en config)."""
+    min_duration: timedelta = timedelta(seconds=60)
+    cooldown: timedelta = timedelta(minutes=10)
+    escalate_after: timedelta = timedelta(minutes=30)
+
+    @classmethod
+    def from_config(cls, config) -> "AlertRules":
+        return cls(
+            min_duration=timedelta(seconds=config.get("ALERT_MIN_DURATION_S", 60)),
+            cooldown=timedelta(seconds=config.get("ALERT_COOLDOWN_S", 600)),
+            escalate_after=timedelta(seconds=config.get("ALERT_ESCALATE_AFTER_S", 1800)),
+        )
+
+
+@dataclass(slots=True)
+class EpisodeState:
+    """Estado compacto de un par (paciente, métrica); se persiste en `alert_states`."""
+    patient_id: int
+    metric: str
+    status: str = OK
+    direction: Optional[str] = None          # 'high' | 'low': lado del umbral del episodio
+    started_at: Optional[datetime] = None    # primera muestra fuera de rango del episodio
+    last_ts: Optional[datetime] = None       # última muestra procesada (descarta repetidas/atrasadas)
+    last_seen_at: Optional[datetime] = None  # última muestra fuera de rango
+    peak_value: Optional[float] = None
+    occurrences: int = 0
+    severity: Optional[str] = None
+    alert_id: Optional[int] = None           # alerta del episodio (abierta o en cooldown)
+    resolved_at: Optional[datetime] = None
+    # Solo en memoria
+    persisted: bool = False
+    dirty: bool = False
+
+
+class AlertStateTable:
+    """Estados en memoria indexados por (patient_id, metric); se cargan y guardan en lote."""
+
+    def __init__(self, states: Iterable[EpisodeState] = ()):
+        self._states: Dict[Tuple[int, str], EpisodeState] = {(s.patient_id, s.metric): s for s in states}
+
+    def get(self, patient_id: int, metric: str) -> EpisodeState:
+        key = (patient_id, metric)
+        state = self._states.get(key)
+        if state is None:
+            state = self._states[key] = EpisodeState(patient_id=patient_id, metric=metric)
+        return state
+
+    def dirty(self) -> List[EpisodeState]:
+        return [s for s in self._states.values() if s.dirty]
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+
+def episode_message(metric: str, direction: str, peak: float,
+                    lo: Optional[float], hi: Optional[float]) -> str:
+    """Texto de la alerta de un episodio, p. ej. 'Frecuencia cardiaca alta: pico 135 bpm (máx 120)'."""
+    rule = METRIC_RULES[metric]
+    high = direction == "high"
+    limit = hi if high else lo
+    text = f"{rule['label']} {'alta' if high else 'baja'}: pico {peak:g} {rule['unit']}"
+    if limit is not None:
+        text += f" ({'máx' if high else 'mín'} {limit:g})"
+    return text[:255]
+
+
+def severity_rank(severity: Optional[str]) -> int:
+    return SEVERITIES.index(severity) if severity else -1
+
+
+def _breach(value: float, lo: Optional[float], hi: Optional[float]) -> Optional[str]:
+    if hi is not None and value > hi:
+        return "high"
+    if lo is not None and value < lo:
+        return "low"
+    return None
+
+
+def _cleared(direction: str, value: float, lo: Optional[float], hi: Optional[float], band: float) -> bool:
+    if direction == "high":
+        return hi is None or value <= hi - band
+    return lo is None or value >= lo + band
+
+
+def _record(state: EpisodeState, ts: datetime, value: float) -> None:
+    state.occurrences += 1
+    state.last_seen_at = ts
+    if state.peak_value is None:
+        state.peak_value = value
+    elif state.direction == "high":
+        state.peak_value = max(state.peak_value, value)
+    else:
+        state.peak_value = min(state.peak_value, value)
+
+
+def _escalate(state: EpisodeState, ts: datetime, lo: Optional[float], hi: Optional[float],
+              rules: AlertRules) -> bool:
+    """Recalcula la severidad (solo sube). Devuelve True si subió en un episodio ya abierto."""
+    limit = hi if state.direction == "high" else lo
+    excess = abs(state.peak_value - limit) if limit is not None else 0
+    level = sum(1 for s in METRIC_RULES[state.metric]["steps"] if excess >= s)
+    if ts - state.started_at >= rules.escalate_after:
+        level += 1  # episodio prolongado: un nivel más
+    severity = SEVERITIES[min(level, len(SEVERITIES) - 1)]
+    if severity_rank(severity) <= severity_rank(state.severity):
+        return False
+    previous, state.severity = state.severity, severity
+    return previous is not None
+
+
+def step(state: EpisodeState, ts: datetime, value, lo: Optional[float], hi: Optional[float],
+         rules: AlertRules) -> List[str]:
+    """
+    Procesa una muestra. Efectos posibles (en orden):
+      'open'     -> crear la alerta del episodio
+      'update'   -> actualizar ocurrencias / último visto / pico
+      'escalate' -> igual que 'update' pero la severidad subió
+      'reopen'   -> la alerta en cooldown vuelve a estar activa
+      'resolve'  -> el episodio terminó (resolved_at = ts)
+    """
+    if state.last_ts is not None and ts <= state.last_ts:
+        return []
+    state.last_ts = ts
+    state.dirty = True
+    value = float(value)
+    direction = _breach(value, lo, hi)
+    effects: List[str] = []
+
+    if state.status == COOLDOWN:
+        if ts - state.resolved_at >= rules.cooldown or (direction and direction != state.direction):
+            state.status = OK  # el próximo episodio es nuevo
+        elif direction:
+            # Vuelve a cruzar antes de terminar el cooldown: mismo episodio, misma alerta
+            state.status = FIRING
+            state.resolved_at = None
+            _record(state, ts, value)
+            _escalate(state, ts, lo, hi, rules)
+            return ["reopen"]
+        else:
+            return []
+
+    if state.status == FIRING:
+        if direction == state.direction:
+            _record(state, ts, value)
+            return ["escalate"] if _escalate(state, ts, lo, hi, rules) else ["update"]
+        if not _cleared(state.direction, value, lo, hi, METRIC_RULES[state.metric]["hysteresis"]):
+            return []  # dentro de la banda de histéresis: el episodio sigue abierto
+        state.status = COOLDOWN
+        state.resolved_at = ts
+        effects.append("resolve")
+        if direction is None:
+            return effects
+        state.status = OK  # saltó al lado opuesto: empieza otro episodio
+
+    # ok / pending
+    if direction is None:
+        state.status = OK
+        return effects
+    if state.status != PENDING or direction != state.direction:
+        state.status = PENDING
+        state.direction = direction
+        state.started_at = ts
+        state.occurrences = 0
+        state.peak_value = None
+        state.severity = None
+        state.alert_id = None
+        state.resolved_at = None
+    _record(state, ts, value)
+    if ts - state.started_at >= rules.min_duration:
+        state.status = FIRING
+        _escalate(state, ts, lo, hi, rules)
+        effects.append("open")
+    return effects
@@ -0,0 +1,157 @@
+# backend/app/cache.py
+
+"""
+Cachés en memoria del proceso (una copia por worker de gunicorn).
+
+- TTLCache: dict con vencimiento por entrada, seguro entre hilos.
+- VersionedCache: TTLCache atada a un contador de la tabla `cache_versions`.
+  Quien modifica los datos incrementa el contador en su misma transacción; cada
+  worker lo consulta como mucho cada `check_every` segundos y, si cambió, descarta
+  su copia. Así los demás workers ven el cambio en segundos y no al vencer el TTL.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Caché clave -> valor con vencimiento. `ttl <= 0` la desactiva (nunca guarda)."""
+
+    def __init__(self, ttl: float, maxsize: int = 10_000, clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._clock = clock
+        self._data: Dict[Hashable, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+        self._fill_lock = threading.Lock()
+        self._generation = 0  # cambia en cada clear()
+
+    @property
+    def generation(self) -> int:
+        """Leerla antes de ir a la BD y pasarla a set_many: si entretanto se vació, no se guarda."""
+        return self._generation
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            if entry[0] <= self._clock():
+                del self._data[key]
+                return default
+            return entry[1]
+
+    def get_many(self, keys: Iterable[Hashable]) -> Dict[Hashable, Any]:
+        """Solo las claves vigentes (las ausentes no aparecen en el resultado)."""
+        found: Dict[Hashable, Any] = {}
+        for key in keys:
+            value = TTLCache.get(self, key, _MISSING)
+            if value is not _MISSING:
+                found[key] = value
+        return found
+
+    def get_or_set(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """
+        Valor en caché o, si venció, lo calcula con `factory()` una sola vez: los
+        hilos que llegan mientras se calcula esperan y usan ese mismo resultado.
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        with self._fill_lock:
+            value = self.get(key, _MISSING)
+            if value is _MISSING:
+                value = factory()
+                self.set(key, value)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self.set_many({key: value})
+
+    def set_many(self, items: Dict[Hashable, Any], generation: Optional[int] = None) -> None:
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return  # se leyó antes de una invalidación: podría estar desactualizado
+            now = self._clock()
+            expires = now + self.ttl
+            for key, value in items.items():
+                self._data.pop(key, None)  # re-inserta al final: el orden del dict es el de antigüedad
+                self._data[key] = (expires, value)
+            if len(self._data) > self.maxsize:
+                self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        """Quita las vencidas y, si no alcanza, las más antiguas."""
+        for key in [k for k, (exp, _) in self._data.items() if exp <= now]:
+            del self._data[key]
+        excess = len(self._data) - self.maxsize
+        if excess > 0:
+            for key in list(self._data)[:excess]:
+                del self._data[key]
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._clear()
+
+    def _clear(self) -> None:
+        self._data.clear()
+        self._generation += 1
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class VersionedCache(TTLCache):
+    """
+    TTLCache que se vacía cuando cambia la versión devuelta por `version_loader`
+    (normalmente CacheVersionsRepository.get(nombre)). La versión se consulta como
+    mucho cada `check_every` segundos, antes de leer de la caché.
+    """
+
+    def __init__(self, name: str, ttl: float, version_loader: Callable[[], int],
+                 check_every: float = 2.0, maxsize: int = 10_000,
+                 clock: Callable[[], float] = time.monotonic):
+        super().__init__(ttl, maxsize=maxsize, clock=clock)
+        self.name = name
+        self.check_every = check_every
+        self._version_loader = version_loader
+        self._version: Optional[int] = None
+        self._next_check = 0.0
+
+    def sync(self) -> None:
+        """Descarta la caché si la versión compartida cambió (o nunca se leyó)."""
+        if self.ttl <= 0 or self._clock() < self._next_check:
+            return
+        version = self._version_loader()
+        with self._lock:
+            self._next_check = self._clock() + self.check_every
+            if version != self._version:
+                self._clear()
+                self._version = version
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        self.sync()
+        return super().get(key, default)
+
+    def get_many(self, keys: Iterable[Hashable]) -> Dict[Hashable, Any]:
+        self.sync()
+        return super().get_many(keys)
+
+    def invalidate(self) -> None:
+        """
+        Vacía la copia local y fuerza a releer la versión en el próximo acceso.
+        Llamar después del commit que incrementó la versión en `cache_versions`.
+        """
+        with self._lock:
+            self._clear()
+            self._version = None
+            self._next_check = 0.0
@@ -0,0 +1,145 @@
+# backend/app/cli.py
+
+"""Comandos `flask ...` para tareas programadas (cron / ECS scheduled tasks)."""
+
+from datetime import date
+import click
+from flask import Flask
+from flask.cli import AppGroup
+
+summaries_cli = AppGroup("summaries", help="Resúmenes diarios por paciente.")
+jobs_cli = AppGroup("jobs", help="Worker de jobs en segundo plano.")
+alerts_cli = AppGroup("alerts", help="Mantenimiento de alertas.")
+notifications_cli = AppGroup("notifications", help="Envío de notificaciones de alertas.")
+devices_cli = AppGroup("devices", help="Dispositivos: alta masiva y presencia.")
+users_cli = AppGroup("users", help="Usuarios y roles.")
+
+
+@summaries_cli.command("build")
+@click.option("--day", "day_str", default=None, help="Día a calcular (YYYY-MM-DD). Por defecto: ayer.")
+@click.option("--from", "from_str", default=None, help="Backfill: primer día (YYYY-MM-DD).")
+@click.option("--to", "to_str", default=None, help="Backfill: último día (YYYY-MM-DD). Por defecto: ayer.")
+def build_summaries(day_str, from_str, to_str):
+    """Calcula el resumen diario (job nocturno) o un rango de días (backfill)."""
+    from .services.summaries_service import SummariesService
+    service = SummariesService()
+
+    if from_str:
+        day_from = date.fromisoformat(from_str)
+        day_to = date.fromisoformat(to_str) if to_str else service.yesterday()
+        total = service.backfill(day_from, day_to)
+        click.echo(f"Backfill {day_from}..{day_to}: {total} filas.")
+        return
+
+    day = date.fromisoformat(day_str) if day_str else service.yesterday()
+    count = service.build_day(day)
+    click.echo(f"Resumen {day}: {count} pacientes.")
+
+
+@jobs_cli.command("worker")
+@click.option("--once", is_flag=True, help="Procesa la cola pendiente y termina.")
+def jobs_worker(once):
+    """Ejecuta el worker de jobs (ProcessPoolExecutor con JOBS_MAX_WORKERS procesos)."""
+    from flask import current_app
+    from .jobs.runner import JobRunner
+    JobRunner(current_app._get_current_object()).run(once=once)
+
+
+@jobs_cli.command("purge-expired")
+def jobs_purge_expired():
+    """Borra los resultados vencidos (también lo hace el worker cada minuto)."""
+    from flask import current_app
+    from .jobs.runner import JobRunner
+    count = JobRunner(current_app._get_current_object()).purge_expired()
+    click.echo(f"{count} jobs vencidos.")
+
+
+@alerts_cli.command("rebuild-pending-counts")
+def alerts_rebuild_pending_counts():
+    """Recalcula alert_pending_counts desde la tabla alerts (p. ej. tras cargas manuales)."""
+    from .extensions import db
+    from .repository.alert_pending_counts_repository import AlertPendingCountsRepository
+    rows = AlertPendingCountsRepository.rebuild()
+    db.session.commit()
+    click.echo(f"{rows} contadores recalculados.")
+
+
+@alerts_cli.command("escalation-worker")
+@click.option("--once", is_flag=True, help="Sincroniza, dispara lo vencido y termina.")
+def alerts_escalation_worker(once):
+    """Escala las alertas graves sin reconocer según ESCALATION_DELAYS_MIN."""
+    from flask import current_app
+    from .alerts.scheduler import EscalationScheduler
+    EscalationScheduler(current_app._get_current_object()).run(once=once)
+
+
+@notifications_cli.command("worker")
+@click.option("--once", is_flag=True, help="Envía lo vencido y termina.")
+def notifications_worker(once):
+    """Vacía notification_outbox (ThreadPoolExecutor con NOTIFY_MAX_WORKERS hilos)."""
+    from flask import current_app
+    from .notifications.dispatcher import NotificationDispatcher
+    NotificationDispatcher(current_app._get_current_object()).run(once=once)
+
+
+@devices_cli.command("provision")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--dry-run", is_flag=True, help="Solo valida y muestra el reporte.")
+def devices_provision(path, dry_run):
+    """Alta masiva desde un CSV (serial,model[,patient_id,status]) o JSON."""
+    from flask import current_app
+    from .model.dto.batch_schemas import device_rows_from_csv, device_rows_from_json, validate_device_rows
+    from .services.devices_service import DevicesService
+    with open(path, encoding="utf-8-sig") as fh:
+        text = fh.read()
+    items = device_rows_from_json(text) if path.lower().endswith(".json") else device_rows_from_csv(text)
+    rows, errors = validate_device_rows(items, current_app.config["DEVICES_PROVISION_MAX_ROWS"])
+    if "_schema" in errors:
+        raise click.ClickException("; ".join(errors["_schema"]))
+    try:
+        report = DevicesService().provision(rows, errors, dry_run=dry_run)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    ok = 0
+    for item in report["items"]:
+        if item["status"] in ("created", "would_create"):
+            ok += 1
+        else:
+            # Fila 1 = primera fila de datos (en un CSV, la línea 2)
+            detail = item.get("messages") or item.get("id")
+            if "duplicate_of" in item:
+                detail = f"(repite la fila {item['duplicate_of'] + 1})"
+            click.echo(f"fila {item['row'] + 1}: {item['status']} {item.get('serial', '')} {detail or ''}".rstrip())
+    verb = "se crearían" if dry_run else "creados"
+    click.echo(f"{ok} {verb}, {report['skipped']} omitidos.")
+
+
+@devices_cli.command("presence-worker")
+@click.option("--once", is_flag=True, help="Hace un barrido y termina.")
+def devices_presence_worker(once):
+    """Detecta bandas sin contacto (y las que vuelven) cada PRESENCE_SWEEP_S."""
+    from flask import current_app
+    from .presence.sweeper import PresenceSweeper
+    PresenceSweeper(current_app._get_current_object()).run(once=once)
+
+
+@users_cli.command("set-role")
+@click.argument("email")
+@click.argument("role", type=click.Choice(["admin", "client"]))
+def users_set_role(email, role):
+    """Cambia el rol de un usuario; sus tokens emitidos dejan de valer (debe volver a iniciar sesión)."""
+    from .services.identity_service import IdentityService
+    user_id = IdentityService().set_role(email.strip().lower(), role)
+    if user_id is None:
+        raise click.ClickException(f"No existe el usuario {email}.")
+    click.echo(f"Usuario {user_id} ({email}) ahora es {role}.")
+
+
+def register_cli(app: Flask) -> None:
+    """Registra los grupos de comandos en la app."""
+    app.cli.add_command(summaries_cli)
+    app.cli.add_command(jobs_cli)
+    app.cli.add_command(alerts_cli)
+    app.cli.add_command(notifications_cli)
+    app.cli.add_command(devices_cli)
+    app.cli.add_command(users_cli)
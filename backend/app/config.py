@@ -45,6 +45,13 @@ class Config:
         "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
     }
 
+    # Réplicas de lectura para el historial (app/replicas.py); vacío = todo a la primaria
+    SQLALCHEMY_REPLICA_URIS = [u.strip() for u in os.getenv("SQLALCHEMY_REPLICA_URIS", "").split(",") if u.strip()]
+    REPLICA_MAX_LAG_S = float(os.getenv("REPLICA_MAX_LAG_S", "5"))          # más atrasada => primaria; 0 = no se mide
+    REPLICA_CHECK_S = float(os.getenv("REPLICA_CHECK_S", "1"))              # latido + chequeo, por worker
+    REPLICA_STICKY_S = float(os.getenv("REPLICA_STICKY_S", "5"))            # tras escribir, el usuario lee de la primaria
+    REPLICA_CONNECT_TIMEOUT_S = int(os.getenv("REPLICA_CONNECT_TIMEOUT_S", "2"))
+
     # CORS
     CORS_ORIGINS = os.getenv("CORS_ORIGINS", "http://localhost:5173,http://localhost:3000")
     CORS_ORIGINS_LIST = [o.strip() for o in CORS_ORIGINS.split(",") if o.strip()]
@@ -56,3 +63,86 @@ class Config:
     # JSON
     JSON_SORT_KEYS = False
     JSONIFY_PRETTYPRINT_REGULAR = _bool(os.getenv("JSON_PRETTY", "0"))
+
+    # Jobs en segundo plano (reportes, backfills) - ver app/jobs
+    JOBS_RESULT_DIR = os.getenv("JOBS_RESULT_DIR", os.path.join(os.getcwd(), "var", "jobs"))
+    JOBS_MAX_WORKERS = int(os.getenv("JOBS_MAX_WORKERS", "2"))              # procesos del pool
+    JOBS_MAX_PENDING_PER_USER = int(os.getenv("JOBS_MAX_PENDING_PER_USER", "3"))
+    JOBS_RESULT_TTL_HOURS = int(os.getenv("JOBS_RESULT_TTL_HOURS", "24"))
+    JOBS_POLL_INTERVAL_S = float(os.getenv("JOBS_POLL_INTERVAL_S", "2"))
+    JOBS_STALE_AFTER_MIN = int(os.getenv("JOBS_STALE_AFTER_MIN", "60"))     # 'running' huérfanos
+
+    # Ingesta batch (POST /devices/<id>/readings:batch y /telemetry:batch)
+    INGEST_MAX_BATCH = int(os.getenv("INGEST_MAX_BATCH", "5000"))          # muestras por request
+
+    # Alertas por umbral (máquina de estados en app/alerts)
+    ALERT_MIN_DURATION_S = int(os.getenv("ALERT_MIN_DURATION_S", "60"))      # fuera de rango antes de alertar
+    ALERT_COOLDOWN_S = int(os.getenv("ALERT_COOLDOWN_S", "600"))             # re-cruces dentro reabren la alerta
+    ALERT_ESCALATE_AFTER_S = int(os.getenv("ALERT_ESCALATE_AFTER_S", "1800"))  # +1 severidad si el episodio dura más
+    ALERTS_ACK_MAX_BATCH = int(os.getenv("ALERTS_ACK_MAX_BATCH", "1000"))    # tope de POST /admin/alerts/acknowledge
+    ALERT_ANALYTICS_MAX_BUCKETS = int(os.getenv("ALERT_ANALYTICS_MAX_BUCKETS", "1000"))  # GET /admin/alerts/analytics
+    DASHBOARD_PENDING_ALERTS = int(os.getenv("DASHBOARD_PENDING_ALERTS", "10"))  # alertas en GET /me/dashboard
+    DEVICES_PROVISION_MAX_ROWS = int(os.getenv("DEVICES_PROVISION_MAX_ROWS", "5000"))  # POST /admin/devices:bulk
+
+    # Contraseñas y límite de intentos de login (app/passwords.py, app/ratelimit.py)
+    PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")  # al cambiarlo se rehashea al login
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "1"))       # procesos por worker (0 = en el hilo)
+    # En curso + en cola; más => 429. Menor que los hilos de gunicorn (4): siempre quedan hilos libres
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "2"))
+    PASSWORD_HASH_TIMEOUT_S = float(os.getenv("PASSWORD_HASH_TIMEOUT_S", "5"))
+    LOGIN_RATE_PER_IP_PER_MIN = float(os.getenv("LOGIN_RATE_PER_IP_PER_MIN", "30"))  # 0 = sin límite
+    LOGIN_RATE_IP_BURST = int(os.getenv("LOGIN_RATE_IP_BURST", "10"))
+    LOGIN_RATE_PER_EMAIL_PER_MIN = float(os.getenv("LOGIN_RATE_PER_EMAIL_PER_MIN", "6"))
+    LOGIN_RATE_EMAIL_BURST = int(os.getenv("LOGIN_RATE_EMAIL_BURST", "5"))
+    RATE_LIMIT_STORE = os.getenv("RATE_LIMIT_STORE", "memory")              # o "paquete.modulo:objeto"
+
+    # Sentencias SQL por request (app/instrumentation.py): header Server-Timing + log JSON
+    QUERY_STATS_SAMPLE_RATE = float(os.getenv("QUERY_STATS_SAMPLE_RATE", "0.01"))  # fracción de requests; 0 = nunca
+    QUERY_STATS_SLOW_MS = float(os.getenv("QUERY_STATS_SLOW_MS", "200"))   # una sentencia así => log en WARNING
+    QUERY_STATS_TOP_N = int(os.getenv("QUERY_STATS_TOP_N", "3"))           # sentencias más lentas en el log
+
+    # Cachés en memoria por worker (app/cache.py)
+    THRESHOLDS_CACHE_TTL_S = float(os.getenv("THRESHOLDS_CACHE_TTL_S", "300"))  # 0 = sin caché
+    CACHE_VERSION_CHECK_S = float(os.getenv("CACHE_VERSION_CHECK_S", "2"))      # cada cuánto se mira cache_versions
+    STATS_CACHE_TTL_S = float(os.getenv("STATS_CACHE_TTL_S", "5"))              # GET /admin/stats
+    IDENTITY_CACHE_TTL_S = float(os.getenv("IDENTITY_CACHE_TTL_S", "60"))       # usuario del token (rol, bandas)
+    # Tokens emitidos sin claim `ver` (antes de token_version): apagar una vida de token tras el despliegue
+    AUTH_ACCEPT_UNVERSIONED_TOKENS = os.getenv("AUTH_ACCEPT_UNVERSIONED_TOKENS", "true").lower() == "true"
+    STATS_RETENTION_DAYS = int(os.getenv("STATS_RETENTION_DAYS", "8"))          # stats_counters (lo purga el worker)
+
+    # Notificaciones de alertas (outbox + `flask notifications worker`, ver app/notifications)
+    NOTIFY_MIN_SEVERITY = os.getenv("NOTIFY_MIN_SEVERITY", "high")          # se avisa desde esta severidad
+    NOTIFY_WEBHOOK_URLS = os.getenv("NOTIFY_WEBHOOK_URLS", "")              # separados por coma
+    NOTIFY_EMAIL_TO = os.getenv("NOTIFY_EMAIL_TO", "")                      # separados por coma
+    NOTIFY_FILE_PATH = os.getenv("NOTIFY_FILE_PATH", "")                    # sink local (desarrollo)
+    NOTIFY_SMTP_HOST = os.getenv("NOTIFY_SMTP_HOST", "localhost")
+    NOTIFY_SMTP_PORT = int(os.getenv("NOTIFY_SMTP_PORT", "25"))
+    NOTIFY_SMTP_USER = os.getenv("NOTIFY_SMTP_USER", "")
+    NOTIFY_SMTP_PASS = os.getenv("NOTIFY_SMTP_PASS", "")
+    NOTIFY_SMTP_FROM = os.getenv("NOTIFY_SMTP_FROM", "alertas@vitalband.local")
+    NOTIFY_SMTP_STARTTLS = _bool(os.getenv("NOTIFY_SMTP_STARTTLS", "0"))
+    NOTIFY_TIMEOUT_S = float(os.getenv("NOTIFY_TIMEOUT_S", "10"))           # por envío (HTTP / SMTP)
+    NOTIFY_MAX_WORKERS = int(os.getenv("NOTIFY_MAX_WORKERS", "4"))          # hilos de envío
+    NOTIFY_BATCH_SIZE = int(os.getenv("NOTIFY_BATCH_SIZE", "200"))          # filas reclamadas por vuelta
+    NOTIFY_MAX_PER_MESSAGE = int(os.getenv("NOTIFY_MAX_PER_MESSAGE", "50"))  # alertas por POST / correo
+    NOTIFY_RATE_PER_MIN = float(os.getenv("NOTIFY_RATE_PER_MIN", "30"))     # envíos por destinatario
+    NOTIFY_RATE_BURST = int(os.getenv("NOTIFY_RATE_BURST", "10"))
+    NOTIFY_MAX_ATTEMPTS = int(os.getenv("NOTIFY_MAX_ATTEMPTS", "8"))
+    NOTIFY_BACKOFF_BASE_S = float(os.getenv("NOTIFY_BACKOFF_BASE_S", "15"))  # 15s, 30s, 1m, ... con jitter
+    NOTIFY_BACKOFF_MAX_S = float(os.getenv("NOTIFY_BACKOFF_MAX_S", "1800"))
+    NOTIFY_POLL_INTERVAL_S = float(os.getenv("NOTIFY_POLL_INTERVAL_S", "2"))
+    NOTIFY_STALE_AFTER_MIN = int(os.getenv("NOTIFY_STALE_AFTER_MIN", "10"))  # 'sending' huérfanos
+    NOTIFY_RETENTION_DAYS = int(os.getenv("NOTIFY_RETENTION_DAYS", "7"))    # enviadas (las borra el worker)
+
+    # Escalamiento de alertas sin reconocer (`flask alerts escalation-worker`, ver app/alerts/escalation.py)
+    ESCALATION_DELAYS_MIN = os.getenv("ESCALATION_DELAYS_MIN", "15,30,60")  # acumulados; vacío = desactivado
+    ESCALATION_MIN_SEVERITY = os.getenv("ESCALATION_MIN_SEVERITY", "critical")
+    ESCALATION_SYNC_S = float(os.getenv("ESCALATION_SYNC_S", "30"))          # lectura de timers nuevos
+    ESCALATION_BATCH = int(os.getenv("ESCALATION_BATCH", "500"))            # alertas por transacción
+
+    # Presencia de dispositivos (app/presence): último contacto y detección de bandas sin señal
+    PRESENCE_FLUSH_S = float(os.getenv("PRESENCE_FLUSH_S", "5"))               # escrituras coalescidas por worker
+    PRESENCE_OFFLINE_AFTER_S = int(os.getenv("PRESENCE_OFFLINE_AFTER_S", "300"))  # si devices.offline_after_s es NULL
+    PRESENCE_SWEEP_S = float(os.getenv("PRESENCE_SWEEP_S", "30"))               # `flask devices presence-worker`
+    PRESENCE_ALERTS = _bool(os.getenv("PRESENCE_ALERTS", "0"))                 # alerta 'custom' al quedar offline
+    PRESENCE_ALERT_SEVERITY = os.getenv("PRESENCE_ALERT_SEVERITY", "moderate")
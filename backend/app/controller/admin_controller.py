@@ -1,7 +1,8 @@
 # backend/app/controller/admin_controller.py
 
+from datetime import date
 from functools import wraps
-from flask import Blueprint, request, abort, jsonify
+from flask import Blueprint, current_app, request, abort, jsonify
 from flask_jwt_extended import jwt_required, get_jwt, get_jwt_identity
 from marshmallow import ValidationError
 
@@ -10,17 +11,24 @@ from ..services.patients_service import PatientsService
 from ..services.devices_service import DevicesService
 from ..services.alerts_service import AlertsService
 from ..services.thresholds_service import ThresholdsService
+from ..services.summaries_service import SummariesService
+from ..services.stats_service import StatsService
+from ..services.alert_analytics_service import AlertAnalyticsService
+from ..services.jobs_service import JobLimitError
 # (Importa User service si necesitas gestionar usuarios admin/cliente)
 # from ..services.users_service import UsersService
 
 # --- Schemas (DTOs) ---
 from ..model.dto.request_schemas import (
-    PatientCreateRequest, PatientUpdateRequest,
+    PatientCreateRequest, PatientUpdateRequest, PatientSearchQuery,
     DeviceCreateRequest, DeviceUpdateRequest, DeviceAssignRequest, # Asume que existen
-    ThresholdUpdateRequest, AlertAcknowledgeRequest # Asume que existen
+    ThresholdUpdateRequest, AlertAcknowledgeRequest, # Asume que existen
+    AlertBulkAcknowledgeRequest, AlertAnalyticsQuery, FleetQuery
 )
+from ..model.dto.batch_schemas import device_rows_from_csv, device_rows_from_json, validate_device_rows
 from ..model.dto.response_schemas import (
-    PatientResponse, DeviceResponse, AlertResponse, ThresholdResponse # Asume que existen
+    PatientResponse, PatientListItemResponse, DeviceResponse, AlertResponse, ThresholdResponse, # Asume que existen
+    DailySummaryResponse, FleetDeviceResponse, JobResponse
 )
 
 admin_bp = Blueprint("admin", __name__) # Prefijo manejado en app/__init__.py
@@ -30,6 +38,9 @@ _patients_service = PatientsService()
 _devices_service = DevicesService()
 _alerts_service = AlertsService()
 _thresholds_service = ThresholdsService()
+_summaries_service = SummariesService()
+_stats_service = StatsService()
+_alert_analytics_service = AlertAnalyticsService()
 # _users_service = UsersService() # Si gestionas usuarios
 
 # --- Instancias de Schemas ---
@@ -37,14 +48,20 @@ _patient_create_in = PatientCreateRequest()
 _patient_update_in = PatientUpdateRequest()
 _patient_out = PatientResponse()
 _patient_out_many = PatientResponse(many=True)
+_patient_search_in = PatientSearchQuery()
+_patient_list_out_many = PatientListItemResponse(many=True)
 
 _device_create_in = DeviceCreateRequest() # Asume existencia
 _device_update_in = DeviceUpdateRequest() # Asume existencia
 _device_assign_in = DeviceAssignRequest() # Asume existencia
 _device_out = DeviceResponse() # Asume existencia
 _device_out_many = DeviceResponse(many=True) # Asume existencia
+_fleet_in = FleetQuery()
+_fleet_out_many = FleetDeviceResponse(many=True)
 
 _alert_ack_in = AlertAcknowledgeRequest() # Asume existencia
+_alert_bulk_ack_in = AlertBulkAcknowledgeRequest()
+_alert_analytics_in = AlertAnalyticsQuery()
 _alert_out = AlertResponse() # Asume existencia
 _alert_out_many = AlertResponse(many=True) # Asume existencia
 
@@ -52,6 +69,9 @@ _threshold_update_in = ThresholdUpdateRequest() # Asume existencia
 _threshold_out = ThresholdResponse() # Asume existencia
 _threshold_out_many = ThresholdResponse(many=True) # Asume existencia
 
+_summary_out_many = DailySummaryResponse(many=True)
+_job_out = JobResponse()
+
 # === Decorador para verificar rol de Admin ===
 def admin_required():
     def wrapper(fn):
@@ -93,10 +113,19 @@ def create_patient():
 @admin_bp.get("/patients")
 @admin_required()
 def list_patients_admin():
-    """Lista todos los pacientes (potencialmente con filtros/paginación)."""
-    # TODO: Añadir filtros (por nombre, email?) y paginación si es necesario
-    patients = _patients_service.list_patients()
-    return {"items": _patient_out_many.dump(patients)}, 200
+    """
+    Listado paginado de pacientes con búsqueda por nombre, email o teléfono.
+
+    Query params: q (subcadena; varias palabras = todas), limit (1-200, 50 por
+    defecto), cursor (`next_cursor` de la página anterior), ids (lista separada
+    por comas, hasta 200: solo esos pacientes).
+    """
+    try:
+        q = _patient_search_in.load(request.args)
+    except ValidationError as err:
+        return {"messages": err.messages}, 400
+    page = _patients_service.search(q.get("q"), q["limit"], q.get("cursor"), ids=q.get("ids"))
+    return {"items": _patient_list_out_many.dump(page["items"]), "next_cursor": page["next_cursor"]}, 200
 
 @admin_bp.get("/patients/<int:patient_id>")
 @admin_required()
@@ -132,17 +161,17 @@ def update_patient(patient_id: int):
 @admin_bp.delete("/patients/<int:patient_id>")
 @admin_required()
 def delete_patient(patient_id: int):
-    """Elimina un paciente."""
-    if not _patients_service.get(patient_id):
+    """
+    Elimina un paciente en segundo plano: desasigna sus bandas y encola el job
+    'purge_patient'. Responde 202 con el job (seguir en /admin/jobs/<id>).
+    """
+    try:
+        job = _patients_service.schedule_delete(patient_id, requested_by=int(get_jwt_identity()))
+    except JobLimitError as e:
+        abort(429, description=str(e))
+    if job is None:
         abort(404, description="Paciente no encontrado.")
-
-    # --- INICIO DEL CÓDIGO REAL (REEMPLAZA EL PLACEHOLDER) ---
-    success = _patients_service.delete(patient_id)
-    if not success:
-        abort(500, description="Error al eliminar el paciente.")
-    
-    return "", 204 # Éxito (No Content)
-    # --- FIN DEL CÓDIGO REAL ---
+    return _job_out.dump(job), 202
 
 # ===========================
 # DISPOSITIVOS (CRUD + Asignación)
@@ -168,6 +197,38 @@ def register_device():
     except Exception as e: 
         abort(500, description=f"Error interno al registrar dispositivo: {e}")
 
+def _provision_items():
+    """Filas del alta masiva: CSV (archivo multipart 'file' o body text/csv) o JSON (array o {"items": [...]})."""
+    upload = request.files.get("file")
+    if upload is not None:
+        text = upload.read().decode("utf-8-sig", errors="replace")
+        if (upload.filename or "").lower().endswith(".json"):
+            return device_rows_from_json(text)
+        return device_rows_from_csv(text)
+    if request.mimetype == "text/csv":
+        return device_rows_from_csv(request.get_data(as_text=True))
+    body = request.get_json(force=True, silent=True)
+    return body.get("items") if isinstance(body, dict) else body
+
+@admin_bp.post("/devices:bulk")
+@admin_required()
+def provision_devices_bulk():
+    """
+    Alta masiva de dispositivos (envío de bandas): serial, model y opcionales
+    patient_id / status por fila, en CSV o JSON. Un solo INSERT multi-fila en una
+    transacción; devuelve el resultado de cada fila (created, exists, duplicate,
+    patient_not_found, invalid). Con ?dry_run=1 solo valida.
+    """
+    rows, errors = validate_device_rows(_provision_items(), current_app.config["DEVICES_PROVISION_MAX_ROWS"])
+    if "_schema" in errors:
+        return {"messages": errors}, 400
+    dry_run = request.args.get("dry_run", "").lower() in ("1", "true")
+    try:
+        report = _devices_service.provision(rows, errors, dry_run=dry_run)
+    except ValueError as e:
+        abort(409, description=str(e))
+    return report, 201 if report["created"] else 200
+
 @admin_bp.get("/devices")
 @admin_required()
 def list_devices_admin():
@@ -178,6 +239,26 @@ def list_devices_admin():
     return {"items": _device_out_many.dump(devices)}, 200
     # --- FIN DEL CÓDIGO REAL ---
 
+@admin_bp.get("/devices/fleet")
+@admin_required()
+def list_fleet():
+    """
+    Vista de flota: cada dispositivo con paciente, último contacto, última lectura,
+    batería / señal y `online`, en una consulta por página (sin llamadas por dispositivo).
+
+    Query params: limit (1-500), cursor (`next_cursor` de la página anterior),
+    status (lista con coma), patient_id, offline_min, online (true|false), battery_below.
+    """
+    try:
+        q = _fleet_in.load(request.args)
+    except ValidationError as err:
+        return {"messages": err.messages}, 400
+    page = _devices_service.fleet(
+        q["limit"], q.get("cursor"), statuses=q.get("status"), patient_id=q.get("patient_id"),
+        offline_min=q.get("offline_min"), online=q.get("online"), battery_below=q.get("battery_below"),
+    )
+    return {"items": _fleet_out_many.dump(page["items"]), "next_cursor": page["next_cursor"]}, 200
+
 @admin_bp.get("/devices/<int:device_id>")
 @admin_required()
 def get_device_detail(device_id: int):
@@ -233,17 +314,19 @@ def assign_device_to_patient(device_id: int):
 @admin_bp.delete("/devices/<int:device_id>")
 @admin_required()
 def delete_device(device_id: int):
-    """Elimina un dispositivo (¡cuidado con los datos asociados!)."""
+    """
+    Elimina un dispositivo con todo su historial en segundo plano: lo marca 'retired'
+    y encola el job 'purge_device'. Responde 202 con el job (seguir en /admin/jobs/<id>).
+    """
     device = _devices_service.get_by_id(device_id) # Necesitamos el objeto
     if not device:
         abort(404, description="Dispositivo no encontrado.")
 
-    # --- INICIO DEL CÓDIGO REAL (REEMPLAZA EL PLACEHOLDER) ---
-    success = _devices_service.delete(device)
-    if not success:
-        abort(500, description="Error al eliminar el dispositivo.")
-    return "", 204
-    # --- FIN DEL CÓDIGO REAL ---
+    try:
+        job = _devices_service.schedule_delete(device, requested_by=int(get_jwt_identity()))
+    except JobLimitError as e:
+        abort(429, description=str(e))
+    return _job_out.dump(job), 202
 
 # ===========================
 # ALERTAS (Gestión)
@@ -306,7 +389,8 @@ def acknowledge_alert(alert_id: int):
 def get_global_thresholds():
     """Obtiene los umbrales globales para todas las métricas."""
     metrics = ["heart_rate", "temperature", "spo2"] # O obtén de Enum
-    thresholds = [_thresholds_service.get_thresholds(patient_id=None, metric=m) for m in metrics]
+    effective = _thresholds_service.effective_thresholds(None)  # una sola consulta (o caché)
+    thresholds = [effective[m] for m in metrics]
     # Filtra los que no tengan min/max definidos si quieres solo los existentes
     # existing_thresholds = [t for t in thresholds if t.get('min') is not None or t.get('max') is not None]
     # Serializa usando el schema adecuado
@@ -326,12 +410,17 @@ def set_global_threshold(metric: str):
     except ValidationError as err:
         return {"messages": err.messages}, 400
 
-    threshold = _thresholds_service.upsert_thresholds(
-        patient_id=None,
-        metric=metric,
-        min_value=data.get("min_value"),
-        max_value=data.get("max_value")
-    )
+    try:
+        threshold = _thresholds_service.upsert_thresholds(
+            patient_id=None,
+            metric=metric,
+            min_value=data.get("min_value"),
+            max_value=data.get("max_value"),
+            reevaluate_hours=data.get("reevaluate_hours"),
+            requested_by=int(get_jwt_identity()),
+        )
+    except JobLimitError as e:
+        abort(429, description=str(e))
     return _threshold_out.dump(threshold), 200
 
 
@@ -343,8 +432,9 @@ def get_patient_thresholds(patient_id: int):
         abort(404, description="Paciente no encontrado.")
 
     metrics = ["heart_rate", "temperature", "spo2"]
-    # El servicio ya debería manejar la lógica de fallback a global si no hay específico
-    thresholds = [_thresholds_service.get_thresholds(patient_id=patient_id, metric=m) for m in metrics]
+    # El servicio resuelve el fallback a global / por defecto (una sola consulta o caché)
+    effective = _thresholds_service.effective_thresholds(patient_id)
+    thresholds = [effective[m] for m in metrics]
     # Serializa usando el schema adecuado
     return {"items": _threshold_out_many.dump(thresholds)}, 200
 
@@ -363,12 +453,17 @@ def set_patient_threshold(patient_id: int, metric: str):
     except ValidationError as err:
         return {"messages": err.messages}, 400
 
-    threshold = _thresholds_service.upsert_thresholds(
-        patient_id=patient_id,
-        metric=metric,
-        min_value=data.get("min_value"),
-        max_value=data.get("max_value")
-    )
+    try:
+        threshold = _thresholds_service.upsert_thresholds(
+            patient_id=patient_id,
+            metric=metric,
+            min_value=data.get("min_value"),
+            max_value=data.get("max_value"),
+            reevaluate_hours=data.get("reevaluate_hours"),
+            requested_by=int(get_jwt_identity()),
+        )
+    except JobLimitError as e:
+        abort(429, description=str(e))
     return _threshold_out.dump(threshold), 200
 
 # ===========================
@@ -386,22 +481,103 @@ def get_pending_alerts():
     
     return {"items": _alert_out_many.dump(alerts)}, 200
 
+@admin_bp.post("/alerts/acknowledge")
+@admin_required()
+def acknowledge_alerts_bulk():
+    """
+    Reconoce varias alertas pendientes de una vez (triage).
+    Body: {"ids": [..]} y/o filtro {"patient_id", "type", "before"}; las ya reconocidas se ignoran.
+    """
+    payload = request.get_json() or {}
+    try:
+        data = _alert_bulk_ack_in.load(payload)
+    except ValidationError as err:
+        return {"messages": err.messages}, 400
+
+    result = _alerts_service.acknowledge_many(
+        int(get_jwt_identity()),
+        ids=data.get("ids"),
+        patient_id=data.get("patient_id"),
+        type=data.get("type"),
+        before=data.get("before"),
+        limit=current_app.config["ALERTS_ACK_MAX_BATCH"],
+    )
+    if result is None:
+        abort(500, description="Error al reconocer las alertas.")
+    return result, 200
+
+@admin_bp.get("/alerts/pending/count")
+@admin_required()
+def get_pending_alerts_count():
+    """Conteo de alertas pendientes por severidad (badges). Query param opcional: patient_id."""
+    patient_id = request.args.get("patient_id", type=int)
+    return _alerts_service.pending_counts(patient_id), 200
+
+@admin_bp.get("/alerts/analytics")
+@admin_required()
+def get_alerts_analytics():
+    """
+    Tendencia de alertas: conteo por intervalo y tiempo medio de reconocimiento.
+
+    Query params: from, to (ISO, por defecto los últimos 30 días), bucket (hour|day|week),
+    group_by (patient,type,severity), filtros patient_id / type / severity (listas con
+    coma) y compare=previous o compare_from (periodo de igual duración a comparar).
+    """
+    try:
+        q = _alert_analytics_in.load(request.args)
+    except ValidationError as err:
+        return {"messages": err.messages}, 400
+    try:
+        return _alert_analytics_service.trends(
+            q.get("from_"), q.get("to"), bucket=q["bucket"], group_by=q["group_by"],
+            patient_ids=q.get("patient_id"), types=q.get("type"), severities=q.get("severity"),
+            compare=q.get("compare"), compare_from=q.get("compare_from"),
+            max_buckets=current_app.config["ALERT_ANALYTICS_MAX_BUCKETS"],
+        ), 200
+    except ValueError as e:
+        abort(400, description=str(e))
+
 # ===========================
-# ESTADÍSTICAS (Opcional)
+# RESÚMENES DIARIOS
 # ===========================
 
-# @admin_bp.get("/stats")
-# @admin_required()
-# def get_admin_dashboard_stats():
-#     """ Devuelve KPIs para el panel de admin. """
-#     # Aquí iría la lógica para calcular:
-#     # - Número de pacientes activos
-#     # - Número de dispositivos conectados
-#     # - Conteo de alertas recientes por tipo/severidad
-#     # Necesitarías métodos en los servicios/repositorios para obtener estos datos agregados.
-#     stats = {
-#         "active_patients": _patients_service.count_active(), # Ejemplo
-#         "active_devices": _devices_service.count_active(), # Ejemplo
-#         "recent_alerts": _alerts_service.count_recent_by_severity() # Ejemplo
-#     }
-#     return jsonify(stats), 200
\ No newline at end of file
+@admin_bp.get("/summaries/daily")
+@admin_required()
+def list_daily_summaries():
+    """Lista el resumen diario precalculado de los pacientes ("ayer de un vistazo").
+
+    Query params: day (YYYY-MM-DD, por defecto ayer), page, per_page, patient_id.
+    """
+    day_str = request.args.get("day")
+    try:
+        day = date.fromisoformat(day_str) if day_str else _summaries_service.yesterday()
+    except ValueError:
+        abort(400, description=f"Formato de día inválido: '{day_str}'.")
+    page = max(1, request.args.get("page", default=1, type=int))
+    per_page = max(1, min(request.args.get("per_page", default=100, type=int), 500))
+    patient_id = request.args.get("patient_id", type=int)
+
+    rows = _summaries_service.list_for_day(day, page=page, per_page=per_page, patient_id=patient_id)
+    items = []
+    for summary, first_name, last_name in rows:
+        summary.patient_name = f"{first_name} {last_name}".strip()
+        items.append(summary)
+    return {"day": day.isoformat(), "page": page, "items": _summary_out_many.dump(items)}, 200
+
+# ===========================
+# ESTADÍSTICAS (panel)
+# ===========================
+
+@admin_bp.get("/stats")
+@admin_required()
+def get_admin_dashboard_stats():
+    """
+    KPIs del panel de admin: pacientes, dispositivos por estado y con contacto en los
+    últimos 5 min, alertas por severidad (1h/24h/7d), pendientes y lecturas por minuto.
+    Sale de contadores precalculados y se cachea unos segundos (STATS_CACHE_TTL_S).
+    """
+    try:
+        return _stats_service.dashboard(), 200
+    except Exception as e:
+        current_app.logger.error(f"Error al calcular las estadísticas del panel: {e}", exc_info=True)
+        abort(500, description="Error al calcular las estadísticas.")
\ No newline at end of file
@@ -1,8 +1,8 @@
 import logging
+import math
 from flask import Blueprint, request, abort, jsonify, current_app
-from werkzeug.security import generate_password_hash, check_password_hash
 # Asegúrate que create_access_token se importa correctamente
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity, get_jwt
+from flask_jwt_extended import create_access_token, current_user, jwt_required
 from marshmallow import ValidationError
 
 # Schemas
@@ -13,6 +13,10 @@ from ..model.dto.response_schemas import UserResponse
 
 from ..model.models import User
 from ..extensions import db
+from ..passwords import HasherBusy
+from ..repository.unit_of_work import unit_of_work
+from ..services.auth_service import AuthService
+from ..services.identity_service import IdentityService
 from ..services.patients_service import PatientsService
 
 auth_bp = Blueprint("auth", __name__)
@@ -24,10 +28,19 @@ _forgot_password_in = ForgotPasswordRequest()
 _reset_password_in = ResetPasswordRequest()
 _user_out = UserResponse()
 _patients_service = PatientsService()
+_identity_service = IdentityService()
+_auth_service = AuthService(_identity_service)
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO) # Mantenemos logging visible
 
+
+def _too_many_attempts(retry_after: float):
+    """429 con Retry-After (límite de intentos o pool de hashing saturado)."""
+    return ({"message": "Demasiados intentos. Intente nuevamente en unos segundos."}, 429,
+            {"Retry-After": str(max(1, math.ceil(retry_after)))})
+
+
 @auth_bp.post("/login")
 def login():
     """Autentica un usuario y devuelve un token JWT."""
@@ -41,12 +54,22 @@ def login():
     email = (data.get("email") or "").strip().lower()
     password = (data.get("password") or "").strip()
 
-    user = User.query.filter_by(email=email).first()
+    # Límite por IP y por email antes de hashear nada (sin consultas)
+    wait = _auth_service.throttle(request.remote_addr or "-", email)
+    if wait:
+        logger.warning(f"Login limitado para {email} desde {request.remote_addr} (reintentar en {wait:.1f}s)")
+        return _too_many_attempts(wait)
 
-    if user and check_password_hash(user.pass_hash, password):
+    # Usuario y claims del token (rol, paciente, bandas) en una sola consulta; el hash
+    # se verifica en el pool de procesos y, si usa parámetros viejos, se rehashea aparte
+    try:
+        user, additional = _auth_service.authenticate(email, password)
+    except HasherBusy:
+        logger.warning(f"Login rechazado para {email}: pool de hashing saturado")
+        return _too_many_attempts(1)
+
+    if user:
         user_id_int = user.id # Guardamos el ID como entero
-        role = user.role
-        additional = {"role": role}
 
         # --- DEBUG FINAL (Mantenemos) ---
         csrf_config_value = current_app.config.get('JWT_CSRF_IN_ACCESS_TOKEN')
@@ -85,43 +108,52 @@ def register():
     password = data["password"]
     name = data.get("name", "")
 
+    wait = _auth_service.throttle(request.remote_addr or "-")
+    if wait:
+        return _too_many_attempts(wait)
+
     if User.query.filter_by(email=email).first():
         logger.warning(f"Intento de registro fallido (email ya existe): {email}")
         abort(409, description="El correo electrónico ya está registrado.")
 
-    password_hash = generate_password_hash(password)
+    try:
+        password_hash = _auth_service.hash_password(password)
+    except HasherBusy:
+        return _too_many_attempts(1)
 
     new_user = User(name=name, email=email, pass_hash=password_hash, role='client')
 
     try:
-        db.session.add(new_user)
-        db.session.commit()
-        db.session.refresh(new_user)
-        logger.info(f"Nuevo usuario registrado: {new_user.id} ({email})")
-
-        # --- INICIO DE LA MODIFICACIÓN ---
-        # Ahora, crea automáticamente el perfil de paciente asociado
-        try:
-            # Extrae nombres del campo 'name'
-            name_parts = name.split(' ', 1)
-            first_name = name_parts[0]
-            last_name = name_parts[1] if len(name_parts) > 1 else "" # Apellido opcional
-
-            _patients_service.create_patient(
-                user_id=new_user.id,
-                first_name=first_name,
-                last_name=last_name,
-                email=email # Puede usar el mismo email
-            )
-            logger.info(f"Perfil de paciente creado automáticamente para user_ID {new_user.id}")
-        except Exception as e:
-            # Si esto falla, el registro de usuario debe deshacerse (rollback)
-            logger.error(f"¡FALLO CRÍTICO! El usuario {new_user.id} se creó, pero su perfil de paciente falló: {e}")
-            # Lanza el error para que el 'except' de abajo lo capture y haga rollback
-            raise e
-        # --- FIN DE LA MODIFICACIÓN ---
-
-        additional = {"role": new_user.role}
+        # Usuario y perfil de paciente en una sola transacción: si el paciente falla,
+        # no queda un usuario huérfano confirmado (antes se hacía commit del usuario primero).
+        with unit_of_work():
+            db.session.add(new_user)
+            db.session.flush()  # asigna new_user.id sin confirmar ni recargar la fila
+
+            # --- INICIO DE LA MODIFICACIÓN ---
+            # Ahora, crea automáticamente el perfil de paciente asociado
+            try:
+                # Extrae nombres del campo 'name'
+                name_parts = name.split(' ', 1)
+                first_name = name_parts[0]
+                last_name = name_parts[1] if len(name_parts) > 1 else "" # Apellido opcional
+
+                _patients_service.create_patient(
+                    user_id=new_user.id,
+                    first_name=first_name,
+                    last_name=last_name,
+                    email=email # Puede usar el mismo email
+                )
+            except Exception as e:
+                # Si esto falla, unit_of_work deshace también la creación del usuario
+                logger.error(f"¡FALLO CRÍTICO! El perfil de paciente del usuario {email} falló: {e}")
+                # Lanza el error para que el 'except' de abajo lo capture
+                raise e
+            # --- FIN DE LA MODIFICACIÓN ---
+        logger.info(f"Nuevo usuario registrado: {new_user.id} ({email}) con su perfil de paciente")
+
+        # Claims con el paciente recién creado
+        _, additional = _identity_service.find_for_login(email)
         user_id_str_reg = str(new_user.id) 
         token = create_access_token(identity=user_id_str_reg, additional_claims=additional) 
 
@@ -180,33 +212,8 @@ def reset_password():
 @jwt_required()
 def get_me():
     """Obtiene la información básica del usuario autenticado."""
-    # --- MODIFICACIÓN: get_jwt_identity ahora devolverá string ---
-    user_id_str = get_jwt_identity()
-    # --- FIN MODIFICACIÓN ---
-    claims = get_jwt()
-    user_role = claims.get('role')
-
-    # Validación extra por si acaso
-    if not user_id_str or not isinstance(user_id_str, str):
-        logger.error(f"Error en /me: get_jwt_identity() no devolvió un string: {user_id_str}")
-        return {"message": "Identidad de token inválida."}, 401
-    if not user_role:
-        logger.error("Token JWT incompleto detectado en /me (falta role)")
-        return {"message": "Token incompleto"}, 401
-
-    try:
-        # --- MODIFICACIÓN: Convertir de vuelta a int para buscar en BD ---
-        user_id = int(user_id_str)
-        # --- FIN MODIFICACIÓN ---
-    except ValueError:
-        logger.error(f"Error en /me: La identidad del token no es un entero válido: {user_id_str}")
-        return {"message": "Identidad de token inválida."}, 401
-
-    user = User.query.get(user_id)
-    if not user:
-        logger.error(f"Usuario con ID {user_id} del token no encontrado en la base de datos.")
-        return {"message": "Usuario asociado al token no encontrado"}, 401
-
+    # current_user es la Identity del token (ya validada contra users.token_version): sin consultas
+    user = current_user
     response_data = {
         "id": user.id,
         "email": user.email,
@@ -1,14 +1,19 @@
-from flask import Blueprint, request, abort
+from datetime import datetime
+from flask import Blueprint, request, abort, current_app, jsonify
 # IMPORTANTE: Asegúrate que jwt_required se importa correctamente
 from flask_jwt_extended import jwt_required, current_user
-from ..model.models import User
+from marshmallow import ValidationError
+from ..services.identity_service import Identity
 # Importa los servicios necesarios
 from ..services.patients_service import PatientsService
 from ..services.metrics_service import MetricsService
 from ..services.alerts_service import AlertsService
 from ..services.devices_service import DevicesService
+from ..services.dashboard_service import DashboardService
 # Importa los schemas de respuesta
-from ..model.dto.response_schemas import PatientResponse, ReadingResponse, AlertResponse, DeviceResponse
+from ..model.dto.response_schemas import (PatientResponse, PatientListItemResponse, ReadingResponse, AlertResponse,
+                                          DeviceResponse, ThresholdResponse)
+from ..model.dto.request_schemas import PatientSearchQuery
 # Importa el helper de parseo de fechas si lo moviste
 from ..controller.telemetry_controller import _parse_dt # Asumiendo que está ahí
 
@@ -20,25 +25,47 @@ _patients_service = PatientsService()
 _metrics_service = MetricsService()
 _alerts_service = AlertsService()
 _devices_service = DevicesService()
+_dashboard_service = DashboardService()
 
 # --- Instancias de Schemas ---
 _patient_out = PatientResponse()
 _patient_out_many = PatientResponse(many=True)
+_patient_search_in = PatientSearchQuery()
+_patient_list_out_many = PatientListItemResponse(many=True)
+_reading_out = ReadingResponse()
 _readings_out_many = ReadingResponse(many=True)
 _alert_out_many = AlertResponse(many=True)
 _device_out_many = DeviceResponse(many=True)
+_device_out = DeviceResponse()
+# Sin created_at: en los umbrales por defecto es "ahora" y cambiaría el ETag en cada request
+_threshold_out_many = ThresholdResponse(many=True, only=("id", "patient_id", "metric", "min_value", "max_value"))
 
 # === Helper REESCRITO para usar current_user ===
 def _get_patient_from_jwt() -> dict:
-    user: User = current_user
+    # Paciente y bandas vienen de la Identity cacheada (sin consultas; ver identity_service)
+    user: Identity = current_user
     if not user:
         abort(401, description="Usuario no encontrado para este token.")
 
-    # --- ASEGÚRATE QUE ESTA ES LA LÓGICA ACTIVA ---
-    patient = _patients_service.get_by_user_id(user.id) # Usa el método del servicio
-    if not patient:
+    if user.patient_id is None:
          abort(404, description=f"Perfil de paciente no encontrado para el usuario {user.email} (ID: {user.id}).") # <-- ESTE ES EL 404
-    return {"id": patient.id, "user_id": user.id, "email": user.email}
+    return {"id": user.patient_id, "user_id": user.id, "email": user.email, "device_ids": user.device_ids}
+
+# Máximo de lecturas devueltas por página en el historial
+_MAX_HISTORY_LIMIT = 5000
+
+# === Helpers de cursor keyset para el historial: "<ts ISO>_<id>" ===
+def _encode_cursor(reading) -> str:
+    return f"{reading.ts.isoformat()}_{reading.id}"
+
+def _parse_cursor(s: str | None) -> tuple[datetime, int] | None:
+    if not s:
+        return None
+    try:
+        ts_str, id_str = s.rsplit("_", 1)
+        return datetime.fromisoformat(ts_str), int(id_str)
+    except ValueError:
+        abort(400, description=f"Cursor inválido: '{s}'.")
 
 # === Rutas para el Cliente (Actualizadas) ===
 
@@ -76,54 +103,108 @@ def get_my_devices():
 @jwt_required()
 # --- FIN REVERSIÓN ---
 def get_my_latest_readings():
-    """Obtiene la última lectura registrada para el dashboard."""
+    """Obtiene la última lectura registrada para el dashboard (considera todas las bandas)."""
     patient_data = _get_patient_from_jwt()
     patient_id = patient_data["id"]
 
     devices = _devices_service.list_by_patient(patient_id)
     if not devices:
-        return {"latest_reading": None, "device_status": "No asignado"}, 200
+        return {"latest_reading": None, "device_status": "No asignado", "devices": []}, 200
 
-    # Asume que el cliente solo tiene un dispositivo activo a la vez
-    # Podrías necesitar lógica más compleja si puede tener varios
-    device = devices[0]
+    # Una sola consulta para la última lectura de cada dispositivo del paciente
+    latest_by_device = _metrics_service.get_latest_readings([d.id for d in devices])
 
-    # --- Lógica Real ---
-    latest_reading = _metrics_service.get_latest_reading(device.id) # Usa el método del servicio
-    # --- Fin Lógica Real ---
-
-    latest_dump = ReadingResponse().dump(latest_reading) if latest_reading else None
+    # La lectura "principal" es la más reciente entre todas las bandas
+    latest_reading = max(latest_by_device.values(), key=lambda r: (r.ts, r.id), default=None)
+    device = next((d for d in devices if latest_reading and d.id == latest_reading.device_id), devices[0])
 
     return {
-        "latest_reading": latest_dump,
-        "device_status": device.status # Estado del dispositivo encontrado
+        "latest_reading": _reading_out.dump(latest_reading) if latest_reading else None,
+        "device_status": device.status, # Estado del dispositivo de la última lectura
+        "devices": [
+            {
+                "device_id": d.id,
+                "serial": d.serial,
+                "status": d.status,
+                "latest_reading": (_reading_out.dump(latest_by_device[d.id])
+                                   if d.id in latest_by_device else None),
+            }
+            for d in devices
+        ],
         }, 200
 
+@client_bp.get("/me/dashboard")
+@jwt_required()
+def get_my_dashboard():
+    """Perfil, bandas con su última lectura, alertas pendientes y umbrales en una sola respuesta.
+
+    Reemplaza las llamadas a /me/profile, /me/devices, /me/readings/latest y /me/alerts
+    (ver DashboardService: número fijo de consultas). Lleva ETag: con If-None-Match y
+    sin cambios responde 304 sin cuerpo.
+    """
+    patient_data = _get_patient_from_jwt()
+    data = _dashboard_service.build(patient_data["id"], current_app.config["DASHBOARD_PENDING_ALERTS"])
+    if data is None:
+        abort(404, description="Perfil de paciente no encontrado.")
+
+    latest_by_device = data["latest_by_device"]
+    latest_reading = data["latest_reading"]
+    devices = data["devices"]
+    device = next((d for d in devices if latest_reading and d.id == latest_reading.device_id),
+                  devices[0] if devices else None)
+    thresholds = data["thresholds"]
+    body = {
+        "profile": _patient_out.dump(data["patient"]),
+        "devices": [
+            {**_device_out.dump(d),
+             "latest_reading": (_reading_out.dump(latest_by_device[d.id]) if d.id in latest_by_device else None)}
+            for d in devices
+        ],
+        "latest_reading": _reading_out.dump(latest_reading) if latest_reading else None,
+        "device_status": device.status if device else "No asignado",
+        "alerts": {"pending": _alert_out_many.dump(data["pending_alerts"]), **data["pending_counts"]},
+        "thresholds": _threshold_out_many.dump([thresholds[m] for m in sorted(thresholds)]),
+    }
+    response = jsonify(body)
+    response.headers["Cache-Control"] = "private, no-cache"  # revalidar siempre (con el ETag)
+    response.add_etag()
+    return response.make_conditional(request)
+
 @client_bp.get("/me/readings") # Historial
 # --- REVERTIDO ---
 @jwt_required()
 # --- FIN REVERSIÓN ---
 def get_my_readings_history():
-    """Obtiene el historial de lecturas para el usuario autenticado, con filtros."""
-    patient_data = _get_patient_from_jwt()
-    patient_id = patient_data["id"]
+    """Obtiene el historial de lecturas para el usuario autenticado, con filtros.
 
-    devices = _devices_service.list_by_patient(patient_id)
-    if not devices:
-        return {"items": []}, 200
+    Mezcla por fecha las lecturas de TODOS los dispositivos del paciente (una banda
+    reemplazada conserva su historial). Filtros opcionales: from, to, limit,
+    device_id (solo una banda) y cursor (paginación keyset, ver `next_cursor`).
+    """
+    patient_data = _get_patient_from_jwt()
+    device_ids = sorted(patient_data["device_ids"])
+    if not device_ids:
+        return {"items": [], "next_cursor": None}, 200
 
-    device_id = devices[0].id
+    device_filter = request.args.get("device_id", type=int)
+    if device_filter is not None:
+        if device_filter not in device_ids:
+            abort(403, description="Acceso denegado a las lecturas de este dispositivo.")
+        device_ids = [device_filter]
 
-    # Parseo de parámetros de fecha y límite (sin cambios)
+    # Parseo de parámetros de fecha, límite y cursor
     dt_from_str = request.args.get("from")
     dt_to_str = request.args.get("to")
     limit = request.args.get("limit", default=1000, type=int)
+    limit = max(1, min(limit, _MAX_HISTORY_LIMIT))
 
     dt_from = _parse_dt(dt_from_str)
     dt_to = _parse_dt(dt_to_str)
+    before = _parse_cursor(request.args.get("cursor"))
 
-    readings = _metrics_service.list_range(device_id, dt_from, dt_to, limit)
-    return {"items": _readings_out_many.dump(readings)}, 200
+    readings = _metrics_service.list_range_for_devices(device_ids, dt_from, dt_to, limit, before)
+    next_cursor = _encode_cursor(readings[-1]) if len(readings) == limit else None
+    return {"items": _readings_out_many.dump(readings), "next_cursor": next_cursor}, 200
 
 @client_bp.get("/me/alerts")
 # --- REVERTIDO ---
@@ -148,11 +229,15 @@ def get_my_alerts():
 def list_patients_public():
     """Lista pública de pacientes (solo para compatibilidad con tests).
 
-    Devuelve una lista básica de pacientes; en producción debería requerir autorizacion
-    o limitar campos. Aquí seguimos lo que esperan los tests.
+    Devuelve una página con los campos básicos (misma búsqueda y paginación que
+    /admin/patients: q, limit, cursor); en producción debería requerir autorizacion.
     """
-    patients = _patients_service.list_patients()
-    return {"items": _patient_out_many.dump(patients)}, 200
+    try:
+        q = _patient_search_in.load(request.args)
+    except ValidationError as err:
+        return {"messages": err.messages}, 400
+    page = _patients_service.search(q.get("q"), q["limit"], q.get("cursor"))
+    return {"items": _patient_list_out_many.dump(page["items"]), "next_cursor": page["next_cursor"]}, 200
 
 @client_bp.get("/metrics/<int:device_id>/last24h")
 @jwt_required()
@@ -0,0 +1,60 @@
+# backend/app/controller/jobs_controller.py
+
+import os
+from flask import Blueprint, request, abort, send_file
+from flask_jwt_extended import get_jwt_identity
+from marshmallow import ValidationError
+
+from ..services.jobs_service import JobsService, JobLimitError
+from ..model.dto.request_schemas import JobCreateRequest
+from ..model.dto.response_schemas import JobResponse
+from .admin_controller import admin_required
+
+jobs_bp = Blueprint("jobs", __name__) # Prefijo /api/v1/admin/jobs en app/__init__.py
+
+_jobs_service = JobsService()
+_job_in = JobCreateRequest()
+_job_out = JobResponse()
+
+
+@jobs_bp.post("")
+@admin_required()
+def submit_job():
+    """Encola un job pesado (ej. kind='patient_report' o 'summaries_backfill'). Responde 202."""
+    payload = request.get_json() or {}
+    try:
+        data = _job_in.load(payload)
+    except ValidationError as err:
+        return {"messages": err.messages}, 400
+
+    try:
+        job = _jobs_service.submit(data["kind"], data["params"], user_id=int(get_jwt_identity()))
+    except ValueError as e:
+        abort(400, description=str(e))
+    except JobLimitError as e:
+        return {"message": str(e)}, 429
+    return _job_out.dump(job), 202
+
+
+@jobs_bp.get("/<int:job_id>")
+@admin_required()
+def get_job_status(job_id: int):
+    """Estado y avance de un job."""
+    job = _jobs_service.get(job_id)
+    if not job:
+        abort(404, description="Job no encontrado.")
+    return _job_out.dump(job), 200
+
+
+@jobs_bp.get("/<int:job_id>/download")
+@admin_required()
+def download_job_result(job_id: int):
+    """Descarga el archivo generado por un job terminado."""
+    job = _jobs_service.get(job_id)
+    if not job:
+        abort(404, description="Job no encontrado.")
+    path = _jobs_service.result_file(job)
+    if not path:
+        abort(409 if job.status in ("queued", "running") else 410,
+              description=f"Resultado no disponible (estado: {job.status}).")
+    return send_file(path, as_attachment=True, download_name=os.path.basename(path))
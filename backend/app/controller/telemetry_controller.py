@@ -1,23 +1,22 @@
 # backend/app/controller/telemetry_controller.py
 
 from datetime import datetime, timezone
-from flask import Blueprint, request, abort
-from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from flask import Blueprint, request, abort, current_app
+from flask_jwt_extended import jwt_required, current_user
 from marshmallow import ValidationError
 
 from ..services.telemetry_service import TelemetryService
-from ..services.devices_service import DevicesService # Para verificar pertenencia
-from ..services.patients_service import PatientsService # Para verificar pertenencia
+from ..services.ingest_service import IngestService
 
 from ..model.dto.request_schemas import DeviceTelemetryRequest
 from ..model.dto.response_schemas import DeviceTelemetryResponse
+from ..model.dto.batch_schemas import readings_batch_validator, telemetry_batch_validator
 # Importa helper de parseo de fechas si lo moviste a utils
 # from ..utils.datetime_helpers import parse_iso_datetime
 
 telemetry_bp = Blueprint("telemetry", __name__)
 _service = TelemetryService()
-_devices_service = DevicesService()
-_patients_service = PatientsService()
+_ingest_service = IngestService()
 _in = DeviceTelemetryRequest()
 _out = DeviceTelemetryResponse()
 _out_many = DeviceTelemetryResponse(many=True)
@@ -37,9 +36,8 @@ def _parse_dt(s: str | None) -> datetime | None:
 # === Helper para verificar permisos de acceso a telemetría ===
 def _check_telemetry_permission(device_id: int, required_level: str = "read"):
     """Verifica si el usuario/token actual tiene permiso para acceder a la telemetría."""
-    user_id_str = get_jwt_identity()
-    claims = get_jwt()
-    role = claims.get("role")
+    # Rol y bandas salen de la Identity cacheada (sin consultas; ver identity_service)
+    role = current_user.role
 
     if role == "admin":
         return
@@ -48,17 +46,10 @@ def _check_telemetry_permission(device_id: int, required_level: str = "read"):
         if required_level == "write":
             abort(403, description="Clientes no pueden escribir telemetría.")
 
-        try:
-            user_id = int(user_id_str) if isinstance(user_id_str, str) else user_id_str
-        except Exception:
-            abort(401, description="Identidad de token inválida.")
-
-        patient = _patients_service.get_by_user_id(user_id)
-        if not patient:
+        if current_user.patient_id is None:
             abort(404, description="Perfil no encontrado.")
 
-        device = _devices_service.get_patient_device(patient.id, device_id)
-        if not device:
+        if device_id not in current_user.device_ids:
             abort(403, description="Acceso denegado a la telemetría de este dispositivo.")
         return
 
@@ -106,3 +97,49 @@ def list_telemetry(device_id: int):
         if hasattr(e, 'code') and e.code == 404: abort(404, "Dispositivo no encontrado.")
         # Loggear error 'e'
         abort(500, description="Error al obtener la telemetría.")
+
+
+# === Ingesta batch (gateways / bancos de prueba) ===
+
+def _batch_items() -> list:
+    """Acepta un array JSON o un objeto {"items": [...]}."""
+    body = request.get_json(force=True, silent=True)
+    if isinstance(body, dict):
+        return body.get("items")
+    return body
+
+
+@telemetry_bp.post("/devices/<int:device_id>/readings:batch")
+@jwt_required()
+def ingest_readings_batch(device_id: int):
+    """Recibe un lote de lecturas biométricas (cada una con 'ts') y las inserta en bloque."""
+    _check_telemetry_permission(device_id, required_level="write")
+
+    rows, errors = readings_batch_validator.validate(_batch_items(), current_app.config["INGEST_MAX_BATCH"])
+    if errors:
+        return {"messages": errors}, 400
+
+    try:
+        count = _ingest_service.ingest_readings(device_id, rows)
+    except Exception as e:
+        if hasattr(e, 'code') and e.code == 404: abort(404, "Dispositivo no encontrado.")
+        abort(500, description="Error al guardar las lecturas.")
+    return {"device_id": device_id, "inserted": count}, 201
+
+
+@telemetry_bp.post("/devices/<int:device_id>/telemetry:batch")
+@jwt_required()
+def ingest_telemetry_batch(device_id: int):
+    """Recibe un lote de registros de telemetría (cada uno con 'ts') y los inserta en bloque."""
+    _check_telemetry_permission(device_id, required_level="write")
+
+    rows, errors = telemetry_batch_validator.validate(_batch_items(), current_app.config["INGEST_MAX_BATCH"])
+    if errors:
+        return {"messages": errors}, 400
+
+    try:
+        count = _ingest_service.ingest_telemetry(device_id, rows)
+    except Exception as e:
+        if hasattr(e, 'code') and e.code == 404: abort(404, "Dispositivo no encontrado.")
+        abort(500, description="Error al guardar la telemetría.")
+    return {"device_id": device_id, "inserted": count}, 201
@@ -1,9 +1,30 @@
+from contextlib import contextmanager
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
+from .replicas import RoutingSession
 
-db = SQLAlchemy()
+# expire_on_commit=False: tras el commit los objetos conservan sus valores y no
+# disparan un SELECT al leerlos (la sesión igual se descarta al final de cada request).
+# Los workers de larga vida (CLI) no tienen ese límite: usan worker_session().
+# RoutingSession manda las lecturas @replica_read a las réplicas (app/replicas.py).
+db = SQLAlchemy(session_options={"expire_on_commit": False, "class_": RoutingSession})
 migrate = Migrate()
 cors = CORS()
 jwt = JWTManager()
+
+
+@contextmanager
+def worker_session():
+    """
+    Sesión de un worker de larga vida (jobs, notificaciones, escalamiento, presencia):
+    expira al commit, así cada vuelta del bucle relee de la BD en lugar de quedarse
+    con los objetos de la anterior. Al salir se descarta la sesión.
+    """
+    session = db.session()
+    session.expire_on_commit = True
+    try:
+        yield session
+    finally:
+        db.session.remove()
@@ -0,0 +1,181 @@
+# backend/app/instrumentation.py
+
+"""
+Sentencias SQL por request: cuántas, cuánto tiempo de BD y cuáles fueron las más
+lentas y las más repetidas (un mismo SELECT decenas de veces suele ser un N+1).
+
+Un listener before/after_cursor_execute sobre todas las engines (primaria y
+réplicas) suma en los colectores activos del contexto actual. Van en una
+ContextVar: un hilo en segundo plano (p. ej. el rehash de contraseñas) no suma al
+request que lo lanzó. Solo una fracción QUERY_STATS_SAMPLE_RATE de los requests
+activa un colector; en el resto el listener sale en la primera línea.
+
+En los requests muestreados:
+- header `Server-Timing: db;dur=12.3;desc="7 queries", app;dur=40.1` (sin SQL);
+- un log JSON (también en `extra={"query_stats": ...}`) con endpoint, status,
+  cantidad, tiempo de BD y las sentencias más lentas / repetidas; en WARNING si
+  alguna tardó más de QUERY_STATS_SLOW_MS.
+
+No incluye lo que se ejecuta al generar una respuesta en streaming (después de
+after_request). capture_queries() activa un colector a mano (tests, CLI).
+"""
+
+import heapq
+import json
+import logging
+import random
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from flask import Flask, g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+_SQL_MAX_CHARS = 300   # de cada sentencia en el log
+_START = "query_stats_start"
+
+_active: ContextVar[Tuple["QueryStats", ...]] = ContextVar("query_stats", default=())
+
+
+class QueryStats:
+    """Acumula las sentencias ejecutadas mientras está activo."""
+
+    def __init__(self, top: int = 3, keep_statements: bool = False):
+        self.top = top
+        self.count = 0
+        self.db_time = 0.0
+        self.statements: List[str] = []          # todas, solo con keep_statements (tests)
+        self._keep = keep_statements
+        self._slowest: List[Tuple[float, int, str]] = []   # heap de las `top` más lentas
+        self._repeats: Counter = Counter()
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.db_time += duration
+        self._repeats[statement] += 1
+        if self._keep:
+            self.statements.append(statement)
+        item = (duration, self.count, statement)
+        if len(self._slowest) < self.top:
+            heapq.heappush(self._slowest, item)
+        elif duration > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, item)
+
+    @property
+    def slowest(self) -> List[Tuple[float, str]]:
+        """[(segundos, sql)] de la más lenta a la más rápida."""
+        return [(d, s) for d, _, s in sorted(self._slowest, reverse=True)]
+
+    @property
+    def most_repeated(self) -> Optional[Tuple[int, str]]:
+        """(veces, sql) de la sentencia más repetida, si alguna se repitió."""
+        if not self._repeats:
+            return None
+        statement, times = self._repeats.most_common(1)[0]
+        return (times, statement) if times > 1 else None
+
+    def server_timing(self, total: Optional[float] = None) -> str:
+        value = f'db;dur={self.db_time * 1000:.1f};desc="{self.count} queries"'
+        if total is not None:
+            value += f", app;dur={total * 1000:.1f}"
+        return value
+
+    def as_dict(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {
+            "queries": self.count,
+            "db_ms": round(self.db_time * 1000, 1),
+            "slowest": [{"ms": round(d * 1000, 1), "sql": _short(s)} for d, s in self.slowest],
+        }
+        repeated = self.most_repeated
+        if repeated:
+            data["repeated"] = {"count": repeated[0], "sql": _short(repeated[1])}
+        return data
+
+
+def _short(statement: str) -> str:
+    statement = " ".join(statement.split())
+    return statement if len(statement) <= _SQL_MAX_CHARS else statement[:_SQL_MAX_CHARS] + "..."
+
+
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    if _active.get():
+        conn.info.setdefault(_START, []).append(time.perf_counter())
+
+
+def _after_execute(conn, cursor, statement, parameters, context, executemany):
+    collectors = _active.get()
+    starts = conn.info.get(_START)
+    if not collectors or not starts:
+        return
+    duration = time.perf_counter() - starts.pop()
+    for stats in collectors:
+        stats.record(statement, duration)
+
+
+def _on_error(exception_context):
+    # La sentencia falló: no hay after_cursor_execute que saque su inicio
+    conn = exception_context.connection
+    if conn is not None and conn.info.get(_START):
+        conn.info[_START].pop()
+
+
+def _install_listeners() -> None:
+    if not event.contains(Engine, "before_cursor_execute", _before_execute):
+        event.listen(Engine, "before_cursor_execute", _before_execute)
+        event.listen(Engine, "after_cursor_execute", _after_execute)
+        event.listen(Engine, "handle_error", _on_error)
+
+
+@contextmanager
+def capture_queries(top: int = 3) -> Iterator[QueryStats]:
+    """Cuenta las sentencias del bloque (en este hilo / contexto) guardando su SQL."""
+    _install_listeners()
+    stats = QueryStats(top=top, keep_statements=True)
+    token = _active.set(_active.get() + (stats,))
+    try:
+        yield stats
+    finally:
+        _active.reset(token)
+
+
+def init_query_stats(app: Flask) -> None:
+    """Muestrea requests (QUERY_STATS_SAMPLE_RATE) y reporta sus sentencias SQL."""
+    _install_listeners()
+
+    @app.before_request
+    def _start_query_stats():
+        rate = app.config.get("QUERY_STATS_SAMPLE_RATE", 0)
+        if rate <= 0 or (rate < 1 and random.random() >= rate):
+            return
+        stats = QueryStats(top=app.config.get("QUERY_STATS_TOP_N", 3))
+        g._query_stats = (stats, _active.set(_active.get() + (stats,)), time.perf_counter())
+
+    @app.after_request
+    def _report_query_stats(response):
+        entry = g.pop("_query_stats", None)
+        if entry is None:
+            return response
+        stats, token, started = entry
+        _active.reset(token)
+        total = time.perf_counter() - started
+        response.headers.add("Server-Timing", stats.server_timing(total))
+
+        record = {"event": "query_stats", "method": request.method, "path": request.path,
+                  "endpoint": request.endpoint, "status": response.status_code,
+                  "total_ms": round(total * 1000, 1), **stats.as_dict()}
+        slow = stats.slowest and stats.slowest[0][0] * 1000 >= app.config.get("QUERY_STATS_SLOW_MS", 200)
+        logger.log(logging.WARNING if slow else logging.INFO, json.dumps(record, ensure_ascii=False),
+                   extra={"query_stats": record})
+        return response
+
+    @app.teardown_request
+    def _discard_query_stats(exc):
+        # El request terminó en una excepción sin pasar por after_request
+        entry = g.pop("_query_stats", None)
+        if entry is not None:
+            _active.reset(entry[1])
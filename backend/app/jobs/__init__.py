@@ -0,0 +1,11 @@
+# backend/app/jobs/__init__.py
+
+"""
+Trabajos pesados fuera del request (reportes, backfills).
+
+La API solo encola filas en `jobs`; el proceso `flask jobs worker` las toma y las
+ejecuta en un ProcessPoolExecutor. Cada tipo de job se registra con `@job_handler`.
+"""
+
+from .registry import JOB_HANDLERS, JobContext, job_handler
+from . import handlers  # noqa: F401  (registra los handlers)
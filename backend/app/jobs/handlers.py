@@ -0,0 +1,243 @@
+# backend/app/jobs/handlers.py
+
+import csv
+import io
+import zipfile
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, Sequence, Tuple
+from sqlalchemy import delete, func, select
+from ..extensions import db
+from ..model.models import (Alert, Device, DeviceLastSeen, DeviceTelemetry, Patient, PatientDailySummary, Reading,
+                            Threshold)
+from ..repository.devices_repository import DevicesRepository
+from ..repository.sql_utils import delete_chunk
+from ..repository.users_repository import UsersRepository
+from .registry import JobContext, job_handler
+
+# Filas por lote al recorrer readings (no se cargan en memoria de una vez)
+_STREAM_CHUNK = 5000
+# Pacientes cuyos umbrales se precargan juntos en la re-evaluación de alertas
+_CHUNK_PATIENTS = 500
+# Filas por transacción al purgar el historial de un dispositivo o paciente
+_PURGE_CHUNK = 5000
+
+
+def _parse_day(value, default: date) -> date:
+    return date.fromisoformat(value) if value else default
+
+
+def _purge_rows(ctx: JobContext, targets: Sequence[Tuple[type, object]]) -> Dict[str, int]:
+    """
+    Borra las filas de cada (modelo, condición) por lotes de _PURGE_CHUNK, confirmando
+    después de cada uno (transacciones cortas: no bloquea la ingesta ni infla el undo
+    log). Reporta avance de 1 a 99 %. Devuelve {tabla: filas borradas}.
+    """
+    total = sum(db.session.query(func.count()).select_from(model).filter(cond).scalar()
+                for model, cond in targets)
+    db.session.commit()
+    ctx.progress(1, f"{total} filas a borrar")
+    done = 0
+    deleted: Dict[str, int] = {}
+    for model, cond in targets:
+        deleted[model.__tablename__] = 0
+        while n := delete_chunk(model, cond, limit=_PURGE_CHUNK):
+            db.session.commit()
+            done += n
+            deleted[model.__tablename__] += n
+            ctx.progress(1 + 98 * min(done, total) / max(total, 1))
+    return deleted
+
+
+def _write_csv(zf: zipfile.ZipFile, name: str, header, rows) -> int:
+    """Escribe un CSV dentro del zip fila a fila. Devuelve las filas escritas."""
+    count = 0
+    with zf.open(name, "w") as raw:
+        out = io.TextIOWrapper(raw, encoding="utf-8", newline="")
+        writer = csv.writer(out)
+        writer.writerow(header)
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+        out.flush()
+        out.detach()
+    return count
+
+
+@job_handler("patient_report")
+def patient_report(ctx: JobContext) -> None:
+    """
+    Reporte de un paciente en un rango de días: zip con readings.csv (todas sus bandas),
+    daily_summary.csv y alerts.csv.
+
+    params: {"patient_id": int, "from": "YYYY-MM-DD"?, "to": "YYYY-MM-DD"?} (por defecto últimos 30 días)
+    """
+    patient_id = int(ctx.params["patient_id"])
+    if not db.session.get(Patient, patient_id):
+        raise ValueError(f"Paciente {patient_id} no encontrado.")
+    today = datetime.now(timezone.utc).date()
+    day_to = _parse_day(ctx.params.get("to"), today)
+    day_from = _parse_day(ctx.params.get("from"), day_to - timedelta(days=30))
+    dt_from = datetime.combine(day_from, time.min)
+    dt_to = datetime.combine(day_to + timedelta(days=1), time.min)
+
+    device_ids = [d for (d,) in db.session.query(Device.id).filter(Device.patient_id == patient_id)]
+    readings_filter = (Reading.device_id.in_(device_ids), Reading.ts >= dt_from, Reading.ts < dt_to)
+    total = db.session.query(Reading.id).filter(*readings_filter).count() if device_ids else 0
+    ctx.progress(1, f"{total} lecturas a exportar")
+
+    def stream_readings():
+        if not device_ids:
+            return
+        stmt = (select(Reading.ts, Reading.device_id, Reading.heart_rate_bpm, Reading.spo2_pct,
+                       Reading.temp_c, Reading.motion_level)
+                .where(*readings_filter)
+                .order_by(Reading.ts.asc())
+                .execution_options(yield_per=_STREAM_CHUNK))
+        for i, row in enumerate(db.session.execute(stmt), start=1):
+            if i % _STREAM_CHUNK == 0:
+                ctx.progress(1 + 89 * i / max(total, 1))
+            yield row
+
+    path = ctx.result_file(f"patient_{patient_id}_{day_from}_{day_to}.zip")
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        _write_csv(zf, "readings.csv",
+                   ["ts", "device_id", "heart_rate_bpm", "spo2_pct", "temp_c", "motion_level"],
+                   stream_readings())
+        ctx.progress(90, "Lecturas exportadas")
+
+        summaries = (db.session.query(PatientDailySummary)
+                     .filter(PatientDailySummary.patient_id == patient_id,
+                             PatientDailySummary.day >= day_from, PatientDailySummary.day <= day_to)
+                     .order_by(PatientDailySummary.day.asc()))
+        _write_csv(zf, "daily_summary.csv",
+                   ["day", "readings_count", "resting_hr_bpm", "min_spo2_pct", "max_temp_c",
+                    "minutes_out_of_range", "alerts_total", "alerts_high", "wear_minutes"],
+                   ((s.day, s.readings_count, s.resting_hr_bpm, s.min_spo2_pct, s.max_temp_c,
+                     s.minutes_out_of_range, s.alerts_total, s.alerts_high, s.wear_minutes)
+                    for s in summaries))
+        ctx.progress(95)
+
+        alerts = (db.session.query(Alert)
+                  .filter(Alert.patient_id == patient_id, Alert.ts >= dt_from, Alert.ts < dt_to)
+                  .order_by(Alert.ts.asc()))
+        _write_csv(zf, "alerts.csv",
+                   ["ts", "type", "severity", "message", "acknowledged_by", "acknowledged_at"],
+                   ((a.ts, a.type, a.severity, a.message, a.acknowledged_by, a.acknowledged_at)
+                    for a in alerts))
+
+
+@job_handler("summaries_backfill")
+def summaries_backfill(ctx: JobContext) -> None:
+    """
+    Recalcula patient_daily_summary para un rango de días.
+
+    params: {"from": "YYYY-MM-DD", "to": "YYYY-MM-DD"?} (por defecto hasta ayer)
+    """
+    from ..services.summaries_service import SummariesService
+    service = SummariesService()
+    day_from = date.fromisoformat(ctx.params["from"])
+    day_to = _parse_day(ctx.params.get("to"), service.yesterday())
+    days = (day_to - day_from).days + 1
+    for i in range(max(days, 0)):
+        day = day_from + timedelta(days=i)
+        service.build_day(day)
+        ctx.progress(100 * (i + 1) / days, f"Día {day} calculado")
+
+
+@job_handler("alerts_reevaluate")
+def alerts_reevaluate(ctx: JobContext) -> None:
+    """
+    Re-evalúa las alertas de una métrica en las últimas N horas tras un cambio de umbral.
+
+    params: {"metric": str, "hours": int, "patient_id": int | None}. Sin patient_id es un
+    cambio global: afecta a todos los pacientes con dispositivos que no tienen umbral
+    propio para esa métrica. Cada paciente se confirma en su propia transacción.
+    """
+    from ..alerts.state_machine import METRIC_RULES
+    from ..services.alert_evaluation_service import AlertEvaluationService
+    metric = ctx.params["metric"]
+    if metric not in METRIC_RULES:
+        raise ValueError(f"Métrica desconocida: {metric}.")
+    since = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(hours=int(ctx.params["hours"]))
+
+    patient_id = ctx.params.get("patient_id")
+    if patient_id is not None:
+        if not db.session.get(Patient, int(patient_id)):
+            raise ValueError(f"Paciente {patient_id} no encontrado.")
+        patient_ids = [int(patient_id)]
+    else:
+        own = select(Threshold.patient_id).where(Threshold.metric == metric, Threshold.patient_id.isnot(None))
+        patient_ids = [pid for (pid,) in (db.session.query(Device.patient_id)
+                                          .filter(Device.patient_id.isnot(None), Device.patient_id.notin_(own))
+                                          .distinct()
+                                          .order_by(Device.patient_id))]
+    db.session.commit()
+    ctx.progress(1, f"{len(patient_ids)} pacientes a re-evaluar")
+
+    service = AlertEvaluationService()
+    totals = {"opened": 0, "updated": 0, "resolved": 0}
+    every = max(1, len(patient_ids) // 100)
+    for i, pid in enumerate(patient_ids, start=1):
+        if (i - 1) % _CHUNK_PATIENTS == 0:
+            # Umbrales del siguiente tramo en una consulta: reevaluate() los lee de la caché
+            service.thresholds_service.effective_thresholds_many(patient_ids[i - 1:i - 1 + _CHUNK_PATIENTS])
+        for key, n in service.reevaluate(pid, metric, since).items():
+            totals[key] += n
+        db.session.commit()
+        if i % every == 0 or i == len(patient_ids):
+            ctx.progress(1 + 99 * i / len(patient_ids), f"{i}/{len(patient_ids)} pacientes")
+    ctx.summary = "Alertas: {opened} abiertas, {updated} actualizadas, {resolved} cerradas.".format(**totals)
+
+
+@job_handler("purge_device")
+def purge_device(ctx: JobContext) -> None:
+    """
+    Elimina un dispositivo con todo su historial (readings, device_telemetry) por lotes,
+    en lugar de un único DELETE que arrastre meses de filas por ON DELETE CASCADE.
+
+    params: {"device_id": int}. Si el dispositivo ya no existe termina sin error.
+    """
+    device_id = int(ctx.params["device_id"])
+    device = db.session.get(Device, device_id)
+    if device is None:
+        db.session.commit()
+        ctx.summary = f"Dispositivo {device_id} ya no existe."
+        return
+    serial, patient_id = device.serial, device.patient_id
+    deleted = _purge_rows(ctx, [(Reading, Reading.device_id == device_id),
+                                (DeviceTelemetry, DeviceTelemetry.device_id == device_id)])
+    # Lo que llegue durante la purga lo borra el ON DELETE CASCADE (pocas filas)
+    db.session.execute(delete(DeviceLastSeen).where(DeviceLastSeen.device_id == device_id))
+    if patient_id is not None:
+        UsersRepository.identities_changed()   # la banda sale de la identidad del paciente
+    db.session.execute(delete(Device).where(Device.id == device_id))
+    db.session.commit()
+    ctx.summary = (f"Dispositivo {serial} eliminado ({deleted['readings']} lecturas, "
+                   f"{deleted['device_telemetry']} registros de telemetría).")
+
+
+@job_handler("purge_patient")
+def purge_patient(ctx: JobContext) -> None:
+    """
+    Elimina un paciente: desasigna sus bandas (conservan su historial), borra alertas
+    y resúmenes diarios por lotes y al final la fila del paciente; umbrales, estados y
+    contadores de alertas caen por ON DELETE CASCADE (pocas filas por paciente).
+
+    params: {"patient_id": int}. Si el paciente ya no existe termina sin error.
+    """
+    from ..services.patients_service import bump_search_index
+    patient_id = int(ctx.params["patient_id"])
+    if not db.session.get(Patient, patient_id):
+        db.session.commit()
+        ctx.summary = f"Paciente {patient_id} ya no existe."
+        return
+    DevicesRepository.unassign_patient(patient_id)   # por si se le asignó una banda tras encolar
+    db.session.commit()
+    deleted = _purge_rows(ctx, [(Alert, Alert.patient_id == patient_id),
+                                (PatientDailySummary, PatientDailySummary.patient_id == patient_id)])
+    db.session.execute(delete(Patient).where(Patient.id == patient_id))
+    UsersRepository.identities_changed()   # su usuario queda sin paciente
+    bump_search_index()   # sale del índice de búsqueda de los workers
+    db.session.commit()
+    ctx.summary = (f"Paciente {patient_id} eliminado ({deleted['alerts']} alertas, "
+                   f"{deleted['patient_daily_summary']} resúmenes diarios).")
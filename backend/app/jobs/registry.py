@@ -0,0 +1,42 @@
+# backend/app/jobs/registry.py
+
+import os
+from typing import Any, Callable, Dict, Optional
+from ..repository.jobs_repository import JobsRepository
+
+# kind -> función(ctx: JobContext) que ejecuta el job
+JOB_HANDLERS: Dict[str, Callable[["JobContext"], None]] = {}
+
+
+def job_handler(kind: str):
+    """Decorador para registrar la función que ejecuta un tipo de job."""
+    def wrapper(fn):
+        JOB_HANDLERS[kind] = fn
+        return fn
+    return wrapper
+
+
+class JobContext:
+    """Lo que un handler necesita: parámetros, reporte de avance y ruta del resultado."""
+
+    def __init__(self, job_id: int, params: Dict[str, Any], result_dir: str):
+        self.job_id = job_id
+        self.params = params or {}
+        self.result_dir = result_dir
+        self.result_path: Optional[str] = None
+        self.summary: Optional[str] = None  # mensaje final del job (por defecto "Completado.")
+        self._last_progress = -1
+
+    def progress(self, pct: float, message: Optional[str] = None) -> None:
+        """Reporta avance (0–100). Solo escribe en la BD cuando cambia el entero."""
+        value = int(pct)
+        if value == self._last_progress and message is None:
+            return
+        self._last_progress = value
+        JobsRepository.set_progress(self.job_id, value, message)
+
+    def result_file(self, filename: str) -> str:
+        """Reserva la ruta del archivo de resultado para este job."""
+        os.makedirs(self.result_dir, exist_ok=True)
+        self.result_path = os.path.join(self.result_dir, f"job_{self.job_id}_{filename}")
+        return self.result_path
@@ -0,0 +1,137 @@
+# backend/app/jobs/runner.py
+
+import logging
+import multiprocessing
+import os
+import time
+import types
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Set
+from flask import Flask
+from ..extensions import db, worker_session
+from ..repository.jobs_repository import JobsRepository
+from ..repository.stats_repository import StatsRepository
+
+logger = logging.getLogger(__name__)
+
+# App propia de cada proceso hijo del pool (se crea una vez en el initializer)
+_worker_app: Optional[Flask] = None
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _init_child(config: Dict[str, Any]) -> None:
+    """Initializer del pool: cada proceso hijo crea su app y su pool de conexiones."""
+    global _worker_app
+    from .. import create_app
+    _worker_app = create_app(types.SimpleNamespace(**config))
+
+
+def _execute(job_id: int) -> None:
+    """Ejecuta un job ya reclamado (corre en un proceso hijo)."""
+    from .registry import JOB_HANDLERS, JobContext
+
+    with _worker_app.app_context(), worker_session():
+        cfg = _worker_app.config
+        job = JobsRepository.get(job_id)
+        handler = JOB_HANDLERS.get(job.kind) if job else None
+        if handler is None:
+            JobsRepository.finish(job_id, "failed", _utcnow(), message="Tipo de job desconocido.")
+            return
+
+        ctx = JobContext(job.id, job.params, cfg["JOBS_RESULT_DIR"])
+        db.session.commit()  # no mantener la transacción de lectura durante el job
+        expires_at = _utcnow() + timedelta(hours=cfg["JOBS_RESULT_TTL_HOURS"])
+        try:
+            handler(ctx)
+            db.session.commit()
+            JobsRepository.finish(job_id, "succeeded", _utcnow(), message=ctx.summary or "Completado.",
+                                  result_path=ctx.result_path, expires_at=expires_at)
+            logger.info(f"Job {job_id} ({job.kind}) completado.")
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Job {job_id} ({job.kind}) falló: {e}", exc_info=True)
+            if ctx.result_path and os.path.exists(ctx.result_path):
+                os.remove(ctx.result_path)
+            JobsRepository.finish(job_id, "failed", _utcnow(), message=f"Error: {e}",
+                                  expires_at=expires_at)
+
+
+class JobRunner:
+    """
+    Bucle del worker: reclama jobs de la tabla `jobs` y los ejecuta en un
+    ProcessPoolExecutor de JOBS_MAX_WORKERS procesos (límite de concurrencia global
+    de este worker). También vence resultados viejos y libera jobs huérfanos.
+    """
+
+    def __init__(self, app: Flask):
+        self.app = app
+        self.max_workers = app.config["JOBS_MAX_WORKERS"]
+        self.poll_interval = app.config["JOBS_POLL_INTERVAL_S"]
+        self._in_flight: Set[Future] = set()
+        self._stopping = False
+
+    def _child_config(self) -> Dict[str, Any]:
+        return {k: v for k, v in self.app.config.items() if k.isupper()}
+
+    def purge_expired(self) -> int:
+        """Borra archivos de resultados vencidos y marca sus jobs como 'expired'."""
+        expired = JobsRepository.list_expired(_utcnow())
+        for job in expired:
+            if job.result_path and os.path.exists(job.result_path):
+                try:
+                    os.remove(job.result_path)
+                except OSError as e:
+                    logger.warning(f"No se pudo borrar el resultado del job {job.id}: {e}")
+        JobsRepository.mark_expired([j.id for j in expired])
+        return len(expired)
+
+    def purge_stats(self) -> int:
+        """Borra los contadores por minuto del panel más viejos que STATS_RETENTION_DAYS."""
+        cutoff = _utcnow() - timedelta(days=self.app.config["STATS_RETENTION_DAYS"])
+        count = StatsRepository.purge_before(cutoff)
+        db.session.commit()
+        return count
+
+    def stop(self) -> None:
+        self._stopping = True
+
+    def run(self, once: bool = False) -> None:
+        """Ejecuta el bucle (o una sola pasada con `once`, útil para cron/tests)."""
+        with worker_session():
+            stale_before = _utcnow() - timedelta(minutes=self.app.config["JOBS_STALE_AFTER_MIN"])
+            failed = JobsRepository.fail_stale(stale_before, _utcnow())
+            if failed:
+                logger.warning(f"{failed} jobs huérfanos marcados como fallidos.")
+
+            ctx = multiprocessing.get_context("spawn")  # hijos limpios, sin conexiones heredadas
+            with ProcessPoolExecutor(max_workers=self.max_workers, mp_context=ctx,
+                                     initializer=_init_child,
+                                     initargs=(self._child_config(),)) as pool:
+                last_purge = 0.0
+                while not self._stopping:
+                    self._in_flight = {f for f in self._in_flight if not f.done()}
+
+                    # Solo reclama lo que el pool puede ejecutar ya; el resto espera en la cola
+                    while len(self._in_flight) < self.max_workers:
+                        job_id = JobsRepository.claim_next(_utcnow())
+                        if job_id is None:
+                            break
+                        logger.info(f"Job {job_id} reclamado.")
+                        self._in_flight.add(pool.submit(_execute, job_id))
+
+                    if time.monotonic() - last_purge > 60:
+                        self.purge_expired()
+                        self.purge_stats()
+                        last_purge = time.monotonic()
+
+                    if once:
+                        # Drena la cola: espera y vuelve a reclamar hasta que no quede nada
+                        if not self._in_flight:
+                            break
+                        wait(self._in_flight, return_when=FIRST_COMPLETED)
+                        continue
+                    time.sleep(self.poll_interval)
@@ -0,0 +1,249 @@
+# backend/app/model/dto/batch_schemas.py
+
+"""
+Validación columnar de lotes de muestras (ingesta batch).
+
+En vez de instanciar/cargar un Schema de marshmallow por cada elemento, se compila
+una vez la especificación de columnas (tipo + rango) a partir del Schema existente
+y se valida el lote columna por columna. Así los rangos siguen definidos en un solo
+lugar (request_schemas.py). Los rangos se comprueban sobre un vector de numpy por
+columna; las conversiones que sí hacen falta (strings, Decimal, fechas) van por valor.
+
+Al final: lectura y validación fila por fila del alta masiva de dispositivos.
+"""
+
+import csv
+import io
+import json
+from datetime import datetime, timezone
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, List, Tuple, Type
+import numpy as np
+from marshmallow import Schema, ValidationError, fields, validate
+
+from .request_schemas import DeviceCreateRequest, DeviceTelemetryRequest, ReadingCreateRequest
+
+# Máximo de errores devueltos (un lote de miles de filas inválidas no debe generar una respuesta enorme)
+MAX_REPORTED_ERRORS = 50
+
+
+# Las conversiones aceptan lo mismo que el campo de marshmallow equivalente (no
+# estricto): el lote por JSON o por CSV valida igual que el endpoint de a una.
+
+def _as_int(v):
+    # Como fields.Integer: "72", 72.0 y Decimal valen; 72.5 se trunca; bool no
+    if isinstance(v, bool):
+        raise ValueError("Not a valid integer.")
+    if isinstance(v, int):
+        return v
+    try:
+        return int(v)
+    except OverflowError:
+        raise ValueError("Number too large.")
+    except (TypeError, ValueError):
+        raise ValueError("Not a valid integer.")
+
+
+def _as_decimal(v):
+    if isinstance(v, bool):
+        raise ValueError("Not a valid number.")
+    try:
+        d = Decimal(str(v))
+    except InvalidOperation:
+        raise ValueError("Not a valid number.")
+    if not d.is_finite():
+        raise ValueError("Not a valid number.")
+    return d
+
+
+def _as_bool(v):
+    # Como fields.Boolean: además de true/false acepta 1/0, "yes"/"no", "on"/"off"...
+    if isinstance(v, bool):
+        return v
+    try:
+        if v in fields.Boolean.truthy:
+            return True
+        if v in fields.Boolean.falsy:
+            return False
+    except TypeError:   # no hashable (lista, dict)
+        pass
+    raise ValueError("Not a valid boolean.")
+
+
+def _as_utc_datetime(v):
+    """ISO 8601 -> datetime UTC naive (como se guarda en la BD)."""
+    if not isinstance(v, str):
+        raise ValueError("Not a valid datetime.")
+    try:
+        dt = datetime.fromisoformat(v)   # acepta el sufijo "Z" desde Python 3.11
+    except ValueError:
+        raise ValueError("Not a valid datetime.")
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+def _convert(out: List[Any], convert) -> Dict[int, str]:
+    """Convierte en su lugar los valores no nulos. Devuelve {índice: mensaje} de los inválidos (quedan en None)."""
+    failed = {}
+    for i, v in enumerate(out):
+        if v is not None:
+            try:
+                out[i] = convert(v)
+            except ValueError as e:
+                failed[i] = str(e)
+                out[i] = None
+    return failed
+
+
+def _out_of_range(values: List[Any], lo, hi) -> List[int]:
+    """
+    Índices fuera de [lo, hi] (los None no cuentan): la comparación es una operación
+    sobre un vector float64 de numpy. Como float64 redondea (Decimal con muchos
+    dígitos, enteros enormes), lo que cae en el borde o más allá se confirma con el
+    valor exacto.
+    """
+    try:
+        arr = np.array(values if _NONE not in set(map(type, values))
+                       else [np.nan if v is None else v for v in values], dtype=np.float64)
+    except OverflowError:   # entero que no entra en un float: comparación exacta
+        return [i for i, v in enumerate(values)
+                if v is not None and ((lo is not None and v < lo) or (hi is not None and v > hi))]
+    edge = np.zeros(len(values), dtype=bool)
+    if lo is not None:
+        edge |= arr <= lo
+    if hi is not None:
+        edge |= arr >= hi
+    return [i for i in np.flatnonzero(edge).tolist()
+            if (lo is not None and values[i] < lo) or (hi is not None and values[i] > hi)]
+
+
+_CONVERTERS = {
+    fields.Integer: _as_int,
+    fields.Decimal: _as_decimal,
+    fields.Boolean: _as_bool,
+    fields.DateTime: _as_utc_datetime,
+}
+
+_NONE = type(None)
+# Tipos que cada conversión devuelve tal cual: una columna solo con ellos no se recorre
+_NATIVE = {_as_int: {int, _NONE}, _as_decimal: {Decimal, _NONE}, _as_bool: {bool, _NONE},
+           _as_utc_datetime: {_NONE}}
+
+
+class ColumnarBatchValidator:
+    """Valida una lista de dicts contra las columnas de un Schema de marshmallow."""
+
+    def __init__(self, schema_cls: Type[Schema], required: Tuple[str, ...] = ()):
+        self.columns = []
+        for name, field in schema_cls().fields.items():
+            convert = next((fn for cls, fn in _CONVERTERS.items() if isinstance(field, cls)), None)
+            if convert is None:
+                raise TypeError(f"Campo no soportado en validación batch: {name}")
+            rng = next((v for v in field.validators if isinstance(v, validate.Range)), None)
+            self.columns.append((
+                name,
+                convert,
+                rng.min if rng else None,
+                rng.max if rng else None,
+                name in required or field.required,
+            ))
+        self.allowed = {c[0] for c in self.columns}
+
+    def validate(self, items: Any, max_items: int) -> Tuple[List[Dict[str, Any]], Dict[Any, Any]]:
+        """
+        Devuelve (filas_normalizadas, errores). `errores` tiene el mismo formato que
+        marshmallow con many=True: {índice: {campo: [mensajes]}}, o {"_schema":
+        [mensajes]} si falla el lote entero. Si hay errores, no se devuelve ninguna
+        fila (el lote se acepta o rechaza completo).
+        """
+        if not isinstance(items, list) or not items:
+            return [], {"_schema": ["Se esperaba una lista no vacía de muestras."]}
+        if len(items) > max_items:
+            return [], {"_schema": [f"Máximo {max_items} muestras por lote."]}
+
+        errors: Dict[Any, Any] = {}
+
+        def add_error(i, field, msg):
+            if len(errors) < MAX_REPORTED_ERRORS or i in errors:
+                errors.setdefault(i, {}).setdefault(field, []).append(msg)
+
+        # 1) Estructura: cada elemento es un objeto y no trae campos desconocidos
+        for i, it in enumerate(items):
+            if not isinstance(it, dict):
+                add_error(i, "_schema", "Invalid input type.")
+            elif not self.allowed.issuperset(it):
+                for k in set(it) - self.allowed:
+                    add_error(i, k, "Unknown field.")
+        if errors:
+            return [], errors
+
+        # 2) Columna por columna: conversión (solo si hace falta) + rango sobre un vector numpy
+        converted: Dict[str, List[Any]] = {}
+        for name, convert, lo, hi, required in self.columns:
+            out = [it.get(name) for it in items]
+            types = set(map(type, out))
+            if required and _NONE in types:
+                for i, v in enumerate(out):
+                    if v is None:
+                        add_error(i, name, "Missing data for required field.")
+            bad = {} if types <= _NATIVE[convert] else _convert(out, convert)
+            if lo is not None or hi is not None:
+                for i in _out_of_range(out, lo, hi):
+                    bad[i] = f"Must be greater than or equal to {lo} and less than or equal to {hi}."
+            for i in sorted(bad):
+                add_error(i, name, bad[i])
+            converted[name] = out
+        if errors:
+            return [], errors
+
+        names = [c[0] for c in self.columns]
+        rows = [dict(zip(names, values)) for values in zip(*(converted[n] for n in names))]
+        return rows, {}
+
+
+# Lotes con timestamp obligatorio (el orden y la deduplicación dependen de 'ts')
+readings_batch_validator = ColumnarBatchValidator(ReadingCreateRequest, required=("ts",))
+telemetry_batch_validator = ColumnarBatchValidator(DeviceTelemetryRequest, required=("ts",))
+
+
+# ---------- Alta masiva de dispositivos ----------
+# Pocas filas (un envío de bandas) y con strings: marshmallow por fila, pero el
+# resultado es por fila (las válidas se dan de alta aunque otras fallen).
+_device_row_schema = DeviceCreateRequest()
+
+
+def device_rows_from_csv(text: str) -> List[Dict[str, Any]]:
+    """CSV con encabezado (serial, model y opcionales patient_id, status) -> lista de dicts."""
+    reader = csv.DictReader(io.StringIO(text.lstrip("\ufeff")))  # tolera el BOM de Excel
+    return [{k.strip(): (v.strip() or None if isinstance(v, str) else v)
+             for k, v in row.items() if k is not None}
+            for row in reader]
+
+
+def device_rows_from_json(text: str) -> Any:
+    """Array JSON u objeto {"items": [...]}; si no es JSON válido devuelve None (lo rechaza la validación)."""
+    try:
+        body = json.loads(text)
+    except ValueError:
+        return None
+    return body.get("items") if isinstance(body, dict) else body
+
+
+def validate_device_rows(items: Any, max_items: int) -> Tuple[List[Tuple[int, Dict[str, Any]]], Dict[int, Any]]:
+    """
+    Devuelve ([(índice, fila_validada), ...], {índice: errores}). Errores de todo el
+    lote (no es lista, vacío, demasiadas filas) van en "_schema", como en marshmallow,
+    y sin filas.
+    """
+    if not isinstance(items, list) or not items:
+        return [], {"_schema": ["Se esperaba una lista no vacía de dispositivos."]}
+    if len(items) > max_items:
+        return [], {"_schema": [f"Máximo {max_items} dispositivos por lote."]}
+    rows, errors = [], {}
+    for i, item in enumerate(items):
+        try:
+            rows.append((i, _device_row_schema.load(item)))
+        except ValidationError as err:
+            errors[i] = err.messages
+    return rows, errors
@@ -1,7 +1,7 @@
 # backend/app/model/dto/request_schemas.py
 
 import os
-from marshmallow import Schema, fields, validate, validates, ValidationError, pre_load
+from marshmallow import Schema, fields, validate, validates, validates_schema, ValidationError, pre_load
 
 # --- Helper de Validación para Password (ejemplo) ---
 def validate_password(password):
@@ -99,6 +99,27 @@ class PatientUpdateRequest(Schema):
     # No incluimos user_id aquí, ya que no debería cambiarse en una actualización.
 
 
+class PatientSearchQuery(Schema):
+    """Búsqueda y paginación keyset del listado de pacientes."""
+    q = fields.String(required=False, allow_none=True, validate=validate.Length(max=100))  # nombre, email o teléfono
+    limit = fields.Integer(load_default=50, validate=validate.Range(min=1, max=200))
+    cursor = fields.Integer(required=False, allow_none=True, validate=validate.Range(min=1))  # next_cursor anterior
+    ids = fields.List(fields.Integer(validate=validate.Range(min=1)), required=False,
+                      validate=validate.Length(min=1, max=200))   # pacientes puntuales (p. ej. nombres de una tabla)
+
+    @pre_load
+    def split_ids(self, data, **kwargs):
+        # ?ids=3,7 o ?ids=3&ids=7 (MultiDict de request.args)
+        getlist = getattr(data, "getlist", None)
+        out = dict(data)
+        values = getlist("ids") if getlist else out.get("ids")
+        if values:
+            if isinstance(values, str):
+                values = [values]
+            out["ids"] = [v.strip() for item in values for v in str(item).split(",") if v.strip()]
+        return out
+
+
 # ---------- Readings (ingesta biométrica - si tuvieras un endpoint específico) ----------
 # Este schema no se usa actualmente en los controllers revisados (los datos vienen de telemetría o directo del device?)
 # Si el ESP32 envía lecturas directas a un endpoint POST /readings, necesitarías algo así:
@@ -167,6 +188,8 @@ class ThresholdUpdateRequest(Schema):
                                validate=validate.Range(min=0)) # Ajusta rangos según métrica si es necesario
     max_value = fields.Decimal(required=False, allow_none=True, as_string=True,
                                validate=validate.Range(min=0))
+    # Opcional: re-evaluar las alertas de las últimas N horas con el nuevo umbral (job en segundo plano)
+    reevaluate_hours = fields.Integer(required=False, allow_none=True, validate=validate.Range(min=1, max=168))
 
     # Validación adicional: min no puede ser mayor que max si ambos están presentes
     @validates("max_value")
@@ -193,6 +216,86 @@ class AlertAcknowledgeRequest(Schema):
     # Podrías añadir un campo para notas si quisieras
     notes = fields.String(required=False, allow_none=True, validate=validate.Length(max=255))
 
+# --- NUEVO: Reconocimiento masivo (ids o filtro) ---
+class AlertBulkAcknowledgeRequest(Schema):
+    """Schema para reconocer varias alertas: por lista de ids o por filtro (paciente, tipo, antes de ts)."""
+    ids = fields.List(fields.Integer(validate=validate.Range(min=1)), required=False,
+                      validate=validate.Length(min=1, max=1000))
+    patient_id = fields.Integer(required=False, allow_none=True)
+    type = fields.String(required=False, allow_none=True,
+                         validate=validate.OneOf(["tachycardia", "bradycardia", "fever", "hypoxia", "custom"]))
+    before = fields.DateTime(required=False, allow_none=True)  # alertas con ts anterior a este instante
+    notes = fields.String(required=False, allow_none=True, validate=validate.Length(max=255))
+
+    @validates_schema
+    def validate_target(self, data, **kwargs):
+        # Sin ids ni filtro se reconocerían TODAS las pendientes: se exige algo explícito
+        if not data.get("ids") and not any(data.get(k) is not None for k in ("patient_id", "type", "before")):
+            raise ValidationError("Indica 'ids' o al menos un filtro (patient_id, type, before).")
+
+
+# --- NUEVO: Analítica de alertas (query string de GET /admin/alerts/analytics) ---
+class AlertAnalyticsQuery(Schema):
+    """Rango, intervalo, agrupación, filtros y periodo de comparación de la analítica de alertas."""
+    from_ = fields.DateTime(data_key="from", required=False, allow_none=True)   # por defecto: to - 30 días
+    to = fields.DateTime(required=False, allow_none=True)                        # por defecto: ahora
+    bucket = fields.String(load_default="day", validate=validate.OneOf(["hour", "day", "week"]))
+    group_by = fields.List(fields.String(validate=validate.OneOf(["patient", "type", "severity"])),
+                           load_default=list)
+    patient_id = fields.List(fields.Integer(validate=validate.Range(min=1)), required=False)
+    type = fields.List(fields.String(validate=validate.OneOf(
+        ["tachycardia", "bradycardia", "fever", "hypoxia", "custom"])), required=False)
+    severity = fields.List(fields.String(validate=validate.OneOf(
+        ["low", "moderate", "high", "critical"])), required=False)
+    compare = fields.String(required=False, allow_none=True, validate=validate.OneOf(["previous"]))
+    compare_from = fields.DateTime(required=False, allow_none=True)  # inicio del periodo a comparar
+
+    @pre_load
+    def split_lists(self, data, **kwargs):
+        # Acepta ?group_by=type,severity y ?group_by=type&group_by=severity (MultiDict de request.args)
+        getlist = getattr(data, "getlist", None)
+        out = dict(data)  # de un MultiDict toma el primer valor de cada clave
+        for key in ("group_by", "patient_id", "type", "severity"):
+            values = getlist(key) if getlist else out.get(key)
+            if not values:
+                continue
+            if isinstance(values, str):
+                values = [values]
+            out[key] = [v.strip() for item in values for v in str(item).split(",") if v.strip()]
+        return out
+
+
+# --- NUEVO: Vista de flota (query string de GET /admin/devices/fleet) ---
+class FleetQuery(Schema):
+    """Paginación keyset y filtros de la vista de flota."""
+    limit = fields.Integer(load_default=100, validate=validate.Range(min=1, max=500))
+    cursor = fields.Integer(required=False, allow_none=True, validate=validate.Range(min=1))  # next_cursor anterior
+    status = fields.List(fields.String(validate=validate.OneOf(["new", "active", "lost", "retired", "service"])),
+                         required=False)
+    patient_id = fields.Integer(required=False, validate=validate.Range(min=1))
+    offline_min = fields.Integer(required=False, validate=validate.Range(min=1))   # sin contacto hace > N min
+    online = fields.Boolean(required=False, allow_none=True)
+    battery_below = fields.Integer(required=False, validate=validate.Range(min=1, max=101))
+
+    @pre_load
+    def split_status(self, data, **kwargs):
+        # ?status=active,service o ?status=active&status=service (MultiDict de request.args)
+        getlist = getattr(data, "getlist", None)
+        out = dict(data)
+        values = getlist("status") if getlist else out.get("status")
+        if values:
+            if isinstance(values, str):
+                values = [values]
+            out["status"] = [v.strip() for item in values for v in str(item).split(",") if v.strip()]
+        return out
+
+
+# ---------- Jobs ----------
+class JobCreateRequest(Schema):
+    """Schema para encolar un job en segundo plano (reporte, backfill)."""
+    kind = fields.String(required=True, validate=validate.Length(min=1, max=40))
+    params = fields.Dict(keys=fields.String(), required=False, load_default=dict)
+
 
 # ---------- Chatbot ----------
 # Configurable: longitud máxima de entrada del chatbot (por entorno)
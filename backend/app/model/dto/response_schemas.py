@@ -35,6 +35,14 @@ class PatientResponse(Schema):
         last = getattr(obj, "last_name", "") or ""
         return f"{first} {last}".strip()
 
+class PatientListItemResponse(Schema):
+    """Fila del listado / búsqueda de pacientes (solo las columnas de la vista)."""
+    id = fields.Integer(required=True)
+    full_name = fields.String(required=True)
+    email = fields.String(allow_none=True)
+    phone = fields.String(allow_none=True)
+    birthdate = fields.Date(allow_none=True)
+
 # --- NUEVO: Device Response ---
 class DeviceResponse(Schema):
     """Schema para la información de un dispositivo."""
@@ -47,6 +55,27 @@ class DeviceResponse(Schema):
     # Podrías añadir campos relacionados si fueran necesarios, ej:
     # patient = fields.Nested(PatientResponse, only=("id", "full_name"), allow_none=True)
 
+# --- NUEVO: Vista de flota ---
+class FleetPatientResponse(Schema):
+    id = fields.Integer(required=True)
+    full_name = fields.String(required=True)
+
+
+class FleetDeviceResponse(Schema):
+    """Dispositivo con su paciente y la foto de último contacto (GET /admin/devices/fleet)."""
+    id = fields.Integer(required=True)
+    serial = fields.String(required=True)
+    model = fields.String(required=True)
+    status = fields.String(required=True)
+    registered_at = fields.DateTime(required=True)
+    patient = fields.Nested(FleetPatientResponse, allow_none=True)
+    last_seen_at = fields.DateTime(allow_none=True)
+    last_reading_at = fields.DateTime(allow_none=True)
+    last_telemetry_at = fields.DateTime(allow_none=True)
+    battery_pct = fields.Integer(allow_none=True)
+    rssi_dbm = fields.Integer(allow_none=True)
+    online = fields.Boolean(required=True)
+
 # ---------- Readings ----------
 class ReadingResponse(Schema):
     """Schema para una lectura biométrica."""
@@ -79,6 +108,7 @@ class ThresholdResponse(Schema):
     min_value = fields.Decimal(as_string=True, allow_none=True)
     max_value = fields.Decimal(as_string=True, allow_none=True)
     created_at = fields.DateTime(required=True)
+    reevaluation_job_id = fields.Integer(dump_only=True)  # solo si se pidió reevaluate_hours
 
 # --- NUEVO: Alert Response ---
 class AlertResponse(Schema):
@@ -91,10 +121,50 @@ class AlertResponse(Schema):
     message = fields.String(allow_none=True)
     acknowledged_by = fields.Integer(allow_none=True) # ID del User que reconoció
     acknowledged_at = fields.DateTime(allow_none=True) # Timestamp del reconocimiento
+    # Episodio: una alerta agrupa todas las lecturas fuera de rango seguidas
+    metric = fields.String(allow_none=True)
+    occurrences = fields.Integer()
+    last_seen_at = fields.DateTime(allow_none=True)
+    peak_value = fields.Decimal(as_string=True, allow_none=True, places=2)
+    resolved_at = fields.DateTime(allow_none=True)
     # Opcional: Incluir info básica del paciente o del usuario que reconoció
     # patient = fields.Nested(PatientResponse, only=("id", "full_name"), allow_none=True)
     # acknowledged_user = fields.Nested(UserResponse, only=("id", "name"), allow_none=True)
 
+# --- NUEVO: Patient Daily Summary Response ---
+class DailySummaryResponse(Schema):
+    """Schema para el resumen diario precalculado de un paciente."""
+    day = fields.Date(required=True)
+    patient_id = fields.Integer(required=True)
+    patient_name = fields.String(required=True)
+    readings_count = fields.Integer(required=True)
+    resting_hr_bpm = fields.Decimal(as_string=True, allow_none=True, places=1)
+    min_spo2_pct = fields.Integer(allow_none=True)
+    max_temp_c = fields.Decimal(as_string=True, allow_none=True, places=1)
+    minutes_out_of_range = fields.Integer(required=True)
+    alerts_total = fields.Integer(required=True)
+    alerts_high = fields.Integer(required=True)
+    wear_minutes = fields.Integer(required=True)
+    computed_at = fields.DateTime(required=True)
+
+# --- NUEVO: Job Response ---
+class JobResponse(Schema):
+    """Schema para el estado de un job en segundo plano."""
+    id = fields.Integer(required=True)
+    kind = fields.String(required=True)
+    params = fields.Dict(allow_none=True)
+    status = fields.String(required=True) # 'queued', 'running', 'succeeded', 'failed', 'expired'
+    progress = fields.Integer(required=True) # 0–100
+    message = fields.String(allow_none=True)
+    has_result = fields.Method("get_has_result", dump_only=True)
+    created_at = fields.DateTime(required=True)
+    started_at = fields.DateTime(allow_none=True)
+    finished_at = fields.DateTime(allow_none=True)
+    expires_at = fields.DateTime(allow_none=True)
+
+    def get_has_result(self, obj) -> bool:
+        return obj.status == "succeeded" and bool(obj.result_path)
+
 # --- NUEVO: Chatbot Response ---
 class ChatbotResponse(Schema):
     """Schema simple para la respuesta del chatbot."""
@@ -1,9 +1,14 @@
 # backend/app/model/models.py
-from datetime import datetime
+from datetime import datetime, timezone
 from sqlalchemy import func, UniqueConstraint
 from ..extensions import db
 
 
+def _utcnow() -> datetime:
+    """Default en Python (UTC naive) para timestamps: el valor se conoce sin releer la fila."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
 # -----------------------------
 # Users (login y roles)
 # -----------------------------
@@ -15,7 +20,10 @@ class User(db.Model):
     email = db.Column(db.String(150), unique=True, nullable=False)
     pass_hash = db.Column(db.String(255), nullable=False)
     role = db.Column(db.Enum("admin", "client", name="user_role"), nullable=False, default="client")
-    created_at = db.Column(db.DateTime, nullable=False, server_default=func.current_timestamp())
+    # Versión de los tokens del usuario: se incrementa al cambiar su rol y los tokens
+    # emitidos antes dejan de valer (ver services/identity_service.py)
+    token_version = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    created_at = db.Column(db.DateTime, nullable=False, default=_utcnow, server_default=func.current_timestamp())
 
     # Relación 1:1 opcional con Patient (cuando role = client)
     patient = db.relationship("Patient", back_populates="user", uselist=False)
@@ -39,12 +47,14 @@ class Patient(db.Model):
                     nullable=False, default="unknown")
     height_cm = db.Column(db.Numeric(5, 2))
     weight_kg = db.Column(db.Numeric(5, 2))
-    created_at = db.Column(db.DateTime, nullable=False, server_default=func.current_timestamp())
+    created_at = db.Column(db.DateTime, nullable=False, default=_utcnow, server_default=func.current_timestamp())
 
     user = db.relationship("User", back_populates="patient")
-    devices = db.relationship("Device", back_populates="patient", lazy=True)
-    alerts = db.relationship("Alert", back_populates="patient", lazy=True)
-    thresholds = db.relationship("Threshold", back_populates="patient", lazy=True)
+    # passive_deletes: al borrar el paciente el ORM no carga estas colecciones; las FK
+    # (SET NULL en devices, CASCADE en el resto) hacen el trabajo en la BD
+    devices = db.relationship("Device", back_populates="patient", lazy=True, passive_deletes=True)
+    alerts = db.relationship("Alert", back_populates="patient", lazy=True, passive_deletes=True)
+    thresholds = db.relationship("Threshold", back_populates="patient", lazy=True, passive_deletes=True)
 
     @property
     def full_name(self) -> str:
@@ -63,11 +73,15 @@ class Device(db.Model):
     serial = db.Column(db.String(64), unique=True, nullable=False)
     status = db.Column(db.Enum("new", "active", "lost", "retired", "service", name="device_status"),
                        nullable=False, default="new")
-    registered_at = db.Column(db.DateTime, nullable=False, server_default=func.current_timestamp())
+    registered_at = db.Column(db.DateTime, nullable=False, default=_utcnow, server_default=func.current_timestamp())
+    offline_after_s = db.Column(db.Integer)            # silencio tolerado (NULL = PRESENCE_OFFLINE_AFTER_S)
 
     patient = db.relationship("Patient", back_populates="devices")
-    readings = db.relationship("Reading", back_populates="device", lazy=True, cascade="all, delete-orphan")
-    telemetry = db.relationship("DeviceTelemetry", back_populates="device", lazy=True, cascade="all, delete-orphan")
+    # ON DELETE CASCADE en la BD: el ORM no carga lecturas/telemetría para borrarlas una a una
+    readings = db.relationship("Reading", back_populates="device", lazy=True, cascade="all, delete-orphan",
+                               passive_deletes=True)
+    telemetry = db.relationship("DeviceTelemetry", back_populates="device", lazy=True, cascade="all, delete-orphan",
+                                passive_deletes=True)
 
 
 # -----------------------------
@@ -79,7 +93,7 @@ class Reading(db.Model):
     id = db.Column(db.BigInteger, primary_key=True)
     device_id = db.Column(db.Integer, db.ForeignKey("devices.id", ondelete="CASCADE", onupdate="CASCADE"),
                           nullable=False)
-    ts = db.Column(db.DateTime, nullable=False, server_default=func.current_timestamp(), index=True)
+    ts = db.Column(db.DateTime, nullable=False, default=_utcnow, server_default=func.current_timestamp(), index=True)
 
     heart_rate_bpm = db.Column(db.SmallInteger)        # 20–250
     temp_c = db.Column(db.Numeric(4, 1))               # 30.0–45.0
@@ -98,7 +112,7 @@ class DeviceTelemetry(db.Model):
     id = db.Column(db.BigInteger, primary_key=True)
     device_id = db.Column(db.Integer, db.ForeignKey("devices.id", ondelete="CASCADE", onupdate="CASCADE"),
                           nullable=False)
-    ts = db.Column(db.DateTime, nullable=False, server_default=func.current_timestamp(), index=True)
+    ts = db.Column(db.DateTime, nullable=False, default=_utcnow, server_default=func.current_timestamp(), index=True)
 
     battery_mv = db.Column(db.SmallInteger)            # 3300–4300
     battery_pct = db.Column(db.SmallInteger)           # 0–100
@@ -112,6 +126,14 @@ class DeviceTelemetry(db.Model):
 # -----------------------------
 # Thresholds (umbrales)
 # -----------------------------
+# Umbrales por defecto de cada métrica (si no hay fila propia del paciente ni global)
+DEFAULT_THRESHOLDS = {
+    "heart_rate": {"min": 50, "max": 120},
+    "temperature": {"min": 35.5, "max": 38.0},
+    "spo2": {"min": 92, "max": 100},
+}
+
+
 class Threshold(db.Model):
     __tablename__ = "thresholds"
     __table_args__ = (UniqueConstraint("patient_id", "metric", name="ux_threshold_patient_metric"),)
@@ -122,7 +144,7 @@ class Threshold(db.Model):
     metric = db.Column(db.Enum("heart_rate", "temperature", "spo2", name="metric_enum"), nullable=False)
     min_value = db.Column(db.Numeric(6, 2))
     max_value = db.Column(db.Numeric(6, 2))
-    created_at = db.Column(db.DateTime, nullable=False, server_default=func.current_timestamp())
+    created_at = db.Column(db.DateTime, nullable=False, default=_utcnow, server_default=func.current_timestamp())
 
     patient = db.relationship("Patient", back_populates="thresholds")
 
@@ -132,11 +154,18 @@ class Threshold(db.Model):
 # -----------------------------
 class Alert(db.Model):
     __tablename__ = "alerts"
+    __table_args__ = (
+        db.Index("idx_alerts_patient_ts", "patient_id", "ts"),
+        db.Index("idx_alerts_ack_ts", "acknowledged_at", "ts"),                        # pendientes (global)
+        db.Index("idx_alerts_patient_ack_ts", "patient_id", "acknowledged_at", "ts"),  # pendientes por paciente
+        db.Index("idx_alerts_ack_escalation", "acknowledged_at", "escalation_due_at"),  # timers de escalamiento
+        db.Index("idx_alerts_ts_cover", "ts", "type", "severity", "patient_id", "acknowledged_at"),  # analítica
+    )
 
     id = db.Column(db.BigInteger, primary_key=True)
     patient_id = db.Column(db.Integer, db.ForeignKey("patients.id", ondelete="CASCADE", onupdate="CASCADE"),
                            nullable=False)
-    ts = db.Column(db.DateTime, nullable=False, server_default=func.current_timestamp())
+    ts = db.Column(db.DateTime, nullable=False, default=_utcnow, server_default=func.current_timestamp())
     type = db.Column(db.Enum("tachycardia", "bradycardia", "fever", "hypoxia", "custom", name="alert_type"), nullable=False)
     severity = db.Column(db.Enum("low", "moderate", "high", "critical", name="alert_severity"),
                          nullable=False, default="low")
@@ -144,5 +173,173 @@ class Alert(db.Model):
     acknowledged_by = db.Column(db.Integer, db.ForeignKey("users.id"))
     acknowledged_at = db.Column(db.DateTime)
 
+    # Episodio (alertas por umbral, ver app/alerts): una fila por episodio, no por lectura
+    metric = db.Column(db.String(32))                                  # Threshold.metric que la generó
+    occurrences = db.Column(db.Integer, nullable=False, default=1, server_default="1")
+    last_seen_at = db.Column(db.DateTime)                              # última lectura fuera de rango
+    peak_value = db.Column(db.Numeric(6, 2))                           # valor más extremo del episodio
+    resolved_at = db.Column(db.DateTime)                               # NULL mientras sigue activa
+
+    # Escalamiento por falta de reconocimiento (ver app/alerts/escalation.py)
+    escalation_level = db.Column(db.SmallInteger, nullable=False, default=0, server_default="0")
+    escalation_due_at = db.Column(db.DateTime)                         # próximo escalamiento (NULL = ninguno)
+
     patient = db.relationship("Patient", back_populates="alerts")
     acknowledged_user = db.relationship("User", foreign_keys=[acknowledged_by])
+
+
+# -----------------------------
+# Conteo de alertas pendientes por paciente y severidad (badges en O(1))
+# -----------------------------
+class AlertPendingCount(db.Model):
+    __tablename__ = "alert_pending_counts"
+
+    patient_id = db.Column(db.Integer, db.ForeignKey("patients.id", ondelete="CASCADE", onupdate="CASCADE"),
+                           primary_key=True)
+    severity = db.Column(db.Enum("low", "moderate", "high", "critical", name="alert_severity"), primary_key=True)
+    pending = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+
+
+# -----------------------------
+# Alert States (máquina de estados por paciente y métrica)
+# -----------------------------
+class AlertState(db.Model):
+    __tablename__ = "alert_states"
+
+    patient_id = db.Column(db.Integer, db.ForeignKey("patients.id", ondelete="CASCADE", onupdate="CASCADE"),
+                           primary_key=True)
+    metric = db.Column(db.String(32), primary_key=True)
+    status = db.Column(db.Enum("ok", "pending", "firing", "cooldown", name="alert_state_status"),
+                       nullable=False, default="ok")
+    direction = db.Column(db.Enum("high", "low", name="alert_state_direction"))
+    started_at = db.Column(db.DateTime)
+    last_ts = db.Column(db.DateTime)
+    last_seen_at = db.Column(db.DateTime)
+    peak_value = db.Column(db.Numeric(6, 2))
+    occurrences = db.Column(db.Integer, nullable=False, default=0)
+    severity = db.Column(db.Enum("low", "moderate", "high", "critical", name="alert_severity"))
+    alert_id = db.Column(db.BigInteger, db.ForeignKey("alerts.id", ondelete="SET NULL"))
+    resolved_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime, nullable=False, default=_utcnow, server_default=func.current_timestamp())
+
+
+# -----------------------------
+# Patient Daily Summary (resumen diario precalculado)
+# -----------------------------
+class PatientDailySummary(db.Model):
+    __tablename__ = "patient_daily_summary"
+    __table_args__ = (UniqueConstraint("day", "patient_id", name="ux_summary_day_patient"),)
+
+    id = db.Column(db.BigInteger, primary_key=True)
+    day = db.Column(db.Date, nullable=False)
+    patient_id = db.Column(db.Integer, db.ForeignKey("patients.id", ondelete="CASCADE", onupdate="CASCADE"),
+                           nullable=False, index=True)
+
+    readings_count = db.Column(db.Integer, nullable=False, default=0)
+    resting_hr_bpm = db.Column(db.Numeric(5, 1))       # media de HR con motion_level bajo
+    min_spo2_pct = db.Column(db.SmallInteger)
+    max_temp_c = db.Column(db.Numeric(4, 1))
+    minutes_out_of_range = db.Column(db.Integer, nullable=False, default=0)  # minutos con alguna métrica fuera de umbral
+    alerts_total = db.Column(db.Integer, nullable=False, default=0)
+    alerts_high = db.Column(db.Integer, nullable=False, default=0)           # severidad high + critical
+    wear_minutes = db.Column(db.Integer, nullable=False, default=0)          # minutos con telemetría sin cargar
+    computed_at = db.Column(db.DateTime, nullable=False, default=_utcnow, server_default=func.current_timestamp())
+
+    patient = db.relationship("Patient")
+
+
+# -----------------------------
+# Jobs (trabajos en segundo plano: reportes, backfills)
+# -----------------------------
+class Job(db.Model):
+    __tablename__ = "jobs"
+    __table_args__ = (db.Index("idx_jobs_status_created", "status", "created_at"),)
+
+    id = db.Column(db.BigInteger, primary_key=True)
+    kind = db.Column(db.String(40), nullable=False)
+    params = db.Column(db.JSON)
+    status = db.Column(db.Enum("queued", "running", "succeeded", "failed", "expired", name="job_status"),
+                       nullable=False, default="queued")
+    progress = db.Column(db.SmallInteger, nullable=False, default=0)   # 0–100
+    message = db.Column(db.String(255))                                 # detalle de progreso o error
+    result_path = db.Column(db.String(255))                             # archivo generado (si aplica)
+    requested_by = db.Column(db.Integer, db.ForeignKey("users.id", ondelete="SET NULL"), index=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=_utcnow, server_default=func.current_timestamp())
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    expires_at = db.Column(db.DateTime)
+
+
+# -----------------------------
+# Versiones de caché (invalidación entre workers, ver app/cache.py)
+# -----------------------------
+class CacheVersion(db.Model):
+    __tablename__ = "cache_versions"
+
+    name = db.Column(db.String(64), primary_key=True)   # p. ej. 'thresholds'
+    version = db.Column(db.BigInteger, nullable=False, default=0, server_default="0")
+    updated_at = db.Column(db.DateTime, nullable=False, default=_utcnow, server_default=func.current_timestamp())
+
+
+# -----------------------------
+# Contadores por minuto para el panel de admin (se incrementan al ingerir / crear alertas)
+# -----------------------------
+class StatsCounter(db.Model):
+    __tablename__ = "stats_counters"
+
+    name = db.Column(db.String(40), primary_key=True)     # 'readings', 'alerts.high', ...
+    bucket = db.Column(db.DateTime, primary_key=True)     # inicio del minuto (UTC)
+    value = db.Column(db.BigInteger, nullable=False, default=0, server_default="0")
+
+
+# -----------------------------
+# Último contacto de cada dispositivo (lo actualiza la ingesta; evita ir a readings
+# y device_telemetry para el panel y la vista de flota)
+# -----------------------------
+class DeviceLastSeen(db.Model):
+    __tablename__ = "device_last_seen"
+
+    device_id = db.Column(db.Integer, db.ForeignKey("devices.id", ondelete="CASCADE", onupdate="CASCADE"),
+                          primary_key=True)
+    last_seen_at = db.Column(db.DateTime, nullable=False, index=True)
+    last_reading_at = db.Column(db.DateTime)           # ts de la lectura más reciente
+    last_telemetry_at = db.Column(db.DateTime)         # ts de la telemetría más reciente
+    battery_pct = db.Column(db.SmallInteger)           # de esa telemetría
+    rssi_dbm = db.Column(db.SmallInteger)
+    online = db.Column(db.Boolean, nullable=False, default=False, server_default="0")  # lo mantiene el sweeper
+    online_changed_at = db.Column(db.DateTime)         # última transición online/offline
+
+
+# -----------------------------
+# Outbox de notificaciones (se escribe en la transacción de la alerta; la vacía
+# `flask notifications worker`, ver app/notifications)
+# -----------------------------
+class NotificationOutbox(db.Model):
+    __tablename__ = "notification_outbox"
+    __table_args__ = (db.Index("idx_outbox_status_next", "status", "next_attempt_at"),)
+
+    id = db.Column(db.BigInteger, primary_key=True)
+    alert_id = db.Column(db.BigInteger, db.ForeignKey("alerts.id", ondelete="CASCADE"), index=True)
+    event = db.Column(db.String(20), nullable=False)                  # 'open', 'reopen', 'escalate', 'unacknowledged'
+    channel = db.Column(db.String(20), nullable=False)                # 'webhook', 'email', 'file'
+    recipient = db.Column(db.String(255), nullable=False)             # URL, dirección o ruta según el canal
+    payload = db.Column(db.JSON, nullable=False)
+    status = db.Column(db.Enum("pending", "sending", "sent", "failed", name="outbox_status"),
+                       nullable=False, default="pending")
+    attempts = db.Column(db.SmallInteger, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=_utcnow)
+    claimed_at = db.Column(db.DateTime)                               # 'sending' desde (detecta workers caídos)
+    last_error = db.Column(db.String(255))
+    created_at = db.Column(db.DateTime, nullable=False, default=_utcnow, server_default=func.current_timestamp())
+    sent_at = db.Column(db.DateTime)
+
+
+# -----------------------------
+# Latido para medir el atraso de las réplicas de lectura (lo escribe cada worker web
+# en la primaria y lo lee en cada réplica, ver app/replicas.py). Una sola fila.
+# -----------------------------
+class ReplicaHeartbeat(db.Model):
+    __tablename__ = "replica_heartbeat"
+
+    id = db.Column(db.SmallInteger, primary_key=True, autoincrement=False)
+    beat_ms = db.Column(db.BigInteger, nullable=False, default=0, server_default="0")   # epoch en ms
@@ -0,0 +1,12 @@
+# backend/app/notifications/__init__.py
+
+"""
+Notificaciones de alertas fuera del request.
+
+La evaluación de alertas solo inserta filas en `notification_outbox` (en la misma
+transacción que la alerta); el proceso `flask notifications worker` las reclama y
+las entrega por los canales de `channels` (webhook, email, archivo) con reintentos,
+agrupación por destinatario y límite de tasa. La ingesta nunca espera un envío.
+"""
+
+from .channels import CHANNELS, Channel, PermanentError, channel, routes_from_config
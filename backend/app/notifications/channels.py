@@ -0,0 +1,154 @@
+# backend/app/notifications/channels.py
+
+"""
+Canales de entrega. Cada canal recibe un destinatario y un lote de notificaciones
+(payloads de alertas) y las envía juntas: un POST, un correo o N líneas de archivo.
+
+Un canal nuevo se registra con `@channel("nombre")` y se construye con
+`from_config(config)`. Lanzar `PermanentError` si reintentar no tiene sentido
+(p. ej. 4xx del webhook); cualquier otra excepción se reintenta con backoff.
+"""
+
+import json
+import logging
+import os
+import smtplib
+import threading
+import urllib.error
+import urllib.request
+from email.message import EmailMessage
+from typing import Any, Dict, List, Mapping, Tuple, Type
+
+logger = logging.getLogger(__name__)
+
+# nombre -> clase del canal
+CHANNELS: Dict[str, Type["Channel"]] = {}
+
+
+class PermanentError(Exception):
+    """El envío no va a funcionar reintentando (destinatario inválido, 4xx, ...)."""
+
+
+def channel(name: str):
+    """Decorador para registrar una clase de canal."""
+    def wrapper(cls):
+        cls.name = name
+        CHANNELS[name] = cls
+        return cls
+    return wrapper
+
+
+def _split(value: str | None) -> List[str]:
+    return [v.strip() for v in (value or "").split(",") if v.strip()]
+
+
+def routes_from_config(config: Mapping[str, Any]) -> List[Tuple[str, str]]:
+    """Destinos configurados como [(canal, destinatario)]. Vacío = notificaciones apagadas."""
+    routes = [("webhook", url) for url in _split(config.get("NOTIFY_WEBHOOK_URLS"))]
+    routes += [("email", addr) for addr in _split(config.get("NOTIFY_EMAIL_TO"))]
+    if config.get("NOTIFY_FILE_PATH"):
+        routes.append(("file", config["NOTIFY_FILE_PATH"]))
+    return routes
+
+
+def build_channels(config: Mapping[str, Any]) -> Dict[str, "Channel"]:
+    """Una instancia de cada canal registrado (las comparten los hilos del dispatcher)."""
+    return {name: cls.from_config(config) for name, cls in CHANNELS.items()}
+
+
+def summary_line(item: Dict[str, Any]) -> str:
+    """Una línea legible por notificación (asunto / cuerpo de correo)."""
+    return (f"[{item.get('severity', '').upper()}] Paciente {item.get('patient_id')}: "
+            f"{item.get('message') or item.get('type')} ({item.get('ts')})")
+
+
+class Channel:
+    name = ""
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any]) -> "Channel":
+        return cls()
+
+    def send(self, recipient: str, items: List[Dict[str, Any]]) -> None:
+        raise NotImplementedError
+
+
+@channel("webhook")
+class WebhookChannel(Channel):
+    """POST JSON {"notifications": [...]} al URL del destinatario."""
+
+    def __init__(self, timeout: float = 10.0):
+        self.timeout = timeout
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(timeout=config.get("NOTIFY_TIMEOUT_S", 10))
+
+    def send(self, recipient, items):
+        body = json.dumps({"notifications": items}, default=str).encode("utf-8")
+        req = urllib.request.Request(recipient, data=body, method="POST",
+                                     headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                resp.read()
+        except urllib.error.HTTPError as e:
+            # 408/429/5xx son transitorios; el resto de 4xx no mejora reintentando
+            if 400 <= e.code < 500 and e.code not in (408, 429):
+                raise PermanentError(f"HTTP {e.code}") from e
+            raise
+
+
+@channel("email")
+class EmailChannel(Channel):
+    """Un correo por destinatario con todas las alertas del lote."""
+
+    def __init__(self, host: str, port: int, sender: str, username: str | None = None,
+                 password: str | None = None, starttls: bool = False, timeout: float = 10.0):
+        self.host, self.port, self.sender = host, port, sender
+        self.username, self.password = username, password
+        self.starttls = starttls
+        self.timeout = timeout
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(host=config.get("NOTIFY_SMTP_HOST", "localhost"),
+                   port=int(config.get("NOTIFY_SMTP_PORT", 25)),
+                   sender=config.get("NOTIFY_SMTP_FROM", "alertas@vitalband.local"),
+                   username=config.get("NOTIFY_SMTP_USER") or None,
+                   password=config.get("NOTIFY_SMTP_PASS") or None,
+                   starttls=bool(config.get("NOTIFY_SMTP_STARTTLS")),
+                   timeout=config.get("NOTIFY_TIMEOUT_S", 10))
+
+    def send(self, recipient, items):
+        msg = EmailMessage()
+        msg["From"] = self.sender
+        msg["To"] = recipient
+        msg["Subject"] = (summary_line(items[0]) if len(items) == 1
+                          else f"VitalBand: {len(items)} alertas nuevas")
+        msg.set_content("\n".join(summary_line(i) for i in items))
+        try:
+            with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+                if self.starttls:
+                    smtp.starttls()
+                if self.username:
+                    smtp.login(self.username, self.password or "")
+                smtp.send_message(msg)
+        except smtplib.SMTPRecipientsRefused as e:
+            raise PermanentError(f"Destinatario rechazado: {recipient}") from e
+
+
+@channel("file")
+class FileChannel(Channel):
+    """Sink local (desarrollo / pruebas): una línea JSON por notificación y un log INFO."""
+
+    _lock = threading.Lock()
+
+    def send(self, recipient, items):
+        folder = os.path.dirname(recipient)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        lines = "".join(json.dumps(i, default=str) + "\n" for i in items)
+        with self._lock, open(recipient, "a", encoding="utf-8") as fh:
+            fh.write(lines)
+        for item in items:
+            logger.info(f"Notificación: {summary_line(item)}")
@@ -0,0 +1,155 @@
+# backend/app/notifications/dispatcher.py
+
+import logging
+import random
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+from flask import Flask
+from ..extensions import db, worker_session
+from ..ratelimit import RateLimiter  # token bucket por (canal, destinatario)
+from ..model.models import NotificationOutbox
+from ..repository.notification_outbox_repository import NotificationOutboxRepository
+from .channels import Channel, PermanentError, build_channels
+
+logger = logging.getLogger(__name__)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def backoff_delay(attempt: int, base: float, cap: float, rng: Callable[[], float] = random.random) -> float:
+    """
+    Espera antes del reintento `attempt` (1, 2, ...): exponencial con tope y
+    "equal jitter" (entre la mitad y el total) para no reintentar todos a la vez.
+    """
+    delay = min(cap, base * (2 ** max(0, attempt - 1)))
+    return delay / 2 + rng() * delay / 2
+
+
+class NotificationDispatcher:
+    """
+    Bucle de `flask notifications worker`: reclama lotes de `notification_outbox`,
+    los agrupa por (canal, destinatario) y envía cada grupo en un ThreadPoolExecutor
+    de NOTIFY_MAX_WORKERS hilos (los envíos son E/S: HTTP / SMTP). Solo el hilo
+    principal toca la BD; los hilos del pool únicamente llaman a los canales.
+    Fallos transitorios -> reintento con backoff exponencial; agotados los intentos
+    o con PermanentError -> 'failed'.
+    """
+
+    def __init__(self, app: Flask, repo: NotificationOutboxRepository | None = None,
+                 channels: Dict[str, Channel] | None = None, limiter: RateLimiter | None = None):
+        cfg = app.config
+        self.app = app
+        self.repo = repo or NotificationOutboxRepository()
+        self.channels = channels if channels is not None else build_channels(cfg)
+        self.limiter = limiter or RateLimiter(cfg["NOTIFY_RATE_PER_MIN"] / 60.0, cfg["NOTIFY_RATE_BURST"])
+        self.max_workers = cfg["NOTIFY_MAX_WORKERS"]
+        self.batch_size = cfg["NOTIFY_BATCH_SIZE"]
+        self.max_per_message = cfg["NOTIFY_MAX_PER_MESSAGE"]
+        self.max_attempts = cfg["NOTIFY_MAX_ATTEMPTS"]
+        self.backoff_base = cfg["NOTIFY_BACKOFF_BASE_S"]
+        self.backoff_max = cfg["NOTIFY_BACKOFF_MAX_S"]
+        self.poll_interval = cfg["NOTIFY_POLL_INTERVAL_S"]
+        self._stopping = False
+
+    def stop(self) -> None:
+        self._stopping = True
+
+    def _groups(self, rows: List[NotificationOutbox]) -> List[Tuple[str, str, List[NotificationOutbox]]]:
+        """Agrupa por (canal, destinatario) en mensajes de como mucho NOTIFY_MAX_PER_MESSAGE."""
+        by_dest: Dict[Tuple[str, str], List[NotificationOutbox]] = defaultdict(list)
+        for row in rows:
+            by_dest[(row.channel, row.recipient)].append(row)
+        size = max(1, self.max_per_message)
+        return [(ch, to, items[i:i + size])
+                for (ch, to), items in by_dest.items() for i in range(0, len(items), size)]
+
+    def _deliver(self, channel: Channel, recipient: str, rows: List[NotificationOutbox]) -> None:
+        channel.send(recipient, [dict(r.payload, event=r.event) for r in rows])
+
+    def _failed(self, rows: List[NotificationOutbox], error: Exception, now: datetime) -> None:
+        """Reprograma cada fila según sus intentos o la da por fallida."""
+        message = f"{type(error).__name__}: {error}"
+        if isinstance(error, PermanentError):
+            self.repo.mark_failed([r.id for r in rows], message)
+            return
+        retry: Dict[datetime, List[int]] = defaultdict(list)
+        give_up: List[int] = []
+        for row in rows:
+            attempt = (row.attempts or 0) + 1
+            if attempt >= self.max_attempts:
+                give_up.append(row.id)
+            else:
+                delay = backoff_delay(attempt, self.backoff_base, self.backoff_max)
+                retry[now + timedelta(seconds=delay)].append(row.id)
+        self.repo.mark_failed(give_up, message)
+        for when, ids in retry.items():
+            self.repo.reschedule(ids, when, error=message)
+
+    def dispatch_once(self, pool: ThreadPoolExecutor) -> int:
+        """Reclama un lote, lo envía y registra el resultado. Devuelve las filas reclamadas."""
+        now = _utcnow()
+        rows = self.repo.claim_due(now, self.batch_size)
+        if not rows:
+            return 0
+
+        futures = {}
+        for channel_name, recipient, items in self._groups(rows):
+            channel = self.channels.get(channel_name)
+            if channel is None:
+                self.repo.mark_failed([r.id for r in items], f"Canal desconocido: {channel_name}")
+                continue
+            wait_s = self.limiter.acquire((channel_name, recipient))
+            if wait_s:
+                # Límite de tasa del destinatario: vuelve a la cola sin gastar un intento
+                self.repo.reschedule([r.id for r in items], now + timedelta(seconds=wait_s), count_attempt=False)
+                continue
+            futures[pool.submit(self._deliver, channel, recipient, items)] = (channel_name, recipient, items)
+
+        sent = 0
+        for future in as_completed(futures):
+            channel_name, recipient, items = futures[future]
+            try:
+                future.result()
+            except Exception as e:
+                logger.warning(f"Envío {channel_name} a {recipient} falló ({len(items)} notificaciones): {e}")
+                self._failed(items, e, _utcnow())
+                continue
+            self.repo.mark_sent([r.id for r in items], _utcnow())
+            sent += len(items)
+        db.session.commit()
+        if sent:
+            logger.info(f"{sent} notificaciones enviadas.")
+        return len(rows)
+
+    def housekeeping(self) -> None:
+        """Libera reclamos de workers caídos y borra lo enviado hace más de NOTIFY_RETENTION_DAYS."""
+        cfg = self.app.config
+        released = self.repo.release_stale(_utcnow() - timedelta(minutes=cfg["NOTIFY_STALE_AFTER_MIN"]))
+        if released:
+            logger.warning(f"{released} notificaciones huérfanas devueltas a la cola.")
+        self.repo.purge_sent(_utcnow() - timedelta(days=cfg["NOTIFY_RETENTION_DAYS"]))
+
+    def run(self, once: bool = False) -> None:
+        """Ejecuta el bucle (o vacía lo vencido y termina con `once`)."""
+        with worker_session():
+            last_housekeeping: Optional[float] = None
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="notify") as pool:
+                while not self._stopping:
+                    if last_housekeeping is None or time.monotonic() - last_housekeeping > 60:
+                        self.housekeeping()
+                        last_housekeeping = time.monotonic()
+                    try:
+                        claimed = self.dispatch_once(pool)
+                    except Exception as e:
+                        db.session.rollback()
+                        logger.error(f"Error despachando notificaciones: {e}", exc_info=True)
+                        claimed = 0
+                    if once and not claimed:
+                        break
+                    if claimed < self.batch_size:
+                        time.sleep(0 if once else self.poll_interval)  # lote lleno: seguir sin esperar
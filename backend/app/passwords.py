@@ -0,0 +1,100 @@
+# backend/app/passwords.py
+
+"""
+Hash y verificación de contraseñas fuera de los hilos de gunicorn.
+
+scrypt / pbkdf2 tardan decenas de ms de CPU por llamada: hechos en el hilo del
+request, una ráfaga de logins ocupa los 4 hilos del worker y frena a todos los
+demás endpoints. PasswordHasher los manda a un pool de procesos acotado y, si ya
+hay `max_pending` operaciones en curso o en cola, rechaza en el acto con
+HasherBusy (el controlador responde 429) en lugar de encolar sin límite.
+
+El pool se crea al primer uso en cada proceso (después del fork de gunicorn) con
+contexto "spawn": no se hace fork de un proceso con hilos.
+"""
+
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from typing import Any, Callable, Mapping, Optional
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+logger = logging.getLogger(__name__)
+
+
+class HasherBusy(Exception):
+    """No hay lugar en la cola de hashing (o no respondió a tiempo): reintentar más tarde."""
+
+
+class PasswordHasher:
+    """
+    `workers` procesos (0 = en el hilo que llama, para tests / desarrollo) y como
+    mucho `max_pending` operaciones entre en curso y en cola. Cada una ocupa un hilo
+    del request mientras espera, así que `max_pending` debe ser menor que los hilos
+    del worker para que los demás endpoints siempre tengan dónde correr.
+    """
+
+    def __init__(self, method: str, workers: int = 1, max_pending: int = 2, timeout: float = 5.0):
+        self.method = method
+        # Método completo como queda en el hash: werkzeug expande los atajos ("scrypt" ->
+        # "scrypt:32768:8:1", "pbkdf2:sha256" -> "pbkdf2:sha256:1000000"). Un hash al
+        # construir (también valida el método configurado).
+        self._hash_prefix = generate_password_hash("", method).split("$", 1)[0]
+        self.workers = workers
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max(1, max_pending))
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pid: Optional[int] = None
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any]) -> "PasswordHasher":
+        return cls(config["PASSWORD_HASH_METHOD"], workers=config["PASSWORD_HASH_WORKERS"],
+                   max_pending=config["PASSWORD_HASH_MAX_PENDING"], timeout=config["PASSWORD_HASH_TIMEOUT_S"])
+
+    def hash(self, password: str) -> str:
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, pass_hash: str, password: str) -> bool:
+        return self._run(check_password_hash, pass_hash, password)
+
+    def needs_rehash(self, pass_hash: str) -> bool:
+        """El hash se hizo con otro método o parámetros ("scrypt:32768:8:1$sal$hash")."""
+        return pass_hash.split("$", 1)[0] != self._hash_prefix
+
+    def _run(self, fn: Callable, *args) -> Any:
+        if not self._slots.acquire(blocking=False):
+            raise HasherBusy("Cola de hashing llena.")
+        if self.workers <= 0:
+            try:
+                return fn(*args)
+            finally:
+                self._slots.release()
+        try:
+            future = self._executor().submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        # El lugar se libera al terminar de verdad, aunque el request ya no espere
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            raise HasherBusy("El hashing no terminó a tiempo.")
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None or self._pid != os.getpid():
+                self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context("spawn"))
+                self._pid = os.getpid()
+            return self._pool
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._pool is not None and self._pid == os.getpid():
+                self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
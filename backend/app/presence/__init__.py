@@ -0,0 +1,19 @@
+# backend/app/presence/__init__.py
+
+"""
+Presencia de dispositivos.
+
+La ingesta anota cada contacto en `tracker` (memoria del worker) y este lo vuelca a
+device_last_seen coalescido, como mucho una vez cada PRESENCE_FLUSH_S; la ingesta
+batch lo escribe en su propia transacción. El proceso `flask devices presence-worker`
+(`sweeper`) recorre esa tabla, que tiene una fila por dispositivo, y registra las
+transiciones online/offline según el silencio tolerado de cada banda, sin leer nunca
+`readings`.
+"""
+
+from ..config import Config
+from .sweeper import PresenceSweeper
+from .tracker import PresenceTracker
+
+# Un tracker por proceso web (como las cachés de app/cache.py)
+tracker = PresenceTracker(flush_every=Config.PRESENCE_FLUSH_S)
@@ -0,0 +1,44 @@
+# backend/app/presence/sweeper.py
+
+import logging
+import threading
+from flask import Flask
+from ..extensions import db, worker_session
+
+logger = logging.getLogger(__name__)
+
+
+class PresenceSweeper:
+    """
+    Proceso `flask devices presence-worker`: cada PRESENCE_SWEEP_S recorre
+    device_last_seen y registra las bandas que pasaron a offline u online (y, con
+    PRESENCE_ALERTS, abre o resuelve su alerta 'custom'). Se pueden correr varios:
+    cada transición se aplica una sola vez (ver PresenceService.sweep).
+    """
+
+    def __init__(self, app: Flask, service=None):
+        from ..services.presence_service import PresenceService
+        self.app = app
+        self.service = service or PresenceService()
+        self.interval = float(app.config["PRESENCE_SWEEP_S"])
+        self._stop = threading.Event()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def sweep_once(self):
+        try:
+            return self.service.sweep()
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error en el barrido de presencia: {e}", exc_info=True)
+            return None
+
+    def run(self, once: bool = False) -> None:
+        """Ejecuta el bucle (o un solo barrido con `once`)."""
+        with worker_session():
+            while not self._stop.is_set():
+                self.sweep_once()
+                if once:
+                    break
+                self._stop.wait(self.interval)
@@ -0,0 +1,108 @@
+# backend/app/presence/tracker.py
+
+import atexit
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Dict, Mapping, Optional
+from flask import current_app
+
+logger = logging.getLogger(__name__)
+
+
+class PresenceTracker:
+    """
+    Último contacto de cada dispositivo en memoria del worker web, volcado a
+    device_last_seen como mucho una vez cada `flush_every` segundos.
+
+    `seen()` no toca la BD (el POST de telemetría sigue en SELECT del dispositivo +
+    INSERT): solo guarda el contacto más reciente por dispositivo. Un hilo en segundo
+    plano, que se arranca con el primer contacto, escribe todo lo acumulado en un
+    único upsert (insert_or_greatest / insert_or_latest: entre varios workers gana el
+    más nuevo). Si el proceso muere se pierden como mucho `flush_every` segundos de
+    presencia, que el siguiente contacto repone.
+    """
+
+    def __init__(self, flush_every: float = 5.0, repo=None):
+        from ..repository.device_last_seen_repository import DeviceLastSeenRepository
+        self.flush_every = flush_every
+        self.repo = repo or DeviceLastSeenRepository()
+        self._lock = threading.Lock()
+        self._seen: Dict[int, datetime] = {}
+        self._telemetry: Dict[int, Dict[str, Any]] = {}   # última telemetría (batería / señal) por dispositivo
+        self._app = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+    def seen(self, device_id: int, at: datetime, telemetry: Optional[Mapping[str, Any]] = None) -> None:
+        """Registra un contacto (y opcionalmente la telemetría recibida, con su 'ts')."""
+        with self._lock:
+            prev = self._seen.get(device_id)
+            if prev is None or at > prev:
+                self._seen[device_id] = at
+            if telemetry is not None:
+                last = self._telemetry.get(device_id)
+                if last is None or telemetry["ts"] >= last["ts"]:
+                    self._telemetry[device_id] = dict(telemetry)
+        self._ensure_started()
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None or self.flush_every <= 0:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._app = current_app._get_current_object()
+            self._thread = threading.Thread(target=self._run, name="presence-flush", daemon=True)
+            self._thread.start()
+            atexit.register(self.stop)
+
+    def _take(self):
+        with self._lock:
+            seen, telemetry = self._seen, self._telemetry
+            self._seen, self._telemetry = {}, {}
+        return seen, telemetry
+
+    def _restore(self, seen: Dict[int, datetime], telemetry: Dict[int, Dict[str, Any]]) -> None:
+        # Lo que no se pudo escribir vuelve al buffer sin pisar contactos más nuevos
+        with self._lock:
+            for device_id, at in seen.items():
+                if device_id not in self._seen or at > self._seen[device_id]:
+                    self._seen[device_id] = at
+            for device_id, row in telemetry.items():
+                if device_id not in self._telemetry:
+                    self._telemetry[device_id] = row
+
+    def flush(self) -> int:
+        """Escribe los contactos acumulados (requiere app context). Devuelve cuántos dispositivos."""
+        from ..extensions import db
+        seen, telemetry = self._take()
+        if not seen:
+            return 0
+        try:
+            self.repo.record_telemetry({d: seen[d] for d in telemetry}, telemetry)
+            self.repo.touch({d: at for d, at in seen.items() if d not in telemetry})
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            self._restore(seen, telemetry)
+            logger.error(f"Error guardando la presencia de {len(seen)} dispositivos: {e}", exc_info=True)
+            return 0
+        return len(seen)
+
+    def _run(self) -> None:
+        from ..extensions import db
+        while not self._stop.wait(self.flush_every):
+            with self._app.app_context():
+                self.flush()
+                db.session.remove()
+
+    def stop(self) -> None:
+        """Detiene el hilo y escribe lo pendiente (al apagar el worker)."""
+        self._stop.set()
+        if self._app is not None and self._seen:
+            with self._app.app_context():
+                self.flush()
@@ -0,0 +1,86 @@
+# backend/app/ratelimit.py
+
+"""
+Token buckets por clave (destinatario de notificaciones, IP o email de login, ...).
+
+El estado de los buckets vive en un "store" intercambiable. Por defecto es
+MemoryBucketStore, un dict del proceso, así que con varios workers de gunicorn
+cada uno limita por su cuenta (el límite efectivo se multiplica por los workers).
+Para un límite compartido se configura RATE_LIMIT_STORE con la ruta de un objeto
+(o fábrica sin argumentos) con el mismo método `take`, p. ej. uno sobre Redis.
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Hashable, Optional, Protocol, Tuple
+
+from werkzeug.utils import import_string
+
+
+class BucketStore(Protocol):
+    def take(self, key: Hashable, rate: float, burst: int) -> float:
+        """Consume un token de `key` y devuelve 0, o cuántos segundos faltan para el próximo."""
+
+
+class MemoryBucketStore:
+    """
+    Buckets en memoria del proceso. Con muchas claves (una por IP) descarta primero
+    las que ya se llenaron (equivalen a no tener fila) y luego las más antiguas.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic, max_keys: int = 100_000):
+        self._clock = clock
+        self.max_keys = max_keys
+        self._buckets: Dict[Hashable, Tuple[float, float]] = {}  # clave -> (tokens, instante)
+        self._lock = threading.Lock()
+
+    def take(self, key: Hashable, rate: float, burst: int) -> float:
+        with self._lock:
+            now = self._clock()
+            tokens, last = self._buckets.pop(key, (float(burst), now))
+            tokens = min(float(burst), tokens + (now - last) * rate)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / rate
+            self._buckets[key] = (tokens, now)   # re-inserta al final: orden de último uso
+            if len(self._buckets) > self.max_keys:
+                self._evict(now, rate, burst)
+            return wait
+
+    def _evict(self, now: float, rate: float, burst: int) -> None:
+        full = [k for k, (tokens, last) in self._buckets.items() if tokens + (now - last) * rate >= burst]
+        for k in full:
+            del self._buckets[k]
+        excess = len(self._buckets) - self.max_keys
+        if excess > 0:
+            for k in list(self._buckets)[:excess]:
+                del self._buckets[k]
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+def load_store(spec: Optional[str]) -> BucketStore:
+    """Store configurado: vacío / "memory" = MemoryBucketStore; si no, "paquete.modulo:objeto"."""
+    if not spec or spec == "memory":
+        return MemoryBucketStore()
+    obj = import_string(spec.replace(":", "."))
+    return obj() if isinstance(obj, type) or not hasattr(obj, "take") else obj
+
+
+class RateLimiter:
+    """Token bucket por clave: `rate` tokens/s con ráfagas de `burst`. `rate <= 0` no limita."""
+
+    def __init__(self, rate: float, burst: int, clock: Callable[[], float] = time.monotonic,
+                 store: Optional[BucketStore] = None):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.store = store if store is not None else MemoryBucketStore(clock)
+
+    def acquire(self, key: Hashable) -> float:
+        """Consume un token y devuelve 0, o devuelve cuántos segundos faltan para el próximo."""
+        if self.rate <= 0:
+            return 0.0
+        return self.store.take(key, self.rate, self.burst)
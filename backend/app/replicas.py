@@ -0,0 +1,246 @@
+# backend/app/replicas.py
+
+"""
+Réplicas de lectura para el historial.
+
+Las lecturas marcadas con @replica_read (historial de lecturas y telemetría) van
+a una réplica de SQLALCHEMY_REPLICA_URIS en lugar de a la primaria, que además
+absorbe la ingesta. Todo lo demás, y cualquier escritura, sigue en la primaria.
+
+- Read-your-writes: si la sesión del request ya escribió (flush o INSERT / UPDATE /
+  DELETE directo), sus lecturas siguientes van a la primaria. Durante
+  REPLICA_STICKY_S después de un request que escribió, también las del mismo
+  usuario (registro por worker: en otro worker el atraso queda acotado por el
+  chequeo de abajo).
+- Réplica atrasada o caída: cada REPLICA_CHECK_S se escribe un latido en la
+  primaria (replica_heartbeat) y se lee en cada réplica; si lo que ve está más de
+  REPLICA_MAX_LAG_S atrasado, o no responde, se usa la primaria hasta el próximo
+  chequeo. Si una consulta falla en la réplica, se marca caída y se repite en la
+  primaria.
+
+Para probar en local alcanzan dos SQLite con las mismas tablas (sin replicación:
+REPLICA_MAX_LAG_S=0 desactiva la medición del atraso).
+"""
+
+import functools
+import itertools
+import logging
+import math
+import threading
+import time
+from typing import Callable, Dict, Hashable, List, Mapping, Optional, Sequence
+
+from flask import Flask, current_app, has_request_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy.exc import OperationalError
+
+logger = logging.getLogger(__name__)
+
+# Claves en session.info (la sesión dura lo que el request / app context)
+_READING = "replica_reading"          # dentro de una lectura @replica_read
+_WROTE = "replica_wrote"              # la sesión ya escribió: todo a la primaria
+_USED = "replica_used"                # réplica usada por la lectura en curso
+_USER_STICKY = "replica_user_sticky"  # el usuario escribió hace menos de REPLICA_STICKY_S
+
+
+def _is_plain_select(clause) -> bool:
+    return bool(getattr(clause, "is_select", False)) and getattr(clause, "_for_update_arg", None) is None
+
+
+class RoutingSession(Session):
+    """Session de Flask-SQLAlchemy que manda a una réplica las lecturas @replica_read."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            if self._flushing or (clause is not None and not _is_plain_select(clause)):
+                self.info[_WROTE] = True
+            elif self.info.get(_READING) and not self.info.get(_WROTE) and not self.info.get(_USER_STICKY):
+                router = current_app.extensions.get("replicas")
+                key = router.pick() if router is not None else None
+                if key is not None:
+                    self.info[_USED] = key
+                    return self._db.engines[key]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+class ReplicaRouter:
+    """Réplicas en uso según el último chequeo (por worker) y escrituras recientes por usuario."""
+
+    def __init__(self, engines: Callable[[], Mapping[Optional[str], object]], keys: Sequence[str],
+                 max_lag: float = 5.0, check_every: float = 1.0, sticky_for: float = 5.0,
+                 clock: Callable[[], float] = time.monotonic, wall: Callable[[], float] = time.time,
+                 max_users: int = 10_000):
+        self._engines = engines
+        self.keys = list(keys)
+        self.max_lag = max_lag
+        self.check_every = check_every
+        self.sticky_for = sticky_for
+        self.max_users = max_users
+        self._clock = clock
+        self._wall = wall
+        self._healthy: List[str] = []
+        self._checked_at: Optional[float] = None
+        self._check_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._turn = itertools.count()
+        self._writes: Dict[Hashable, float] = {}   # usuario -> instante de su última escritura
+
+    def pick(self) -> Optional[str]:
+        """Clave de una réplica usable (rotando entre las sanas) o None = primaria."""
+        if self._checked_at is None or self._clock() - self._checked_at >= self.check_every:
+            # Un solo hilo chequea; los demás siguen con el resultado anterior
+            if self._check_lock.acquire(blocking=False):
+                try:
+                    self.check()
+                finally:
+                    self._check_lock.release()
+        healthy = self._healthy
+        return healthy[next(self._turn) % len(healthy)] if healthy else None
+
+    def check(self) -> List[str]:
+        from .repository.replica_heartbeat_repository import ReplicaHeartbeatRepository
+        engines = self._engines()
+        now = self._wall()
+        if self.max_lag > 0:
+            try:
+                with engines[None].begin() as conn:
+                    ReplicaHeartbeatRepository.beat(conn, now)
+            except Exception as e:
+                logger.warning(f"No se pudo escribir el latido de réplicas en la primaria: {e}")
+
+        healthy, problems = [], {}
+        for key in self.keys:
+            try:
+                with engines[key].connect() as conn:
+                    if self.max_lag > 0:
+                        beat = ReplicaHeartbeatRepository.read(conn)
+                        lag = now - beat if beat is not None else math.inf
+                    else:
+                        ReplicaHeartbeatRepository.ping(conn)
+                        lag = 0.0
+            except Exception as e:
+                problems[key] = f"no responde ({e.__class__.__name__})"
+                continue
+            if lag > self.max_lag > 0:
+                problems[key] = f"atrasada {lag:.1f} s"
+            else:
+                healthy.append(key)
+
+        with self._lock:
+            for key in self.keys:
+                was, now_ok = key in self._healthy, key in healthy
+                if was and not now_ok:
+                    logger.warning(f"Réplica {key} fuera de uso: {problems[key]}. Se lee de la primaria.")
+                elif now_ok and not was and self._checked_at is not None:
+                    logger.info(f"Réplica {key} de nuevo en uso.")
+            self._healthy = healthy
+            self._checked_at = self._clock()
+        return healthy
+
+    def mark_down(self, key: str, error: Exception) -> None:
+        """La réplica falló en una consulta: fuera de uso hasta el próximo chequeo."""
+        with self._lock:
+            if key in self._healthy:
+                logger.warning(f"Réplica {key} fuera de uso: {error.__class__.__name__}. Se lee de la primaria.")
+            self._healthy = [k for k in self._healthy if k != key]
+            self._checked_at = self._clock()
+
+    def note_write(self, user: Hashable) -> None:
+        if self.sticky_for <= 0:
+            return
+        now = self._clock()
+        with self._lock:
+            self._writes.pop(user, None)
+            self._writes[user] = now   # al final: orden de escritura
+            if len(self._writes) > self.max_users:
+                for u in [u for u, at in self._writes.items() if now - at >= self.sticky_for]:
+                    del self._writes[u]
+                for u in list(self._writes)[:len(self._writes) - self.max_users]:
+                    del self._writes[u]
+
+    def wrote_recently(self, user: Optional[Hashable]) -> bool:
+        if user is None:
+            return False
+        at = self._writes.get(user)
+        return at is not None and self._clock() - at < self.sticky_for
+
+
+def _current_user_key() -> Optional[Hashable]:
+    """'sub' del JWT del request (si se verificó uno)."""
+    if not has_request_context():
+        return None
+    from flask_jwt_extended import get_jwt
+    try:
+        return get_jwt().get("sub")
+    except RuntimeError:
+        return None
+
+
+def replica_read(fn):
+    """
+    Marca una lectura de repositorio que tolera el atraso de una réplica (hasta
+    REPLICA_MAX_LAG_S). Sin réplicas configuradas no cambia nada.
+    """
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        from .extensions import db
+        router = current_app.extensions.get("replicas")
+        info = db.session.info
+        if router is None or info.get(_READING):
+            return fn(*args, **kwargs)
+        if _USER_STICKY not in info:
+            info[_USER_STICKY] = router.wrote_recently(_current_user_key())
+        info[_READING] = True
+        info.pop(_USED, None)
+        try:
+            return fn(*args, **kwargs)
+        except OperationalError as e:
+            key = info.get(_USED)
+            if key is None:
+                raise
+            router.mark_down(key, e)
+            db.session.rollback()   # descarta la conexión rota (la sesión no había escrito)
+        finally:
+            info[_READING] = False
+            info.pop(_USED, None)
+        return fn(*args, **kwargs)   # fuera de la lectura en réplica: va a la primaria
+    return wrapper
+
+
+def init_replicas(app: Flask) -> None:
+    """
+    Registra cada URI de SQLALCHEMY_REPLICA_URIS como bind 'replica_N' (antes de
+    db.init_app) y el router en app.extensions["replicas"].
+    """
+    uris = app.config.get("SQLALCHEMY_REPLICA_URIS") or []
+    if isinstance(uris, str):
+        uris = [u.strip() for u in uris.split(",") if u.strip()]
+    if not uris:
+        return
+    binds = dict(app.config.get("SQLALCHEMY_BINDS") or {})
+    keys = []
+    for i, uri in enumerate(uris):
+        key = f"replica_{i}"
+        options = {"url": uri}
+        if uri.startswith("mysql"):
+            # Una réplica caída no debe colgar el request: falla rápido y se usa la primaria
+            options["connect_args"] = {"connect_timeout": app.config.get("REPLICA_CONNECT_TIMEOUT_S", 2)}
+        binds[key] = options
+        keys.append(key)
+    app.config["SQLALCHEMY_BINDS"] = binds
+
+    from .extensions import db
+    app.extensions["replicas"] = ReplicaRouter(
+        lambda: db.engines, keys,
+        max_lag=app.config.get("REPLICA_MAX_LAG_S", 5.0),
+        check_every=app.config.get("REPLICA_CHECK_S", 1.0),
+        sticky_for=app.config.get("REPLICA_STICKY_S", 5.0),
+    )
+
+    @app.teardown_request
+    def _remember_writes(exc):
+        # Solo mira la sesión si el request llegó a crearla
+        if db.session.registry.has() and db.session.info.get(_WROTE):
+            user = _current_user_key()
+            if user is not None:
+                app.extensions["replicas"].note_write(user)
@@ -0,0 +1,61 @@
+# backend/app/repository/alert_pending_counts_repository.py
+
+from collections import Counter
+from typing import Dict, Hashable, Mapping, Optional, Tuple
+from sqlalchemy import delete, func, insert, select
+from ..alerts.state_machine import SEVERITIES
+from ..extensions import db
+from ..model.models import Alert, AlertPendingCount
+from .sql_utils import insert_or_increment
+
+
+def pending_key(alert: Optional[Alert]) -> Optional[Tuple[int, str]]:
+    """Casilla de alert_pending_counts en la que cuenta la alerta (None si no está pendiente)."""
+    if alert is None or alert.acknowledged_at is not None:
+        return None
+    return alert.patient_id, alert.severity
+
+
+def track_move(deltas: Counter, before: Optional[Hashable], after: Optional[Hashable]) -> None:
+    """Mueve una unidad de la casilla `before` a `after` (None = fuera de los conteos)."""
+    if before != after:
+        if before:
+            deltas[before] -= 1
+        if after:
+            deltas[after] += 1
+
+
+class AlertPendingCountsRepository:
+    """Contador de alertas sin reconocer por (paciente, severidad)."""
+
+    @staticmethod
+    def apply(deltas: Mapping[Tuple[int, str], int]) -> None:
+        """
+        Suma los deltas {(patient_id, severity): n} (+1 alerta pendiente nueva, -1
+        reconocida, -1/+1 si cambió de severidad). No hace commit: va en la misma
+        transacción que el cambio de la alerta.
+        """
+        rows = [{"patient_id": pid, "severity": sev, "pending": n}
+                for (pid, sev), n in deltas.items() if n]
+        insert_or_increment(AlertPendingCount, rows, keys=("patient_id", "severity"), counter="pending")
+
+    @staticmethod
+    def counts(patient_id: Optional[int] = None) -> Dict[str, int]:
+        """Pendientes por severidad de un paciente (lectura por clave primaria) o de todos."""
+        stmt = select(AlertPendingCount.severity, func.sum(AlertPendingCount.pending)).group_by(AlertPendingCount.severity)
+        if patient_id is not None:
+            stmt = stmt.where(AlertPendingCount.patient_id == patient_id)
+        result = {sev: 0 for sev in SEVERITIES}
+        result.update({sev: int(n or 0) for sev, n in db.session.execute(stmt)})
+        return result
+
+    @staticmethod
+    def rebuild() -> int:
+        """Recalcula todos los contadores desde `alerts` (no hace commit). Devuelve las filas creadas."""
+        db.session.execute(delete(AlertPendingCount))
+        source = (select(Alert.patient_id, Alert.severity, func.count())
+                  .where(Alert.acknowledged_at.is_(None))
+                  .group_by(Alert.patient_id, Alert.severity))
+        result = db.session.execute(insert(AlertPendingCount)
+                                    .from_select(["patient_id", "severity", "pending"], source))
+        return result.rowcount or 0
@@ -0,0 +1,61 @@
+# backend/app/repository/alert_states_repository.py
+
+from typing import Iterable, List
+from sqlalchemy import select, update
+from ..alerts.state_machine import METRIC_RULES, EpisodeState
+from ..extensions import db
+from ..model.models import AlertState, _utcnow
+from .sql_utils import insert_or_ignore, insert_or_replace
+
+_FIELDS = ("patient_id", "metric", "status", "direction", "started_at", "last_ts", "last_seen_at",
+           "peak_value", "occurrences", "severity", "alert_id", "resolved_at")
+_KEYS = ("patient_id", "metric")
+
+
+class AlertStatesRepository:
+    @staticmethod
+    def load(patient_ids: Iterable[int], lock: bool = False) -> List[EpisodeState]:
+        """
+        Estados guardados de los pacientes indicados (una sola consulta).
+
+        Con `lock` los toma hasta el fin de la transacción: dos evaluaciones del mismo
+        paciente (dos bandas, un reintento, el job de reevaluación) se serializan en
+        lugar de pisarse o abrir el mismo episodio dos veces. Primero crea sin pisar la
+        fila de cada métrica que falte (así nadie espera sobre un hueco del índice, que
+        con dos inserciones cruzadas terminaría en deadlock) y después la lee con
+        SELECT ... FOR UPDATE, que ve lo último confirmado. Orden de clave en ambos.
+        """
+        ids = sorted(set(patient_ids))
+        if not ids:
+            return []
+        stmt = select(*(getattr(AlertState, f) for f in _FIELDS)).where(AlertState.patient_id.in_(ids))
+        if lock:
+            insert_or_ignore(AlertState, [{"patient_id": p, "metric": m} for p in ids for m in METRIC_RULES], _KEYS)
+            stmt = stmt.order_by(AlertState.patient_id, AlertState.metric).with_for_update()
+        states = []
+        for row in db.session.execute(stmt).mappings():
+            s = EpisodeState(**row, persisted=True)
+            if s.peak_value is not None:
+                s.peak_value = float(s.peak_value)
+            states.append(s)
+        return states
+
+    @staticmethod
+    def save(states: List[EpisodeState]) -> None:
+        """
+        Guarda los estados modificados: upsert para los nuevos (si otra transacción
+        creó la fila entretanto no falla por clave duplicada) y UPDATE por clave
+        primaria (executemany) para los existentes. No hace commit.
+        """
+        now = _utcnow()
+        new_rows, old_rows = [], []
+        for s in states:
+            row = {f: getattr(s, f) for f in _FIELDS}
+            row["updated_at"] = now
+            (old_rows if s.persisted else new_rows).append(row)
+        if new_rows:
+            insert_or_replace(AlertState, new_rows, _KEYS, [f for f in _FIELDS if f not in _KEYS] + ["updated_at"])
+        if old_rows:
+            db.session.execute(update(AlertState), old_rows)
+        for s in states:
+            s.persisted, s.dirty = True, False
@@ -1,10 +1,14 @@
 # backend/app/repository/alerts_repository.py
 
-from typing import List, Optional, Dict
+from collections import Counter
+from typing import List, Optional, Dict, Sequence, Tuple
 from datetime import datetime # Necesario para acknowledge
 from ..extensions import db
 from ..model.models import Alert
-from sqlalchemy import func, case # Necesario para el conteo
+from .alert_pending_counts_repository import AlertPendingCountsRepository
+from .unit_of_work import save
+from sqlalchemy import func, case, select, update # Necesario para el conteo
+from sqlalchemy.orm.attributes import set_committed_value
 
 class AlertsRepository:
     @staticmethod
@@ -27,15 +31,73 @@ class AlertsRepository:
     def acknowledge(alert: Alert, user_id: int, timestamp: datetime, notes: Optional[str] = None) -> Alert:
         """
         Actualiza los campos 'acknowledged_by' y 'acknowledged_at' de una alerta.
+
+        El UPDATE es condicional (solo si sigue pendiente), así dos reconocimientos
+        simultáneos no descuentan dos veces el contador de pendientes.
         """
-        alert.acknowledged_by = user_id
-        alert.acknowledged_at = timestamp
+        result = db.session.execute(
+            update(Alert)
+            .where(Alert.id == alert.id, Alert.acknowledged_at.is_(None))
+            .values(acknowledged_by=user_id, acknowledged_at=timestamp)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount:
+            AlertPendingCountsRepository.apply({(alert.patient_id, alert.severity): -1})
+            set_committed_value(alert, "acknowledged_by", user_id)
+            set_committed_value(alert, "acknowledged_at", timestamp)
         # NOTA: 'notes' no se guarda porque el modelo 'Alert' no tiene un campo para ello.
-        
-        db.session.commit() # Guarda los cambios en la BD
-        db.session.refresh(alert) # Refresca el objeto
+
+        save(alert) # Guarda los cambios en la BD
+        if not result.rowcount:
+            # Otro usuario la reconoció antes: se devuelve con sus datos
+            db.session.refresh(alert, attribute_names=["acknowledged_by", "acknowledged_at"])
         return alert
 
+    # --- NUEVO: Reconocimiento masivo ---
+    @staticmethod
+    def acknowledge_many(user_id: int, timestamp: datetime, ids: Optional[Sequence[int]] = None,
+                         patient_id: Optional[int] = None, type: Optional[str] = None,
+                         before: Optional[datetime] = None, limit: int = 1000) -> Tuple[List[int], bool]:
+        """
+        Reconoce en bloque las alertas pendientes que cumplen el filtro (no hace commit).
+
+        MySQL no tiene UPDATE ... RETURNING: se bloquean las pendientes con un
+        SELECT ... FOR UPDATE (por índice), se marcan con un único UPDATE y se
+        descuentan los contadores de pendientes, todo en la transacción del llamador.
+        Devuelve (ids reconocidos, True si quedaron más de `limit` sin reconocer).
+        """
+        conds = [Alert.acknowledged_at.is_(None)]
+        if ids:
+            conds.append(Alert.id.in_(list(ids)))
+        if patient_id is not None:
+            conds.append(Alert.patient_id == patient_id)
+        if type:
+            conds.append(Alert.type == type)
+        if before is not None:
+            conds.append(Alert.ts < before)
+        rows = db.session.execute(
+            select(Alert.id, Alert.patient_id, Alert.severity)
+            .where(*conds)
+            .order_by(Alert.ts.asc(), Alert.id.asc())
+            .limit(limit + 1)
+            .with_for_update()
+        ).all()
+        more = len(rows) > limit
+        rows = rows[:limit]
+        if not rows:
+            return [], False
+
+        acked = [r.id for r in rows]
+        db.session.execute(
+            update(Alert)
+            .where(Alert.id.in_(acked), Alert.acknowledged_at.is_(None))
+            .values(acknowledged_by=user_id, acknowledged_at=timestamp)
+            .execution_options(synchronize_session=False)
+        )
+        deltas = Counter((r.patient_id, r.severity) for r in rows)
+        AlertPendingCountsRepository.apply({key: -n for key, n in deltas.items()})
+        return acked, more
+
     # --- CÓDIGO FUNCIONAL AÑADIDO (Para el paso 2) ---
     @staticmethod
     def list_pending(limit: int = 50) -> List[Alert]:
@@ -46,6 +108,43 @@ class AlertsRepository:
                 .limit(limit)
                 .all())
 
+    # --- NUEVO: Alerta abierta (episodio activo) de una métrica ---
+    @staticmethod
+    def get_open(patient_id: int, metric: str) -> Optional[Alert]:
+        """Alerta por umbral aún no resuelta de un paciente y métrica (la más reciente)."""
+        return (
+            Alert.query
+            .filter(Alert.patient_id == patient_id, Alert.metric == metric, Alert.resolved_at.is_(None))
+            .order_by(Alert.ts.desc())
+            .first()
+        )
+
+    # --- NUEVO: Timers de escalamiento (ver app/alerts/escalation.py) ---
+    @staticmethod
+    def list_escalation_due(until: datetime) -> List[Tuple[int, int, datetime]]:
+        """
+        (id, escalation_level, escalation_due_at) de las alertas sin reconocer con un
+        escalamiento que vence hasta `until`. Rango sobre idx_alerts_ack_escalation:
+        solo lee los timers de la ventana, no todas las pendientes.
+        """
+        rows = db.session.execute(
+            select(Alert.id, Alert.escalation_level, Alert.escalation_due_at)
+            .where(Alert.acknowledged_at.is_(None), Alert.escalation_due_at <= until)
+            .order_by(Alert.escalation_due_at.asc())
+        )
+        return [tuple(r) for r in rows]
+
+    @staticmethod
+    def lock_for_escalation(alert_ids: Sequence[int]) -> List[Alert]:
+        """Bloquea (SELECT ... FOR UPDATE) y relee las alertas cuyo timer venció."""
+        if not alert_ids:
+            return []
+        return (Alert.query
+                .filter(Alert.id.in_(list(alert_ids)))
+                .with_for_update()
+                .populate_existing()
+                .all())
+
     # --- NUEVO: Listar alertas pendientes por paciente ---
     @staticmethod
     def list_pending_for_patient(patient_id: int, limit: int = 5) -> List[Alert]:
@@ -0,0 +1,26 @@
+# backend/app/repository/cache_versions_repository.py
+
+from datetime import datetime, timezone
+from sqlalchemy import select
+from ..extensions import db
+from ..model.models import CacheVersion
+from .sql_utils import insert_or_increment
+
+
+class CacheVersionsRepository:
+    @staticmethod
+    def get(name: str) -> int:
+        """Versión actual de una caché (0 si aún no tiene fila)."""
+        version = db.session.execute(select(CacheVersion.version).where(CacheVersion.name == name)).scalar()
+        return int(version or 0)
+
+    @staticmethod
+    def bump(name: str) -> None:
+        """
+        Incrementa la versión en la transacción actual (no hace commit): el cambio se
+        publica junto con los datos que invalida. Es un upsert, así dos transacciones
+        que crean la fila a la vez no chocan en la clave.
+        """
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        insert_or_increment(CacheVersion, [{"name": name, "version": 1, "updated_at": now}],
+                            keys=("name",), counter="version", columns=("updated_at",))
@@ -0,0 +1,66 @@
+# backend/app/repository/device_last_seen_repository.py
+
+from datetime import datetime
+from typing import Any, List, Mapping, Sequence, Tuple
+from sqlalchemy import func, select
+from ..extensions import db
+from ..model.models import Device, DeviceLastSeen
+from .sql_utils import insert_or_greatest, insert_or_latest
+
+
+class DeviceLastSeenRepository:
+    @staticmethod
+    def touch(last_seen: Mapping[int, datetime]) -> None:
+        """
+        Registra {device_id: ts} como último contacto (se queda con el mayor: un lote
+        atrasado no retrocede el valor). No hace commit.
+        """
+        rows = [{"device_id": d, "last_seen_at": ts} for d, ts in last_seen.items() if ts is not None]
+        insert_or_greatest(DeviceLastSeen, rows, keys=("device_id",), column="last_seen_at")
+
+    @staticmethod
+    def record_readings(seen_at: datetime, last_reading: Mapping[int, datetime]) -> None:
+        """Contacto en `seen_at` con lecturas hasta {device_id: ts} (un lote atrasado no retrocede nada)."""
+        rows = [{"device_id": d, "last_seen_at": seen_at, "last_reading_at": ts} for d, ts in last_reading.items()]
+        insert_or_latest(DeviceLastSeen, rows, keys=("device_id",), ts_column="last_reading_at",
+                         greatest=("last_seen_at",))
+
+    @staticmethod
+    def record_telemetry(seen_at: Mapping[int, datetime], latest: Mapping[int, Mapping[str, Any]]) -> None:
+        """Contacto {device_id: seen_at} con {device_id: telemetría más reciente} (batería, señal)."""
+        rows = [{"device_id": d, "last_seen_at": seen_at[d], "last_telemetry_at": row["ts"],
+                 "battery_pct": row.get("battery_pct"), "rssi_dbm": row.get("rssi_dbm")}
+                for d, row in latest.items()]
+        insert_or_latest(DeviceLastSeen, rows, keys=("device_id",), ts_column="last_telemetry_at",
+                         columns=("battery_pct", "rssi_dbm"), greatest=("last_seen_at",))
+
+    @staticmethod
+    def count_since(since: datetime) -> int:
+        """Dispositivos con contacto desde `since` (rango sobre ix_device_last_seen_last_seen_at)."""
+        stmt = select(func.count()).select_from(DeviceLastSeen).where(DeviceLastSeen.last_seen_at >= since)
+        return int(db.session.execute(stmt).scalar() or 0)
+
+    # --- NUEVO: Presencia (ver app/presence) ---
+    @staticmethod
+    def list_presence() -> List:
+        """
+        (device_id, last_seen_at, online, offline_after_s) de los dispositivos no
+        retirados: una fila por dispositivo, recorre la tabla chica, nunca `readings`.
+        """
+        stmt = (select(DeviceLastSeen.device_id, DeviceLastSeen.last_seen_at, DeviceLastSeen.online,
+                       Device.offline_after_s)
+                .join(Device, Device.id == DeviceLastSeen.device_id)
+                .where(Device.status != "retired"))
+        return db.session.execute(stmt).all()
+
+    @staticmethod
+    def lock_presence(device_ids: Sequence[int]) -> List[Tuple[DeviceLastSeen, Device]]:
+        """Bloquea (SELECT ... FOR UPDATE) y relee las filas a cambiar de estado, con su dispositivo."""
+        if not device_ids:
+            return []
+        stmt = (select(DeviceLastSeen, Device)
+                .join(Device, Device.id == DeviceLastSeen.device_id)
+                .where(DeviceLastSeen.device_id.in_(list(device_ids)))
+                .with_for_update(of=DeviceLastSeen)
+                .execution_options(populate_existing=True))
+        return [tuple(r) for r in db.session.execute(stmt)]
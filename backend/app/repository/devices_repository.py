@@ -1,9 +1,12 @@
 # backend/app/repository/devices_repository.py
 
-from typing import Optional, List, Dict, Any # Añadir Dict, Any
-from sqlalchemy import select, update as sqlalchemy_update # Para SQLAlchemy 2.0+ style (opcional)
+from datetime import datetime
+from typing import Optional, List, Dict, Any, Sequence # Añadir Dict, Any
+from sqlalchemy import insert, or_, select, update as sqlalchemy_update # Para SQLAlchemy 2.0+ style (opcional)
 from ..extensions import db
-from ..model.models import Device
+from ..model.models import Device, DeviceLastSeen, Patient
+from .unit_of_work import save
+from .users_repository import UsersRepository
 
 class DevicesRepository:
     @staticmethod
@@ -32,6 +35,63 @@ class DevicesRepository:
         # stmt = select(Device).order_by(Device.id.desc()).limit(per_page).offset((page - 1) * per_page)
         # return list(db.session.scalars(stmt).all())
 
+    # --- NUEVO: Alta masiva ---
+    @staticmethod
+    def existing_serials(serials: Sequence[str]) -> Dict[str, int]:
+        """{serial: id} de los seriales que ya existen (un solo `IN` sobre el índice único)."""
+        if not serials:
+            return {}
+        stmt = select(Device.serial, Device.id).where(Device.serial.in_(list(serials)))
+        return {serial: device_id for serial, device_id in db.session.execute(stmt)}
+
+    @staticmethod
+    def bulk_insert(rows: List[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Inserta los dispositivos en un INSERT multi-fila y devuelve {serial: id} (MySQL
+        no tiene RETURNING: se releen por serial). El commit lo hace el llamador.
+        """
+        if not rows:
+            return {}
+        if any(r.get("patient_id") is not None for r in rows):
+            UsersRepository.identities_changed()   # los pacientes que reciben bandas
+        # Core (no el bulk del ORM, que parte el lote según qué columnas vienen en NULL)
+        db.session.execute(insert(Device.__table__), rows)
+        return DevicesRepository.existing_serials([r["serial"] for r in rows])
+
+    # --- NUEVO: Vista de flota (dispositivo + paciente + último contacto) ---
+    @staticmethod
+    def list_fleet(limit: int = 100, after_id: Optional[int] = None, statuses: Optional[Sequence[str]] = None,
+                   patient_id: Optional[int] = None, seen_before: Optional[datetime] = None,
+                   seen_since: Optional[datetime] = None, battery_below: Optional[int] = None) -> List:
+        """
+        Dispositivos (id descendente) con el nombre del paciente y la foto de
+        device_last_seen, en una sola consulta con LEFT JOIN por clave primaria.
+
+        Paginación keyset: `after_id` es el último id de la página anterior (recorre la
+        PK, el costo no crece con la página). Filtros: estados, paciente, sin contacto
+        desde `seen_before` (incluye los que nunca reportaron), con contacto desde
+        `seen_since` y batería menor a `battery_below`.
+        """
+        stmt = (select(Device.id, Device.serial, Device.model, Device.status, Device.patient_id,
+                       Device.registered_at, Patient.first_name, Patient.last_name,
+                       DeviceLastSeen.last_seen_at, DeviceLastSeen.last_reading_at,
+                       DeviceLastSeen.last_telemetry_at, DeviceLastSeen.battery_pct, DeviceLastSeen.rssi_dbm)
+                .outerjoin(Patient, Patient.id == Device.patient_id)
+                .outerjoin(DeviceLastSeen, DeviceLastSeen.device_id == Device.id))
+        if after_id is not None:
+            stmt = stmt.where(Device.id < after_id)
+        if statuses:
+            stmt = stmt.where(Device.status.in_(list(statuses)))
+        if patient_id is not None:
+            stmt = stmt.where(Device.patient_id == patient_id)
+        if seen_before is not None:
+            stmt = stmt.where(or_(DeviceLastSeen.last_seen_at.is_(None), DeviceLastSeen.last_seen_at < seen_before))
+        if seen_since is not None:
+            stmt = stmt.where(DeviceLastSeen.last_seen_at >= seen_since)
+        if battery_below is not None:
+            stmt = stmt.where(DeviceLastSeen.battery_pct < battery_below)
+        return db.session.execute(stmt.order_by(Device.id.desc()).limit(limit)).all()
+
     @staticmethod
     def list_by_patient(patient_id: int) -> List[Device]:
         """Lista los dispositivos asignados a un paciente específico."""
@@ -58,8 +118,9 @@ class DevicesRepository:
         # o capturar la IntegrityError de SQLAlchemy aquí o en el servicio.
         d = Device(serial=serial, model=model, patient_id=patient_id, status=status)
         db.session.add(d)
-        db.session.commit()
-        db.session.refresh(d)
+        if patient_id is not None:
+            UsersRepository.identities_changed()
+        save(d)
         return d
 
     @staticmethod
@@ -68,11 +129,22 @@ class DevicesRepository:
         d = db.session.get(Device, device_id)
         if not d:
             return None
+        if d.patient_id != patient_id:
+            UsersRepository.identities_changed()   # bandas del paciente anterior y del nuevo
         d.patient_id = patient_id # Actualiza el campo
-        db.session.commit() # Guarda el cambio
-        db.session.refresh(d)
+        save(d) # Guarda el cambio
         return d
 
+    @staticmethod
+    def unassign_patient(patient_id: int) -> int:
+        """Desasigna (patient_id = NULL) todas las bandas de un paciente. Devuelve cuántas."""
+        res = db.session.execute(sqlalchemy_update(Device)
+                                 .where(Device.patient_id == patient_id)
+                                 .values(patient_id=None))
+        if res.rowcount:
+            UsersRepository.identities_changed()
+        return res.rowcount
+
     # --- NUEVO: Actualizar Dispositivo ---
     @staticmethod
     def update(device: Device, data: Dict[str, Any]) -> Device:
@@ -85,8 +157,7 @@ class DevicesRepository:
                 updated = True
 
         if updated:
-            db.session.commit() # Guarda solo si hubo cambios
-            db.session.refresh(device)
+            save(device) # Guarda solo si hubo cambios
         return device
 
         # Alternativa SQLAlchemy 2.0+ style (menos común para updates parciales basados en objeto):
@@ -102,9 +173,9 @@ class DevicesRepository:
     @staticmethod
     def delete(device: Device) -> bool:
         """Elimina un registro de dispositivo de la base de datos."""
-        # ¡IMPORTANTE! El modelo tiene cascade="all, delete-orphan" para readings y telemetry.
-        # Esto significa que al borrar el dispositivo, SQLAlchemy también borrará
-        # automáticamente todos sus registros asociados en esas tablas.
+        # readings y telemetry tienen passive_deletes: el ON DELETE CASCADE de la BD las
+        # borra sin cargarlas, pero en una sola transacción. Para bandas con historial
+        # usar el job 'purge_device' (DevicesService.schedule_delete), que borra por lotes.
         try:
             db.session.delete(device)
             db.session.commit()
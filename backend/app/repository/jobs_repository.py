@@ -0,0 +1,111 @@
+# backend/app/repository/jobs_repository.py
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from sqlalchemy import update
+from ..extensions import db
+from ..model.models import Job
+from .unit_of_work import save
+
+class JobsRepository:
+    @staticmethod
+    def create(kind: str, params: Dict[str, Any], requested_by: Optional[int] = None) -> Job:
+        """Encola un nuevo job."""
+        job = Job(kind=kind, params=params, requested_by=requested_by, status="queued", progress=0)
+        db.session.add(job)
+        save(job)
+        return job
+
+    @staticmethod
+    def get(job_id: int) -> Optional[Job]:
+        """Obtiene un job por su ID."""
+        return db.session.get(Job, job_id)
+
+    @staticmethod
+    def count_pending_for_user(user_id: int) -> int:
+        """Jobs en cola o en ejecución de un usuario (límite de concurrencia por usuario)."""
+        return (Job.query
+                .filter(Job.requested_by == user_id, Job.status.in_(["queued", "running"]))
+                .count())
+
+    @staticmethod
+    def claim_next(now: datetime) -> Optional[int]:
+        """
+        Toma el job en cola más antiguo y lo marca 'running'.
+
+        El UPDATE condicionado a status='queued' hace el claim atómico aunque haya
+        varios workers: solo uno obtiene rowcount == 1.
+        """
+        while True:
+            row = (db.session.query(Job.id)
+                   .filter(Job.status == "queued")
+                   .order_by(Job.created_at.asc(), Job.id.asc())
+                   .first())
+            if not row:
+                db.session.commit()  # cierra la transacción de lectura
+                return None
+            res = db.session.execute(
+                update(Job)
+                .where(Job.id == row.id, Job.status == "queued")
+                .values(status="running", started_at=now, progress=0)
+            )
+            db.session.commit()
+            if res.rowcount == 1:
+                return row.id
+            # Otro worker lo tomó primero: probar con el siguiente
+
+    @staticmethod
+    def set_progress(job_id: int, progress: int, message: Optional[str] = None) -> None:
+        """
+        Actualiza el porcentaje de avance.
+
+        Usa su propia conexión y transacción para no confirmar (ni cortar un cursor
+        en streaming de) la sesión con la que trabaja el handler.
+        """
+        values: Dict[str, Any] = {"progress": max(0, min(100, int(progress)))}
+        if message is not None:
+            values["message"] = message[:255]
+        with db.engine.begin() as conn:
+            conn.execute(update(Job).where(Job.id == job_id).values(**values))
+
+    @staticmethod
+    def finish(job_id: int, status: str, now: datetime, message: Optional[str] = None,
+               result_path: Optional[str] = None, expires_at: Optional[datetime] = None) -> None:
+        """Marca un job como terminado ('succeeded' o 'failed')."""
+        values: Dict[str, Any] = {"status": status, "finished_at": now, "expires_at": expires_at,
+                                  "result_path": result_path}
+        if status == "succeeded":
+            values["progress"] = 100
+        if message is not None:
+            values["message"] = message[:255]
+        db.session.execute(update(Job).where(Job.id == job_id).values(**values))
+        db.session.commit()
+
+    @staticmethod
+    def fail_stale(started_before: datetime, now: datetime) -> int:
+        """Marca como fallidos los jobs 'running' huérfanos (worker caído)."""
+        res = db.session.execute(
+            update(Job)
+            .where(Job.status == "running", Job.started_at < started_before)
+            .values(status="failed", finished_at=now, message="Worker interrumpido.")
+        )
+        db.session.commit()
+        return res.rowcount
+
+    @staticmethod
+    def list_expired(now: datetime, limit: int = 500) -> List[Job]:
+        """Jobs terminados cuyo resultado ya venció."""
+        return (Job.query
+                .filter(Job.status.in_(["succeeded", "failed"]), Job.expires_at.isnot(None),
+                        Job.expires_at < now)
+                .limit(limit)
+                .all())
+
+    @staticmethod
+    def mark_expired(job_ids: List[int]) -> None:
+        """Marca jobs como vencidos y olvida su archivo de resultado."""
+        if not job_ids:
+            return
+        db.session.execute(update(Job).where(Job.id.in_(job_ids))
+                           .values(status="expired", result_path=None))
+        db.session.commit()
@@ -1,15 +1,18 @@
 # backend/app/repository/metrics_repository.py
 
 from datetime import datetime, timedelta, timezone
-from typing import List, Optional
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from sqlalchemy import RowMapping, and_, func, insert, or_, select
 # Importa el modelo Reading
 from ..model.models import Reading
 # Importa db si necesitas la sesión directamente (aunque query suele ser suficiente aquí)
-# from ..extensions import db
+from ..extensions import db
+from ..replicas import replica_read
 
 class MetricsRepository:
     """Mantiene el nombre del archivo para compatibilidad, pero trabaja con Reading."""
     @staticmethod
+    @replica_read
     def last_24h(device_id: int) -> List[Reading]:
         """Obtiene todas las lecturas de un dispositivo en las últimas 24 horas."""
         since = datetime.now(timezone.utc) - timedelta(hours=24)
@@ -19,6 +22,7 @@ class MetricsRepository:
                 .all())
 
     @staticmethod
+    @replica_read
     def list_range(device_id: int, dt_from: Optional[datetime] = None,
                    dt_to: Optional[datetime] = None, limit: int = 1000) -> List[Reading]:
         """Obtiene lecturas para un dispositivo filtrando por ID, rango de fechas y límite."""
@@ -42,4 +46,88 @@ class MetricsRepository:
         return (Reading.query
                 .filter(Reading.device_id == device_id)
                 .order_by(Reading.ts.desc()) # Ordena por fecha, la más nueva primero
-                .first()) # Toma solo el primer resultado (el más reciente)
\ No newline at end of file
+                .first()) # Toma solo el primer resultado (el más reciente)
+
+    # --- NUEVO: Historial combinado de varios dispositivos ---
+    @staticmethod
+    @replica_read
+    def list_range_for_devices(device_ids: Sequence[int], dt_from: Optional[datetime] = None,
+                               dt_to: Optional[datetime] = None, limit: int = 1000,
+                               before: Optional[Tuple[datetime, int]] = None) -> List[Reading]:
+        """
+        Obtiene lecturas de varios dispositivos mezcladas por timestamp (más nuevas primero).
+
+        Se resuelve en una sola consulta con `device_id IN (...)` sobre el índice
+        (device_id, ts): el motor recorre cada rango del índice y mezcla por `ts`,
+        en lugar de lanzar una consulta completa por dispositivo.
+        `before` es un cursor keyset (ts, id): devuelve solo lecturas estrictamente anteriores.
+        """
+        if not device_ids:
+            return []
+        q = Reading.query.filter(Reading.device_id.in_(list(device_ids)))
+        if dt_from:
+            q = q.filter(Reading.ts >= dt_from)
+        if dt_to:
+            q = q.filter(Reading.ts <= dt_to)
+        if before:
+            before_ts, before_id = before
+            q = q.filter(or_(Reading.ts < before_ts,
+                             and_(Reading.ts == before_ts, Reading.id < before_id)))
+        # 'id' desempata lecturas con el mismo ts para que el cursor sea estable
+        return q.order_by(Reading.ts.desc(), Reading.id.desc()).limit(limit).all()
+
+    # --- NUEVO: Recorrido por lotes (jobs) ---
+    @staticmethod
+    def iter_range_for_devices(device_ids: Sequence[int], dt_from: datetime,
+                               dt_to: Optional[datetime] = None, chunk: int = 5000) -> Iterator[RowMapping]:
+        """
+        Recorre las lecturas de varios dispositivos desde `dt_from`, en el orden del índice
+        (device_id, ts) y trayendo `chunk` filas por vez (no carga el rango completo).
+        Devuelve mappings con device_id, ts y las columnas de signos vitales.
+        """
+        if not device_ids:
+            return iter(())
+        stmt = (select(Reading.device_id, Reading.ts, Reading.heart_rate_bpm, Reading.spo2_pct, Reading.temp_c)
+                .where(Reading.device_id.in_(device_ids), Reading.ts >= dt_from))
+        if dt_to:
+            stmt = stmt.where(Reading.ts <= dt_to)
+        stmt = stmt.order_by(Reading.device_id.asc(), Reading.ts.asc()).execution_options(yield_per=chunk)
+        return db.session.execute(stmt).mappings()
+
+    # --- NUEVO: Última lectura de cada dispositivo en una sola consulta ---
+    @staticmethod
+    def get_latest_for_devices(device_ids: Sequence[int]) -> Dict[int, Reading]:
+        """
+        Devuelve {device_id: última Reading} para los dispositivos indicados.
+
+        Usa un "groupwise max": MAX(ts) por dispositivo (resuelto con el índice
+        (device_id, ts)) y un join de vuelta contra readings.
+        """
+        if not device_ids:
+            return {}
+        latest_ts = (db.session.query(Reading.device_id.label("device_id"),
+                                      func.max(Reading.ts).label("max_ts"))
+                     .filter(Reading.device_id.in_(list(device_ids)))
+                     .group_by(Reading.device_id)
+                     .subquery())
+        rows = (Reading.query
+                .join(latest_ts, and_(Reading.device_id == latest_ts.c.device_id,
+                                      Reading.ts == latest_ts.c.max_ts))
+                .order_by(Reading.id.asc())
+                .all())
+        # Si hay empate en ts gana el id más alto (el último en iterar)
+        return {r.device_id: r for r in rows}
+
+    # --- NUEVO: Inserción masiva (ingesta batch) ---
+    @staticmethod
+    def bulk_insert(rows: List[dict]) -> int:
+        """
+        Inserta filas con un solo INSERT en modo executemany (sin objetos ORM ni refresh).
+
+        SQLAlchemy 2.0 lo emite como INSERT ... VALUES (...), (...) por lotes
+        ("insertmanyvalues") y PyMySQL hace lo mismo en MySQL: una sola compilación
+        del statement, no una por fila. El commit lo hace el llamador.
+        """
+        if rows:
+            db.session.execute(insert(Reading), rows)
+        return len(rows)
@@ -0,0 +1,121 @@
+# backend/app/repository/notification_outbox_repository.py
+
+from datetime import datetime
+from typing import Any, Dict, Iterable, List
+from sqlalchemy import delete, insert, select, update
+from ..extensions import db
+from ..model.models import NotificationOutbox
+
+
+class NotificationOutboxRepository:
+    """Cola de notificaciones pendientes (patrón outbox)."""
+
+    @staticmethod
+    def enqueue(rows: List[Dict[str, Any]]) -> None:
+        """
+        Inserta las notificaciones {alert_id, event, channel, recipient, payload,
+        next_attempt_at} con un solo INSERT multi-fila. No hace commit: va en la
+        transacción de la alerta, así no se notifica algo que terminó en rollback.
+        """
+        if rows:
+            db.session.execute(insert(NotificationOutbox), rows)
+
+    @staticmethod
+    def claim_due(now: datetime, limit: int) -> List[NotificationOutbox]:
+        """
+        Marca como 'sending' hasta `limit` notificaciones vencidas y las devuelve.
+
+        SKIP LOCKED deja que varios workers reclamen lotes distintos sin esperarse:
+        las filas bloqueadas por otro no aparecen y, cuando este confirma, ya no
+        están 'pending' (en SQLite el FOR UPDATE se ignora: hay un solo escritor).
+        """
+        ids = db.session.execute(
+            select(NotificationOutbox.id)
+            .where(NotificationOutbox.status == "pending", NotificationOutbox.next_attempt_at <= now)
+            .order_by(NotificationOutbox.next_attempt_at.asc(), NotificationOutbox.id.asc())
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        ).scalars().all()
+        if not ids:
+            db.session.commit()  # cierra la transacción de lectura
+            return []
+        db.session.execute(
+            update(NotificationOutbox)
+            .where(NotificationOutbox.id.in_(ids), NotificationOutbox.status == "pending")
+            .values(status="sending", claimed_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        # La sesión del worker expira al commit (worker_session): se releen las filas recién reclamadas
+        return (NotificationOutbox.query
+                .filter(NotificationOutbox.id.in_(ids), NotificationOutbox.status == "sending")
+                .order_by(NotificationOutbox.id.asc())
+                .all())
+
+    @staticmethod
+    def mark_sent(ids: Iterable[int], now: datetime) -> None:
+        ids = list(ids)
+        if ids:
+            db.session.execute(
+                update(NotificationOutbox)
+                .where(NotificationOutbox.id.in_(ids))
+                .values(status="sent", sent_at=now, claimed_at=None, last_error=None,
+                        attempts=NotificationOutbox.attempts + 1)
+                .execution_options(synchronize_session=False)
+            )
+
+    @staticmethod
+    def reschedule(ids: Iterable[int], next_attempt_at: datetime, error: str | None = None,
+                   count_attempt: bool = True) -> None:
+        """
+        Devuelve notificaciones a 'pending' para `next_attempt_at`. Con
+        `count_attempt=False` (límite de tasa) no consume un intento.
+        """
+        ids = list(ids)
+        if not ids:
+            return
+        values: Dict[str, Any] = {"status": "pending", "next_attempt_at": next_attempt_at, "claimed_at": None}
+        if count_attempt:
+            values["attempts"] = NotificationOutbox.attempts + 1
+        if error is not None:
+            values["last_error"] = error[:255]
+        db.session.execute(
+            update(NotificationOutbox)
+            .where(NotificationOutbox.id.in_(ids))
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    def mark_failed(ids: Iterable[int], error: str) -> None:
+        """Agotó los reintentos: queda en 'failed' para revisión manual."""
+        ids = list(ids)
+        if ids:
+            db.session.execute(
+                update(NotificationOutbox)
+                .where(NotificationOutbox.id.in_(ids))
+                .values(status="failed", claimed_at=None, last_error=error[:255],
+                        attempts=NotificationOutbox.attempts + 1)
+                .execution_options(synchronize_session=False)
+            )
+
+    @staticmethod
+    def release_stale(claimed_before: datetime) -> int:
+        """Vuelve a 'pending' lo que un worker caído dejó en 'sending'. Hace commit."""
+        res = db.session.execute(
+            update(NotificationOutbox)
+            .where(NotificationOutbox.status == "sending", NotificationOutbox.claimed_at < claimed_before)
+            .values(status="pending", claimed_at=None)
+        )
+        db.session.commit()
+        return res.rowcount or 0
+
+    @staticmethod
+    def purge_sent(before: datetime) -> int:
+        """Borra las notificaciones enviadas antes de `before`. Hace commit."""
+        res = db.session.execute(
+            delete(NotificationOutbox)
+            .where(NotificationOutbox.status == "sent", NotificationOutbox.sent_at < before)
+        )
+        db.session.commit()
+        return res.rowcount or 0
@@ -1,8 +1,12 @@
 # backend/app/repository/patients_repository.py
 
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Sequence, Set
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload
 from ..extensions import db
 from ..model.models import Patient
+from .unit_of_work import save
+from .users_repository import UsersRepository
 
 class PatientsRepository:
     @staticmethod
@@ -10,11 +14,50 @@ class PatientsRepository:
         """Obtiene todos los pacientes, ordenados por ID descendente."""
         return Patient.query.order_by(Patient.id.desc()).all()
 
+    @staticmethod
+    def list_page(limit: int = 50, after_id: Optional[int] = None,
+                  ids: Optional[Sequence[int]] = None) -> List:
+        """
+        Proyección del listado (id, nombres, email, teléfono, nacimiento), id descendente.
+
+        Paginación keyset por la PK: `after_id` es el último id de la página anterior.
+        Con `ids` (resultado de la búsqueda) trae solo esos pacientes.
+        """
+        stmt = select(Patient.id, Patient.first_name, Patient.last_name, Patient.email,
+                      Patient.phone, Patient.birthdate)
+        if ids is not None:
+            if not ids:
+                return []
+            stmt = stmt.where(Patient.id.in_(list(ids)))
+        if after_id is not None:
+            stmt = stmt.where(Patient.id < after_id)
+        return db.session.execute(stmt.order_by(Patient.id.desc()).limit(limit)).all()
+
+    @staticmethod
+    def search_rows() -> List:
+        """Columnas buscables de todos los pacientes (para construir el índice de búsqueda)."""
+        return db.session.execute(select(Patient.id, Patient.first_name, Patient.last_name,
+                                         Patient.email, Patient.phone)).all()
+
     @staticmethod
     def get(patient_id: int) -> Optional[Patient]:
         """Obtiene un paciente por su ID primario."""
         return db.session.get(Patient, patient_id)
 
+    @staticmethod
+    def get_with_devices(patient_id: int) -> Optional[Patient]:
+        """Paciente con `devices` ya cargado (un JOIN, sin la consulta lazy aparte)."""
+        return db.session.execute(
+            select(Patient).options(joinedload(Patient.devices)).where(Patient.id == patient_id)
+        ).unique().scalar_one_or_none()
+
+    @staticmethod
+    def existing_ids(patient_ids: Sequence[int]) -> Set[int]:
+        """Cuáles de `patient_ids` existen (una consulta `IN` por clave primaria)."""
+        if not patient_ids:
+            return set()
+        return set(db.session.scalars(select(Patient.id).where(Patient.id.in_(list(patient_ids)))))
+
     # --- MÉTODO AÑADIDO ---
     @staticmethod
     def get_by_user_id(user_id: int) -> Optional[Patient]:
@@ -40,8 +83,8 @@ class PatientsRepository:
             weight_kg=weight_kg
         )
         db.session.add(p)
-        db.session.commit()
-        db.session.refresh(p)
+        UsersRepository.identities_changed()   # su identidad pasa a llevar patient_id
+        save(p)
         return p
 
     @staticmethod
@@ -50,17 +93,5 @@ class PatientsRepository:
         for key, value in data.items():
             if hasattr(patient, key):
                 setattr(patient, key, value)
-        db.session.commit()
-        db.session.refresh(patient)
+        save(patient)
         return patient
-
-    @staticmethod
-    def delete(patient: Patient) -> bool:
-        """Elimina un registro de paciente de la base de datos."""
-        try:
-            db.session.delete(patient)
-            db.session.commit()
-            return True
-        except Exception as e:
-            db.session.rollback()
-            return False
\ No newline at end of file
@@ -0,0 +1,31 @@
+# backend/app/repository/replica_heartbeat_repository.py
+
+from typing import Optional
+from sqlalchemy import insert, literal, select, update
+from sqlalchemy.engine import Connection
+from ..model.models import ReplicaHeartbeat
+
+_ROW_ID = 1
+
+
+class ReplicaHeartbeatRepository:
+    """Trabaja sobre una conexión explícita (primaria o réplica), fuera de db.session."""
+
+    @staticmethod
+    def beat(conn: Connection, at: float) -> None:
+        """Escribe el latido (epoch en segundos) en la primaria."""
+        beat_ms = int(at * 1000)
+        result = conn.execute(update(ReplicaHeartbeat).where(ReplicaHeartbeat.id == _ROW_ID)
+                              .values(beat_ms=beat_ms))
+        if result.rowcount == 0:
+            conn.execute(insert(ReplicaHeartbeat).values(id=_ROW_ID, beat_ms=beat_ms))
+
+    @staticmethod
+    def read(conn: Connection) -> Optional[float]:
+        """Último latido que ve la réplica (epoch en segundos) o None si aún no llegó ninguno."""
+        beat_ms = conn.execute(select(ReplicaHeartbeat.beat_ms).where(ReplicaHeartbeat.id == _ROW_ID)).scalar()
+        return beat_ms / 1000 if beat_ms else None
+
+    @staticmethod
+    def ping(conn: Connection) -> None:
+        conn.execute(select(literal(1))).scalar()
@@ -0,0 +1,154 @@
+# backend/app/repository/sql_utils.py
+
+"""Helpers SQL dependientes del dialecto (MySQL en producción, SQLite en pruebas locales)."""
+
+from typing import Any, Callable, Dict, List, Sequence
+from sqlalchemy import Integer, case, cast, delete, func, or_, select, text
+from ..extensions import db
+
+
+def dialect_name() -> str:
+    """Nombre del dialecto del engine actual ('mysql', 'sqlite', 'postgresql', ...)."""
+    return db.engine.dialect.name
+
+
+def minute_bucket(col):
+    """Expresión SQL que trunca un DATETIME a minutos (entero: minutos desde epoch)."""
+    name = dialect_name()
+    if name == "sqlite":
+        return cast(func.strftime("%s", col), Integer) // 60   # '/' es división real en SQLAlchemy 2
+    if name == "postgresql":
+        return func.floor(func.extract("epoch", col) / 60)
+    return func.floor(func.unix_timestamp(col) / 60)
+
+
+# Formato del inicio de cada intervalo ('YYYY-MM-DD HH:MM:SS', comparable como texto)
+_BUCKET_FORMATS = {
+    "mysql": {"hour": "%Y-%m-%d %H:00:00", "day": "%Y-%m-%d 00:00:00"},
+    "sqlite": {"hour": "%Y-%m-%d %H:00:00", "day": "%Y-%m-%d 00:00:00"},
+}
+
+
+def time_bucket(col, bucket: str):
+    """
+    Expresión SQL con el inicio del intervalo ('hour', 'day' o 'week', semanas de
+    lunes a domingo) de un DATETIME, como texto 'YYYY-MM-DD HH:MM:SS' (UTC).
+    """
+    name = dialect_name()
+    if name == "postgresql":
+        return func.to_char(func.date_trunc(bucket, col), "YYYY-MM-DD HH24:MI:SS")
+    if name == "sqlite":
+        if bucket == "week":
+            # 'weekday 0' avanza al domingo (o se queda si ya lo es); -6 días = lunes
+            return func.strftime("%Y-%m-%d 00:00:00", col, "weekday 0", "-6 days")
+        return func.strftime(_BUCKET_FORMATS["sqlite"][bucket], col)
+    if bucket == "week":
+        col = func.subdate(col, func.weekday(col))  # SUBDATE(ts, n) resta n días; WEEKDAY: lunes = 0
+        bucket = "day"
+    return func.date_format(col, _BUCKET_FORMATS["mysql"][bucket])
+
+
+def seconds_between(start, end):
+    """Segundos de `start` a `end` (NULL si alguno es NULL)."""
+    name = dialect_name()
+    if name == "sqlite":
+        return (func.julianday(end) - func.julianday(start)) * 86400
+    if name == "postgresql":
+        return func.extract("epoch", end - start)
+    return func.timestampdiff(text("SECOND"), start, end)
+
+
+def _upsert(model, rows: List[Dict], keys: Sequence[str], updates: Callable[[Any], Dict[str, Any]]) -> None:
+    """
+    INSERT de `rows`; si la clave ya existe, aplica `updates(entrante)`: un dict
+    {columna: expresión} donde `entrante` es la fila propuesta (stmt.inserted /
+    stmt.excluded) y model.<col> el valor actual. ON DUPLICATE KEY UPDATE en MySQL,
+    ON CONFLICT en SQLite/PostgreSQL. Las filas se ordenan por clave para que dos
+    transacciones no se bloqueen en cruz.
+
+    MySQL evalúa las asignaciones en orden y las siguientes ya ven el valor nuevo:
+    `updates` debe devolver las columnas que comparan contra otra antes que esa otra.
+    """
+    if not rows:
+        return
+    rows = sorted(rows, key=lambda r: tuple(r[k] for k in keys))
+    if dialect_name() == "mysql":
+        from sqlalchemy.dialects.mysql import insert
+        stmt = insert(model).values(rows)
+        stmt = stmt.on_duplicate_key_update(list(updates(stmt.inserted).items()))
+    else:
+        if dialect_name() == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        stmt = insert(model).values(rows)
+        stmt = stmt.on_conflict_do_update(index_elements=list(keys), set_=updates(stmt.excluded))
+    db.session.execute(stmt)
+
+
+def _greatest(current, incoming):
+    return (func.max if dialect_name() == "sqlite" else func.greatest)(current, incoming)
+
+
+def insert_or_increment(model, rows: List[Dict], keys: Sequence[str], counter: str,
+                        columns: Sequence[str] = ()) -> None:
+    """
+    Suma `row[counter]` al contador de cada fila (por clave `keys`), creándola si no
+    existe. Las columnas de `columns` se reemplazan por el valor entrante.
+    """
+    _upsert(model, rows, keys,
+            lambda new: {counter: getattr(model, counter) + new[counter], **{c: new[c] for c in columns}})
+
+
+def insert_or_greatest(model, rows: List[Dict], keys: Sequence[str], column: str) -> None:
+    """Guarda el mayor entre el valor actual y el entrante (p. ej. un 'último visto')."""
+    _upsert(model, rows, keys, lambda new: {column: _greatest(getattr(model, column), new[column])})
+
+
+def insert_or_replace(model, rows: List[Dict], keys: Sequence[str], columns: Sequence[str]) -> None:
+    """Inserta cada fila o, si la clave ya existe, reemplaza `columns` por los valores entrantes."""
+    _upsert(model, rows, keys, lambda new: {c: new[c] for c in columns})
+
+
+def insert_or_ignore(model, rows: List[Dict], keys: Sequence[str]) -> None:
+    """
+    Crea las filas que falten sin tocar las existentes. Igual bloquea cada fila
+    (existente o nueva) hasta el fin de la transacción.
+    """
+    _upsert(model, rows, keys, lambda new: {keys[0]: getattr(model, keys[0])})
+
+
+def insert_or_latest(model, rows: List[Dict], keys: Sequence[str], ts_column: str,
+                     columns: Sequence[str] = (), greatest: Sequence[str] = ()) -> None:
+    """
+    Upsert de una "foto" fechada: si la fila entrante es igual o más nueva que
+    `ts_column` (o no había), reemplaza `ts_column` y `columns` (un NULL entrante
+    conserva el valor actual); si es más vieja, no los toca. Las columnas de
+    `greatest` se quedan con el mayor, como en insert_or_greatest.
+    """
+    def updates(new):
+        current_ts = getattr(model, ts_column)
+        newer = or_(current_ts.is_(None), new[ts_column] >= current_ts)
+        out = {c: _greatest(getattr(model, c), new[c]) for c in greatest}
+        for c in columns:
+            out[c] = case((newer, func.coalesce(new[c], getattr(model, c))), else_=getattr(model, c))
+        out[ts_column] = case((newer, new[ts_column]), else_=current_ts)  # última: las de arriba la comparan
+        return out
+    _upsert(model, rows, keys, updates)
+
+
+def delete_chunk(model, *conds, limit: int) -> int:
+    """
+    Borra hasta `limit` filas de `model` que cumplen `conds` y devuelve cuántas.
+
+    Primero lee los ids y luego borra por clave primaria: MySQL no admite LIMIT en
+    una subconsulta IN y un DELETE ... LIMIT sin ORDER BY no es seguro con
+    replicación por sentencias. Sin ORDER BY en la lectura, el índice del filtro
+    (p. ej. idx_readings_device_ts) basta y no hay que ordenar todas las filas.
+    El que llama confirma entre lotes para que cada transacción quede corta.
+    """
+    pk = model.__mapper__.primary_key[0]
+    ids = [i for (i,) in db.session.execute(select(pk).where(*conds).limit(limit))]
+    if ids:
+        db.session.execute(delete(model).where(pk.in_(ids)))
+    return len(ids)
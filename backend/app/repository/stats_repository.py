@@ -0,0 +1,70 @@
+# backend/app/repository/stats_repository.py
+
+from datetime import datetime
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+from sqlalchemy import case, delete, func, select
+from ..extensions import db
+from ..model.models import Alert, Device, Patient, StatsCounter
+from .sql_utils import insert_or_increment
+
+
+def minute_of(ts: datetime) -> datetime:
+    """Bucket de stats_counters al que pertenece un instante (inicio de su minuto)."""
+    return ts.replace(second=0, microsecond=0)
+
+
+def alert_stats_key(alert: Optional[Alert]) -> Optional[Tuple[str, datetime]]:
+    """Contador de stats_counters de la alerta: severidad actual en el minuto en que empezó."""
+    if alert is None:
+        return None
+    return f"alerts.{alert.severity}", minute_of(alert.ts)
+
+
+class StatsRepository:
+    @staticmethod
+    def increment(deltas: Mapping[Tuple[str, datetime], int]) -> None:
+        """Suma {(nombre, minuto): n} a los contadores. No hace commit (va con el cambio que cuenta)."""
+        rows = [{"name": name, "bucket": bucket, "value": n} for (name, bucket), n in deltas.items() if n]
+        insert_or_increment(StatsCounter, rows, keys=("name", "bucket"), counter="value")
+
+    @staticmethod
+    def totals_by_window(names: Iterable[str], windows: Mapping[str, datetime]) -> Dict[str, Dict[str, int]]:
+        """
+        Suma de cada contador en varias ventanas ({etiqueta: desde}) en UNA consulta:
+        un rango por nombre sobre la PK (name, bucket) y un SUM(CASE ...) por ventana.
+        Devuelve {etiqueta: {nombre: total}}.
+        """
+        names = list(names)
+        labels = list(windows)
+        sums = [func.sum(case((StatsCounter.bucket >= windows[label], StatsCounter.value), else_=0))
+                for label in labels]
+        stmt = (select(StatsCounter.name, *sums)
+                .where(StatsCounter.name.in_(names), StatsCounter.bucket >= min(windows.values()))
+                .group_by(StatsCounter.name))
+        result = {label: {name: 0 for name in names} for label in labels}
+        for name, *totals in db.session.execute(stmt):
+            for label, total in zip(labels, totals):
+                result[label][name] = int(total or 0)
+        return result
+
+    @staticmethod
+    def series(name: str, since: datetime) -> List[Tuple[datetime, int]]:
+        """Valores por minuto de un contador desde `since` (solo minutos con datos)."""
+        stmt = (select(StatsCounter.bucket, StatsCounter.value)
+                .where(StatsCounter.name == name, StatsCounter.bucket >= since)
+                .order_by(StatsCounter.bucket))
+        return [(bucket, int(value)) for bucket, value in db.session.execute(stmt)]
+
+    @staticmethod
+    def purge_before(cutoff: datetime) -> int:
+        """Borra los minutos anteriores a `cutoff` (no hace commit)."""
+        return db.session.execute(delete(StatsCounter).where(StatsCounter.bucket < cutoff)).rowcount or 0
+
+    @staticmethod
+    def devices_by_status() -> Dict[str, int]:
+        stmt = select(Device.status, func.count()).group_by(Device.status)
+        return {status: int(n) for status, n in db.session.execute(stmt)}
+
+    @staticmethod
+    def count_patients() -> int:
+        return int(db.session.execute(select(func.count()).select_from(Patient)).scalar() or 0)
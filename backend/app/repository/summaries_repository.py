@@ -0,0 +1,133 @@
+# backend/app/repository/summaries_repository.py
+
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
+from sqlalchemy import and_, case, delete, func, insert, literal, or_, select
+from sqlalchemy.orm import aliased
+from ..extensions import db
+from ..model.models import (
+    DEFAULT_THRESHOLDS, Alert, Device, DeviceTelemetry, Patient, PatientDailySummary, Reading, Threshold
+)
+from .sql_utils import minute_bucket
+
+# motion_level máximo para considerar una lectura "en reposo"
+RESTING_MOTION_MAX = 1
+
+
+def _global_limit(column, metric: str):
+    """
+    Límite global de una métrica como subconsulta escalar. La unicidad (patient_id,
+    metric) no impide filas globales repetidas (NULL != NULL): se toma la más nueva,
+    igual que ThresholdsService, en vez de multiplicar las lecturas con un JOIN.
+    """
+    return (select(column)
+            .where(Threshold.patient_id.is_(None), Threshold.metric == metric)
+            .order_by(Threshold.id.desc())
+            .limit(1)
+            .scalar_subquery())
+
+
+def _effective_limits(metric: str):
+    """
+    Devuelve (min, max) efectivos como expresiones SQL para el paciente del dispositivo:
+    umbral del paciente -> umbral global -> default del servicio.
+    Se resuelve con un LEFT JOIN por métrica (una fila por paciente y métrica) y el
+    global como subconsulta escalar, sin consultas por paciente.
+    """
+    tp = aliased(Threshold)
+    d = DEFAULT_THRESHOLDS[metric]
+    joins = [(tp, and_(tp.patient_id == Device.patient_id, tp.metric == metric))]
+    lo = func.coalesce(tp.min_value, _global_limit(Threshold.min_value, metric), literal(d["min"]))
+    hi = func.coalesce(tp.max_value, _global_limit(Threshold.max_value, metric), literal(d["max"]))
+    return joins, lo, hi
+
+
+class SummariesRepository:
+    """Agregados diarios por paciente calculados en SQL (GROUP BY sobre todos los pacientes)."""
+
+    @staticmethod
+    def aggregate_readings(dt_from: datetime, dt_to: datetime) -> Dict[int, Dict[str, Any]]:
+        """Métricas de readings por paciente en [dt_from, dt_to): conteo, HR en reposo, SpO2 mín., temp. máx. y minutos fuera de umbral."""
+        joins = []
+        out_of_range = []
+        for metric, col in (("heart_rate", Reading.heart_rate_bpm),
+                            ("spo2", Reading.spo2_pct),
+                            ("temperature", Reading.temp_c)):
+            metric_joins, lo, hi = _effective_limits(metric)
+            joins.extend(metric_joins)
+            out_of_range.append(and_(col.isnot(None), or_(col < lo, col > hi)))
+
+        bucket = minute_bucket(Reading.ts)
+        q = (db.session.query(
+                Device.patient_id,
+                func.count(Reading.id),
+                func.avg(case((Reading.motion_level <= RESTING_MOTION_MAX, Reading.heart_rate_bpm))),
+                func.min(Reading.spo2_pct),
+                func.max(Reading.temp_c),
+                func.count(func.distinct(case((or_(*out_of_range), bucket)))),
+             )
+             .select_from(Reading)
+             .join(Device, Device.id == Reading.device_id))
+        for target, onclause in joins:
+            q = q.outerjoin(target, onclause)
+        rows = (q.filter(Reading.ts >= dt_from, Reading.ts < dt_to, Device.patient_id.isnot(None))
+                 .group_by(Device.patient_id)
+                 .all())
+        return {
+            pid: {
+                "readings_count": n,
+                "resting_hr_bpm": round(float(rest), 1) if rest is not None else None,
+                "min_spo2_pct": spo2,
+                "max_temp_c": temp,
+                "minutes_out_of_range": oor or 0,
+            }
+            for pid, n, rest, spo2, temp, oor in rows
+        }
+
+    @staticmethod
+    def aggregate_wear(dt_from: datetime, dt_to: datetime) -> Dict[int, int]:
+        """Minutos de uso por paciente: minutos distintos con telemetría y la banda fuera del cargador."""
+        rows = (db.session.query(Device.patient_id,
+                                 func.count(func.distinct(minute_bucket(DeviceTelemetry.ts))))
+                .select_from(DeviceTelemetry)
+                .join(Device, Device.id == DeviceTelemetry.device_id)
+                .filter(DeviceTelemetry.ts >= dt_from, DeviceTelemetry.ts < dt_to,
+                        Device.patient_id.isnot(None),
+                        or_(DeviceTelemetry.charging.is_(None), DeviceTelemetry.charging.is_(False)))
+                .group_by(Device.patient_id)
+                .all())
+        return {pid: n for pid, n in rows}
+
+    @staticmethod
+    def aggregate_alerts(dt_from: datetime, dt_to: datetime) -> Dict[int, Dict[str, int]]:
+        """Conteo de alertas por paciente (total y severidad high/critical)."""
+        rows = (db.session.query(Alert.patient_id,
+                                 func.count(Alert.id),
+                                 func.sum(case((Alert.severity.in_(["high", "critical"]), 1), else_=0)))
+                .filter(Alert.ts >= dt_from, Alert.ts < dt_to)
+                .group_by(Alert.patient_id)
+                .all())
+        return {pid: {"alerts_total": total, "alerts_high": int(high or 0)} for pid, total, high in rows}
+
+    @staticmethod
+    def replace_day(day: date, rows: List[Dict[str, Any]]) -> int:
+        """Reemplaza los resúmenes de un día: un DELETE y un INSERT multi-fila en la misma transacción."""
+        db.session.execute(delete(PatientDailySummary).where(PatientDailySummary.day == day))
+        if rows:
+            db.session.execute(insert(PatientDailySummary).values(rows))
+        db.session.commit()
+        return len(rows)
+
+    @staticmethod
+    def list_by_day(day: date, page: int = 1, per_page: int = 100,
+                    patient_id: Optional[int] = None) -> List[Any]:
+        """Resúmenes de un día con el nombre del paciente (usa ux_summary_day_patient)."""
+        q = (db.session.query(PatientDailySummary, Patient.first_name, Patient.last_name)
+             .join(Patient, Patient.id == PatientDailySummary.patient_id)
+             .filter(PatientDailySummary.day == day))
+        if patient_id is not None:
+            q = q.filter(PatientDailySummary.patient_id == patient_id)
+        return (q.order_by(PatientDailySummary.patient_id.asc())
+                 .limit(per_page)
+                 .offset((page - 1) * per_page)
+                 .all())
@@ -1,18 +1,21 @@
 from datetime import datetime
 from typing import List, Optional
+from sqlalchemy import insert
 from ..extensions import db
 from ..model.models import DeviceTelemetry
+from ..replicas import replica_read
+from .unit_of_work import save
 
 class TelemetryRepository:
     @staticmethod
     def create(device_id: int, payload: dict) -> DeviceTelemetry:
         tel = DeviceTelemetry(device_id=device_id, **payload)
         db.session.add(tel)
-        db.session.commit()
-        db.session.refresh(tel)
+        save(tel)
         return tel
 
     @staticmethod
+    @replica_read
     def list_by_device(device_id: int,
                        dt_from: Optional[datetime] = None,
                        dt_to: Optional[datetime] = None,
@@ -23,3 +26,10 @@ class TelemetryRepository:
         if dt_to:
             q = q.filter(DeviceTelemetry.ts <= dt_to)
         return q.order_by(DeviceTelemetry.ts.desc()).limit(limit).all()
+
+    @staticmethod
+    def bulk_insert(rows: List[dict]) -> int:
+        """Inserta telemetría en bloque (ver MetricsRepository.bulk_insert). El commit lo hace el llamador."""
+        if rows:
+            db.session.execute(insert(DeviceTelemetry), rows)
+        return len(rows)
@@ -1,6 +1,8 @@
-from typing import Optional
+from typing import List, Optional, Sequence
+from sqlalchemy import or_
 from ..extensions import db
 from ..model.models import Threshold
+from .unit_of_work import save
 
 class ThresholdsRepository:
     @staticmethod
@@ -11,10 +13,23 @@ class ThresholdsRepository:
             db.session.add(t)
         t.min_value = min_value
         t.max_value = max_value
-        db.session.commit()
-        db.session.refresh(t)
+        save(t)
         return t
 
     @staticmethod
     def get(patient_id: Optional[int], metric: str) -> Optional[Threshold]:
         return Threshold.query.filter_by(patient_id=patient_id, metric=metric).first()
+
+    # --- NUEVO: Umbrales de varios pacientes (y los globales) en una sola consulta ---
+    @staticmethod
+    def list_for_patients(patient_ids: Sequence[int], include_global: bool = True) -> List[Threshold]:
+        """Todas las métricas de `patient_ids` y, si se pide, las filas globales (patient_id NULL)."""
+        conds = []
+        if patient_ids:
+            conds.append(Threshold.patient_id.in_(list(patient_ids)))
+        if include_global:
+            conds.append(Threshold.patient_id.is_(None))
+        if not conds:
+            return []
+        # Por id: si hay globales repetidos (NULL no cuenta para la unicidad) gana el más nuevo
+        return Threshold.query.filter(or_(*conds)).order_by(Threshold.id.asc()).all()
@@ -0,0 +1,64 @@
+# backend/app/repository/unit_of_work.py
+
+"""
+Transacciones explícitas para los repositorios.
+
+Por defecto cada escritura de repositorio confirma sola (comportamiento histórico).
+Dentro de `with unit_of_work():` los repositorios solo hacen flush y el commit
+ocurre una vez al salir del bloque, así un servicio agrupa varios cambios en una
+única transacción (y los revierte juntos si algo falla).
+"""
+
+from contextlib import contextmanager
+from sqlalchemy import inspect
+from ..extensions import db
+
+_DEPTH_KEY = "unit_of_work_depth"
+
+
+def in_unit_of_work() -> bool:
+    return db.session.info.get(_DEPTH_KEY, 0) > 0
+
+
+@contextmanager
+def unit_of_work():
+    """Agrupa las escrituras del bloque en una transacción. Se puede anidar."""
+    session = db.session
+    depth = session.info.get(_DEPTH_KEY, 0)
+    session.info[_DEPTH_KEY] = depth + 1
+    try:
+        yield session
+        if depth == 0:
+            session.commit()
+    except Exception:
+        if depth == 0:
+            session.rollback()
+        raise
+    finally:
+        session.info[_DEPTH_KEY] = depth
+
+
+def _server_default_attrs(obj) -> list:
+    """Atributos de columna con server_default que aún no se conocen en memoria."""
+    state = inspect(obj)
+    unloaded = state.unloaded
+    return [attr.key for attr in state.mapper.column_attrs
+            if attr.key in unloaded and any(c.server_default is not None for c in attr.columns)]
+
+
+def save(*objs) -> None:
+    """
+    Persiste los cambios pendientes: flush dentro de un unit_of_work, commit fuera.
+
+    No hace `refresh()` por costumbre (un SELECT extra por escritura): el id llega
+    con el INSERT y los timestamps tienen default en Python. Solo si algún atributo
+    depende de un server_default todavía desconocido se recarga ese atributo.
+    """
+    if in_unit_of_work():
+        db.session.flush()
+    else:
+        db.session.commit()
+    for obj in objs:
+        pending = _server_default_attrs(obj)
+        if pending:
+            db.session.refresh(obj, attribute_names=pending)
@@ -0,0 +1,96 @@
+# backend/app/repository/users_repository.py
+
+from typing import FrozenSet, Iterable, List, Optional, Tuple
+from sqlalchemy import select, update
+from ..extensions import db
+from ..model.models import Device, Patient, User
+from .cache_versions_repository import CacheVersionsRepository
+
+# Nombre en cache_versions de la caché de identidades (services/identity_service.py)
+IDENTITY_CACHE_NAME = "identities"
+
+
+class UsersRepository:
+    @staticmethod
+    def get_for_login(email: str) -> Tuple[Optional[User], Optional[int], List[int]]:
+        """
+        Usuario por email junto con el id de su paciente y los de sus bandas (los
+        claims del token), en una sola consulta. (None, None, []) si no existe.
+        """
+        rows = db.session.execute(
+            select(User, Patient.id, Device.id)
+            .outerjoin(Patient, Patient.user_id == User.id)
+            .outerjoin(Device, Device.patient_id == Patient.id)
+            .where(User.email == email)
+            .order_by(Device.id)
+            .execution_options(populate_existing=True)  # token_version pudo cambiar por UPDATE en esta sesión
+        ).all()
+        if not rows:
+            return None, None, []
+        user, patient_id, _ = rows[0]
+        return user, patient_id, [device_id for _, _, device_id in rows if device_id is not None]
+
+    @staticmethod
+    def get_auth(user_id: int) -> Optional[Tuple[int, str, str, int, Optional[int], FrozenSet[int]]]:
+        """
+        (id, email, role, token_version, patient_id, device_ids): lo que hace falta para
+        autorizar un token, en una sola consulta. None si el usuario no existe.
+        """
+        rows = db.session.execute(
+            select(User.id, User.email, User.role, User.token_version, Patient.id, Device.id)
+            .outerjoin(Patient, Patient.user_id == User.id)
+            .outerjoin(Device, Device.patient_id == Patient.id)
+            .where(User.id == user_id)
+        ).all()
+        if not rows:
+            return None
+        uid, email, role, token_version, patient_id, _ = rows[0]
+        return (uid, email, role, token_version or 0, patient_id,
+                frozenset(r[5] for r in rows if r[5] is not None))
+
+    @staticmethod
+    def bump_token_versions(user_ids: Iterable[int]) -> None:
+        """
+        Invalida los tokens ya emitidos de esos usuarios (p. ej. al cambiar su rol) en
+        la transacción actual, sin commit: incrementa token_version y la versión de la
+        caché de identidades para que los demás workers la descarten.
+        """
+        user_ids = [i for i in set(user_ids) if i is not None]
+        if not user_ids:
+            return
+        db.session.execute(
+            update(User).where(User.id.in_(user_ids)).values(token_version=User.token_version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        CacheVersionsRepository.bump(IDENTITY_CACHE_NAME)
+
+    @staticmethod
+    def identities_changed() -> None:
+        """
+        El paciente o las bandas de algún usuario cambiaron: los workers descartan su
+        caché de identidades (sin commit). Los tokens emitidos siguen valiendo.
+        """
+        CacheVersionsRepository.bump(IDENTITY_CACHE_NAME)
+
+    @staticmethod
+    def replace_pass_hash(user_id: int, old_hash: str, new_hash: str) -> bool:
+        """
+        Reemplaza el hash solo si sigue siendo `old_hash` (si entretanto cambió la
+        contraseña, gana ese cambio). No hace commit.
+        """
+        result = db.session.execute(
+            update(User).where(User.id == user_id, User.pass_hash == old_hash).values(pass_hash=new_hash)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount > 0
+
+    @staticmethod
+    def set_role(email: str, role: str) -> Optional[int]:
+        """Cambia el rol (invalidando sus tokens) y devuelve el id del usuario, o None si no existe."""
+        user_id = db.session.execute(select(User.id).where(User.email == email)).scalar()
+        if user_id is None:
+            return None
+        db.session.execute(update(User).where(User.id == user_id).values(role=role)
+                           .execution_options(synchronize_session=False))
+        UsersRepository.bump_token_versions(user_ids=[user_id])
+        return user_id
@@ -0,0 +1,129 @@
+# backend/app/search.py
+
+"""
+Índice de búsqueda por subcadena en memoria del proceso (una copia por worker).
+
+El texto normalizado de todas las filas se guarda en una sola cadena, en orden de
+id descendente, y se busca con str.find (implementado en C): a 100k pacientes son
+unos pocos MB y una búsqueda tarda del orden de 1 ms, sin índices FULLTEXT ni
+LIKE '%...%' que recorran la tabla. Como las coincidencias salen en orden de id,
+la paginación keyset (`after_id`) no cuesta nada extra.
+
+Igual que VersionedCache, va atado a un contador de `cache_versions`: quien
+modifica las filas lo incrementa en su transacción y cada worker lo consulta como
+mucho cada `check_every` segundos; si cambió, el índice se reconstruye entero en la
+siguiente búsqueda (una consulta de proyección).
+"""
+
+import re
+import threading
+import time
+import unicodedata
+from array import array
+from bisect import bisect_right
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple
+
+_ROW_SEP = "\x00"  # separa filas: una búsqueda nunca cruza de un paciente a otro
+_CONTROL_CHARS = dict.fromkeys(range(32))
+_COMBINING = re.compile(r"[\u0300-\u036f]")  # tildes y diacríticos que deja NFKD ('é' -> 'e' + U+0301)
+
+
+def normalize(text: Optional[str]) -> str:
+    """Minúsculas, sin tildes ni caracteres de control ('Pérez' -> 'perez')."""
+    if not text:
+        return ""
+    text = str(text).lower()
+    if not text.isascii():
+        text = _COMBINING.sub("", unicodedata.normalize("NFKD", text))
+    return text if text.isprintable() else text.translate(_CONTROL_CHARS)
+
+
+def search_terms(query: Optional[str]) -> List[str]:
+    """Términos de una búsqueda: cada uno debe aparecer (como subcadena) en la fila."""
+    return normalize(query).split()
+
+
+class SubstringIndex:
+    """
+    ids que contienen todos los términos buscados. `loader()` devuelve pares
+    (id, texto) de todas las filas; `version_loader()` la versión compartida.
+    """
+
+    def __init__(self, name: str, loader: Callable[[], Iterable[Tuple[int, str]]],
+                 version_loader: Callable[[], int], check_every: float = 2.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.check_every = check_every
+        self._loader = loader
+        self._version_loader = version_loader
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._version: Optional[int] = None
+        self._next_check = 0.0
+        # (texto, inicio de cada fila, -id de cada fila): se reemplaza entero al reconstruir
+        self._data: Optional[Tuple[str, array, array]] = None
+
+    def sync(self) -> None:
+        """
+        Reconstruye el índice si la versión compartida cambió (o nunca se cargó).
+        Mientras un hilo lo reconstruye, los demás siguen buscando en la copia anterior.
+        """
+        if self._data is not None and self._clock() < self._next_check:
+            return
+        if not self._lock.acquire(blocking=self._data is None):
+            return
+        try:
+            if self._data is not None and self._clock() < self._next_check:
+                return  # otro hilo lo acaba de revisar
+            version = self._version_loader()
+            if self._data is None or version != self._version:
+                self._data = self._build(self._loader())
+                self._version = version
+            self._next_check = self._clock() + self.check_every
+        finally:
+            self._lock.release()
+
+    @staticmethod
+    def _build(rows: Iterable[Tuple[int, str]]) -> Tuple[str, array, array]:
+        parts, starts, neg_ids = [], array("q"), array("q")
+        offset = 0
+        for row_id, text in sorted(rows, key=lambda r: -r[0]):
+            text = text.replace(_ROW_SEP, "")
+            starts.append(offset)
+            neg_ids.append(-row_id)
+            parts.append(text)
+            offset += len(text) + 1
+        return _ROW_SEP.join(parts) + _ROW_SEP, starts, neg_ids
+
+    def search(self, terms: Sequence[str], limit: int, after_id: Optional[int] = None) -> List[int]:
+        """
+        Hasta `limit` ids (descendentes) cuyas filas contienen todos los `terms`,
+        empezando después de `after_id` (el último id de la página anterior).
+        """
+        self.sync()
+        blob, starts, neg_ids = self._data
+        terms = sorted({t for t in terms if t}, key=len, reverse=True)
+        if not terms or not starts:
+            return []
+        anchor, rest = terms[0], terms[1:]  # el más largo es el más selectivo
+        first = bisect_right(neg_ids, -after_id) if after_id is not None else 0
+        if first >= len(starts):
+            return []
+        found: List[int] = []
+        pos = starts[first]
+        while len(found) < limit:
+            pos = blob.find(anchor, pos)
+            if pos < 0:
+                break
+            row = bisect_right(starts, pos) - 1
+            end = starts[row + 1] - 1 if row + 1 < len(starts) else len(blob) - 1
+            if all(t in blob[starts[row]:end] for t in rest):
+                found.append(-neg_ids[row])
+            pos = end + 1  # siguiente fila: una coincidencia por fila
+        return found
+
+    def invalidate(self) -> None:
+        """Fuerza a revisar la versión en la próxima búsqueda (tras el commit del cambio)."""
+        with self._lock:
+            self._version = None
+            self._next_check = 0.0
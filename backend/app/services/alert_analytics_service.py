@@ -0,0 +1,89 @@
+# backend/app/services/alert_analytics_service.py
+
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Sequence
+from ..repository.alert_analytics_repository import AlertAnalyticsRepository
+
+logger = logging.getLogger(__name__)
+
+BUCKET_SIZES = {"hour": timedelta(hours=1), "day": timedelta(days=1), "week": timedelta(weeks=1)}
+
+# Nombre de la dimensión en la respuesta
+_DIM_KEYS = {"patient": "patient_id", "type": "type", "severity": "severity"}
+
+
+def _utc_naive(ts: Optional[datetime]) -> Optional[datetime]:
+    """alerts.ts se guarda en UTC naive: convierte los parámetros con zona horaria."""
+    if ts is None or ts.tzinfo is None:
+        return ts
+    return ts.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _mean(seconds: Optional[float], n: int) -> Optional[float]:
+    return round(seconds / n, 1) if n and seconds is not None else None
+
+
+def _pct_change(current: float, previous: float) -> Optional[float]:
+    return round((current - previous) * 100.0 / previous, 1) if previous else None
+
+
+class AlertAnalyticsService:
+    def __init__(self, repo: AlertAnalyticsRepository | None = None):
+        self.repo = repo or AlertAnalyticsRepository()
+
+    def _period(self, since: datetime, until: datetime, bucket: str, group_by: Sequence[str],
+                filters: Dict[str, Any]) -> Dict[str, Any]:
+        rows = self.repo.aggregate(since, until, bucket, group_by, **filters)
+        items = []
+        count = acked = 0
+        seconds = 0.0
+        for row in rows:
+            item: Dict[str, Any] = {"bucket": datetime.fromisoformat(str(row.bucket)).isoformat()}
+            item.update({_DIM_KEYS[g]: value for g, value in zip(group_by, row[1:])})
+            row_seconds = float(row.ack_seconds or 0)
+            item.update(count=int(row.count), acknowledged=int(row.acknowledged),
+                        mean_ack_s=_mean(row_seconds, int(row.acknowledged)))
+            items.append(item)
+            count += item["count"]
+            acked += item["acknowledged"]
+            seconds += row_seconds
+        return {"from": since.isoformat(), "to": until.isoformat(), "items": items,
+                "totals": {"count": count, "acknowledged": acked, "mean_ack_s": _mean(seconds, acked)}}
+
+    def trends(self, since: Optional[datetime] = None, until: Optional[datetime] = None, bucket: str = "day",
+               group_by: Sequence[str] = (), patient_ids: Optional[Sequence[int]] = None,
+               types: Optional[Sequence[str]] = None, severities: Optional[Sequence[str]] = None,
+               compare: Optional[str] = None, compare_from: Optional[datetime] = None,
+               max_buckets: int = 1000) -> Dict[str, Any]:
+        """
+        Alertas por intervalo entre `since` y `until` (por defecto los últimos 30
+        días; y por paciente / tipo / severidad según `group_by`) con tiempo medio de
+        reconocimiento. Con `compare="previous"` o `compare_from` agrega el mismo
+        cálculo para un periodo de igual duración (el inmediatamente anterior o el que
+        empieza en `compare_from`) y la variación de los totales.
+        Lanza ValueError si el rango es inválido o tiene más de `max_buckets` intervalos.
+        """
+        until = _utc_naive(until) or datetime.now(timezone.utc).replace(tzinfo=None)
+        since = _utc_naive(since) or until - timedelta(days=30)
+        compare_from = since - (until - since) if compare == "previous" else _utc_naive(compare_from)
+        if since >= until:
+            raise ValueError("'from' debe ser anterior a 'to'.")
+        if (until - since) / BUCKET_SIZES[bucket] > max_buckets:
+            raise ValueError(f"Demasiados intervalos (máx. {max_buckets}): usa un bucket mayor o un rango menor.")
+        group_by = [g for g in _DIM_KEYS if g in set(group_by)]  # orden estable y sin repetidos
+        filters = {"patient_ids": patient_ids, "types": types, "severities": severities}
+
+        result = {"bucket": bucket, "group_by": group_by, **self._period(since, until, bucket, group_by, filters)}
+        if compare_from is not None:
+            comparison = self._period(compare_from, compare_from + (until - since), bucket, group_by, filters)
+            current, previous = result["totals"], comparison["totals"]
+            comparison["change"] = {
+                "count": current["count"] - previous["count"],
+                "count_pct": _pct_change(current["count"], previous["count"]),
+                "mean_ack_s": (round(current["mean_ack_s"] - previous["mean_ack_s"], 1)
+                               if current["mean_ack_s"] is not None and previous["mean_ack_s"] is not None
+                               else None),
+            }
+            result["comparison"] = comparison
+        return result
@@ -0,0 +1,260 @@
+# backend/app/services/alert_evaluation_service.py
+
+import logging
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Optional, Tuple
+import numpy as np
+from flask import current_app
+from ..alerts.engine import METRICS, AlertEngine, ReadingArrays, ThresholdTable
+from ..alerts.escalation import EscalationPolicy
+from ..alerts.state_machine import (
+    COOLDOWN, FIRING, OK, METRIC_RULES, AlertRules, AlertStateTable, EpisodeState, episode_message, severity_rank, step,
+)
+from ..extensions import db
+from ..model.models import Alert
+from ..repository.alert_pending_counts_repository import AlertPendingCountsRepository, pending_key, track_move
+from ..repository.alert_states_repository import AlertStatesRepository
+from ..repository.alerts_repository import AlertsRepository
+from ..repository.devices_repository import DevicesRepository
+from ..repository.metrics_repository import MetricsRepository
+from ..repository.stats_repository import StatsRepository, alert_stats_key
+from .notifications_service import NOTIFY_EVENTS, NotificationsService
+from .thresholds_service import ThresholdsService
+
+logger = logging.getLogger(__name__)
+
+Limits = Dict[str, Tuple[Optional[float], Optional[float]]]
+
+
+def _as_float(v) -> Optional[float]:
+    return float(v) if v is not None else None
+
+
+class AlertEvaluationService:
+    """
+    Genera y mantiene las alertas por umbral a partir de las lecturas, pasando cada
+    muestra por la máquina de estados de app/alerts (una alerta por episodio).
+    """
+
+    def __init__(self,
+                 repo: AlertStatesRepository | None = None,
+                 alerts_repo: AlertsRepository | None = None,
+                 thresholds_service: ThresholdsService | None = None,
+                 metrics_repo: MetricsRepository | None = None,
+                 devices_repo: DevicesRepository | None = None,
+                 pending_repo: AlertPendingCountsRepository | None = None,
+                 stats_repo: StatsRepository | None = None,
+                 notifications: NotificationsService | None = None):
+        self.repo = repo or AlertStatesRepository()
+        self.alerts_repo = alerts_repo or AlertsRepository()
+        self.thresholds_service = thresholds_service or ThresholdsService()
+        self.metrics_repo = metrics_repo or MetricsRepository()
+        self.devices_repo = devices_repo or DevicesRepository()
+        self.pending_repo = pending_repo or AlertPendingCountsRepository()
+        self.stats_repo = stats_repo or StatsRepository()
+        self.notifications = notifications or NotificationsService()
+
+    def limits_for(self, patient_id: int) -> Limits:
+        """Umbrales efectivos (min, max) por métrica para un paciente."""
+        return self.limits_for_many([patient_id])[patient_id]
+
+    def limits_for_many(self, patient_ids: Iterable[int]) -> Dict[int, Limits]:
+        """limits_for de N pacientes con una sola consulta (entrada de ThresholdTable.from_limits)."""
+        effective = self.thresholds_service.effective_thresholds_many(patient_ids)
+        return {pid: {metric: (_as_float(t.min_value), _as_float(t.max_value))
+                      for metric, t in by_metric.items() if metric in METRIC_RULES}
+                for pid, by_metric in effective.items()}
+
+    def evaluate_readings(self, patient_id: int, rows: Iterable[Dict[str, Any]],
+                          rules: AlertRules | None = None) -> Dict[str, int]:
+        """
+        Evalúa lecturas (ordenadas por ts) de un paciente y aplica los efectos sobre
+        `alerts` y `alert_states`. No hace commit: corre en la transacción del llamador.
+        Devuelve el conteo de efectos, p. ej. {"open": 1, "update": 40}.
+        """
+        rules = rules or AlertRules.from_config(current_app.config)
+        escalation = EscalationPolicy.from_config(current_app.config)
+        rows = list(rows)
+        if not rows:
+            return {}
+        limits = self.limits_for(patient_id)
+        table = AlertStateTable(self.repo.load([patient_id], lock=True))  # serializa con otras evaluaciones
+        current: Dict[str, Optional[Alert]] = {}
+        counts: Counter = Counter()
+        pending: Counter = Counter()  # deltas de alert_pending_counts
+        stats: Counter = Counter()    # deltas de stats_counters
+        notify: Dict[int, Tuple[Alert, str]] = {}  # primer evento notificable de cada alerta del lote
+
+        # Prefiltro vectorizado: qué métricas cruzan algún umbral en el lote
+        batch = ReadingArrays.from_rows(rows)
+        thresholds = ThresholdTable.from_limits({patient_id: limits})
+        high, low = AlertEngine.breaches(batch.values, thresholds.lo[0], thresholds.hi[0])
+        breached = (high | low).any(axis=0)
+
+        for m, metric in enumerate(METRICS):
+            state = table.get(patient_id, metric)
+            if state.status == OK and not breached[m]:
+                self._advance(state, batch, m)  # nada que evaluar fila por fila
+                continue
+            column = METRIC_RULES[metric]["column"]
+            lo, hi = limits[metric]
+            current[metric] = self.alerts_repo.get_by_id(state.alert_id) if state.alert_id else None
+            for row in rows:
+                value = row.get(column)
+                if value is None:
+                    continue
+                for effect in step(state, row["ts"], value, lo, hi, rules):
+                    counts[effect] += 1
+                    prev = None if effect == "open" else current[metric]
+                    before = pending_key(prev), alert_stats_key(prev)
+                    rearm = effect == "reopen" or (prev is not None and prev.acknowledged_at is not None)
+                    current[metric] = self._apply(effect, state, current[metric], row["ts"], lo, hi)
+                    track_move(pending, before[0], pending_key(current[metric]))
+                    track_move(stats, before[1], alert_stats_key(current[metric]))
+                    if effect in NOTIFY_EVENTS and current[metric] is not None:
+                        notify.setdefault(id(current[metric]), (current[metric], effect))
+                        self._arm_escalation(current[metric], escalation, rearm)
+
+        db.session.flush()  # asigna id a las alertas nuevas
+        for metric, alert in current.items():
+            state = table.get(patient_id, metric)
+            if alert is not None and state.status in (FIRING, COOLDOWN):
+                state.alert_id = alert.id
+        self.repo.save(table.dirty())
+        self.pending_repo.apply(pending)
+        self.stats_repo.increment(stats)
+        self.notifications.enqueue_alerts(notify.values())  # con la severidad final del lote
+        if counts.get("open"):
+            logger.info(f"Paciente {patient_id}: {counts['open']} alertas nuevas.")
+        return dict(counts)
+
+    def reevaluate(self, patient_id: int, metric: str, since: datetime,
+                   rules: AlertRules | None = None) -> Dict[str, int]:
+        """
+        Recalcula con los umbrales actuales los episodios de `metric` desde `since` y
+        concilia la alerta abierta del paciente y su estado: cierra la alerta si con el
+        nuevo umbral ya no hay episodio activo, la actualiza si sigue, o abre una si
+        ahora corresponde. No crea alertas históricas ni hace commit.
+        Devuelve {"opened": n, "updated": n, "resolved": n}.
+        """
+        rules = rules or AlertRules.from_config(current_app.config)
+        # Primero el lock de los estados: la ingesta en vivo del paciente espera a que
+        # termine la conciliación en lugar de pisarla
+        self.repo.load([patient_id], lock=True)
+        device_ids = [d.id for d in self.devices_repo.list_by_patient(patient_id)]
+        t = self.thresholds_service.get_thresholds(patient_id, metric)
+        lo, hi = _as_float(t.min_value), _as_float(t.max_value)
+
+        batch = ReadingArrays.from_rows(self.metrics_repo.iter_range_for_devices(device_ids, since))
+        episodes = AlertEngine(rules).evaluate(batch, {d: patient_id for d in device_ids},
+                                               ThresholdTable.from_limits({patient_id: {metric: (lo, hi)}}))
+        ongoing = next((e for e in episodes if e["resolved_at"] is None), None)
+        present = ~np.isnan(batch.values[:, METRICS.index(metric)]) if len(batch) else np.zeros(0, dtype=bool)
+        last_ts = batch.ts[present].max().astype(datetime) if present.any() else None
+
+        counts: Counter = Counter()
+        alert = self.alerts_repo.get_open(patient_id, metric)
+        if alert is not None and (ongoing is None or alert.type != ongoing["type"]):
+            alert.resolved_at = last_ts or datetime.now(timezone.utc).replace(tzinfo=None)
+            counts["resolved"] += 1
+            alert = None
+        if ongoing is not None:
+            before = pending_key(alert), alert_stats_key(alert)
+            event = None
+            if alert is None:
+                alert = Alert(**ongoing)
+                db.session.add(alert)
+                counts["opened"] += 1
+                event = "open"
+                self._arm_escalation(alert, EscalationPolicy.from_config(current_app.config))
+            else:
+                if severity_rank(ongoing["severity"]) > severity_rank(alert.severity):
+                    event = "escalate"
+                # El inicio del episodio puede ser anterior a la ventana: no se achican los acumulados
+                alert.severity = ongoing["severity"]
+                alert.occurrences = max(alert.occurrences or 0, ongoing["occurrences"])
+                alert.last_seen_at = ongoing["last_seen_at"]
+                alert.peak_value = ongoing["peak_value"]
+                alert.message = ongoing["message"]
+                counts["updated"] += 1
+            pending, stats = Counter(), Counter()
+            track_move(pending, before[0], pending_key(alert))
+            track_move(stats, before[1], alert_stats_key(alert))
+            self.pending_repo.apply(pending)
+            self.stats_repo.increment(stats)
+            db.session.flush()
+            if event:
+                self.notifications.enqueue_alerts([(alert, event)])
+
+        # El estado en línea queda como el resultado recalculado (la ingesta sigue desde ahí)
+        state = AlertStateTable(self.repo.load([patient_id], lock=True)).get(patient_id, metric)
+        state.last_ts = max(filter(None, (state.last_ts, last_ts)), default=None)
+        state.dirty = True
+        if ongoing is not None:
+            types = METRIC_RULES[metric]["types"]
+            state.status = FIRING
+            state.direction = "high" if ongoing["type"] == types["high"] else "low"
+            state.started_at = ongoing["ts"]
+            state.last_seen_at = ongoing["last_seen_at"]
+            state.peak_value = ongoing["peak_value"]
+            state.occurrences = alert.occurrences
+            state.severity = ongoing["severity"]
+            state.alert_id = alert.id
+        else:
+            state.status, state.direction, state.alert_id = OK, None, None
+            state.occurrences, state.peak_value, state.severity = 0, None, None
+        state.resolved_at = None
+        self.repo.save([state])
+        return dict(counts)
+
+    @staticmethod
+    def _arm_escalation(alert: Alert, policy: EscalationPolicy, rearm: bool = False) -> None:
+        """
+        Programa el primer escalamiento de una alerta pendiente grave. No toca uno ya
+        en curso (ni vuelve a empezar si ya se agotaron los niveles) salvo `rearm`:
+        la alerta se reabrió o se había reconocido y vuelve a la lista de pendientes.
+        """
+        if not policy.applies_to(alert.severity):
+            return
+        if not rearm and (alert.escalation_due_at is not None or (alert.escalation_level or 0) > 0):
+            return
+        alert.escalation_level = 0
+        alert.escalation_due_at = policy.first_due(datetime.now(timezone.utc).replace(tzinfo=None))
+
+    @staticmethod
+    def _advance(state: EpisodeState, batch: ReadingArrays, m: int) -> None:
+        """Estado 'ok' sin cruces en el lote: solo avanza last_ts (como haría step())."""
+        present = ~np.isnan(batch.values[:, m])
+        if not present.any():
+            return
+        newest = batch.ts[present].max().astype(datetime)
+        if state.last_ts is None or newest > state.last_ts:
+            state.last_ts = newest
+            state.dirty = True
+
+    @staticmethod
+    def _apply(effect: str, state: EpisodeState, alert: Optional[Alert], ts,
+               lo: Optional[float], hi: Optional[float]) -> Optional[Alert]:
+        """Refleja un efecto de la máquina de estados en la fila de `alerts` del episodio."""
+        if effect == "open":
+            alert = Alert(patient_id=state.patient_id, metric=state.metric, ts=state.started_at,
+                          type=METRIC_RULES[state.metric]["types"][state.direction])
+            db.session.add(alert)
+        if alert is None:  # la alerta del episodio fue borrada: no hay fila que actualizar
+            return None
+        if effect == "resolve":
+            alert.resolved_at = ts
+            return alert
+        if severity_rank(state.severity) > severity_rank(alert.severity):
+            alert.severity = state.severity  # solo sube: no deshace un escalamiento por falta de reconocimiento
+        alert.occurrences = state.occurrences
+        alert.last_seen_at = state.last_seen_at
+        alert.peak_value = state.peak_value
+        alert.resolved_at = None
+        alert.message = episode_message(state.metric, state.direction, state.peak_value, lo, hi)
+        if effect in ("reopen", "escalate"):
+            # Vuelve a la lista de pendientes aunque ya se hubiera reconocido
+            alert.acknowledged_by = None
+            alert.acknowledged_at = None
+        return alert
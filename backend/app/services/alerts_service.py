@@ -1,9 +1,11 @@
 # backend/app/services/alerts_service.py
 
 import logging
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from datetime import datetime, timezone # Necesario para acknowledge
+from ..repository.alert_pending_counts_repository import AlertPendingCountsRepository
 from ..repository.alerts_repository import AlertsRepository
+from ..repository.unit_of_work import unit_of_work
 from ..model.models import Alert
 # Importa db si necesitas manejar la sesión directamente
 from ..extensions import db
@@ -11,8 +13,10 @@ from ..extensions import db
 logger = logging.getLogger(__name__)
 
 class AlertsService:
-    def __init__(self, repo: AlertsRepository | None = None):
+    def __init__(self, repo: AlertsRepository | None = None,
+                 pending_repo: AlertPendingCountsRepository | None = None):
         self.repo = repo or AlertsRepository()
+        self.pending_repo = pending_repo or AlertPendingCountsRepository()
 
     def list_alerts_for_patient(self, patient_id: int, limit: int = 500) -> List[Alert]:
         """Lista las alertas para un paciente."""
@@ -56,6 +60,28 @@ class AlertsService:
              db.session.rollback()
              return None # O relanza
     
+    # --- NUEVO: Reconocimiento masivo ---
+    def acknowledge_many(self, user_id: int, ids: Optional[List[int]] = None, patient_id: Optional[int] = None,
+                         type: Optional[str] = None, before: Optional[datetime] = None,
+                         limit: int = 1000) -> Optional[Dict[str, Any]]:
+        """
+        Reconoce de una vez las alertas pendientes indicadas (ids y/o filtro) en una
+        sola transacción. Las ya reconocidas se ignoran. Devuelve los ids afectados.
+        """
+        if before is not None and before.tzinfo is not None:
+            before = before.astimezone(timezone.utc).replace(tzinfo=None)  # alerts.ts se guarda en UTC naive
+        try:
+            with unit_of_work():
+                acked, more = self.repo.acknowledge_many(
+                    user_id, datetime.now(timezone.utc).replace(tzinfo=None),
+                    ids=ids, patient_id=patient_id, type=type, before=before, limit=limit,
+                )
+        except Exception as e:
+            logger.error(f"Error al reconocer alertas en bloque (user {user_id}): {e}")
+            return None
+        logger.info(f"Usuario {user_id} reconoció {len(acked)} alertas en bloque.")
+        return {"acknowledged": acked, "count": len(acked), "has_more": more}
+
     # --- NUEVO: Listar alertas pendientes para el dashboard de admin ---
     def list_pending_alerts(self, limit: int = 50) -> List[Alert]:
         """Lista las alertas pendientes más recientes de todos los pacientes."""
@@ -75,6 +101,12 @@ class AlertsService:
             logger.error(f"Error al listar alertas pendientes para paciente {patient_id}: {e}")
             return []
 
+    # --- NUEVO: Conteo de pendientes (badges) desde alert_pending_counts ---
+    def pending_counts(self, patient_id: Optional[int] = None) -> Dict[str, Any]:
+        """Alertas sin reconocer por severidad (de un paciente o de todos) y su total."""
+        by_severity = self.pending_repo.counts(patient_id)
+        return {"total": sum(by_severity.values()), "by_severity": by_severity}
+
     # --- NUEVO (Opcional): Contar alertas ---
     # def count_recent_by_severity(self, hours: int = 24) -> Dict[str, int]:
     #     """Cuenta alertas recientes agrupadas por severidad."""
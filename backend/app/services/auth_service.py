@@ -0,0 +1,96 @@
+# backend/app/services/auth_service.py
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+from flask import current_app
+from ..config import Config
+from ..model.models import User
+from ..passwords import HasherBusy, PasswordHasher
+from ..ratelimit import BucketStore, load_store
+from ..repository.unit_of_work import unit_of_work
+from ..repository.users_repository import UsersRepository
+from .identity_service import IdentityService
+
+logger = logging.getLogger(__name__)
+
+# Por worker: pool de hashing, buckets de intentos (store configurable; las tasas se leen
+# de la config de la app en cada intento) y un hilo que rehashea en segundo plano las
+# contraseñas con parámetros viejos.
+_hasher = PasswordHasher.from_config(vars(Config))
+_store = load_store(Config.RATE_LIMIT_STORE)
+_rehash_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rehash")
+
+
+class AuthService:
+    def __init__(self, identity_service=None, repo=None, hasher: Optional[PasswordHasher] = None,
+                 store: Optional[BucketStore] = None, rehash_executor=None):
+        self.identity_service = identity_service or IdentityService()
+        self.repo = repo or UsersRepository()
+        self.hasher = hasher or _hasher
+        self.store = store if store is not None else _store
+        self.rehash_executor = rehash_executor or _rehash_executor
+        self._rehashing = set()   # user_ids con rehash en cola (uno por usuario)
+        self._lock = threading.Lock()
+
+    def throttle(self, ip: str, email: Optional[str] = None) -> float:
+        """
+        Consume un intento de la IP (y del email, si viene) y devuelve 0, o cuántos
+        segundos esperar (-> 429). Se llama antes de hashear: un intento rechazado no
+        cuesta CPU ni consultas.
+        """
+        cfg = current_app.config
+        wait = self._take(("login-ip", ip), cfg["LOGIN_RATE_PER_IP_PER_MIN"], cfg["LOGIN_RATE_IP_BURST"])
+        if wait or not email:
+            return wait
+        return self._take(("login-email", email), cfg["LOGIN_RATE_PER_EMAIL_PER_MIN"], cfg["LOGIN_RATE_EMAIL_BURST"])
+
+    def _take(self, key, per_min: float, burst: int) -> float:
+        if per_min <= 0:
+            return 0.0
+        return self.store.take(key, per_min / 60.0, max(1, burst))
+
+    def authenticate(self, email: str, password: str) -> Tuple[Optional[User], Dict[str, Any]]:
+        """
+        (usuario, claims del token) si la contraseña es correcta, o (None, {}).
+        Lanza HasherBusy si el pool de hashing está saturado.
+        """
+        user, claims = self.identity_service.find_for_login(email)
+        if user is None or not self.hasher.verify(user.pass_hash, password):
+            return None, {}
+        if self.hasher.needs_rehash(user.pass_hash):
+            self._schedule_rehash(user.id, user.pass_hash, password)
+        return user, claims
+
+    def hash_password(self, password: str) -> str:
+        """Hash con los parámetros configurados. Lanza HasherBusy si el pool está saturado."""
+        return self.hasher.hash(password)
+
+    def _schedule_rehash(self, user_id: int, old_hash: str, password: str) -> None:
+        """
+        Rehashea con los parámetros actuales fuera del request (el login no paga un
+        segundo hash ni el UPDATE). Si falla, se reintenta en el próximo login.
+        """
+        with self._lock:
+            if user_id in self._rehashing:
+                return
+            self._rehashing.add(user_id)
+        app = current_app._get_current_object()
+
+        def run():
+            try:
+                with app.app_context():
+                    new_hash = self.hasher.hash(password)
+                    with unit_of_work():
+                        updated = self.repo.replace_pass_hash(user_id, old_hash, new_hash)
+                    logger.info(f"Contraseña del usuario {user_id} rehasheada ({self.hasher.method}): {updated}")
+            except HasherBusy:
+                logger.info(f"Rehash del usuario {user_id} pospuesto: pool de hashing saturado")
+            except Exception as e:
+                logger.error(f"Error al rehashear la contraseña del usuario {user_id}: {e}")
+            finally:
+                with self._lock:
+                    self._rehashing.discard(user_id)
+
+        self.rehash_executor.submit(run)
@@ -247,9 +247,10 @@ REGLA MÁS IMPORTANTE: NO ERES UN MÉDICO. NUNCA DEBES DAR CONSEJOS MÉDICOS, DI
 
                 # Umbrales del paciente (con fallback a global si aplica)
                 try:
-                    th_hr = self.thresholds_service.get_thresholds(patient.id, "heart_rate")
-                    th_spo2 = self.thresholds_service.get_thresholds(patient.id, "spo2")
-                    th_temp = self.thresholds_service.get_thresholds(patient.id, "temperature")
+                    effective = self.thresholds_service.effective_thresholds(patient.id)
+                    th_hr = effective["heart_rate"]
+                    th_spo2 = effective["spo2"]
+                    th_temp = effective["temperature"]
 
                     def d_to_float(d):
                         try:
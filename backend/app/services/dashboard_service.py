@@ -0,0 +1,55 @@
+# backend/app/services/dashboard_service.py
+
+import logging
+from typing import Any, Dict, Optional
+from ..repository.alert_pending_counts_repository import AlertPendingCountsRepository
+from ..repository.alerts_repository import AlertsRepository
+from ..repository.metrics_repository import MetricsRepository
+from ..repository.patients_repository import PatientsRepository
+from .thresholds_service import ThresholdsService
+
+logger = logging.getLogger(__name__)
+
+
+class DashboardService:
+    """
+    Todo lo que muestra el panel del cliente en una sola pasada y con un número fijo
+    de consultas, sin importar cuántas bandas o alertas tenga el paciente:
+
+    1. paciente + sus bandas (JOIN)
+    2. última lectura de cada banda (groupwise max)
+    3. últimas alertas pendientes
+    4. conteo de pendientes por severidad (alert_pending_counts)
+    5. umbrales vigentes (normalmente desde la caché, 0 consultas)
+    """
+
+    def __init__(self, patients_repo=None, metrics_repo=None, alerts_repo=None, pending_repo=None,
+                 thresholds_service=None):
+        self.patients_repo = patients_repo or PatientsRepository()
+        self.metrics_repo = metrics_repo or MetricsRepository()
+        self.alerts_repo = alerts_repo or AlertsRepository()
+        self.pending_repo = pending_repo or AlertPendingCountsRepository()
+        self.thresholds_service = thresholds_service or ThresholdsService()
+
+    def build(self, patient_id: int, alerts_limit: int = 10) -> Optional[Dict[str, Any]]:
+        """
+        {"patient", "devices" (más nueva primero), "latest_by_device" {device_id: Reading},
+        "latest_reading", "pending_alerts", "pending_counts", "thresholds"} con modelos
+        sin serializar, o None si el paciente no existe.
+        """
+        patient = self.patients_repo.get_with_devices(patient_id)
+        if patient is None:
+            return None
+        devices = sorted(patient.devices, key=lambda d: d.id, reverse=True)
+        latest_by_device = self.metrics_repo.get_latest_for_devices([d.id for d in devices]) if devices else {}
+        by_severity = self.pending_repo.counts(patient_id)
+        return {
+            "patient": patient,
+            "devices": devices,
+            "latest_by_device": latest_by_device,
+            # La lectura "principal" es la más reciente entre todas las bandas
+            "latest_reading": max(latest_by_device.values(), key=lambda r: (r.ts, r.id), default=None),
+            "pending_alerts": self.alerts_repo.list_pending_for_patient(patient_id, limit=alerts_limit),
+            "pending_counts": {"total": sum(by_severity.values()), "by_severity": by_severity},
+            "thresholds": self.thresholds_service.effective_thresholds(patient_id),
+        }
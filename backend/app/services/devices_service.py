@@ -1,17 +1,25 @@
 # backend/app/services/devices_service.py
 
 import logging
-from typing import Optional, List, Dict, Any # Añadir Dict, Any
+from datetime import datetime, timedelta, timezone
+from typing import Optional, List, Dict, Any, Mapping, Sequence, Tuple # Añadir Dict, Any
+from sqlalchemy.exc import IntegrityError
 from ..repository.devices_repository import DevicesRepository
-from ..model.models import Device
+from ..repository.patients_repository import PatientsRepository
+from ..repository.unit_of_work import unit_of_work
+from ..model.models import Device, Job
 # Importa db si necesitas manejar la sesión directamente
 from ..extensions import db
+from .jobs_service import JobsService
+from .stats_service import ONLINE_WINDOW
 
 logger = logging.getLogger(__name__)
 
 class DevicesService:
-    def __init__(self, repo: DevicesRepository | None = None):
+    def __init__(self, repo: DevicesRepository | None = None,
+                 patients_repo: PatientsRepository | None = None):
         self.repo = repo or DevicesRepository()
+        self.patients_repo = patients_repo or PatientsRepository()
 
     def get_by_id(self, device_id: int) -> Optional[Device]:
         """Obtiene un dispositivo por su ID."""
@@ -54,6 +62,62 @@ class DevicesService:
             logger.error(f"Error en repositorio al crear dispositivo (serial: {serial}): {e}")
             raise e
 
+    # --- NUEVO: Alta masiva (envío de bandas) ---
+    def provision(self, rows: Sequence[Tuple[int, Dict[str, Any]]], invalid: Mapping[int, Any] | None = None,
+                  dry_run: bool = False) -> Dict[str, Any]:
+        """
+        Da de alta las filas ya validadas [(índice, {serial, model, status?, patient_id?})]
+        con una consulta `IN` de seriales existentes, otra de pacientes y un INSERT
+        multi-fila, todo en una transacción. Las filas con serial ya registrado,
+        repetido en el lote o paciente inexistente se informan y no se insertan.
+        `invalid` son los errores de validación por índice (solo van al reporte).
+        Devuelve {"created", "skipped", "dry_run", "items": [resultado por fila]}.
+        Lanza ValueError si otro alta concurrente registró alguno de los seriales.
+        """
+        report: Dict[int, Dict[str, Any]] = {
+            i: {"row": i, "status": "invalid", "messages": messages} for i, messages in (invalid or {}).items()
+        }
+        existing = self.repo.existing_serials(sorted({r["serial"] for _, r in rows}))
+        patients = self.patients_repo.existing_ids(sorted({r["patient_id"] for _, r in rows
+                                                           if r.get("patient_id") is not None}))
+        to_insert: List[Tuple[int, Dict[str, Any]]] = []
+        seen: Dict[str, int] = {}
+        for i, r in rows:
+            serial = r["serial"]
+            if serial in existing:
+                report[i] = {"row": i, "serial": serial, "status": "exists", "id": existing[serial]}
+            elif serial in seen:
+                report[i] = {"row": i, "serial": serial, "status": "duplicate", "duplicate_of": seen[serial]}
+            elif r.get("patient_id") is not None and r["patient_id"] not in patients:
+                report[i] = {"row": i, "serial": serial, "status": "patient_not_found"}
+            else:
+                seen[serial] = i
+                to_insert.append((i, {"serial": serial, "model": r["model"], "status": r.get("status") or "new",
+                                      "patient_id": r.get("patient_id")}))
+
+        if to_insert and not dry_run:
+            try:
+                ids = self.repo.bulk_insert([r for _, r in to_insert])
+                db.session.commit()
+            except IntegrityError:
+                db.session.rollback()
+                raise ValueError("Otro alta registró alguno de los seriales al mismo tiempo; reintenta el lote.")
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"Error en el alta masiva de {len(to_insert)} dispositivos: {e}")
+                raise
+        else:
+            ids = {}
+            db.session.commit()  # cierra la transacción de lectura
+        for i, r in to_insert:
+            report[i] = {"row": i, "serial": r["serial"], "status": "would_create" if dry_run else "created",
+                         "id": ids.get(r["serial"])}
+
+        if not dry_run and to_insert:
+            logger.info(f"Alta masiva: {len(to_insert)} dispositivos creados, {len(report) - len(to_insert)} omitidos.")
+        return {"created": 0 if dry_run else len(to_insert), "skipped": len(report) - len(to_insert),
+                "dry_run": dry_run, "items": [report[i] for i in sorted(report)]}
+
     # --- NUEVO: Listar todos los dispositivos (para admin) ---
     def list_all(self, page: int = 1, per_page: int = 100) -> List[Device]: # Añade paginación básica
         """Lista todos los dispositivos registrados."""
@@ -65,6 +129,37 @@ class DevicesService:
             logger.error(f"Error al listar todos los dispositivos: {e}")
             return []
 
+    # --- NUEVO: Vista de flota (una consulta por página, sin N+1 a telemetría/lecturas) ---
+    def fleet(self, limit: int = 100, cursor: Optional[int] = None, statuses: Optional[Sequence[str]] = None,
+              patient_id: Optional[int] = None, offline_min: Optional[int] = None,
+              online: Optional[bool] = None, battery_below: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Página de la flota: cada dispositivo con su paciente, último contacto, última
+        lectura, batería / señal de la última telemetría y `online` (contacto en los
+        últimos 5 minutos, como el panel). `cursor` es el `next_cursor` de la página
+        anterior; `offline_min` deja los que llevan más de N minutos sin contacto.
+        """
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        online_since = now - ONLINE_WINDOW
+        seen_before = [now - timedelta(minutes=offline_min)] if offline_min is not None else []
+        if online is False:
+            seen_before.append(online_since)
+        rows = self.repo.list_fleet(limit + 1, after_id=cursor, statuses=statuses, patient_id=patient_id,
+                                    seen_before=min(seen_before) if seen_before else None,
+                                    seen_since=online_since if online else None,
+                                    battery_below=battery_below)
+        items = [{
+            "id": r.id, "serial": r.serial, "model": r.model, "status": r.status,
+            "registered_at": r.registered_at,
+            "patient": ({"id": r.patient_id, "full_name": f"{r.first_name} {r.last_name}".strip()}
+                        if r.patient_id is not None else None),
+            "last_seen_at": r.last_seen_at, "last_reading_at": r.last_reading_at,
+            "last_telemetry_at": r.last_telemetry_at, "battery_pct": r.battery_pct, "rssi_dbm": r.rssi_dbm,
+            "online": r.last_seen_at is not None and r.last_seen_at >= online_since,
+        } for r in rows[:limit]]
+        next_cursor = str(items[-1]["id"]) if len(rows) > limit else None
+        return {"items": items, "next_cursor": next_cursor}
+
     def list_by_patient(self, patient_id: int) -> List[Device]:
         """Lista los dispositivos asignados a un paciente."""
         return self.repo.list_by_patient(patient_id)
@@ -140,6 +235,18 @@ class DevicesService:
             db.session.rollback()
             return False
 
+    def schedule_delete(self, device: Device, requested_by: int | None = None) -> Job:
+        """
+        Retira el dispositivo (status='retired', sale de la flota activa) y encola el job
+        'purge_device', que borra su historial por lotes y al final la fila. Ambos en la
+        misma transacción: si el job no se puede encolar (JobLimitError) no cambia nada.
+        """
+        with unit_of_work():
+            device.status = "retired"
+            job = JobsService().submit("purge_device", {"device_id": device.id}, user_id=requested_by)
+        logger.info(f"Dispositivo {device.id} retirado; purga en el job {job.id}.")
+        return job
+
     # --- NUEVO (Opcional): Contar dispositivos ---
     # def count_active(self) -> int:
     #     """Cuenta dispositivos activos."""
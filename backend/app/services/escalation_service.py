@@ -0,0 +1,70 @@
+# backend/app/services/escalation_service.py
+
+import logging
+from collections import Counter
+from datetime import datetime
+from typing import List, Sequence, Tuple
+from ..alerts.escalation import EscalationPolicy
+from ..extensions import db
+from ..repository.alert_pending_counts_repository import AlertPendingCountsRepository, pending_key, track_move
+from ..repository.alerts_repository import AlertsRepository
+from ..repository.stats_repository import StatsRepository, alert_stats_key
+from ..repository.unit_of_work import unit_of_work
+from .notifications_service import NotificationsService
+
+logger = logging.getLogger(__name__)
+
+Timer = Tuple[int, int, datetime]  # (alert_id, nivel, vencimiento)
+
+
+class EscalationService:
+    """Dispara los timers de escalamiento vencidos (lo llama app/alerts/scheduler.py)."""
+
+    def __init__(self,
+                 repo: AlertsRepository | None = None,
+                 pending_repo: AlertPendingCountsRepository | None = None,
+                 stats_repo: StatsRepository | None = None,
+                 notifications: NotificationsService | None = None):
+        self.repo = repo or AlertsRepository()
+        self.pending_repo = pending_repo or AlertPendingCountsRepository()
+        self.stats_repo = stats_repo or StatsRepository()
+        self.notifications = notifications or NotificationsService()
+
+    def due_timers(self, until: datetime) -> List[Timer]:
+        """Timers armados en la BD que vencen hasta `until` (rehidratación y altas nuevas)."""
+        timers = self.repo.list_escalation_due(until)
+        db.session.commit()  # no dejar abierta la transacción de lectura entre vueltas
+        return timers
+
+    def fire(self, timers: Sequence[Timer], policy: EscalationPolicy) -> List[Timer]:
+        """
+        Escala las alertas de `timers` en una transacción y devuelve los timers del
+        nivel siguiente. Exactamente una vez: las filas se bloquean y solo se escalan
+        si siguen sin reconocer con el mismo nivel y vencimiento; un timer viejo (la
+        alerta se reconoció, se re-armó u otro scheduler ya la escaló) no hace nada.
+        """
+        expected = {alert_id: (level, due) for alert_id, level, due in timers}
+        pending: Counter = Counter()
+        stats: Counter = Counter()
+        events, following = [], []
+        with unit_of_work():
+            for alert in self.repo.lock_for_escalation(list(expected)):
+                level, due = expected[alert.id]
+                if (alert.acknowledged_at is not None or alert.escalation_level != level
+                        or alert.escalation_due_at != due):
+                    continue
+                before = pending_key(alert), alert_stats_key(alert)
+                alert.severity = policy.bumped(alert.severity)
+                alert.escalation_level = level + 1
+                alert.escalation_due_at = policy.next_due(level, due)
+                track_move(pending, before[0], pending_key(alert))
+                track_move(stats, before[1], alert_stats_key(alert))
+                events.append((alert, "unacknowledged"))
+                if alert.escalation_due_at is not None:
+                    following.append((alert.id, alert.escalation_level, alert.escalation_due_at))
+            self.pending_repo.apply(pending)
+            self.stats_repo.increment(stats)
+            self.notifications.enqueue_alerts(events)
+        if events:
+            logger.info(f"{len(events)} alertas escaladas por falta de reconocimiento.")
+        return following
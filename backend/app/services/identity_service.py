@@ -0,0 +1,112 @@
+# backend/app/services/identity_service.py
+
+"""
+Identidad del usuario autenticado sin ir a la BD en cada request.
+
+Cada worker cachea por usuario (id, email, rol, token_version, paciente, bandas)
+con un TTL corto; lo que cuesta por request es, como mucho cada
+CACHE_VERSION_CHECK_S, una lectura de cache_versions por worker. Un alta o
+reasignación de bandas incrementa cache_versions('identities') en su misma
+transacción: los workers releen la identidad y el token sigue valiendo (los claims
+patient_id / device_ids del token son informativos, no se usan para autorizar).
+
+El claim `ver` es la users.token_version con que se emitió el token. Solo se
+incrementa al cambiar el rol: ahí un token con otra versión responde 401 (igual
+que si el usuario ya no existe) y el frontend vuelve a pedir login. Los tokens
+emitidos antes de existir `ver` se aceptan mientras AUTH_ACCEPT_UNVERSIONED_TOKENS
+esté activo (una vida de token, JWT_EXPIRE_MINUTES, tras el despliegue).
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Iterable, Optional, Tuple
+from ..cache import VersionedCache
+from ..config import Config
+from ..model.models import User
+from ..repository.cache_versions_repository import CacheVersionsRepository
+from ..repository.unit_of_work import unit_of_work
+from ..repository.users_repository import IDENTITY_CACHE_NAME, UsersRepository
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Identity:
+    """Usuario del token (`current_user` en los controladores)."""
+    id: int
+    email: str
+    role: str
+    patient_id: Optional[int] = None
+    device_ids: FrozenSet[int] = frozenset()
+
+
+def identity_claims(role: str, token_version: int, patient_id: Optional[int],
+                    device_ids: Iterable[int]) -> Dict[str, Any]:
+    """additional_claims de create_access_token."""
+    return {"role": role, "ver": token_version, "patient_id": patient_id, "device_ids": sorted(device_ids)}
+
+
+# Caché por worker: user_id -> (id, email, role, token_version, patient_id, device_ids)
+_cache = VersionedCache(IDENTITY_CACHE_NAME, ttl=Config.IDENTITY_CACHE_TTL_S,
+                        check_every=Config.CACHE_VERSION_CHECK_S,
+                        version_loader=lambda: CacheVersionsRepository.get(IDENTITY_CACHE_NAME))
+
+
+def _newer(claim: Any, cached: int) -> bool:
+    return isinstance(claim, int) and claim > cached
+
+
+class IdentityService:
+    def __init__(self, repo=None, cache=None, accept_unversioned: Optional[bool] = None):
+        self.repo = repo or UsersRepository()
+        self.cache = cache if cache is not None else _cache
+        self.accept_unversioned = (Config.AUTH_ACCEPT_UNVERSIONED_TOKENS if accept_unversioned is None
+                                   else accept_unversioned)
+
+    def find_for_login(self, email: str) -> Tuple[Optional[User], Dict[str, Any]]:
+        """Usuario por email y los claims de su token, en una consulta. (None, {}) si no existe."""
+        user, patient_id, device_ids = self.repo.get_for_login(email)
+        if user is None:
+            return None, {}
+        return user, identity_claims(user.role, user.token_version or 0, patient_id, device_ids)
+
+    def resolve(self, jwt_data: Dict[str, Any]) -> Optional[Identity]:
+        """
+        Identity del usuario del token con su paciente y bandas actuales, o None
+        (-> 401) si el usuario ya no existe o el token se emitió antes de un cambio
+        de rol (otra `ver`).
+        """
+        try:
+            user_id = int(jwt_data.get("sub"))
+        except (TypeError, ValueError):
+            logger.warning("Token sin 'sub' entero: %r", jwt_data.get("sub"))
+            return None
+        ver = jwt_data.get("ver")
+        auth = self.cache.get(user_id)
+        # Un token más nuevo que la copia cacheada (login tras un cambio que este worker aún
+        # no vio) obliga a releer; si no, se rechazaría un token recién emitido
+        if auth is None or _newer(ver, auth[3]):
+            generation = self.cache.generation
+            auth = self.repo.get_auth(user_id)
+            if auth is None:
+                logger.warning("Usuario %s del token no existe", user_id)
+                return None
+            auth = tuple(auth)
+            self.cache.set_many({user_id: auth}, generation=generation)
+        _, email, role, token_version, patient_id, device_ids = auth
+        if ver is None and not self.accept_unversioned:
+            logger.info("Token sin versión del usuario %s", user_id)
+            return None
+        if ver is not None and ver != token_version:
+            logger.info("Token revocado del usuario %s (ver %r, actual %s)", user_id, ver, token_version)
+            return None
+        return Identity(id=user_id, email=email, role=role, patient_id=patient_id,
+                        device_ids=frozenset(device_ids))
+
+    def set_role(self, email: str, role: str) -> Optional[int]:
+        """Cambia el rol e invalida los tokens emitidos. Devuelve el id del usuario o None."""
+        with unit_of_work():
+            user_id = self.repo.set_role(email, role)
+        if user_id is not None:
+            self.cache.invalidate()
+        return user_id
@@ -0,0 +1,99 @@
+# backend/app/services/ingest_service.py
+
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+from flask import abort
+from ..extensions import db
+from ..repository.device_last_seen_repository import DeviceLastSeenRepository
+from ..repository.devices_repository import DevicesRepository
+from ..repository.metrics_repository import MetricsRepository
+from ..repository.stats_repository import StatsRepository, minute_of
+from ..repository.telemetry_repository import TelemetryRepository
+from .alert_evaluation_service import AlertEvaluationService
+
+logger = logging.getLogger(__name__)
+
+class IngestService:
+    """Ingesta por lotes de lecturas y telemetría (gateways, bancos de prueba)."""
+
+    def __init__(self,
+                 metrics_repo: MetricsRepository | None = None,
+                 telemetry_repo: TelemetryRepository | None = None,
+                 devices_repo: DevicesRepository | None = None,
+                 alerts_service: AlertEvaluationService | None = None,
+                 stats_repo: StatsRepository | None = None,
+                 last_seen_repo: DeviceLastSeenRepository | None = None):
+        self.metrics_repo = metrics_repo or MetricsRepository()
+        self.telemetry_repo = telemetry_repo or TelemetryRepository()
+        self.devices_repo = devices_repo or DevicesRepository()
+        self.alerts_service = alerts_service or AlertEvaluationService()
+        self.stats_repo = stats_repo or StatsRepository()
+        self.last_seen_repo = last_seen_repo or DeviceLastSeenRepository()
+
+    def _ensure_device(self, device_id: int):
+        dev = self.devices_repo.get_by_id(device_id)
+        if not dev:
+            abort(404, description="Device not found")
+        return dev
+
+    @staticmethod
+    def _prepare(device_id: int, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # Orden por ts: inserciones contiguas en el índice (device_id, ts)
+        for r in rows:
+            r["device_id"] = device_id
+        rows.sort(key=lambda r: r["ts"])
+        return rows
+
+    def _record_contact(self, device_id: int, counter: str, rows: List[Dict[str, Any]]) -> None:
+        """
+        Último contacto del dispositivo (con la lectura o telemetría más reciente del
+        lote, ya ordenado por ts) y contador por minuto del panel (misma transacción).
+        """
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        if counter == "readings":
+            self.last_seen_repo.record_readings(now, {device_id: rows[-1]["ts"]})
+        else:
+            self.last_seen_repo.record_telemetry({device_id: now}, {device_id: rows[-1]})
+        self.stats_repo.increment({(counter, minute_of(now)): len(rows)})
+
+    def _evaluate_alerts(self, patient_id: int, rows: List[Dict[str, Any]]) -> None:
+        """
+        Evalúa alertas en un SAVEPOINT: si falla, se registra el error y las lecturas
+        se guardan igual (no se pierde el lote por un problema en las alertas).
+        """
+        try:
+            with db.session.begin_nested():
+                self.alerts_service.evaluate_readings(patient_id, rows)
+        except Exception as e:
+            logger.error(f"Error al evaluar alertas del paciente {patient_id}: {e}", exc_info=True)
+
+    def ingest_readings(self, device_id: int, rows: List[Dict[str, Any]]) -> int:
+        """Inserta un lote de lecturas ya validado (y evalúa sus alertas) en una sola transacción."""
+        dev = self._ensure_device(device_id)
+        rows = self._prepare(device_id, rows)
+        try:
+            count = self.metrics_repo.bulk_insert(rows)
+            self._record_contact(device_id, "readings", rows)
+            if dev.patient_id:
+                self._evaluate_alerts(dev.patient_id, rows)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error en ingesta batch de lecturas (device {device_id}): {e}")
+            raise
+        return count
+
+    def ingest_telemetry(self, device_id: int, rows: List[Dict[str, Any]]) -> int:
+        """Inserta un lote de telemetría ya validado en una sola transacción."""
+        self._ensure_device(device_id)
+        rows = self._prepare(device_id, rows)
+        try:
+            count = self.telemetry_repo.bulk_insert(rows)
+            self._record_contact(device_id, "telemetry", rows)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error en ingesta batch de telemetría (device {device_id}): {e}")
+            raise
+        return count
@@ -0,0 +1,48 @@
+# backend/app/services/jobs_service.py
+
+import logging
+import os
+from typing import Any, Dict, Optional
+from flask import current_app
+from ..repository.jobs_repository import JobsRepository
+from ..model.models import Job
+from ..jobs import JOB_HANDLERS
+
+logger = logging.getLogger(__name__)
+
+
+class JobLimitError(Exception):
+    """El usuario alcanzó el máximo de jobs en cola/ejecución."""
+
+
+class JobsService:
+    def __init__(self, repo: JobsRepository | None = None):
+        self.repo = repo or JobsRepository()
+
+    def submit(self, kind: str, params: Optional[Dict[str, Any]] = None,
+               user_id: Optional[int] = None) -> Job:
+        """
+        Encola un job para el worker (`flask jobs worker`). No ejecuta nada en el request.
+
+        Lanza ValueError si el tipo no existe y JobLimitError si el usuario ya tiene
+        JOBS_MAX_PENDING_PER_USER jobs pendientes.
+        """
+        if kind not in JOB_HANDLERS:
+            raise ValueError(f"Tipo de job desconocido: {kind}.")
+        if user_id is not None:
+            limit = current_app.config["JOBS_MAX_PENDING_PER_USER"]
+            if self.repo.count_pending_for_user(user_id) >= limit:
+                raise JobLimitError(f"Máximo de {limit} jobs pendientes por usuario.")
+        job = self.repo.create(kind, params or {}, requested_by=user_id)
+        logger.info(f"Job {job.id} ({kind}) encolado por user {user_id}.")
+        return job
+
+    def get(self, job_id: int) -> Optional[Job]:
+        """Obtiene el estado de un job."""
+        return self.repo.get(job_id)
+
+    def result_file(self, job: Job) -> Optional[str]:
+        """Ruta del archivo de resultado si el job terminó bien y no venció."""
+        if job.status != "succeeded" or not job.result_path:
+            return None
+        return job.result_path if os.path.exists(job.result_path) else None
@@ -2,7 +2,7 @@
 
 import logging
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional, Sequence, Tuple
 from ..repository.metrics_repository import MetricsRepository
 from ..model.models import Reading
 
@@ -40,4 +40,25 @@ class MetricsService:
             # --- FIN DEL CÓDIGO REAL ---
         except Exception as e:
             logger.error(f"Error al obtener la última lectura para device {device_id}: {e}")
-            return None
\ No newline at end of file
+            return None
+
+    # --- NUEVO: Historial y últimas lecturas de todos los dispositivos de un paciente ---
+    def list_range_for_devices(self, device_ids: Sequence[int],
+                               dt_from: Optional[datetime] = None,
+                               dt_to: Optional[datetime] = None,
+                               limit: int = 1000,
+                               before: Optional[Tuple[datetime, int]] = None) -> List[Reading]:
+        """Obtiene lecturas de varios dispositivos ordenadas por fecha (keyset con `before`)."""
+        try:
+            return self.repo.list_range_for_devices(device_ids, dt_from, dt_to, limit, before)
+        except Exception as e:
+            logger.error(f"Error al obtener rango de lecturas para devices {list(device_ids)}: {e}")
+            return []
+
+    def get_latest_readings(self, device_ids: Sequence[int]) -> Dict[int, Reading]:
+        """Obtiene la última lectura de cada dispositivo indicado."""
+        try:
+            return self.repo.get_latest_for_devices(device_ids)
+        except Exception as e:
+            logger.error(f"Error al obtener últimas lecturas para devices {list(device_ids)}: {e}")
+            return {}
@@ -0,0 +1,65 @@
+# backend/app/services/notifications_service.py
+
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Mapping, Tuple
+from flask import current_app
+from ..alerts.state_machine import severity_rank
+from ..model.models import Alert
+from ..notifications.channels import routes_from_config
+from ..repository.notification_outbox_repository import NotificationOutboxRepository
+
+logger = logging.getLogger(__name__)
+
+# Efectos de la máquina de estados que ameritan avisar (si la severidad alcanza el mínimo)
+NOTIFY_EVENTS = ("open", "reopen", "escalate")
+
+
+def _iso(ts) -> str | None:
+    return ts.isoformat() if ts is not None else None
+
+
+def alert_payload(alert: Alert) -> Dict[str, Any]:
+    """Lo que viaja en la notificación: una foto de la alerta al momento del evento."""
+    return {
+        "alert_id": alert.id,
+        "patient_id": alert.patient_id,
+        "metric": alert.metric,
+        "type": alert.type,
+        "severity": alert.severity,
+        "ts": _iso(alert.ts),
+        "last_seen_at": _iso(alert.last_seen_at),
+        "peak_value": float(alert.peak_value) if alert.peak_value is not None else None,
+        "message": alert.message,
+        "escalation_level": alert.escalation_level or 0,
+    }
+
+
+class NotificationsService:
+    def __init__(self, repo: NotificationOutboxRepository | None = None):
+        self.repo = repo or NotificationOutboxRepository()
+
+    def enqueue_alerts(self, events: Iterable[Tuple[Alert, str]],
+                       config: Mapping[str, Any] | None = None) -> int:
+        """
+        Encola una notificación por destino configurado para cada (alerta, evento)
+        con severidad >= NOTIFY_MIN_SEVERITY. No hace commit ni envía nada: va en la
+        transacción del llamador y la entrega queda para el worker.
+        Devuelve las filas encoladas.
+        """
+        config = config or current_app.config
+        routes = routes_from_config(config)
+        if not routes:
+            return 0
+        min_rank = severity_rank(config.get("NOTIFY_MIN_SEVERITY", "high"))
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        rows = []
+        for alert, event in events:
+            if alert.id is None or severity_rank(alert.severity) < min_rank:
+                continue
+            payload = alert_payload(alert)
+            rows.extend({"alert_id": alert.id, "event": event, "channel": ch, "recipient": to,
+                         "payload": payload, "next_attempt_at": now}
+                        for ch, to in routes)
+        self.repo.enqueue(rows)
+        return len(rows)
@@ -1,21 +1,86 @@
 # backend/app/services/patients_service.py
 
 import logging
+import re
 from typing import List, Optional, Dict, Any
+from ..config import Config
+from ..repository.cache_versions_repository import CacheVersionsRepository
+from ..repository.devices_repository import DevicesRepository
 from ..repository.patients_repository import PatientsRepository
-from ..model.models import Patient
+from ..repository.unit_of_work import unit_of_work
+from ..model.models import Job, Patient
 from ..extensions import db
+from ..search import SubstringIndex, normalize, search_terms
+from .jobs_service import JobsService
 
 logger = logging.getLogger(__name__)
 
+SEARCH_INDEX_NAME = "patients"
+_SEARCH_FIELDS = {"first_name", "last_name", "email", "phone"}
+_NON_DIGITS = re.compile(r"\D")
+
+
+def _search_text(first_name: str, last_name: str, email: Optional[str], phone: Optional[str]) -> str:
+    """
+    Texto buscable de un paciente: nombre completo, email y teléfono (también solo
+    dígitos). Separados por espacios: un término no tiene espacios, así que nunca
+    coincide cruzando de un campo a otro.
+    """
+    phone = phone or ""
+    return normalize(f"{first_name} {last_name} {email or ''} {phone} {_NON_DIGITS.sub('', phone)}")
+
+
+def bump_search_index() -> None:
+    """Publica un cambio de nombre/email/teléfono (en la transacción actual, sin commit)."""
+    CacheVersionsRepository.bump(SEARCH_INDEX_NAME)
+
+
+# Índice por worker; altas, cambios y purgas incrementan cache_versions('patients')
+_search_index = SubstringIndex(SEARCH_INDEX_NAME,
+                               loader=lambda: [(pid, _search_text(*fields))
+                                               for pid, *fields in PatientsRepository.search_rows()],
+                               version_loader=lambda: CacheVersionsRepository.get(SEARCH_INDEX_NAME),
+                               check_every=Config.CACHE_VERSION_CHECK_S)
+
+
 class PatientsService:
-    def __init__(self, repo: PatientsRepository | None = None):
+    def __init__(self, repo: PatientsRepository | None = None,
+                 devices_repo: DevicesRepository | None = None,
+                 search_index: SubstringIndex | None = None):
         self.repo = repo or PatientsRepository()
+        self.devices_repo = devices_repo or DevicesRepository()
+        self.search_index = search_index if search_index is not None else _search_index
 
     def list_patients(self) -> List[Patient]:
         """Lista todos los pacientes."""
         return self.repo.list()
 
+    def search(self, query: Optional[str] = None, limit: int = 50, cursor: Optional[int] = None,
+               ids: Optional[List[int]] = None) -> Dict[str, Any]:
+        """
+        Página del listado de pacientes (id descendente), solo con las columnas de la
+        vista. `query` filtra por subcadena de nombre, email o teléfono (sin distinguir
+        mayúsculas ni tildes; con varias palabras deben aparecer todas) usando el
+        índice en memoria; sin `query` es un recorrido keyset de la PK. `cursor` es el
+        `next_cursor` de la página anterior. `ids` trae esos pacientes en una sola
+        página (ignora `query` y `cursor`).
+        """
+        terms = search_terms(query)
+        if ids:
+            rows = self.repo.list_page(len(ids), ids=ids)
+            last_id = None
+        elif terms:
+            ids = self.search_index.search(terms, limit + 1, after_id=cursor)
+            rows = self.repo.list_page(limit, ids=ids[:limit])
+            last_id = ids[limit - 1] if len(ids) > limit else None
+        else:
+            rows = self.repo.list_page(limit + 1, after_id=cursor)
+            last_id = rows[limit - 1].id if len(rows) > limit else None
+            rows = rows[:limit]
+        items = [{"id": r.id, "full_name": f"{r.first_name} {r.last_name}".strip(),
+                  "email": r.email, "phone": r.phone, "birthdate": r.birthdate} for r in rows]
+        return {"items": items, "next_cursor": str(last_id) if last_id is not None else None}
+
     def get(self, patient_id: int) -> Optional[Patient]:
         """Obtiene un paciente por su ID."""
         return self.repo.get(patient_id)
@@ -53,20 +118,24 @@ class PatientsService:
              raise ValueError(f"El usuario {user_id} ya tiene un perfil de paciente asociado.")
 
         try:
-            return self.repo.create(
-                first_name=first_name,
-                last_name=last_name,
-                email=email,
-                phone=phone,
-                birthdate=birthdate,
-                sex=sex,
-                height_cm=height_cm,
-                weight_kg=weight_kg,
-                user_id=user_id,
-            )
+            with unit_of_work():
+                patient = self.repo.create(
+                    first_name=first_name,
+                    last_name=last_name,
+                    email=email,
+                    phone=phone,
+                    birthdate=birthdate,
+                    sex=sex,
+                    height_cm=height_cm,
+                    weight_kg=weight_kg,
+                    user_id=user_id,
+                )
+                bump_search_index()
         except Exception as e:
              logger.error(f"Error en repositorio al crear paciente para user_id {user_id}: {e}")
              raise e
+        self.search_index.invalidate()
+        return patient
 
     def update(self, patient_id: int, data: Dict[str, Any]) -> Optional[Patient]:
         """Actualiza los datos de un paciente existente."""
@@ -76,22 +145,27 @@ class PatientsService:
 
         try:
             # Llama al método update del repositorio
-            return self.repo.update(patient, data) # Usa el repo
+            with unit_of_work():
+                patient = self.repo.update(patient, data) # Usa el repo
+                if _SEARCH_FIELDS & set(data):
+                    bump_search_index()
         except Exception as e:
             logger.error(f"Error al actualizar paciente {patient_id}: {e}")
             db.session.rollback()
             return None
+        self.search_index.invalidate()
+        return patient
 
-    def delete(self, patient_id: int) -> bool:
-        """Elimina un paciente."""
-        patient = self.repo.get(patient_id)
-        if not patient:
-            return False
-
-        try:
-            # Llama al método delete del repositorio
-            return self.repo.delete(patient) # Usa el repo
-        except Exception as e:
-            logger.error(f"Error al eliminar paciente {patient_id}: {e}")
-            db.session.rollback()
-            return False
\ No newline at end of file
+    def schedule_delete(self, patient_id: int, requested_by: int | None = None) -> Optional[Job]:
+        """
+        Desasigna ya las bandas del paciente (dejan de generarle lecturas y alertas) y
+        encola el job 'purge_patient', que borra alertas y resúmenes por lotes y luego
+        el paciente. Devuelve el job, o None si el paciente no existe.
+        """
+        if not self.repo.get(patient_id):
+            return None
+        with unit_of_work():
+            self.devices_repo.unassign_patient(patient_id)
+            job = JobsService().submit("purge_patient", {"patient_id": patient_id}, user_id=requested_by)
+        logger.info(f"Paciente {patient_id}: purga en el job {job.id}.")
+        return job
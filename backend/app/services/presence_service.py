@@ -0,0 +1,108 @@
+# backend/app/services/presence_service.py
+
+import logging
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Mapping
+from flask import current_app
+from ..extensions import db
+from ..model.models import Alert, Device, DeviceLastSeen
+from ..repository.alert_pending_counts_repository import AlertPendingCountsRepository, pending_key, track_move
+from ..repository.alerts_repository import AlertsRepository
+from ..repository.device_last_seen_repository import DeviceLastSeenRepository
+from ..repository.stats_repository import StatsRepository, alert_stats_key
+from ..repository.unit_of_work import unit_of_work
+from .notifications_service import NotificationsService
+
+logger = logging.getLogger(__name__)
+
+
+def offline_metric(device_id: int) -> str:
+    """Alert.metric de las alertas de presencia (un episodio abierto por banda)."""
+    return f"offline:{device_id}"
+
+
+def is_online(last_seen_at: datetime, timeout_s: int, now: datetime) -> bool:
+    return last_seen_at >= now - timedelta(seconds=timeout_s)
+
+
+class PresenceService:
+    """Transiciones online/offline de los dispositivos (lo llama app/presence/sweeper.py)."""
+
+    def __init__(self,
+                 repo: DeviceLastSeenRepository | None = None,
+                 alerts_repo: AlertsRepository | None = None,
+                 pending_repo: AlertPendingCountsRepository | None = None,
+                 stats_repo: StatsRepository | None = None,
+                 notifications: NotificationsService | None = None):
+        self.repo = repo or DeviceLastSeenRepository()
+        self.alerts_repo = alerts_repo or AlertsRepository()
+        self.pending_repo = pending_repo or AlertPendingCountsRepository()
+        self.stats_repo = stats_repo or StatsRepository()
+        self.notifications = notifications or NotificationsService()
+
+    def sweep(self, now: datetime | None = None, config: Mapping[str, Any] | None = None) -> Dict[str, List[int]]:
+        """
+        Compara el último contacto de cada dispositivo con su silencio tolerado
+        (devices.offline_after_s o PRESENCE_OFFLINE_AFTER_S) y registra las
+        transiciones. Una transacción por barrido; las filas que cambian se bloquean y
+        se vuelven a evaluar, así dos sweepers no emiten la misma transición dos veces.
+        Devuelve {"online": [device_id, ...], "offline": [...]}.
+        """
+        config = config or current_app.config
+        now = now or datetime.now(timezone.utc).replace(tzinfo=None)
+        default_timeout = config["PRESENCE_OFFLINE_AFTER_S"]
+        candidates = [r.device_id for r in self.repo.list_presence()
+                      if is_online(r.last_seen_at, r.offline_after_s or default_timeout, now) != r.online]
+        db.session.commit()  # no dejar abierta la transacción de lectura entre barridos
+        changed: Dict[str, List[int]] = {"online": [], "offline": []}
+        if not candidates:
+            return changed
+
+        pending: Counter = Counter()
+        stats: Counter = Counter()
+        events = []
+        with unit_of_work():
+            for presence, device in self.repo.lock_presence(candidates):
+                online = is_online(presence.last_seen_at, device.offline_after_s or default_timeout, now)
+                if online == presence.online:
+                    continue  # otro sweeper ya la cambió o llegó un contacto
+                presence.online = online
+                presence.online_changed_at = now
+                changed["online" if online else "offline"].append(device.id)
+                if config["PRESENCE_ALERTS"] and device.patient_id is not None:
+                    alert = self._alert_transition(device, presence, online, now, config)
+                    if alert is not None:
+                        track_move(pending, None, pending_key(alert))
+                        track_move(stats, None, alert_stats_key(alert))
+                        events.append((alert, "open"))
+            db.session.flush()  # asigna id a las alertas nuevas (outbox)
+            self.pending_repo.apply(pending)
+            self.stats_repo.increment(stats)
+            self.notifications.enqueue_alerts(events, config)
+        for state, ids in changed.items():
+            if ids:
+                logger.info(f"{len(ids)} dispositivos pasaron a {state}: {ids[:20]}")
+        return changed
+
+    def _alert_transition(self, device: Device, presence: DeviceLastSeen, online: bool, now: datetime,
+                          config: Mapping[str, Any]) -> Alert | None:
+        """
+        Offline: abre una alerta 'custom' del paciente (si no hay una abierta de la
+        misma banda). Online: resuelve la abierta; no la reconoce, eso lo hace un admin.
+        Devuelve la alerta nueva, o None.
+        """
+        metric = offline_metric(device.id)
+        open_alert = self.alerts_repo.get_open(device.patient_id, metric)
+        if online:
+            if open_alert is not None:
+                open_alert.resolved_at = now
+            return None
+        if open_alert is not None:
+            return None
+        alert = Alert(patient_id=device.patient_id, metric=metric, ts=now, type="custom",
+                      severity=config["PRESENCE_ALERT_SEVERITY"], last_seen_at=presence.last_seen_at,
+                      message=f"Banda {device.serial} sin contacto desde "
+                              f"{presence.last_seen_at:%Y-%m-%d %H:%M} UTC")
+        db.session.add(alert)
+        return alert
@@ -0,0 +1,68 @@
+# backend/app/services/stats_service.py
+
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict
+from ..alerts.state_machine import SEVERITIES
+from ..cache import TTLCache
+from ..config import Config
+from ..repository.alert_pending_counts_repository import AlertPendingCountsRepository
+from ..repository.device_last_seen_repository import DeviceLastSeenRepository
+from ..repository.stats_repository import StatsRepository, minute_of
+
+logger = logging.getLogger(__name__)
+
+# Ventanas de "alertas recientes" del panel
+ALERT_WINDOWS = {"1h": timedelta(hours=1), "24h": timedelta(hours=24), "7d": timedelta(days=7)}
+ONLINE_WINDOW = timedelta(minutes=5)
+READINGS_SERIES_MINUTES = 60
+
+# Un único cálculo por worker cada STATS_CACHE_TTL_S: un panel que refresca cada pocos
+# segundos (o varios a la vez) lee de memoria.
+_cache = TTLCache(ttl=Config.STATS_CACHE_TTL_S, maxsize=8)
+
+
+class StatsService:
+    """KPIs del panel de admin a partir de contadores mantenidos al ingerir / crear alertas."""
+
+    def __init__(self,
+                 repo: StatsRepository | None = None,
+                 pending_repo: AlertPendingCountsRepository | None = None,
+                 last_seen_repo: DeviceLastSeenRepository | None = None,
+                 cache: TTLCache | None = None):
+        self.repo = repo or StatsRepository()
+        self.pending_repo = pending_repo or AlertPendingCountsRepository()
+        self.last_seen_repo = last_seen_repo or DeviceLastSeenRepository()
+        self.cache = cache if cache is not None else _cache
+
+    def dashboard(self) -> Dict[str, Any]:
+        """Estadísticas del panel (desde la caché si tienen menos de STATS_CACHE_TTL_S)."""
+        return self.cache.get_or_set("dashboard", self._compute)
+
+    def _compute(self) -> Dict[str, Any]:
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        names = [f"alerts.{s}" for s in SEVERITIES]
+        windows = {label: minute_of(now - span) for label, span in ALERT_WINDOWS.items()}
+        totals = self.repo.totals_by_window(names, windows)
+        alerts = {label: {s: totals[label][f"alerts.{s}"] for s in SEVERITIES} for label in ALERT_WINDOWS}
+
+        # Serie por minuto (con ceros en los minutos sin lecturas); el minuto en curso va al final
+        start = minute_of(now) - timedelta(minutes=READINGS_SERIES_MINUTES - 1)
+        per_minute = dict(self.repo.series("readings", start))
+        series = [{"minute": (start + timedelta(minutes=i)).isoformat(),
+                   "count": per_minute.get(start + timedelta(minutes=i), 0)}
+                  for i in range(READINGS_SERIES_MINUTES)]
+
+        by_status = self.repo.devices_by_status()
+        return {
+            "generated_at": now.isoformat(),
+            "patients": {"total": self.repo.count_patients()},
+            "devices": {
+                "total": sum(by_status.values()),
+                "by_status": by_status,
+                "seen_last_5m": self.last_seen_repo.count_since(now - ONLINE_WINDOW),
+            },
+            "alerts": alerts,
+            "alerts_pending": self.pending_repo.counts(),
+            "readings_per_minute": series,
+        }
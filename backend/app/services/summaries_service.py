@@ -0,0 +1,79 @@
+# backend/app/services/summaries_service.py
+
+import logging
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Dict, List, Optional
+from ..repository.summaries_repository import SummariesRepository
+from ..extensions import db
+
+logger = logging.getLogger(__name__)
+
+class SummariesService:
+    def __init__(self, repo: SummariesRepository | None = None):
+        self.repo = repo or SummariesRepository()
+
+    @staticmethod
+    def yesterday() -> date:
+        """Día anterior (UTC), el que calcula el job nocturno."""
+        return datetime.now(timezone.utc).date() - timedelta(days=1)
+
+    def build_day(self, day: date) -> int:
+        """
+        Calcula y guarda el resumen de `day` para TODOS los pacientes con datos.
+
+        Son tres agregaciones GROUP BY (readings, telemetría, alertas) sobre el rango
+        del día más un reemplazo multi-fila; el costo no depende del número de pacientes
+        en consultas, solo en filas escaneadas dentro del rango del día.
+        """
+        dt_from = datetime.combine(day, time.min)
+        dt_to = dt_from + timedelta(days=1)
+
+        readings = self.repo.aggregate_readings(dt_from, dt_to)
+        wear = self.repo.aggregate_wear(dt_from, dt_to)
+        alerts = self.repo.aggregate_alerts(dt_from, dt_to)
+
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        rows: List[Dict[str, Any]] = []
+        for patient_id in sorted(set(readings) | set(wear) | set(alerts)):
+            r = readings.get(patient_id, {})
+            a = alerts.get(patient_id, {})
+            rows.append({
+                "day": day,
+                "patient_id": patient_id,
+                "readings_count": r.get("readings_count", 0),
+                "resting_hr_bpm": r.get("resting_hr_bpm"),
+                "min_spo2_pct": r.get("min_spo2_pct"),
+                "max_temp_c": r.get("max_temp_c"),
+                "minutes_out_of_range": r.get("minutes_out_of_range", 0),
+                "alerts_total": a.get("alerts_total", 0),
+                "alerts_high": a.get("alerts_high", 0),
+                "wear_minutes": wear.get(patient_id, 0),
+                "computed_at": now,
+            })
+
+        try:
+            count = self.repo.replace_day(day, rows)
+        except Exception as e:
+            logger.error(f"Error al guardar resúmenes diarios de {day}: {e}")
+            db.session.rollback()
+            raise
+        logger.info(f"Resumen diario {day}: {count} pacientes.")
+        return count
+
+    def backfill(self, day_from: date, day_to: date) -> int:
+        """Recalcula los resúmenes de cada día en [day_from, day_to]. Devuelve el total de filas."""
+        total = 0
+        day = day_from
+        while day <= day_to:
+            total += self.build_day(day)
+            day += timedelta(days=1)
+        return total
+
+    def list_for_day(self, day: date, page: int = 1, per_page: int = 100,
+                     patient_id: Optional[int] = None) -> List[Any]:
+        """Lista los resúmenes de un día (una sola consulta indexada)."""
+        try:
+            return self.repo.list_by_day(day, page=page, per_page=per_page, patient_id=patient_id)
+        except Exception as e:
+            logger.error(f"Error al listar resúmenes diarios de {day}: {e}")
+            return []
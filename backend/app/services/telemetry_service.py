@@ -1,6 +1,7 @@
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Optional, List
 from flask import abort
+from ..presence import PresenceTracker, tracker
 from ..repository.telemetry_repository import TelemetryRepository
 from ..repository.devices_repository import DevicesRepository
 from ..model.models import DeviceTelemetry
@@ -8,9 +9,11 @@ from ..model.models import DeviceTelemetry
 class TelemetryService:
     def __init__(self,
                  repo: TelemetryRepository | None = None,
-                 devices_repo: DevicesRepository | None = None):
+                 devices_repo: DevicesRepository | None = None,
+                 presence: PresenceTracker | None = None):
         self.repo = repo or TelemetryRepository()
         self.devices_repo = devices_repo or DevicesRepository()
+        self.presence = presence or tracker
 
     def _ensure_device(self, device_id: int):
         dev = self.devices_repo.get_by_id(device_id)
@@ -20,7 +23,12 @@ class TelemetryService:
 
     def create(self, device_id: int, payload: dict) -> DeviceTelemetry:
         self._ensure_device(device_id)
-        return self.repo.create(device_id, payload)
+        tel = self.repo.create(device_id, payload)
+        # Presencia en memoria: device_last_seen se escribe coalescido fuera del request
+        ts = tel.ts.astimezone(timezone.utc).replace(tzinfo=None) if tel.ts.tzinfo else tel.ts
+        self.presence.seen(device_id, datetime.now(timezone.utc).replace(tzinfo=None),
+                           {"ts": ts, "battery_pct": tel.battery_pct, "rssi_dbm": tel.rssi_dbm})
+        return tel
 
     def list_by_device(self, device_id: int,
                        dt_from: Optional[datetime] = None,
@@ -1,56 +1,128 @@
-from typing import Optional
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional
 from datetime import datetime, timezone
 from decimal import Decimal
-from ..model.models import Threshold
+from ..cache import VersionedCache
+from ..config import Config
+from ..model.models import DEFAULT_THRESHOLDS, Threshold
+from ..repository.cache_versions_repository import CacheVersionsRepository
+from ..repository.unit_of_work import unit_of_work
+from .jobs_service import JobsService
 # si creaste el repo opcional:
 try:
     from ..repository.thresholds_repository import ThresholdsRepository
 except Exception:
     ThresholdsRepository = None  # por si aún no lo agregaste
 
+CACHE_NAME = "thresholds"
+_GLOBAL = "global"  # clave de caché de los umbrales globales
+
+
+@dataclass(frozen=True)
+class EffectiveThreshold:
+    """Umbral vigente de una métrica (del paciente, global o por defecto); inmutable para poder cachearlo."""
+    metric: str
+    min_value: Optional[Decimal]
+    max_value: Optional[Decimal]
+    patient_id: Optional[int] = None      # None => global o por defecto
+    id: Optional[int] = None              # None => valor por defecto (no existe fila)
+    created_at: Optional[datetime] = None
+
+    @classmethod
+    def from_row(cls, t: Threshold) -> "EffectiveThreshold":
+        return cls(metric=t.metric, min_value=t.min_value, max_value=t.max_value,
+                   patient_id=t.patient_id, id=t.id, created_at=t.created_at)
+
+    @classmethod
+    def default(cls, metric: str) -> "EffectiveThreshold":
+        d = DEFAULT_THRESHOLDS.get(metric, {"min": None, "max": None})
+        return cls(
+            metric=metric,
+            min_value=(Decimal(str(d.get("min"))) if d.get("min") is not None else None),
+            max_value=(Decimal(str(d.get("max"))) if d.get("max") is not None else None),
+            created_at=datetime.now(timezone.utc),
+        )
+
+
+# Caché por worker: paciente -> {métrica: umbral propio} y _GLOBAL -> {métrica: umbral global}.
+# upsert_thresholds incrementa cache_versions('thresholds') y los demás workers la vacían.
+_cache = VersionedCache(CACHE_NAME, ttl=Config.THRESHOLDS_CACHE_TTL_S,
+                        check_every=Config.CACHE_VERSION_CHECK_S,
+                        version_loader=lambda: CacheVersionsRepository.get(CACHE_NAME))
+
+
 class ThresholdsService:
-    def __init__(self, repo: Optional["ThresholdsRepository"] = None):
+    def __init__(self, repo: Optional["ThresholdsRepository"] = None, cache: Optional[VersionedCache] = None):
         self.repo = repo or (ThresholdsRepository() if ThresholdsRepository else None)
+        self.cache = cache if cache is not None else _cache
 
-    def get_thresholds(self, patient_id: Optional[int], metric: str) -> Threshold:
+    def get_thresholds(self, patient_id: Optional[int], metric: str) -> EffectiveThreshold:
         """
-        Obtiene un objeto Threshold desde el repositorio. Si no existe, devuelve un
-        objeto Threshold temporal (no persistido) con valores por defecto.
+        Umbral vigente de una métrica: el específico del paciente, si no el global
+        (patient_id=None) y si tampoco existe, uno temporal con valores por defecto.
+        """
+        found = self.effective_thresholds(patient_id).get(metric)
+        return found or EffectiveThreshold.default(metric)
+
+    def effective_thresholds(self, patient_id: Optional[int]) -> Dict[str, EffectiveThreshold]:
+        """Umbrales vigentes de todas las métricas de un paciente (o los globales con None)."""
+        if patient_id is None:
+            return self._resolve({}, self._load([])[_GLOBAL])
+        return self.effective_thresholds_many([patient_id])[patient_id]
 
-        También realiza fallback a umbral global (patient_id=None) cuando se solicita
-        uno específico de paciente y no existe.
+    def effective_thresholds_many(self, patient_ids: Iterable[int]) -> Dict[int, Dict[str, EffectiveThreshold]]:
+        """
+        Igual que effective_thresholds para N pacientes. Lo que no está en caché se
+        trae en UNA consulta (filas de esos pacientes + globales).
         """
-        # Si existe repositorio, intenta obtener primero el umbral específico
+        ids = list(dict.fromkeys(patient_ids))
+        rows = self._load(ids)
+        return {pid: self._resolve(rows[pid], rows[_GLOBAL]) for pid in ids}
+
+    def _load(self, patient_ids: list) -> Dict:
+        """{pid | _GLOBAL: {métrica: EffectiveThreshold}} con las filas propias de cada uno."""
+        keys = [*patient_ids, _GLOBAL]
+        found = self.cache.get_many(keys)
+        generation = self.cache.generation
+        missing = [k for k in keys if k not in found]
+        if not missing:
+            return found
+        loaded: Dict = {k: {} for k in missing}
         if self.repo:
-            t: Optional[Threshold] = self.repo.get(patient_id, metric)
-            if t:
-                return t
-
-            # Fallback: intenta obtener el umbral global si no hay específico
-            t_global: Optional[Threshold] = self.repo.get(None, metric)
-            if t_global:
-                return t_global
-
-        # Si no hay repo o no se encontró nada, construye un Threshold temporal con defaults
-        defaults = {
-            "heart_rate": {"min": 50, "max": 120},
-            "temperature": {"min": 35.5, "max": 38.0},
-            "spo2": {"min": 92, "max": 100},
-        }
-
-        d = defaults.get(metric, {"min": None, "max": None})
-        # Para defaults globales, marcamos patient_id=None para indicar que es global
-        temp_patient_id = None if patient_id is not None else patient_id
-        return Threshold(
-            patient_id=temp_patient_id,
-            metric=metric,
-            min_value=(Decimal(str(d.get("min"))) if d.get("min") is not None else None),
-            max_value=(Decimal(str(d.get("max"))) if d.get("max") is not None else None),
-            created_at=datetime.now(timezone.utc)
-        )
+            pids = [k for k in missing if k != _GLOBAL]
+            for t in self.repo.list_for_patients(pids, include_global=_GLOBAL in loaded):
+                loaded[t.patient_id if t.patient_id is not None else _GLOBAL][t.metric] = EffectiveThreshold.from_row(t)
+        self.cache.set_many(loaded, generation=generation)
+        return {**found, **loaded}
+
+    @staticmethod
+    def _resolve(own: Dict[str, EffectiveThreshold],
+                 global_: Dict[str, EffectiveThreshold]) -> Dict[str, EffectiveThreshold]:
+        return {m: own.get(m) or global_.get(m) or EffectiveThreshold.default(m) for m in DEFAULT_THRESHOLDS}
 
     def upsert_thresholds(self, patient_id: int | None, metric: str,
-                          min_value=None, max_value=None) -> Optional[Threshold]:
+                          min_value=None, max_value=None,
+                          reevaluate_hours: int | None = None,
+                          requested_by: int | None = None) -> Optional[Threshold]:
+        """
+        Crea o actualiza un umbral. Con `reevaluate_hours` encola además el job
+        'alerts_reevaluate' (las alertas de las últimas N horas se concilian con el
+        nuevo umbral en segundo plano); su id queda en `threshold.reevaluation_job_id`.
+
+        Umbral, versión de la caché y job se guardan en la misma transacción: si el job
+        no se puede encolar (JobLimitError), el umbral tampoco cambia.
+        """
         if not self.repo:
             raise RuntimeError("ThresholdsRepository no disponible.")
-        return self.repo.upsert(patient_id, metric, min_value, max_value)
+        job = None
+        with unit_of_work():
+            threshold = self.repo.upsert(patient_id, metric, min_value, max_value)
+            CacheVersionsRepository.bump(CACHE_NAME)  # los demás workers descartan su caché
+            if reevaluate_hours:
+                job = JobsService().submit("alerts_reevaluate",
+                                           {"metric": metric, "hours": reevaluate_hours, "patient_id": patient_id},
+                                           user_id=requested_by)
+        self.cache.invalidate()
+        if job is not None:
+            threshold.reevaluation_job_id = job.id
+        return threshold
@@ -0,0 +1,97 @@
+# backend/benchmarks/alert_engine_bench.py
+
+"""
+Benchmark del AlertEngine (NumPy) contra el recorrido fila por fila con step().
+
+Uso (desde backend/):
+    python -m benchmarks.alert_engine_bench --readings 2000000 --patients 500
+
+Genera lecturas sintéticas (paseo aleatorio de HR/SpO2/temperatura cada 10 s por
+paciente), evalúa todo el lote con el motor vectorizado y una muestra con la máquina
+de estados (extrapolando su tiempo al total), y verifica que ambos den los mismos
+episodios sobre la muestra. No necesita base de datos.
+"""
+
+import argparse
+import time
+from datetime import datetime
+
+import numpy as np
+
+from app.alerts.engine import METRICS, AlertEngine, ReadingArrays, ThresholdTable
+from app.alerts.state_machine import METRIC_RULES, AlertRules, AlertStateTable, step
+
+
+def synthetic(readings: int, patients: int, seed: int = 7) -> ReadingArrays:
+    rng = np.random.default_rng(seed)
+    per = readings // patients
+    device_id = np.repeat(np.arange(1, patients + 1, dtype=np.int64), per)
+    start = np.datetime64("2026-01-01T00:00:00", "us")
+    ts = start + np.tile(np.arange(per, dtype=np.int64) * 10_000_000, patients).astype("timedelta64[us]")
+    walk = rng.normal(0, 1, size=(patients, per, len(METRICS))).cumsum(axis=1).reshape(-1, len(METRICS))
+    base = np.array([85.0, 96.0, 36.8])
+    scale = np.array([1.5, 0.15, 0.02])
+    values = np.round(base + walk * scale, 1)
+    values[rng.random(values.shape) < 0.05] = np.nan   # muestras sin dato
+    return ReadingArrays(device_id=device_id, ts=ts, values=values)
+
+
+def loop_episodes(batch: ReadingArrays, limits, rules: AlertRules) -> int:
+    """Episodios con step() fila por fila (lo que haría el camino no vectorizado)."""
+    table = AlertStateTable()
+    opened = 0
+    ts = batch.ts.astype(datetime)
+    for i in range(len(batch)):
+        pid = int(batch.device_id[i])
+        for m, metric in enumerate(METRICS):
+            v = batch.values[i, m]
+            if np.isnan(v):
+                continue
+            lo, hi = limits[pid][metric]
+            opened += step(table.get(pid, metric), ts[i], v, lo, hi, rules).count("open")
+    return opened
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--readings", type=int, default=2_000_000)
+    parser.add_argument("--patients", type=int, default=500)
+    parser.add_argument("--loop-sample", type=int, default=100_000, help="lecturas evaluadas con step()")
+    args = parser.parse_args()
+
+    rules = AlertRules()
+    t = time.perf_counter()
+    batch = synthetic(args.readings, args.patients)
+    print(f"lote sintético: {len(batch):,} lecturas, {args.patients} pacientes ({time.perf_counter() - t:.2f}s)")
+
+    limits = {pid: {"heart_rate": (50.0, 120.0), "spo2": (92.0, 100.0), "temperature": (35.5, 38.0)}
+              for pid in range(1, args.patients + 1)}
+    device_patient = {pid: pid for pid in limits}
+    table = ThresholdTable.from_limits(limits)
+    engine = AlertEngine(rules)
+
+    t = time.perf_counter()
+    alerts = engine.evaluate(batch, device_patient, table)
+    vec = time.perf_counter() - t
+    print(f"AlertEngine: {len(alerts):,} episodios en {vec:.2f}s ({len(batch) / vec:,.0f} lecturas/s)")
+
+    # Muestra: pacientes completos hasta ~loop_sample lecturas
+    per = len(batch) // args.patients
+    n_pat = max(1, min(args.patients, args.loop_sample // per))
+    cut = n_pat * per
+    sample = ReadingArrays(batch.device_id[:cut], batch.ts[:cut], batch.values[:cut])
+    order = np.argsort(sample.ts, kind="stable")
+    sample_sorted = ReadingArrays(sample.device_id[order], sample.ts[order], sample.values[order])
+    t = time.perf_counter()
+    opened = loop_episodes(sample_sorted, limits, rules)
+    loop = time.perf_counter() - t
+    expected = len(engine.evaluate(sample, device_patient, table))
+    rate = cut / loop
+    print(f"step() fila por fila: {cut:,} lecturas en {loop:.2f}s ({rate:,.0f} lecturas/s) "
+          f"-> ~{len(batch) / rate:.1f}s estimado para el lote completo")
+    print(f"speedup ~{(len(batch) / rate) / vec:.0f}x; episodios en la muestra: loop={opened} engine={expected}"
+          f" {'OK' if opened == expected else 'DIFERENTES'}")
+
+
+if __name__ == "__main__":
+    main()
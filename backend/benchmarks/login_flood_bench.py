@@ -0,0 +1,120 @@
+# backend/benchmarks/login_flood_bench.py
+
+"""
+Latencia de un endpoint liviano (GET /api/v1/auth/me) durante una ráfaga de logins,
+con el hash de contraseñas en el hilo del request ("inline", como antes) y en el
+pool de procesos acotado de app/passwords.py ("pool").
+
+Uso (desde backend/):
+    python -m benchmarks.login_flood_bench --logins 200 --threads 4
+
+Simula un worker de gunicorn con `--threads` hilos: todas las requests (los logins
+de la ráfaga y una sonda /auth/me cada `--probe-every` ms) se encolan en el mismo
+ThreadPoolExecutor y se mide la latencia de la sonda desde que se encola hasta que
+responde. Usa un SQLite propio en var/ y no aplica el límite por IP / email (mide
+solo el efecto del hashing).
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.security import generate_password_hash
+
+from app import Config, create_app
+from app.controller import auth_controller
+from app.extensions import db
+from app.model.models import User
+from app.passwords import PasswordHasher
+
+EMAIL, PASSWORD = "bench@vitalband.local", "Bench123!"
+
+
+def make_app(path: str):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{path}"
+        SQLALCHEMY_ENGINE_OPTIONS = {}
+        LOGIN_RATE_PER_IP_PER_MIN = 0
+        LOGIN_RATE_PER_EMAIL_PER_MIN = 0
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        db.session.add(User(name="Bench", email=EMAIL, role="admin",
+                            pass_hash=generate_password_hash(PASSWORD, Config.PASSWORD_HASH_METHOD)))
+        db.session.commit()
+    return app
+
+
+def run(app, hasher: PasswordHasher, logins: int, threads: int, probe_every: float) -> dict:
+    auth_controller._auth_service.hasher = hasher
+    local = threading.local()
+
+    def request(method: str, url: str, **kw):
+        if not hasattr(local, "client"):
+            local.client = app.test_client()
+        return getattr(local.client, method)(url, **kw).status_code
+
+    token = app.test_client().post("/api/v1/auth/login", json={"email": EMAIL, "password": PASSWORD}).get_json()
+    headers = {"Authorization": "Bearer " + token["access_token"]}
+    request_pool = ThreadPoolExecutor(max_workers=threads)
+    for _ in range(threads * 2):    # calienta la caché de identidad y el pool de procesos
+        request_pool.submit(request, "get", "/api/v1/auth/me", headers=headers).result()
+
+    probes = []
+    start = time.perf_counter()
+    flood = [request_pool.submit(request, "post", "/api/v1/auth/login", json={"email": EMAIL, "password": PASSWORD})
+             for _ in range(logins)]
+    while not all(f.done() for f in flood):
+        queued = time.perf_counter()
+        probe = request_pool.submit(request, "get", "/api/v1/auth/me", headers=headers)
+        probe.add_done_callback(lambda _, t=queued: probes.append(time.perf_counter() - t))
+        time.sleep(probe_every)
+    elapsed = time.perf_counter() - start
+    statuses = [f.result() for f in flood]
+    request_pool.shutdown(wait=True)
+    hasher.shutdown()
+    probes.sort()
+    return {
+        "flood_s": elapsed,
+        "ok": statuses.count(200),
+        "rejected": statuses.count(429),
+        "probe_p50_ms": statistics.median(probes) * 1000,
+        "probe_p95_ms": probes[int(len(probes) * 0.95) - 1] * 1000,
+        "probe_max_ms": probes[-1] * 1000,
+        "probes": len(probes),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=4, help="hilos del worker simulado")
+    parser.add_argument("--probe-every", type=float, default=20, help="ms entre sondas /auth/me")
+    parser.add_argument("--workers", type=int, default=Config.PASSWORD_HASH_WORKERS)
+    parser.add_argument("--max-pending", type=int, default=Config.PASSWORD_HASH_MAX_PENDING)
+    args = parser.parse_args()
+
+    os.makedirs("var", exist_ok=True)
+    app = make_app(os.path.join(os.path.abspath(tempfile.mkdtemp(dir="var")), "login_bench.db"))
+    method = Config.PASSWORD_HASH_METHOD
+    scenarios = {
+        "inline (sin límite)": PasswordHasher(method, workers=0, max_pending=args.logins + args.threads),
+        f"pool ({args.workers} proc., {args.max_pending} pendientes)":
+            PasswordHasher(method, workers=args.workers, max_pending=args.max_pending),
+    }
+    print(f"{args.logins} logins con {method}, {args.threads} hilos, sonda cada {args.probe_every:g} ms")
+    for name, hasher in scenarios.items():
+        r = run(app, hasher, args.logins, args.threads, args.probe_every / 1000)
+        print(f"  {name:<28} ráfaga {r['flood_s']:6.2f} s  200={r['ok']:<4} 429={r['rejected']:<4} "
+              f"sonda p50 {r['probe_p50_ms']:7.1f} ms  p95 {r['probe_p95_ms']:7.1f} ms  "
+              f"máx {r['probe_max_ms']:7.1f} ms  ({r['probes']} sondas)")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,7 @@ CREATE TABLE IF NOT EXISTS users (
   email      VARCHAR(150) NOT NULL UNIQUE,
   pass_hash  VARCHAR(255) NOT NULL,
   role       ENUM('admin','client') NOT NULL DEFAULT 'client',
+  token_version INT NOT NULL DEFAULT 0,
   created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
 ) ENGINE=InnoDB;
 
@@ -41,6 +42,7 @@ CREATE TABLE IF NOT EXISTS devices (
   serial        VARCHAR(64)  NOT NULL UNIQUE,
   status        ENUM('new','active','lost','retired','service') NOT NULL DEFAULT 'new',
   registered_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  offline_after_s INT NULL,                 -- silencio tolerado antes de marcarla offline (NULL = config)
   CONSTRAINT fk_devices_patient
     FOREIGN KEY (patient_id) REFERENCES patients(id)
     ON DELETE SET NULL ON UPDATE CASCADE
@@ -86,13 +88,24 @@ CREATE TABLE IF NOT EXISTS alerts (
   message         VARCHAR(255) NULL,
   acknowledged_by INT NULL,
   acknowledged_at DATETIME NULL,
+  metric          VARCHAR(32) NULL,                -- episodio (ver alert_states)
+  occurrences     INT NOT NULL DEFAULT 1,
+  last_seen_at    DATETIME NULL,
+  peak_value      DECIMAL(6,2) NULL,
+  resolved_at     DATETIME NULL,
+  escalation_level  SMALLINT NOT NULL DEFAULT 0,   -- escalamientos por falta de reconocimiento
+  escalation_due_at DATETIME NULL,                 -- próximo escalamiento (NULL = ninguno)
   CONSTRAINT fk_alerts_patient
     FOREIGN KEY (patient_id) REFERENCES patients(id)
     ON DELETE CASCADE ON UPDATE CASCADE,
   CONSTRAINT fk_alerts_ack_user
     FOREIGN KEY (acknowledged_by) REFERENCES users(id)
     ON DELETE SET NULL ON UPDATE CASCADE,
-  INDEX idx_alerts_patient_ts (patient_id, ts)
+  INDEX idx_alerts_patient_ts (patient_id, ts),
+  INDEX idx_alerts_ack_ts (acknowledged_at, ts),
+  INDEX idx_alerts_patient_ack_ts (patient_id, acknowledged_at, ts),
+  INDEX idx_alerts_ack_escalation (acknowledged_at, escalation_due_at),
+  INDEX idx_alerts_ts_cover (ts, type, severity, patient_id, acknowledged_at)  -- analítica (índice cubriente)
 ) ENGINE=InnoDB;
 
 -- 7) Telemetría del dispositivo
@@ -110,3 +123,147 @@ CREATE TABLE IF NOT EXISTS device_telemetry (
     ON DELETE CASCADE ON UPDATE CASCADE,
   INDEX idx_tel_device_ts (device_id, ts)
 ) ENGINE=InnoDB;
+
+-- 8) Resumen diario por paciente (precalculado por `flask summaries build`)
+CREATE TABLE IF NOT EXISTS patient_daily_summary (
+  id                   BIGINT AUTO_INCREMENT PRIMARY KEY,
+  day                  DATE NOT NULL,
+  patient_id           INT NOT NULL,
+  readings_count       INT NOT NULL DEFAULT 0,
+  resting_hr_bpm       DECIMAL(5,1) NULL,
+  min_spo2_pct         SMALLINT NULL,
+  max_temp_c           DECIMAL(4,1) NULL,
+  minutes_out_of_range INT NOT NULL DEFAULT 0,
+  alerts_total         INT NOT NULL DEFAULT 0,
+  alerts_high          INT NOT NULL DEFAULT 0,
+  wear_minutes         INT NOT NULL DEFAULT 0,
+  computed_at          DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  UNIQUE KEY ux_summary_day_patient (day, patient_id),
+  CONSTRAINT fk_summary_patient
+    FOREIGN KEY (patient_id) REFERENCES patients(id)
+    ON DELETE CASCADE ON UPDATE CASCADE,
+  INDEX ix_patient_daily_summary_patient_id (patient_id)
+) ENGINE=InnoDB;
+
+-- 9) Jobs en segundo plano (reportes, backfills) - los ejecuta `flask jobs worker`
+CREATE TABLE IF NOT EXISTS jobs (
+  id           BIGINT AUTO_INCREMENT PRIMARY KEY,
+  kind         VARCHAR(40) NOT NULL,
+  params       JSON NULL,
+  status       ENUM('queued','running','succeeded','failed','expired') NOT NULL DEFAULT 'queued',
+  progress     SMALLINT NOT NULL DEFAULT 0,
+  message      VARCHAR(255) NULL,
+  result_path  VARCHAR(255) NULL,
+  requested_by INT NULL,
+  created_at   DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  started_at   DATETIME NULL,
+  finished_at  DATETIME NULL,
+  expires_at   DATETIME NULL,
+  CONSTRAINT fk_jobs_user
+    FOREIGN KEY (requested_by) REFERENCES users(id)
+    ON DELETE SET NULL,
+  INDEX idx_jobs_status_created (status, created_at),
+  INDEX ix_jobs_requested_by (requested_by)
+) ENGINE=InnoDB;
+
+-- 10) Estado de la máquina de alertas por (paciente, métrica) - ver app/alerts
+CREATE TABLE IF NOT EXISTS alert_states (
+  patient_id   INT NOT NULL,
+  metric       VARCHAR(32) NOT NULL,
+  status       ENUM('ok','pending','firing','cooldown') NOT NULL DEFAULT 'ok',
+  direction    ENUM('high','low') NULL,
+  started_at   DATETIME NULL,
+  last_ts      DATETIME NULL,
+  last_seen_at DATETIME NULL,
+  peak_value   DECIMAL(6,2) NULL,
+  occurrences  INT NOT NULL DEFAULT 0,
+  severity     ENUM('low','moderate','high','critical') NULL,
+  alert_id     BIGINT NULL,
+  resolved_at  DATETIME NULL,
+  updated_at   DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (patient_id, metric),
+  CONSTRAINT fk_alert_states_patient
+    FOREIGN KEY (patient_id) REFERENCES patients(id)
+    ON DELETE CASCADE ON UPDATE CASCADE,
+  CONSTRAINT fk_alert_states_alert
+    FOREIGN KEY (alert_id) REFERENCES alerts(id)
+    ON DELETE SET NULL
+) ENGINE=InnoDB;
+
+-- 11) Versiones de caché: quien modifica los datos incrementa el contador y cada
+--     worker descarta su caché en memoria al ver el cambio (ver app/cache.py)
+CREATE TABLE IF NOT EXISTS cache_versions (
+  name       VARCHAR(64) NOT NULL PRIMARY KEY,
+  version    BIGINT NOT NULL DEFAULT 0,
+  updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+) ENGINE=InnoDB;
+
+INSERT IGNORE INTO cache_versions (name, version) VALUES ('thresholds', 0), ('identities', 0), ('patients', 0);
+
+-- 12) Alertas pendientes (sin reconocer) por paciente y severidad: se actualiza al
+--     crear / escalar / reconocer alertas. Recalcular: `flask alerts rebuild-pending-counts`
+CREATE TABLE IF NOT EXISTS alert_pending_counts (
+  patient_id INT NOT NULL,
+  severity   ENUM('low','moderate','high','critical') NOT NULL,
+  pending    INT NOT NULL DEFAULT 0,
+  PRIMARY KEY (patient_id, severity),
+  CONSTRAINT fk_alert_pending_counts_patient
+    FOREIGN KEY (patient_id) REFERENCES patients(id)
+    ON DELETE CASCADE ON UPDATE CASCADE
+) ENGINE=InnoDB;
+
+-- 13) Contadores por minuto del panel de admin (lecturas ingeridas, alertas por severidad)
+CREATE TABLE IF NOT EXISTS stats_counters (
+  name   VARCHAR(40) NOT NULL,
+  bucket DATETIME NOT NULL,               -- inicio del minuto (UTC)
+  value  BIGINT NOT NULL DEFAULT 0,
+  PRIMARY KEY (name, bucket)
+) ENGINE=InnoDB;
+
+-- 14) Último contacto de cada dispositivo (lo actualiza la ingesta): última lectura,
+--     última telemetría y su batería / señal, para el panel y la vista de flota
+CREATE TABLE IF NOT EXISTS device_last_seen (
+  device_id         INT NOT NULL PRIMARY KEY,
+  last_seen_at      DATETIME NOT NULL,
+  last_reading_at   DATETIME NULL,
+  last_telemetry_at DATETIME NULL,
+  battery_pct       SMALLINT NULL,
+  rssi_dbm          SMALLINT NULL,
+  online            TINYINT(1) NOT NULL DEFAULT 0,   -- estado que mantiene `flask devices presence-worker`
+  online_changed_at DATETIME NULL,
+  CONSTRAINT fk_device_last_seen_device
+    FOREIGN KEY (device_id) REFERENCES devices(id)
+    ON DELETE CASCADE ON UPDATE CASCADE,
+  INDEX ix_device_last_seen_last_seen_at (last_seen_at)
+) ENGINE=InnoDB;
+
+-- 15) Outbox de notificaciones de alertas: se inserta en la misma transacción que la
+--     alerta y la vacía `flask notifications worker` (reintentos con backoff)
+CREATE TABLE IF NOT EXISTS notification_outbox (
+  id              BIGINT AUTO_INCREMENT PRIMARY KEY,
+  alert_id        BIGINT NULL,
+  event           VARCHAR(20) NOT NULL,
+  channel         VARCHAR(20) NOT NULL,
+  recipient       VARCHAR(255) NOT NULL,
+  payload         JSON NOT NULL,
+  status          ENUM('pending','sending','sent','failed') NOT NULL DEFAULT 'pending',
+  attempts        SMALLINT NOT NULL DEFAULT 0,
+  next_attempt_at DATETIME NOT NULL,
+  claimed_at      DATETIME NULL,
+  last_error      VARCHAR(255) NULL,
+  created_at      DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  sent_at         DATETIME NULL,
+  CONSTRAINT fk_outbox_alert
+    FOREIGN KEY (alert_id) REFERENCES alerts(id)
+    ON DELETE CASCADE,
+  INDEX idx_outbox_status_next (status, next_attempt_at),
+  INDEX ix_notification_outbox_alert_id (alert_id)
+) ENGINE=InnoDB;
+
+-- 16) Latido de réplicas de lectura: cada worker web escribe la hora en la primaria y
+--     la lee en cada réplica; la diferencia es su atraso (ver app/replicas.py)
+CREATE TABLE IF NOT EXISTS replica_heartbeat (
+  id       SMALLINT NOT NULL PRIMARY KEY,
+  beat_ms  BIGINT NOT NULL DEFAULT 0            -- epoch en ms
+) ENGINE=InnoDB;
+INSERT IGNORE INTO replica_heartbeat (id, beat_ms) VALUES (1, 0);
@@ -0,0 +1,29 @@
+"""cache_versions: seed the 'patients' search index row
+
+Revision ID: 1f6b8d3a5c29
+Revises: 8c2e5a7b1f94
+Create Date: 2026-10-23 10:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '1f6b8d3a5c29'
+down_revision = '8c2e5a7b1f94'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Índice de búsqueda de pacientes (ver PatientsService). Un alta anterior a esta
+    # migración pudo haber creado ya la fila: solo se inserta si falta
+    op.execute(
+        "INSERT INTO cache_versions (name, version) "
+        "SELECT 'patients', 0 FROM (SELECT 1) AS one "
+        "WHERE NOT EXISTS (SELECT 1 FROM cache_versions WHERE name = 'patients')"
+    )
+
+
+def downgrade():
+    op.execute("DELETE FROM cache_versions WHERE name = 'patients'")
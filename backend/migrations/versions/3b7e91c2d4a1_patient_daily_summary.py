@@ -0,0 +1,44 @@
+"""patient_daily_summary table
+
+Revision ID: 3b7e91c2d4a1
+Revises: 05ad91f0467c
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b7e91c2d4a1'
+down_revision = '05ad91f0467c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'patient_daily_summary',
+        sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('patient_id', sa.Integer(), nullable=False),
+        sa.Column('readings_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('resting_hr_bpm', sa.Numeric(5, 1), nullable=True),
+        sa.Column('min_spo2_pct', sa.SmallInteger(), nullable=True),
+        sa.Column('max_temp_c', sa.Numeric(4, 1), nullable=True),
+        sa.Column('minutes_out_of_range', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('alerts_total', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('alerts_high', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('wear_minutes', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('computed_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+        sa.ForeignKeyConstraint(['patient_id'], ['patients.id'], name='fk_summary_patient',
+                                ondelete='CASCADE', onupdate='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('day', 'patient_id', name='ux_summary_day_patient'),
+    )
+    op.create_index('ix_patient_daily_summary_patient_id', 'patient_daily_summary', ['patient_id'])
+
+
+def downgrade():
+    op.drop_index('ix_patient_daily_summary_patient_id', table_name='patient_daily_summary')
+    op.drop_table('patient_daily_summary')
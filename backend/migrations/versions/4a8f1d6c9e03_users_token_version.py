@@ -0,0 +1,28 @@
+"""users.token_version: invalidate issued tokens on role changes
+
+Revision ID: 4a8f1d6c9e03
+Revises: 6d0b3f8e2a57
+Create Date: 2026-10-21 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4a8f1d6c9e03'
+down_revision = '6d0b3f8e2a57'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('users', sa.Column('token_version', sa.Integer(), nullable=False, server_default='0'))
+    # Versión de la caché de identidades (ver UsersRepository): la fila existe antes del primer bump
+    cache_versions = sa.table('cache_versions', sa.column('name', sa.String), sa.column('version', sa.BigInteger))
+    op.bulk_insert(cache_versions, [{'name': 'identities', 'version': 0}])
+
+
+def downgrade():
+    op.execute("DELETE FROM cache_versions WHERE name = 'identities'")
+    op.drop_column('users', 'token_version')
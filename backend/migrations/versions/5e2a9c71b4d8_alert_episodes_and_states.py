@@ -0,0 +1,57 @@
+"""alert episodes (alerts columns) and alert_states table
+
+Revision ID: 5e2a9c71b4d8
+Revises: 8c4d2f6a1e93
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e2a9c71b4d8'
+down_revision = '8c4d2f6a1e93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('alerts', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('metric', sa.String(length=32), nullable=True))
+        batch_op.add_column(sa.Column('occurrences', sa.Integer(), nullable=False, server_default='1'))
+        batch_op.add_column(sa.Column('last_seen_at', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('peak_value', sa.Numeric(precision=6, scale=2), nullable=True))
+        batch_op.add_column(sa.Column('resolved_at', sa.DateTime(), nullable=True))
+
+    op.create_table(
+        'alert_states',
+        sa.Column('patient_id', sa.Integer(), nullable=False),
+        sa.Column('metric', sa.String(length=32), nullable=False),
+        sa.Column('status', sa.Enum('ok', 'pending', 'firing', 'cooldown', name='alert_state_status'),
+                  nullable=False, server_default='ok'),
+        sa.Column('direction', sa.Enum('high', 'low', name='alert_state_direction'), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('last_ts', sa.DateTime(), nullable=True),
+        sa.Column('last_seen_at', sa.DateTime(), nullable=True),
+        sa.Column('peak_value', sa.Numeric(precision=6, scale=2), nullable=True),
+        sa.Column('occurrences', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('severity', sa.Enum('low', 'moderate', 'high', 'critical', name='alert_severity'), nullable=True),
+        sa.Column('alert_id', sa.BigInteger(), nullable=True),
+        sa.Column('resolved_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+        sa.ForeignKeyConstraint(['patient_id'], ['patients.id'], name='fk_alert_states_patient',
+                                onupdate='CASCADE', ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['alert_id'], ['alerts.id'], name='fk_alert_states_alert', ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('patient_id', 'metric'),
+    )
+
+
+def downgrade():
+    op.drop_table('alert_states')
+    with op.batch_alter_table('alerts', schema=None) as batch_op:
+        batch_op.drop_column('resolved_at')
+        batch_op.drop_column('peak_value')
+        batch_op.drop_column('last_seen_at')
+        batch_op.drop_column('occurrences')
+        batch_op.drop_column('metric')
@@ -0,0 +1,29 @@
+"""device presence: per-device offline timeout and online state
+
+Revision ID: 6d0b3f8e2a57
+Revises: a9e1c5f7d342
+Create Date: 2026-10-20 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6d0b3f8e2a57'
+down_revision = 'a9e1c5f7d342'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('devices', sa.Column('offline_after_s', sa.Integer(), nullable=True))
+    # Arranca todo offline: el primer barrido marca online (sin alertas) a las que reportaron hace poco
+    op.add_column('device_last_seen', sa.Column('online', sa.Boolean(), nullable=False, server_default='0'))
+    op.add_column('device_last_seen', sa.Column('online_changed_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('device_last_seen', 'online_changed_at')
+    op.drop_column('device_last_seen', 'online')
+    op.drop_column('devices', 'offline_after_s')
@@ -0,0 +1,30 @@
+"""replica_heartbeat: measures read-replica lag
+
+Revision ID: 8c2e5a7b1f94
+Revises: 4a8f1d6c9e03
+Create Date: 2026-10-22 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c2e5a7b1f94'
+down_revision = '4a8f1d6c9e03'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    heartbeat = op.create_table(
+        'replica_heartbeat',
+        sa.Column('id', sa.SmallInteger(), autoincrement=False, nullable=False),
+        sa.Column('beat_ms', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.bulk_insert(heartbeat, [{'id': 1, 'beat_ms': 0}])
+
+
+def downgrade():
+    op.drop_table('replica_heartbeat')
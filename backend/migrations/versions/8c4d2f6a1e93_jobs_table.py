@@ -0,0 +1,45 @@
+"""jobs table (background job runner)
+
+Revision ID: 8c4d2f6a1e93
+Revises: 3b7e91c2d4a1
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c4d2f6a1e93'
+down_revision = '3b7e91c2d4a1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'jobs',
+        sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column('kind', sa.String(length=40), nullable=False),
+        sa.Column('params', sa.JSON(), nullable=True),
+        sa.Column('status', sa.Enum('queued', 'running', 'succeeded', 'failed', 'expired', name='job_status'),
+                  nullable=False, server_default='queued'),
+        sa.Column('progress', sa.SmallInteger(), nullable=False, server_default='0'),
+        sa.Column('message', sa.String(length=255), nullable=True),
+        sa.Column('result_path', sa.String(length=255), nullable=True),
+        sa.Column('requested_by', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.Column('expires_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['requested_by'], ['users.id'], name='fk_jobs_user', ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('idx_jobs_status_created', 'jobs', ['status', 'created_at'])
+    op.create_index('ix_jobs_requested_by', 'jobs', ['requested_by'])
+
+
+def downgrade():
+    op.drop_index('ix_jobs_requested_by', table_name='jobs')
+    op.drop_index('idx_jobs_status_created', table_name='jobs')
+    op.drop_table('jobs')
@@ -0,0 +1,31 @@
+"""cache_versions table (in-process cache invalidation across workers)
+
+Revision ID: a7d3e5b19c42
+Revises: 5e2a9c71b4d8
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7d3e5b19c42'
+down_revision = '5e2a9c71b4d8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    cache_versions = op.create_table(
+        'cache_versions',
+        sa.Column('name', sa.String(length=64), nullable=False),
+        sa.Column('version', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+        sa.PrimaryKeyConstraint('name'),
+    )
+    op.bulk_insert(cache_versions, [{'name': 'thresholds', 'version': 0}])
+
+
+def downgrade():
+    op.drop_table('cache_versions')
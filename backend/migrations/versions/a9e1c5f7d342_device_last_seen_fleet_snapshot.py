@@ -0,0 +1,51 @@
+"""device_last_seen: last reading / telemetry snapshot for the fleet view
+
+Revision ID: a9e1c5f7d342
+Revises: e5b92d4f8a06
+Create Date: 2026-10-20 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a9e1c5f7d342'
+down_revision = 'e5b92d4f8a06'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('device_last_seen', sa.Column('last_reading_at', sa.DateTime(), nullable=True))
+    op.add_column('device_last_seen', sa.Column('last_telemetry_at', sa.DateTime(), nullable=True))
+    op.add_column('device_last_seen', sa.Column('battery_pct', sa.SmallInteger(), nullable=True))
+    op.add_column('device_last_seen', sa.Column('rssi_dbm', sa.SmallInteger(), nullable=True))
+
+    # Punto de partida desde las tablas de series (cada subconsulta recorre idx (device_id, ts))
+    op.execute(
+        "INSERT INTO device_last_seen (device_id, last_seen_at) "
+        "SELECT t.device_id, MAX(t.ts) FROM device_telemetry t "
+        "WHERE NOT EXISTS (SELECT 1 FROM device_last_seen s WHERE s.device_id = t.device_id) "
+        "GROUP BY t.device_id"
+    )
+    op.execute(
+        "UPDATE device_last_seen SET "
+        "last_reading_at = (SELECT MAX(r.ts) FROM readings r WHERE r.device_id = device_last_seen.device_id), "
+        "last_telemetry_at = (SELECT MAX(t.ts) FROM device_telemetry t "
+        "                     WHERE t.device_id = device_last_seen.device_id)"
+    )
+    for column in ('battery_pct', 'rssi_dbm'):
+        op.execute(
+            f"UPDATE device_last_seen SET {column} = ("
+            f"SELECT t.{column} FROM device_telemetry t WHERE t.device_id = device_last_seen.device_id "
+            f"ORDER BY t.ts DESC, t.id DESC LIMIT 1) "
+            f"WHERE last_telemetry_at IS NOT NULL"
+        )
+
+
+def downgrade():
+    op.drop_column('device_last_seen', 'rssi_dbm')
+    op.drop_column('device_last_seen', 'battery_pct')
+    op.drop_column('device_last_seen', 'last_telemetry_at')
+    op.drop_column('device_last_seen', 'last_reading_at')
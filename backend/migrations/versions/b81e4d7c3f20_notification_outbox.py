@@ -0,0 +1,46 @@
+"""notification_outbox table (asynchronous alert notifications)
+
+Revision ID: b81e4d7c3f20
+Revises: f3a9c2e7d815
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b81e4d7c3f20'
+down_revision = 'f3a9c2e7d815'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'notification_outbox',
+        sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column('alert_id', sa.BigInteger(), nullable=True),
+        sa.Column('event', sa.String(length=20), nullable=False),
+        sa.Column('channel', sa.String(length=20), nullable=False),
+        sa.Column('recipient', sa.String(length=255), nullable=False),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column('status', sa.Enum('pending', 'sending', 'sent', 'failed', name='outbox_status'),
+                  nullable=False, server_default='pending'),
+        sa.Column('attempts', sa.SmallInteger(), nullable=False, server_default='0'),
+        sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+        sa.Column('claimed_at', sa.DateTime(), nullable=True),
+        sa.Column('last_error', sa.String(length=255), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+        sa.Column('sent_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['alert_id'], ['alerts.id'], name='fk_outbox_alert', ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('idx_outbox_status_next', 'notification_outbox', ['status', 'next_attempt_at'])
+    op.create_index('ix_notification_outbox_alert_id', 'notification_outbox', ['alert_id'])
+
+
+def downgrade():
+    op.drop_index('ix_notification_outbox_alert_id', table_name='notification_outbox')
+    op.drop_index('idx_outbox_status_next', table_name='notification_outbox')
+    op.drop_table('notification_outbox')
@@ -0,0 +1,29 @@
+"""alerts escalation_level / escalation_due_at (escalation of unacknowledged alerts)
+
+Revision ID: c4f07a9e2b61
+Revises: b81e4d7c3f20
+Create Date: 2026-10-19 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4f07a9e2b61'
+down_revision = 'b81e4d7c3f20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('alerts', sa.Column('escalation_level', sa.SmallInteger(), nullable=False, server_default='0'))
+    op.add_column('alerts', sa.Column('escalation_due_at', sa.DateTime(), nullable=True))
+    # El scheduler rehidrata con: WHERE acknowledged_at IS NULL AND escalation_due_at <= ?
+    op.create_index('idx_alerts_ack_escalation', 'alerts', ['acknowledged_at', 'escalation_due_at'])
+
+
+def downgrade():
+    op.drop_index('idx_alerts_ack_escalation', table_name='alerts')
+    op.drop_column('alerts', 'escalation_due_at')
+    op.drop_column('alerts', 'escalation_level')
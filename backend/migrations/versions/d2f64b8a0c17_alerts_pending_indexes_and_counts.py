@@ -0,0 +1,45 @@
+"""alerts pending indexes and alert_pending_counts table
+
+Revision ID: d2f64b8a0c17
+Revises: a7d3e5b19c42
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2f64b8a0c17'
+down_revision = 'a7d3e5b19c42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # list_pending: WHERE acknowledged_at IS NULL ORDER BY ts DESC LIMIT n
+    op.create_index('idx_alerts_ack_ts', 'alerts', ['acknowledged_at', 'ts'])
+    # list_pending_for_patient: WHERE patient_id = ? AND acknowledged_at IS NULL ORDER BY ts DESC
+    op.create_index('idx_alerts_patient_ack_ts', 'alerts', ['patient_id', 'acknowledged_at', 'ts'])
+
+    op.create_table(
+        'alert_pending_counts',
+        sa.Column('patient_id', sa.Integer(), nullable=False),
+        sa.Column('severity', sa.Enum('low', 'moderate', 'high', 'critical', name='alert_severity'), nullable=False),
+        sa.Column('pending', sa.Integer(), nullable=False, server_default='0'),
+        sa.ForeignKeyConstraint(['patient_id'], ['patients.id'], name='fk_alert_pending_counts_patient',
+                                onupdate='CASCADE', ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('patient_id', 'severity'),
+    )
+    # Conteo inicial a partir de las alertas existentes (usa idx_alerts_ack_ts)
+    op.execute(
+        "INSERT INTO alert_pending_counts (patient_id, severity, pending) "
+        "SELECT patient_id, severity, COUNT(*) FROM alerts "
+        "WHERE acknowledged_at IS NULL GROUP BY patient_id, severity"
+    )
+
+
+def downgrade():
+    op.drop_table('alert_pending_counts')
+    op.drop_index('idx_alerts_patient_ack_ts', table_name='alerts')
+    op.drop_index('idx_alerts_ack_ts', table_name='alerts')
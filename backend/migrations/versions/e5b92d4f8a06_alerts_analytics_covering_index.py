@@ -0,0 +1,26 @@
+"""covering index on alerts for time-bucketed analytics
+
+Revision ID: e5b92d4f8a06
+Revises: c4f07a9e2b61
+Create Date: 2026-10-19 23:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5b92d4f8a06'
+down_revision = 'c4f07a9e2b61'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # GET /admin/alerts/analytics: WHERE ts BETWEEN ... GROUP BY intervalo, type, severity, patient_id
+    # con COUNT(acknowledged_at) y SUM(acknowledged_at - ts) se resuelve solo con el índice
+    op.create_index('idx_alerts_ts_cover', 'alerts',
+                    ['ts', 'type', 'severity', 'patient_id', 'acknowledged_at'])
+
+
+def downgrade():
+    op.drop_index('idx_alerts_ts_cover', table_name='alerts')
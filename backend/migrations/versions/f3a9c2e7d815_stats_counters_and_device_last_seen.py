@@ -0,0 +1,46 @@
+"""stats_counters and device_last_seen tables (admin dashboard stats)
+
+Revision ID: f3a9c2e7d815
+Revises: d2f64b8a0c17
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3a9c2e7d815'
+down_revision = 'd2f64b8a0c17'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'stats_counters',
+        sa.Column('name', sa.String(length=40), nullable=False),
+        sa.Column('bucket', sa.DateTime(), nullable=False),
+        sa.Column('value', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('name', 'bucket'),
+    )
+    op.create_table(
+        'device_last_seen',
+        sa.Column('device_id', sa.Integer(), nullable=False),
+        sa.Column('last_seen_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['device_id'], ['devices.id'], name='fk_device_last_seen_device',
+                                onupdate='CASCADE', ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('device_id'),
+    )
+    op.create_index('ix_device_last_seen_last_seen_at', 'device_last_seen', ['last_seen_at'])
+    # Punto de partida: última lectura conocida de cada dispositivo (recorre idx (device_id, ts))
+    op.execute(
+        "INSERT INTO device_last_seen (device_id, last_seen_at) "
+        "SELECT device_id, MAX(ts) FROM readings GROUP BY device_id"
+    )
+
+
+def downgrade():
+    op.drop_index('ix_device_last_seen_last_seen_at', table_name='device_last_seen')
+    op.drop_table('device_last_seen')
+    op.drop_table('stats_counters')
@@ -5,11 +5,23 @@ import pytest
 # --- Permite importar "app" cuando corremos pytest desde backend/ ---
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
+from sqlalchemy import BigInteger  # noqa: E402
+from sqlalchemy.ext.compiler import compiles  # noqa: E402
+
 from app import create_app, Config  # noqa: E402
 
 
+@compiles(BigInteger, "sqlite")
+def _bigint_sqlite(type_, compiler, **kw):
+    # Fixture db_app: en SQLite solo INTEGER PRIMARY KEY es autoincremental
+    return "INTEGER"
+
+
 class TestConfig(Config):
     TESTING = True
+    # Cada test hace login desde la misma IP: sin límite de intentos
+    LOGIN_RATE_PER_IP_PER_MIN = 0
+    LOGIN_RATE_PER_EMAIL_PER_MIN = 0
     # Si quisieras una BD separada para tests, descomenta y ajusta:
     # SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"
     # o bien apunta a otra BD MySQL de pruebas:
@@ -27,6 +39,32 @@ def app():
     ctx.pop()
 
 
+@pytest.fixture()
+def db_app(tmp_path):
+    """
+    App sobre un SQLite vacío con todas las tablas, para tests de repositorios y
+    servicios que no necesitan la BD MySQL de pruebas (sql_utils resuelve las
+    diferencias de dialecto). Deja activo un request context con su sesión.
+    """
+    from app.extensions import db
+    from app.services import identity_service, patients_service, stats_service, thresholds_service
+
+    class SQLiteConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path}/test.db"
+        SQLALCHEMY_ENGINE_OPTIONS = {}
+
+    # Las cachés por worker no deben arrastrar datos de otra BD
+    for cache in (thresholds_service._cache, identity_service._cache, patients_service._search_index):
+        cache.invalidate()
+    stats_service._cache.clear()
+
+    application = create_app(SQLiteConfig)
+    with application.test_request_context():
+        db.create_all()
+        yield application
+        db.session.remove()
+
+
 @pytest.fixture()
 def client(app):
     return app.test_client()
@@ -44,3 +82,38 @@ def token(client):
 @pytest.fixture()
 def auth_headers(token):
     return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture()
+def count_queries(app):
+    """
+    Cuenta las sentencias SQL ejecutadas dentro del bloque (en todas las engines,
+    solo las de este hilo):
+
+        with count_queries() as q:
+            client.get(...)
+        assert q.count <= 2
+    """
+    from app.instrumentation import capture_queries
+    return capture_queries
+
+
+@pytest.fixture()
+def query_budget(app):
+    """
+    Presupuesto de sentencias SQL de un bloque; si se pasa, falla listándolas:
+
+        with query_budget(2):
+            client.get("/api/v1/patients", headers=auth_headers)
+    """
+    from contextlib import contextmanager
+    from app.instrumentation import capture_queries
+
+    @contextmanager
+    def _budget(max_queries: int):
+        with capture_queries() as q:
+            yield q
+        assert q.count <= max_queries, (f"{q.count} sentencias SQL, presupuesto {max_queries}:\n"
+                                        + "\n".join(q.statements))
+
+    return _budget
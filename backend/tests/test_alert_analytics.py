@@ -0,0 +1,55 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from app.services.alert_analytics_service import AlertAnalyticsService
+
+
+class FakeRepo:
+    def __init__(self, periods):
+        self.periods = periods   # since -> filas
+        self.calls = []
+
+    def aggregate(self, since, until, bucket, group_by, **filters):
+        self.calls.append((since, until, bucket, tuple(group_by), filters))
+        return self.periods.get(since, [])
+
+
+class _Row(tuple):
+    """Imita sqlalchemy.Row: acceso por posición y por nombre."""
+
+    def __new__(cls, values, **named):
+        obj = super().__new__(cls, values)
+        obj.__dict__.update(named)
+        return obj
+
+
+def _row(bucket, *dims, count, acknowledged, ack_seconds):
+    return _Row((bucket, *dims, count, acknowledged, ack_seconds),
+                bucket=bucket, count=count, acknowledged=acknowledged, ack_seconds=ack_seconds)
+
+
+def test_trends_totals_mean_ack_and_previous_period():
+    since, until = datetime(2026, 10, 5), datetime(2026, 10, 19)
+    repo = FakeRepo({
+        since: [_row("2026-10-05 00:00:00", "high", count=4, acknowledged=2, ack_seconds=600),
+                _row("2026-10-12 00:00:00", "high", count=6, acknowledged=3, ack_seconds=1800)],
+        datetime(2026, 9, 21): [_row("2026-09-21 00:00:00", "high", count=5, acknowledged=5, ack_seconds=1500)],
+    })
+    out = AlertAnalyticsService(repo).trends(since, until.replace(tzinfo=timezone.utc), bucket="week",
+                                             group_by=["severity", "severity"], compare="previous")
+    assert out["group_by"] == ["severity"]
+    assert out["items"][0] == {"bucket": "2026-10-05T00:00:00", "severity": "high",
+                               "count": 4, "acknowledged": 2, "mean_ack_s": 300.0}
+    assert out["totals"] == {"count": 10, "acknowledged": 5, "mean_ack_s": 480.0}   # 2400 s / 5, no media de medias
+    assert out["comparison"]["from"] == "2026-09-21T00:00:00"
+    assert out["comparison"]["change"] == {"count": 5, "count_pct": 100.0, "mean_ack_s": 180.0}
+    assert [c[0] for c in repo.calls] == [since, datetime(2026, 9, 21)]
+
+
+def test_trends_rejects_invalid_ranges():
+    service = AlertAnalyticsService(FakeRepo({}))
+    with pytest.raises(ValueError):
+        service.trends(datetime(2026, 10, 2), datetime(2026, 10, 1))
+    with pytest.raises(ValueError):
+        service.trends(datetime(2025, 1, 1), datetime(2026, 1, 1), bucket="hour", max_buckets=1000)
@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta
+
+import pytest
+from marshmallow import ValidationError
+from sqlalchemy import select
+
+from app.extensions import db
+from app.model.dto.request_schemas import AlertBulkAcknowledgeRequest
+from app.model.models import Alert, Patient, User
+from app.repository.alert_pending_counts_repository import AlertPendingCountsRepository
+from app.repository.alerts_repository import AlertsRepository
+from app.services.alerts_service import AlertsService
+
+T0 = datetime(2026, 1, 1, 8, 0, 0)
+
+
+@pytest.fixture()
+def alerts(db_app):
+    """Pacientes 1 y 2; alertas 1-4 pendientes, la 5 ya reconocida por el usuario 2."""
+    db.session.add_all([User(id=u, name=f"U{u}", email=f"u{u}@x.com", pass_hash="-", role="admin") for u in (1, 2)])
+    db.session.add_all([Patient(id=p, user_id=p, first_name="P", last_name=str(p)) for p in (1, 2)])
+    db.session.add_all([
+        Alert(id=1, patient_id=1, ts=T0, type="tachycardia", severity="high"),
+        Alert(id=2, patient_id=1, ts=T0 + timedelta(minutes=1), type="fever", severity="low"),
+        Alert(id=3, patient_id=1, ts=T0 + timedelta(minutes=2), type="tachycardia", severity="high"),
+        Alert(id=4, patient_id=2, ts=T0, type="tachycardia", severity="critical"),
+        Alert(id=5, patient_id=1, ts=T0, type="fever", severity="low", acknowledged_by=2, acknowledged_at=T0),
+    ])
+    db.session.commit()
+    AlertPendingCountsRepository.rebuild()
+    db.session.commit()
+
+
+def _acknowledged_by():
+    return dict(db.session.execute(select(Alert.id, Alert.acknowledged_by).order_by(Alert.id)).all())
+
+
+def test_repository_acknowledges_only_pending_matches_in_order(alerts):
+    acked, more = AlertsRepository.acknowledge_many(1, T0, patient_id=1, type="tachycardia", limit=1)
+    assert (acked, more) == ([1], True)
+    acked, more = AlertsRepository.acknowledge_many(1, T0, patient_id=1, before=T0 + timedelta(minutes=2))
+    assert (acked, more) == ([2], False)                 # la 1 ya está y la 5 era de antes
+    assert AlertsRepository.acknowledge_many(1, T0, ids=[1, 2, 5]) == ([], False)
+    assert AlertPendingCountsRepository.counts(1) == {"low": 0, "moderate": 0, "high": 1, "critical": 0}
+
+
+def test_service_skips_acknowledged_and_unknown_ids(alerts):
+    service = AlertsService()
+    assert AlertPendingCountsRepository.counts() == {"low": 1, "moderate": 0, "high": 2, "critical": 1}
+
+    result = service.acknowledge_many(1, ids=[3, 4, 5, 99])
+    assert result == {"acknowledged": [4, 3], "count": 2, "has_more": False}
+    assert _acknowledged_by() == {1: None, 2: None, 3: 1, 4: 1, 5: 2}
+    assert AlertPendingCountsRepository.counts() == {"low": 1, "moderate": 0, "high": 1, "critical": 0}
+
+    # Repetir el mismo lote no vuelve a descontar
+    assert service.acknowledge_many(2, ids=[3, 4]) == {"acknowledged": [], "count": 0, "has_more": False}
+    assert service.acknowledge_many(2, patient_id=1)["acknowledged"] == [1, 2]
+    assert AlertPendingCountsRepository.counts() == {"low": 0, "moderate": 0, "high": 0, "critical": 0}
+    assert AlertPendingCountsRepository.rebuild() == 0   # los contadores coinciden con alerts
+
+
+def test_bulk_request_requires_ids_or_a_filter():
+    schema = AlertBulkAcknowledgeRequest()
+    assert schema.load({"ids": [1, 2]}) == {"ids": [1, 2]}
+    assert schema.load({"type": "fever"}) == {"type": "fever"}
+    for payload in ({}, {"patient_id": None, "notes": "x"}):
+        with pytest.raises(ValidationError) as err:
+            schema.load(payload)
+        assert list(err.value.messages) == ["_schema"]
+    for payload in ({"ids": []}, {"ids": [0]}, {"ids": list(range(1, 1002))}, {"type": "otro"}):
+        with pytest.raises(ValidationError):
+            schema.load(payload)
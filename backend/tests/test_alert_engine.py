@@ -0,0 +1,79 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.alerts.engine import AlertEngine, ReadingArrays, ThresholdTable
+from app.alerts.state_machine import METRIC_RULES, AlertRules, EpisodeState, step
+
+LIMITS = {"heart_rate": (50.0, 120.0), "spo2": (92.0, 100.0), "temperature": (35.5, 38.0)}
+
+
+def _episodes_with_step(rows, limits, rules):
+    """Episodios esperados: recorre las lecturas con la máquina de estados, como el servicio."""
+    states, current, out = {}, {}, []
+    for r in rows:
+        for metric, rule in METRIC_RULES.items():
+            value = r.get(rule["column"])
+            if value is None:
+                continue
+            key = (r["patient_id"], metric)
+            state = states.setdefault(key, EpisodeState(*key))
+            lo, hi = limits[r["patient_id"]][metric]
+            for effect in step(state, r["ts"], value, lo, hi, rules):
+                if effect == "open":
+                    current[key] = {"patient_id": key[0], "metric": metric, "ts": state.started_at,
+                                    "type": rule["types"][state.direction]}
+                    out.append(current[key])
+                if effect == "resolve":
+                    current[key]["resolved_at"] = r["ts"]
+                    continue
+                current[key].update(severity=state.severity, occurrences=state.occurrences,
+                                    last_seen_at=state.last_seen_at, resolved_at=None,
+                                    peak_value=round(state.peak_value, 2))
+    return out
+
+
+def _normalize(alerts):
+    fields = ("patient_id", "metric", "ts", "type", "severity", "occurrences", "last_seen_at",
+              "peak_value", "resolved_at")
+    return sorted(tuple(a[f] for f in fields) for a in alerts)
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_engine_matches_state_machine(seed):
+    """El motor vectorizado produce exactamente los mismos episodios que step() fila por fila."""
+    rnd = random.Random(seed)
+    rules = AlertRules(min_duration=timedelta(seconds=rnd.choice([0, 30, 60])),
+                       cooldown=timedelta(seconds=rnd.choice([0, 120, 600])),
+                       escalate_after=timedelta(seconds=rnd.choice([120, 1800])))
+    devices = {11: 1, 12: 2, 13: None}                 # el 13 no tiene paciente: se ignora
+    limits = {1: LIMITS, 2: dict(LIMITS, spo2=(92.0, None))}
+    rows = []
+    for device_id, patient_id in devices.items():
+        t, hr = datetime(2026, 1, 1), 85.0
+        for _ in range(150):
+            t += timedelta(seconds=rnd.choice([5, 10, 10, 30, 300]))
+            hr = min(200.0, max(20.0, hr + rnd.gauss(0, 12)))
+            rows.append({"device_id": device_id, "patient_id": patient_id, "ts": t,
+                         "heart_rate_bpm": None if rnd.random() < 0.1 else round(hr),
+                         "spo2_pct": rnd.choice([97, 96, 91, 93, 88, None]),
+                         "temp_c": round(rnd.gauss(37.2, 0.7), 1)})
+    rows.sort(key=lambda r: r["ts"])
+
+    expected = _episodes_with_step([r for r in rows if r["patient_id"]], limits, rules)
+    got = AlertEngine(rules).evaluate(ReadingArrays.from_rows(rows), devices, ThresholdTable.from_limits(limits))
+    assert _normalize(got) == _normalize(expected)
+
+
+def test_breaches_broadcast_per_patient_thresholds():
+    table = ThresholdTable.from_limits({2: {"heart_rate": (40.0, 100.0)}, 1: LIMITS})
+    batch = ReadingArrays.from_rows([
+        {"device_id": 1, "ts": datetime(2026, 1, 1), "heart_rate_bpm": 110, "spo2_pct": 90, "temp_c": None},
+        {"device_id": 2, "ts": datetime(2026, 1, 1), "heart_rate_bpm": 110, "spo2_pct": 90, "temp_c": None},
+    ])
+    rows = table.rows_for(batch.device_id)          # device_id == patient_id en este ejemplo
+    high, low = AlertEngine.breaches(batch.values, table.lo[rows], table.hi[rows])
+    assert high[:, 0].tolist() == [False, True]     # HR 110: solo supera el máximo del paciente 2
+    assert low[:, 1].tolist() == [True, False]      # SpO2 90: el paciente 2 no tiene umbral de SpO2
+    assert not low[:, 2].any() and not high[:, 2].any()  # sin dato de temperatura
@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.extensions import db
+from app.model.models import Alert, AlertPendingCount, Device, Patient, User
+from app.repository.alert_pending_counts_repository import AlertPendingCountsRepository
+from app.repository.alerts_repository import AlertsRepository
+from app.services.alert_evaluation_service import AlertEvaluationService
+from app.services.alerts_service import AlertsService
+
+T0 = datetime(2026, 1, 1, 8, 0, 0)
+
+
+@pytest.fixture()
+def patient(db_app):
+    db.session.add_all([User(id=u, name=f"U{u}", email=f"u{u}@x.com", pass_hash="-", role="admin") for u in (1, 2)])
+    db.session.add(Patient(id=1, user_id=1, first_name="Ana", last_name="Pérez"))
+    db.session.add(Device(id=3, patient_id=1, model="vb", serial="VB-3"))
+    db.session.commit()
+
+
+def _rows():
+    stmt = select(AlertPendingCount).execution_options(populate_existing=True)
+    return {(r.patient_id, r.severity): r.pending for r in db.session.execute(stmt).scalars()}
+
+
+def test_apply_adds_deltas_and_moves_between_severities(db_app):
+    AlertPendingCountsRepository.apply({(1, "low"): 2, (2, "high"): 1, (3, "low"): 0})
+    AlertPendingCountsRepository.apply({(1, "low"): -1, (1, "high"): 1})   # una pasó de low a high
+    assert _rows() == {(1, "low"): 1, (1, "high"): 1, (2, "high"): 1}
+    assert AlertPendingCountsRepository.counts(1) == {"low": 1, "moderate": 0, "high": 1, "critical": 0}
+    assert AlertPendingCountsRepository.counts()["high"] == 2
+
+
+def test_counts_follow_open_acknowledge_and_repeated_acknowledge(patient):
+    # Apertura por la evaluación en línea: HR alta sostenida más de ALERT_MIN_DURATION_S
+    rows = [{"device_id": 3, "ts": T0 + timedelta(seconds=30 * i), "heart_rate_bpm": 150} for i in range(5)]
+    assert AlertEvaluationService().evaluate_readings(1, rows)["open"] == 1
+    db.session.commit()
+    alert_id = db.session.execute(select(Alert.id)).scalar_one()
+    severity = db.session.get(Alert, alert_id).severity
+    assert AlertPendingCountsRepository.counts(1)[severity] == 1
+
+    service = AlertsService()
+    assert service.acknowledge(alert_id, user_id=2).acknowledged_by == 2
+    assert AlertPendingCountsRepository.counts(1)[severity] == 0
+
+    # Otro request con la alerta ya cargada (sin ver el primer reconocimiento): no descuenta otra vez
+    stale = db.session.get(Alert, alert_id)
+    set_committed_value(stale, "acknowledged_at", None)
+    set_committed_value(stale, "acknowledged_by", None)
+    acked = AlertsRepository.acknowledge(stale, 1, datetime.now(timezone.utc))
+    assert acked.acknowledged_by == 2
+    assert service.acknowledge(alert_id, user_id=1).acknowledged_by == 2
+    assert _rows() == {(1, severity): 0}
+
+    assert AlertPendingCountsRepository.rebuild() == 0       # coincide con lo recalculado desde alerts
+    assert AlertPendingCountsRepository.counts(1)[severity] == 0
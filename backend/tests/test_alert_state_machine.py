@@ -0,0 +1,75 @@
+from datetime import datetime, timedelta
+
+from app.alerts.state_machine import AlertRules, EpisodeState, step
+
+T0 = datetime(2026, 1, 1, 8, 0, 0)
+RULES = AlertRules(min_duration=timedelta(seconds=60), cooldown=timedelta(minutes=10),
+                   escalate_after=timedelta(minutes=30))
+HR = (50.0, 120.0)
+
+
+def _feed(state, values, start=T0, every=10):
+    """Pasa una serie de valores de HR (uno cada `every` segundos) y junta los efectos."""
+    effects = []
+    for i, v in enumerate(values):
+        effects += step(state, start + timedelta(seconds=every * i), v, *HR, RULES)
+    return effects
+
+
+def test_short_spike_does_not_fire():
+    """Un pico más corto que min_duration no genera alerta."""
+    state = EpisodeState(patient_id=1, metric="heart_rate")
+    assert _feed(state, [80, 130, 131, 132, 80]) == []
+    assert state.status == "ok"
+
+
+def test_sustained_breach_opens_one_alert_and_updates_it():
+    """Una taquicardia sostenida abre UNA alerta y las lecturas siguientes solo la actualizan."""
+    state = EpisodeState(patient_id=1, metric="heart_rate")
+    effects = _feed(state, [130] * 30)
+    assert effects.count("open") == 1
+    assert set(effects) == {"open", "update"}
+    assert state.status == "firing" and state.direction == "high"
+    assert state.occurrences == 30 and state.peak_value == 130
+
+
+def test_hysteresis_band_keeps_episode_open():
+    """Volver apenas bajo el máximo (dentro de la histéresis) no cierra el episodio."""
+    state = EpisodeState(patient_id=1, metric="heart_rate")
+    _feed(state, [130] * 10)
+    assert _feed(state, [118, 117], start=T0 + timedelta(minutes=5)) == []
+    assert state.status == "firing"
+    assert _feed(state, [110], start=T0 + timedelta(minutes=6)) == ["resolve"]
+    assert state.status == "cooldown"
+
+
+def test_breach_during_cooldown_reopens_same_alert():
+    """Un nuevo cruce dentro del cooldown reabre la alerta; pasado el cooldown abre otra."""
+    state = EpisodeState(patient_id=1, metric="heart_rate")
+    _feed(state, [130] * 10 + [100])
+    state.alert_id = 7  # id que el servicio asigna tras crear la alerta
+    assert _feed(state, [125], start=T0 + timedelta(minutes=5)) == ["reopen"]
+    assert state.alert_id == 7 and state.occurrences == 11
+
+    _feed(state, [100], start=T0 + timedelta(minutes=6))
+    later = T0 + timedelta(minutes=30)
+    effects = _feed(state, [130] * 10, start=later)
+    assert effects[0] == "open"
+    assert state.alert_id is None and state.occurrences == 10
+
+
+def test_severity_escalates_with_peak_and_duration():
+    state = EpisodeState(patient_id=1, metric="heart_rate")
+    _feed(state, [125] * 10)
+    assert state.severity == "low"
+    assert _feed(state, [150], start=T0 + timedelta(minutes=2)) == ["escalate"]
+    assert state.severity == "high"
+    assert _feed(state, [150], start=T0 + timedelta(minutes=45)) == ["escalate"]
+    assert state.severity == "critical"
+
+
+def test_out_of_order_samples_are_ignored():
+    state = EpisodeState(patient_id=1, metric="heart_rate")
+    _feed(state, [130] * 10)
+    assert step(state, T0, 40, *HR, RULES) == []
+    assert state.direction == "high"
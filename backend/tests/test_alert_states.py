@@ -0,0 +1,37 @@
+from datetime import datetime
+
+from sqlalchemy import insert, select
+
+from app.alerts.state_machine import METRIC_RULES, AlertStateTable
+from app.extensions import db
+from app.model.models import AlertState
+from app.repository.alert_states_repository import AlertStatesRepository
+
+T0 = datetime(2026, 1, 1, 8, 0, 0)
+
+
+def test_locked_load_creates_missing_rows_without_touching_existing(db_app):
+    db.session.execute(insert(AlertState).values(patient_id=1, metric="heart_rate", status="firing",
+                                                 direction="high", occurrences=4))
+    states = AlertStatesRepository.load([1], lock=True)
+
+    assert [(s.metric, s.persisted) for s in states] == sorted((m, True) for m in METRIC_RULES)
+    table = AlertStateTable(states)
+    assert table.get(1, "heart_rate").status == "firing" and table.get(1, "heart_rate").occurrences == 4
+    assert table.get(1, "spo2").status == "ok"
+
+
+def test_saving_a_new_state_does_not_fail_if_another_transaction_created_it(db_app):
+    table = AlertStateTable(AlertStatesRepository.load([1]))
+    state = table.get(1, "spo2")
+    state.status, state.direction, state.started_at, state.dirty = "pending", "low", T0, True
+
+    with db.engine.begin() as conn:   # otra evaluación del mismo paciente ganó la carrera
+        conn.execute(insert(AlertState).values(patient_id=1, metric="spo2", status="ok", occurrences=0))
+    AlertStatesRepository.save(table.dirty())
+    db.session.commit()
+
+    row = db.session.execute(select(AlertState.status, AlertState.direction, AlertState.started_at)
+                             .where(AlertState.patient_id == 1, AlertState.metric == "spo2")).one()
+    assert tuple(row) == ("pending", "low", T0)
+    assert state.persisted and not state.dirty
@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select
+
+from app.extensions import db
+from app.jobs.handlers import alerts_reevaluate
+from app.jobs.registry import JobContext
+from app.model.models import Alert, AlertState, Device, Patient, Reading, Threshold, User
+from app.services import thresholds_service
+
+
+@pytest.fixture()
+def patients(db_app):
+    """Pacientes 1, 2 y 3 (banda 10 + id) con HR sostenida en la última hora: 115, 125 y 125 lpm."""
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    db.session.add_all([User(id=p, name=f"U{p}", email=f"u{p}@x.com", pass_hash="-") for p in (1, 2, 3)])
+    db.session.add_all([Patient(id=p, user_id=p, first_name="P", last_name=str(p)) for p in (1, 2, 3)])
+    db.session.add_all([Device(id=10 + p, patient_id=p, model="vb", serial=f"VB-{p}") for p in (1, 2, 3)])
+    db.session.add(Threshold(patient_id=3, metric="heart_rate", min_value=50, max_value=200))  # umbral propio
+    for p, hr in ((1, 115), (2, 125), (3, 125)):
+        db.session.add_all([Reading(device_id=10 + p, ts=now - timedelta(minutes=10, seconds=-30 * i),
+                                    heart_rate_bpm=hr) for i in range(10)])
+    db.session.commit()
+
+
+def _reevaluate(tmp_path, max_hr=None):
+    if max_hr is not None:
+        db.session.add(Threshold(metric="heart_rate", min_value=50, max_value=max_hr))
+        db.session.commit()
+        thresholds_service._cache.invalidate()   # lo que haría el cambio de umbral por la API
+    ctx = JobContext(1, {"metric": "heart_rate", "hours": 1}, str(tmp_path))
+    alerts_reevaluate(ctx)
+    db.session.commit()
+    return ctx.summary
+
+
+def _alerts():
+    return [tuple(r) for r in db.session.execute(
+        select(Alert.patient_id, Alert.type, Alert.resolved_at.is_(None)).order_by(Alert.id))]
+
+
+def _alert_id(patient_id):
+    return db.session.execute(select(Alert.id).where(Alert.patient_id == patient_id)).scalar_one()
+
+
+def test_threshold_changes_open_update_and_resolve_alerts(patients, tmp_path):
+    # Con el default (máx. 120) solo el paciente 2; el 3 no entra en un cambio global
+    assert _reevaluate(tmp_path) == "Alertas: 1 abiertas, 0 actualizadas, 0 cerradas."
+    assert _alerts() == [(2, "tachycardia", True)]
+
+    assert _reevaluate(tmp_path, max_hr=110) == "Alertas: 1 abiertas, 1 actualizadas, 0 cerradas."
+    assert _alerts() == [(2, "tachycardia", True), (1, "tachycardia", True)]
+    state = db.session.execute(select(AlertState.status, AlertState.alert_id)
+                               .where(AlertState.patient_id == 1, AlertState.metric == "heart_rate")).one()
+    assert state.status == "firing" and state.alert_id == _alert_id(1)
+
+    assert _reevaluate(tmp_path, max_hr=130) == "Alertas: 0 abiertas, 0 actualizadas, 2 cerradas."
+    assert _alerts() == [(2, "tachycardia", False), (1, "tachycardia", False)]
+    assert set(db.session.execute(select(AlertState.status).where(AlertState.metric == "heart_rate",
+                                                                  AlertState.patient_id.in_([1, 2])))
+               .scalars()) == {"ok"}
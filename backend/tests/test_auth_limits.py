@@ -0,0 +1,94 @@
+from types import SimpleNamespace
+
+import pytest
+from werkzeug.security import generate_password_hash
+
+from app.passwords import HasherBusy, PasswordHasher
+from app.ratelimit import MemoryBucketStore
+from app.services.auth_service import AuthService
+
+METHOD = "pbkdf2:sha256:1000"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeIdentityService:
+    def __init__(self, user):
+        self.user = user
+
+    def find_for_login(self, email):
+        if email != self.user.email:
+            return None, {}
+        return self.user, {"role": "client", "ver": 0}
+
+
+class FakeUsersRepo:
+    def __init__(self):
+        self.replaced = []
+
+    def replace_pass_hash(self, user_id, old_hash, new_hash):
+        self.replaced.append((user_id, old_hash, new_hash))
+        return True
+
+
+class InlineExecutor:
+    def submit(self, fn, *args):
+        fn(*args)
+
+
+def test_bucket_store_limits_per_key_and_refills():
+    clock = FakeClock()
+    store = MemoryBucketStore(clock, max_keys=2)
+    assert [store.take("a", 1.0, 2) for _ in range(3)] == [0.0, 0.0, 1.0]
+    assert store.take("b", 1.0, 2) == 0.0                    # otra clave, otro bucket
+    clock.now = 1.0
+    assert store.take("a", 1.0, 2) == 0.0
+    store.take("c", 1.0, 2)
+    assert len(store) == 2                                   # descarta la más antigua
+
+
+def test_hasher_rejects_when_full_and_detects_old_parameters():
+    hasher = PasswordHasher(METHOD, workers=0, max_pending=1)
+    assert hasher.verify(hasher.hash("Secreta1!"), "Secreta1!")
+    assert hasher.needs_rehash(generate_password_hash("x", "pbkdf2:sha256:600"))
+    assert not hasher.needs_rehash(hasher.hash("x"))
+
+    # Con el método abreviado, un hash con los parámetros por defecto está al día
+    shorthand = PasswordHasher("pbkdf2:sha256", workers=0)
+    assert not shorthand.needs_rehash(shorthand.hash("x"))
+    assert shorthand.needs_rehash(generate_password_hash("x", "pbkdf2:sha256:600"))
+
+    hasher._slots.acquire()                                  # otro request ocupando el lugar
+    with pytest.raises(HasherBusy):
+        hasher.hash("x")
+
+
+def test_authenticate_rehashes_old_hash_and_throttles_by_email(app, monkeypatch):
+    old_hash = generate_password_hash("Secreta1!", "pbkdf2:sha256:600")
+    user = SimpleNamespace(id=2, email="ana@x.com", pass_hash=old_hash)
+    repo = FakeUsersRepo()
+    store = MemoryBucketStore(FakeClock())   # no el _store del módulo: lo usan los logins de otros tests
+    service = AuthService(FakeIdentityService(user), repo, hasher=PasswordHasher(METHOD, workers=0),
+                          store=store, rehash_executor=InlineExecutor())
+
+    with app.app_context():
+        assert service.authenticate("ana@x.com", "mala")[0] is None
+        assert repo.replaced == []
+        assert service.authenticate("ana@x.com", "Secreta1!")[0] is user
+        [(user_id, replaced, new_hash)] = repo.replaced
+        assert (user_id, replaced) == (2, old_hash) and new_hash.startswith(METHOD + "$")
+
+        # La app es de toda la sesión de tests: monkeypatch restaura los límites al terminar
+        for key, value in [("LOGIN_RATE_PER_IP_PER_MIN", 60), ("LOGIN_RATE_IP_BURST", 10),
+                           ("LOGIN_RATE_PER_EMAIL_PER_MIN", 60), ("LOGIN_RATE_EMAIL_BURST", 2)]:
+            monkeypatch.setitem(app.config, key, value)
+        waits = [service.throttle("10.0.0.1", "ana@x.com") for _ in range(3)]
+        assert waits[:2] == [0.0, 0.0] and waits[2] == pytest.approx(1.0)
+        assert service.throttle("10.0.0.1", "otro@x.com") == 0.0
+        assert len(store) == 3                               # IP + dos emails, en el store inyectado
@@ -0,0 +1,74 @@
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from marshmallow import ValidationError
+
+from app.model.dto.batch_schemas import readings_batch_validator, telemetry_batch_validator
+from app.model.dto.request_schemas import DeviceTelemetryRequest, ReadingCreateRequest
+
+TS = "2026-01-01T12:00:00Z"
+
+
+def test_valid_batch_is_normalized():
+    rows, errors = readings_batch_validator.validate(
+        [{"ts": "2026-01-01T09:00:00-03:00", "heart_rate_bpm": "72", "spo2_pct": 97.0, "temp_c": "36.5"}], 10)
+    assert errors == {}
+    assert rows == [{"ts": datetime(2026, 1, 1, 12, 0), "heart_rate_bpm": 72, "temp_c": Decimal("36.5"),
+                     "spo2_pct": 97, "motion_level": None}]
+
+
+@pytest.mark.parametrize("value", ["72", " 72 ", 72.0, 72.9, Decimal("72"), "72.5", True, "abc", [72], 1e400])
+def test_integer_coercion_matches_marshmallow(value):
+    try:
+        expected = ReadingCreateRequest().load({"heart_rate_bpm": value})["heart_rate_bpm"]
+    except ValidationError:
+        expected = None
+    rows, errors = readings_batch_validator.validate([{"ts": TS, "heart_rate_bpm": value}], 10)
+    assert (rows[0]["heart_rate_bpm"] if rows else None) == expected
+    assert bool(errors) == (expected is None)
+
+
+@pytest.mark.parametrize("field, value", [
+    ("heart_rate_bpm", 250), ("heart_rate_bpm", 251), ("heart_rate_bpm", 20), ("heart_rate_bpm", 19),
+    ("heart_rate_bpm", 10 ** 400), ("temp_c", "45.0"), ("temp_c", "45.0000000000000001"),
+    ("temp_c", "29.9999999999999999"), ("temp_c", 30), ("temp_c", 44.99),
+])
+def test_range_checks_match_marshmallow_at_the_edges(field, value):
+    try:
+        expected = ReadingCreateRequest().load({field: value})[field]
+    except ValidationError:
+        expected = None
+    rows, errors = readings_batch_validator.validate([{"ts": TS, field: value}, {"ts": TS}], 10)
+    assert (rows[0][field] if rows else None) == (Decimal(expected) if field == "temp_c" and expected else expected)
+    assert bool(errors) == (expected is None)
+
+
+@pytest.mark.parametrize("value", [True, "true", "yes", 1, "0", "off", False, "maybe", 2, ["x"]])
+def test_boolean_coercion_matches_marshmallow(value):
+    try:
+        expected = DeviceTelemetryRequest().load({"charging": value})["charging"]
+    except ValidationError:
+        expected = None
+    rows, errors = telemetry_batch_validator.validate([{"ts": TS, "charging": value}], 10)
+    assert (rows[0]["charging"] if rows else None) == expected
+    assert bool(errors) == (expected is None)
+
+
+def test_errors_use_marshmallow_keys():
+    assert readings_batch_validator.validate([], 10) == ([], {"_schema": ["Se esperaba una lista no vacía de muestras."]})
+    assert readings_batch_validator.validate({"ts": TS}, 10)[1] == {
+        "_schema": ["Se esperaba una lista no vacía de muestras."]}
+    assert readings_batch_validator.validate([{"ts": TS}] * 3, 2)[1] == {"_schema": ["Máximo 2 muestras por lote."]}
+
+    rows, errors = readings_batch_validator.validate(
+        [{"ts": TS}, "x", {"ts": TS, "pulso": 1}, {"heart_rate_bpm": 70}], 10)
+    assert rows == [] and errors == {1: {"_schema": ["Invalid input type."]}, 2: {"pulso": ["Unknown field."]}}
+
+    rows, errors = readings_batch_validator.validate(
+        [{"ts": TS, "heart_rate_bpm": 300}, {"heart_rate_bpm": 70}, {"ts": "ayer"}], 10)
+    assert rows == [] and errors == {
+        0: {"heart_rate_bpm": ["Must be greater than or equal to 20 and less than or equal to 250."]},
+        1: {"ts": ["Missing data for required field."]},
+        2: {"ts": ["Not a valid datetime."]},
+    }
@@ -0,0 +1,51 @@
+from datetime import datetime
+
+from app.model.models import Alert, Device, Patient, Reading
+from app.services.dashboard_service import DashboardService
+
+T0 = datetime(2026, 1, 1, 12, 0, 0)
+
+
+class FakeRepos:
+    """Un solo fake para todos los repositorios: registra cada llamada (= una consulta)."""
+
+    def __init__(self):
+        self.calls = []
+
+    def get_with_devices(self, patient_id):
+        self.calls.append("patient")
+        if patient_id != 1:
+            return None
+        return Patient(id=1, first_name="Ana", last_name="Pérez",
+                       devices=[Device(id=d, serial=f"VB-{d}", model="vb2", status="active") for d in (3, 7, 5)])
+
+    def get_latest_for_devices(self, device_ids):
+        self.calls.append("latest")
+        return {3: Reading(id=30, device_id=3, ts=T0), 5: Reading(id=50, device_id=5, ts=T0.replace(hour=13))}
+
+    def counts(self, patient_id):
+        self.calls.append("counts")
+        return {"low": 0, "moderate": 1, "high": 2, "critical": 0}
+
+    def list_pending_for_patient(self, patient_id, limit):
+        self.calls.append("alerts")
+        return [Alert(id=i, patient_id=patient_id) for i in range(limit)]
+
+
+class FakeThresholds:
+    def effective_thresholds(self, patient_id):
+        return {"spo2": "t"}
+
+
+def test_dashboard_uses_fixed_number_of_queries():
+    repos = FakeRepos()
+    service = DashboardService(repos, repos, repos, repos, FakeThresholds())
+    data = service.build(1, alerts_limit=2)
+    assert sorted(repos.calls) == ["alerts", "counts", "latest", "patient"]
+    assert [d.id for d in data["devices"]] == [7, 5, 3]
+    assert data["latest_reading"].id == 50 and set(data["latest_by_device"]) == {3, 5}
+    assert data["pending_counts"]["total"] == 3 and len(data["pending_alerts"]) == 2
+    assert data["thresholds"] == {"spo2": "t"}
+
+    repos.calls.clear()
+    assert service.build(2) is None and repos.calls == ["patient"]
@@ -0,0 +1,49 @@
+from app.model.dto.batch_schemas import device_rows_from_csv, validate_device_rows
+from app.services.devices_service import DevicesService
+
+
+class FakeDevicesRepo:
+    def __init__(self, existing):
+        self.existing = dict(existing)
+        self.inserted = []
+
+    def existing_serials(self, serials):
+        return {s: self.existing[s] for s in serials if s in self.existing}
+
+    def bulk_insert(self, rows):
+        self.inserted.extend(rows)
+        return {r["serial"]: 100 + n for n, r in enumerate(rows)}
+
+
+class FakePatientsRepo:
+    def existing_ids(self, ids):
+        return {i for i in ids if i == 1}
+
+
+def test_csv_rows_are_validated_per_row():
+    text = "﻿serial,model,patient_id,status\nVB-0001,vb2,,\nVB-0002,vb2,1,active\nx,vb2,,\n"
+    rows, errors = validate_device_rows(device_rows_from_csv(text), max_items=10)
+    assert [i for i, _ in rows] == [0, 1]
+    assert rows[1][1] == {"serial": "VB-0002", "model": "vb2", "patient_id": 1, "status": "active"}
+    assert list(errors) == [2] and "serial" in errors[2]
+    assert validate_device_rows([], max_items=10)[1]["_schema"]
+    assert validate_device_rows([{}] * 3, max_items=2)[1]["_schema"]
+
+
+def test_provision_reports_each_row_and_inserts_once(app):
+    repo = FakeDevicesRepo({"VB-OLD": 7})
+    service = DevicesService(repo, FakePatientsRepo())
+    rows = [(0, {"serial": "VB-1", "model": "vb2"}),
+            (1, {"serial": "VB-OLD", "model": "vb2"}),
+            (2, {"serial": "VB-1", "model": "vb2"}),
+            (3, {"serial": "VB-2", "model": "vb2", "patient_id": 9}),
+            (4, {"serial": "VB-3", "model": "vb2", "patient_id": 1, "status": "active"})]
+    report = service.provision(rows, invalid={5: {"serial": ["Missing data for required field."]}})
+    assert [(i["row"], i["status"]) for i in report["items"]] == [
+        (0, "created"), (1, "exists"), (2, "duplicate"), (3, "patient_not_found"), (4, "created"), (5, "invalid")]
+    assert report["created"] == 2 and report["skipped"] == 4
+    assert [r["serial"] for r in repo.inserted] == ["VB-1", "VB-3"]
+    assert repo.inserted[0]["status"] == "new" and repo.inserted[1]["patient_id"] == 1
+
+    dry = DevicesService(FakeDevicesRepo({}), FakePatientsRepo()).provision(rows[:1], dry_run=True)
+    assert dry["created"] == 0 and dry["items"][0]["status"] == "would_create"
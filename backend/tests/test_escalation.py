@@ -0,0 +1,45 @@
+from datetime import datetime, timedelta
+
+from app.alerts.escalation import EscalationPolicy, TimerHeap
+
+T0 = datetime(2026, 1, 1, 12, 0, 0)
+
+
+def test_policy_from_config_and_next_due():
+    policy = EscalationPolicy.from_config({"ESCALATION_DELAYS_MIN": "30, 15,60", "ESCALATION_MIN_SEVERITY": "high"})
+    assert policy.delays == (timedelta(minutes=15), timedelta(minutes=30), timedelta(minutes=60))
+    assert policy.applies_to("critical") and policy.applies_to("high") and not policy.applies_to("moderate")
+    due = policy.first_due(T0.replace(microsecond=123456))
+    assert due == T0 + timedelta(minutes=15)
+    assert policy.next_due(0, due) == T0 + timedelta(minutes=30)
+    assert policy.next_due(1, T0 + timedelta(minutes=30)) == T0 + timedelta(minutes=60)
+    assert policy.next_due(2, T0 + timedelta(minutes=60)) is None
+    assert EscalationPolicy.bumped("high") == "critical" and EscalationPolicy.bumped("critical") == "critical"
+
+
+def test_policy_disabled_without_delays():
+    policy = EscalationPolicy.from_config({"ESCALATION_DELAYS_MIN": ""})
+    assert not policy.enabled and not policy.applies_to("critical")
+
+
+def test_timer_heap_pops_in_order_and_skips_rearmed_timers():
+    timers = TimerHeap()
+    timers.push(1, T0 + timedelta(minutes=5), 0)
+    timers.push(2, T0 + timedelta(minutes=1), 0)
+    timers.push(3, T0 + timedelta(minutes=3), 0)
+    assert not timers.push(3, T0 + timedelta(minutes=3), 0)   # ya armado igual
+    timers.push(1, T0 + timedelta(minutes=2), 1)              # re-armado: la entrada vieja se ignora
+    timers.discard(3)
+    assert timers.next_due() == T0 + timedelta(minutes=1)
+    assert timers.pop_due(T0 + timedelta(minutes=10), limit=10) == [
+        (2, 0, T0 + timedelta(minutes=1)), (1, 1, T0 + timedelta(minutes=2))]
+    assert len(timers) == 0 and timers.next_due() is None
+
+
+def test_timer_heap_respects_now_and_limit():
+    timers = TimerHeap()
+    for i in range(10):
+        timers.push(i, T0 + timedelta(seconds=i), 0)
+    assert [k for k, _, _ in timers.pop_due(T0 + timedelta(seconds=5), limit=3)] == [0, 1, 2]
+    assert [k for k, _, _ in timers.pop_due(T0 + timedelta(seconds=5), limit=10)] == [3, 4, 5]
+    assert len(timers) == 4 and 9 in timers
@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from app.services.devices_service import DevicesService
+
+
+class FakeRepo:
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = []
+
+    def list_fleet(self, limit, after_id=None, **filters):
+        self.calls.append((limit, after_id, filters))
+        rows = [r for r in self.rows if after_id is None or r.id < after_id]
+        return rows[:limit]
+
+
+def _row(device_id, seen_ago_min=None, patient=True):
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    seen = now - timedelta(minutes=seen_ago_min) if seen_ago_min is not None else None
+    return SimpleNamespace(id=device_id, serial=f"SN-{device_id}", model="vb", status="active",
+                           registered_at=now, patient_id=7 if patient else None, first_name="Ana",
+                           last_name="Perez", last_seen_at=seen, last_reading_at=seen, last_telemetry_at=seen,
+                           battery_pct=40, rssi_dbm=-60)
+
+
+def test_fleet_keyset_pages_and_online_flag():
+    repo = FakeRepo([_row(5, 1), _row(4, 30, patient=False), _row(3)])
+    service = DevicesService(repo)
+    page = service.fleet(limit=2)
+    assert [i["id"] for i in page["items"]] == [5, 4] and page["next_cursor"] == "4"
+    assert page["items"][0]["online"] and not page["items"][1]["online"]
+    assert page["items"][0]["patient"] == {"id": 7, "full_name": "Ana Perez"} and page["items"][1]["patient"] is None
+    last = service.fleet(limit=2, cursor=4)
+    assert [i["id"] for i in last["items"]] == [3] and last["next_cursor"] is None
+    assert repo.calls[0][0] == 3   # pide una fila de más para saber si hay otra página
+
+
+def test_fleet_offline_filters_use_the_earliest_cutoff():
+    repo = FakeRepo([])
+    DevicesService(repo).fleet(offline_min=60, online=False)
+    filters = repo.calls[0][2]
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    assert filters["seen_since"] is None
+    assert timedelta(minutes=59) < now - filters["seen_before"] <= timedelta(minutes=61)
+
+
+def test_list_fleet_query_joins_filters_and_pages(db_app):
+    from app.extensions import db
+    from app.model.models import Device, DeviceLastSeen, Patient, User
+    from app.repository.devices_repository import DevicesRepository as Repo
+
+    t0 = datetime(2026, 1, 1, 12, 0, 0)
+    db.session.add(User(id=1, name="U1", email="u1@x.com", pass_hash="-"))
+    db.session.add(Patient(id=7, user_id=1, first_name="Ana", last_name="Perez"))
+    db.session.add_all([Device(id=d, model="vb", serial=f"SN-{d}", status=s, patient_id=p)
+                        for d, s, p in ((1, "active", 7), (2, "active", None), (3, "lost", 7),
+                                        (4, "active", None), (5, "active", 7))])
+    db.session.add_all([DeviceLastSeen(device_id=1, last_seen_at=t0, battery_pct=80),
+                        DeviceLastSeen(device_id=3, last_seen_at=t0 - timedelta(hours=2), battery_pct=10),
+                        DeviceLastSeen(device_id=5, last_seen_at=t0 - timedelta(minutes=1), battery_pct=15)])
+    db.session.commit()
+
+    rows = Repo.list_fleet(limit=10)
+    assert [r.id for r in rows] == [5, 4, 3, 2, 1]
+    assert (rows[0].first_name, rows[0].battery_pct) == ("Ana", 15)
+    assert (rows[1].first_name, rows[1].last_seen_at) == (None, None)   # sin paciente ni contacto
+
+    assert [r.id for r in Repo.list_fleet(limit=2)] == [5, 4]
+    assert [r.id for r in Repo.list_fleet(limit=2, after_id=4)] == [3, 2]
+    assert [r.id for r in Repo.list_fleet(limit=2, after_id=2)] == [1]
+
+    cutoff = t0 - timedelta(minutes=30)
+    assert [r.id for r in Repo.list_fleet(seen_before=cutoff)] == [4, 3, 2]   # incluye los que nunca reportaron
+    assert [r.id for r in Repo.list_fleet(seen_since=cutoff)] == [5, 1]
+    assert [r.id for r in Repo.list_fleet(battery_below=20)] == [5, 3]
+    assert [r.id for r in Repo.list_fleet(statuses=["lost"], patient_id=7)] == [3]
+    assert [r.id for r in Repo.list_fleet(patient_id=7, battery_below=20, after_id=5)] == [3]
@@ -0,0 +1,66 @@
+from collections import namedtuple
+
+from app.cache import TTLCache
+from app.services.identity_service import Identity, IdentityService, identity_claims
+
+Auth = namedtuple("Auth", "id email role token_version patient_id device_ids")
+
+
+class FakeUsersRepo:
+    def __init__(self):
+        self.users = {2: Auth(2, "ana@x.com", "client", 0, 1, frozenset({3, 5}))}
+        self.reads = 0
+
+    def get_auth(self, user_id):
+        self.reads += 1
+        return self.users.get(user_id)
+
+
+def _token(user_id, ver, patient_id=1, device_ids=(5, 3)):
+    return {"sub": str(user_id), **identity_claims("client", ver, patient_id, device_ids)}
+
+
+def test_resolve_builds_identity_from_cached_user():
+    repo = FakeUsersRepo()
+    service = IdentityService(repo, cache=TTLCache(ttl=60))
+    assert _token(2, 0)["device_ids"] == [3, 5]
+    expected = Identity(id=2, email="ana@x.com", role="client", patient_id=1, device_ids=frozenset({3, 5}))
+    assert service.resolve(_token(2, 0)) == expected
+    assert service.resolve(_token(2, 0)) == expected
+    assert repo.reads == 1                                   # la segunda sale de la caché
+    assert service.resolve(_token(9, 0)) is None             # usuario borrado
+    assert service.resolve({"sub": "x"}) is None
+
+
+def test_band_changes_keep_the_token_and_refresh_the_identity():
+    repo = FakeUsersRepo()
+    cache = TTLCache(ttl=60)
+    service = IdentityService(repo, cache=cache)
+    old = _token(2, 0)
+    assert service.resolve(old).device_ids == frozenset({3, 5})
+    repo.users[2] = repo.users[2]._replace(device_ids=frozenset({3}))   # se le quitó una banda
+    cache.clear()                                                       # cache_versions('identities')
+
+    # Mismo token: sigue autorizado, con las bandas releídas (no las de sus claims)
+    assert service.resolve(old).device_ids == frozenset({3})
+    assert repo.reads == 2
+
+
+def test_role_change_revokes_issued_tokens():
+    repo = FakeUsersRepo()
+    service = IdentityService(repo, cache=TTLCache(ttl=60))
+    old = _token(2, 0)
+    assert service.resolve(old) is not None
+    repo.users[2] = repo.users[2]._replace(role="admin", token_version=1)
+
+    # Token nuevo con la caché aún en la versión vieja: se relee en vez de rechazarlo
+    assert service.resolve(_token(2, 1)).role == "admin"
+    assert repo.reads == 2
+    assert service.resolve(old) is None
+
+
+def test_unversioned_tokens_only_during_the_transition():
+    legacy = {"sub": "2", "role": "client"}
+    repo = FakeUsersRepo()
+    assert IdentityService(repo, cache=TTLCache(ttl=60)).resolve(legacy).patient_id == 1
+    assert IdentityService(repo, cache=TTLCache(ttl=60), accept_unversioned=False).resolve(legacy) is None
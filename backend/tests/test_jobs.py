@@ -0,0 +1,130 @@
+from datetime import datetime, timedelta
+
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import insert, select, update
+
+from app.extensions import db
+from app.jobs import JOB_HANDLERS, runner
+from app.jobs.registry import JobContext
+from app.model.models import Job, User
+from app.repository.jobs_repository import JobsRepository
+from app.services.identity_service import identity_claims
+from app.services.jobs_service import JobLimitError, JobsService
+
+T0 = datetime(2026, 1, 1, 8, 0, 0)
+
+
+def _job(job_id):
+    # Columnas leídas de la BD (no el objeto de la sesión, que no expira al commit)
+    return db.session.execute(select(Job.status, Job.progress, Job.message).where(Job.id == job_id)).one()
+
+
+def _queue(*created):
+    ids = []
+    for at in created:
+        ids.append(db.session.execute(insert(Job).values(kind="k", params={}, status="queued", progress=0,
+                                                         created_at=at)).inserted_primary_key[0])
+    db.session.commit()
+    return ids
+
+
+def test_claim_takes_the_oldest_queued_job_once(db_app):
+    newer, older, taken = _queue(T0 + timedelta(minutes=1), T0, T0 - timedelta(minutes=1))
+    db.session.execute(update(Job).where(Job.id == taken).values(status="running"))   # otro worker
+    db.session.commit()
+
+    assert JobsRepository.claim_next(T0) == older
+    assert JobsRepository.claim_next(T0) == newer
+    assert JobsRepository.claim_next(T0) is None
+    assert _job(older).status == "running"
+
+
+def test_submit_limits_pending_jobs_per_user(db_app, monkeypatch):
+    monkeypatch.setitem(db_app.config, "JOBS_MAX_PENDING_PER_USER", 2)
+    monkeypatch.setitem(JOB_HANDLERS, "noop", lambda ctx: None)
+    service = JobsService()
+    first = service.submit("noop", user_id=None)
+    service.submit("noop", user_id=None)
+    service.submit("noop", user_id=None)                 # sin usuario no hay límite
+    db.session.execute(insert(User).values(id=7, name="Admin", email="a@x.com", pass_hash="-", role="admin"))
+    for _ in range(2):
+        service.submit("noop", user_id=7)
+    with pytest.raises(JobLimitError):
+        service.submit("noop", user_id=7)
+    with pytest.raises(ValueError):
+        service.submit("no-existe", user_id=7)
+
+    db.session.execute(update(Job).where(Job.requested_by == 7).values(status="succeeded"))
+    assert service.submit("noop", user_id=7).id > first.id   # los terminados no cuentan
+
+
+def test_submit_endpoint_answers_429_over_the_limit(db_app, monkeypatch):
+    monkeypatch.setitem(db_app.config, "JOBS_MAX_PENDING_PER_USER", 1)
+    monkeypatch.setitem(JOB_HANDLERS, "noop", lambda ctx: None)
+    db.session.execute(insert(User).values(id=7, name="Admin", email="a@x.com", pass_hash="-", role="admin"))
+    db.session.commit()
+    token = create_access_token(identity="7", additional_claims=identity_claims("admin", 0, None, []))
+    headers = {"Authorization": f"Bearer {token}"}
+    client = db_app.test_client()
+
+    res = client.post("/api/v1/admin/jobs", json={"kind": "noop"}, headers=headers)
+    assert res.status_code == 202 and res.get_json()["status"] == "queued"
+    assert client.post("/api/v1/admin/jobs", json={"kind": "noop"}, headers=headers).status_code == 429
+    assert client.get(f"/api/v1/admin/jobs/{res.get_json()['id']}", headers=headers).status_code == 200
+
+
+def test_progress_is_written_only_when_it_changes(db_app, monkeypatch):
+    [job_id] = _queue(T0)
+    writes = []
+    set_progress = JobsRepository.set_progress
+    monkeypatch.setattr(JobsRepository, "set_progress",
+                        staticmethod(lambda *args: writes.append(args) or set_progress(*args)))
+    ctx = JobContext(job_id, {}, "/tmp")
+    for pct in (10.2, 10.9, 55.0):
+        ctx.progress(pct)
+    ctx.progress(55.5, "x" * 300)
+    assert [w[1] for w in writes] == [10, 55, 55]
+    assert _job(job_id).progress == 55 and len(_job(job_id).message) == 255
+
+    ctx.progress(140)
+    assert _job(job_id).progress == 100
+
+
+def test_stale_running_jobs_are_failed(db_app):
+    stale, recent, queued = _queue(T0, T0, T0)
+    db.session.execute(update(Job).where(Job.id == stale).values(status="running", started_at=T0))
+    db.session.execute(update(Job).where(Job.id == recent).values(status="running",
+                                                                  started_at=T0 + timedelta(hours=2)))
+    db.session.commit()
+
+    assert JobsRepository.fail_stale(T0 + timedelta(hours=1), T0 + timedelta(hours=3)) == 1
+    assert [_job(j).status for j in (stale, recent, queued)] == ["failed", "running", "queued"]
+    assert _job(stale).message == "Worker interrumpido."
+
+
+def test_execute_records_success_and_failure(db_app, monkeypatch, tmp_path):
+    results = tmp_path / "results"
+    monkeypatch.setitem(db_app.config, "JOBS_RESULT_DIR", str(results))
+    monkeypatch.setattr(runner, "_worker_app", db_app)   # el proceso hijo usaría su propia app
+
+    def ok(ctx):
+        ctx.progress(50)
+        ctx.summary = "Listo."
+
+    def boom(ctx):
+        with open(ctx.result_file("parcial.csv"), "w") as f:
+            f.write("a")
+        raise RuntimeError("sin datos")
+
+    monkeypatch.setitem(JOB_HANDLERS, "ok", ok)
+    monkeypatch.setitem(JOB_HANDLERS, "boom", boom)
+    ids = [db.session.execute(insert(Job).values(kind=kind, params={}, status="running", progress=0))
+           .inserted_primary_key[0] for kind in ("ok", "boom", "desconocido")]
+    db.session.commit()
+
+    for job_id in ids:
+        runner._execute(job_id)
+    assert [tuple(_job(j)) for j in ids] == [("succeeded", 100, "Listo."), ("failed", 0, "Error: sin datos"),
+                                             ("failed", 0, "Tipo de job desconocido.")]
+    assert list(results.iterdir()) == []                 # el resultado parcial se borra
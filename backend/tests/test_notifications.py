@@ -0,0 +1,148 @@
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+from app.notifications.channels import PermanentError, routes_from_config
+from app.notifications.dispatcher import NotificationDispatcher, RateLimiter, backoff_delay
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeRepo:
+    """Outbox en memoria con la misma interfaz que NotificationOutboxRepository."""
+
+    def __init__(self, rows):
+        self.rows = {r.id: r for r in rows}
+
+    def claim_due(self, now, limit):
+        due = [r for r in self.rows.values() if r.status == "pending" and r.next_attempt_at <= now][:limit]
+        for r in due:
+            r.status = "sending"
+        return due
+
+    def mark_sent(self, ids, now):
+        for i in ids:
+            self.rows[i].status, self.rows[i].attempts = "sent", self.rows[i].attempts + 1
+
+    def reschedule(self, ids, next_attempt_at, error=None, count_attempt=True):
+        for i in ids:
+            row = self.rows[i]
+            row.status, row.next_attempt_at = "pending", next_attempt_at
+            row.attempts += 1 if count_attempt else 0
+
+    def mark_failed(self, ids, error):
+        for i in ids:
+            self.rows[i].status, self.rows[i].attempts = "failed", self.rows[i].attempts + 1
+            self.rows[i].last_error = error
+
+
+class FakeChannel:
+    def __init__(self, error=None):
+        self.error = error
+        self.sent = []
+
+    def send(self, recipient, items):
+        if self.error:
+            raise self.error
+        self.sent.append((recipient, [i["alert_id"] for i in items]))
+
+
+def _row(id, recipient="http://hook", channel="webhook"):
+    from datetime import datetime
+    return SimpleNamespace(id=id, channel=channel, recipient=recipient, event="open", attempts=0,
+                           status="pending", next_attempt_at=datetime(2000, 1, 1), last_error=None,
+                           payload={"alert_id": id, "severity": "critical"})
+
+
+@pytest.fixture()
+def dispatch(app, monkeypatch):
+    """Una vuelta del dispatcher sobre filas en memoria (sin BD ni red)."""
+    def _dispatch(rows, channel, limiter=None, **config):
+        for key, value in config.items():
+            monkeypatch.setitem(app.config, key, value)
+        repo = FakeRepo(rows)
+        dispatcher = NotificationDispatcher(app, repo=repo, channels={"webhook": channel},
+                                            limiter=limiter or RateLimiter(rate=0, burst=1))
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            dispatcher.dispatch_once(pool)
+        return repo
+    return _dispatch
+
+
+def test_routes_from_config():
+    routes = routes_from_config({"NOTIFY_WEBHOOK_URLS": "http://a, http://b", "NOTIFY_EMAIL_TO": "",
+                                 "NOTIFY_FILE_PATH": "var/n.jsonl"})
+    assert routes == [("webhook", "http://a"), ("webhook", "http://b"), ("file", "var/n.jsonl")]
+
+
+def test_notifications_are_batched_per_recipient(dispatch):
+    channel = FakeChannel()
+    repo = dispatch([_row(1), _row(2, "http://other"), _row(3), _row(4)], channel,
+                    NOTIFY_MAX_PER_MESSAGE=2)
+    assert sorted(channel.sent) == [("http://hook", [1, 3]), ("http://hook", [4]), ("http://other", [2])]
+    assert all(r.status == "sent" for r in repo.rows.values())
+
+
+def test_transient_failure_is_retried_until_max_attempts(dispatch):
+    rows = [_row(1)]
+    rows[0].attempts = 1
+    repo = dispatch(rows, FakeChannel(error=OSError("timeout")), NOTIFY_MAX_ATTEMPTS=3)
+    assert repo.rows[1].status == "pending" and repo.rows[1].attempts == 2
+    assert repo.rows[1].next_attempt_at.year > 2000
+
+    repo = dispatch(list(repo.rows.values()), FakeChannel(error=OSError("timeout")), NOTIFY_MAX_ATTEMPTS=3)
+    assert repo.rows[1].status == "pending"   # aún no vence el backoff: no se reclamó
+    repo.rows[1].next_attempt_at = _row(0).next_attempt_at
+    repo = dispatch(list(repo.rows.values()), FakeChannel(error=OSError("timeout")), NOTIFY_MAX_ATTEMPTS=3)
+    assert repo.rows[1].status == "failed" and repo.rows[1].attempts == 3
+
+
+def test_permanent_error_is_not_retried(dispatch):
+    repo = dispatch([_row(1)], FakeChannel(error=PermanentError("HTTP 404")), NOTIFY_MAX_ATTEMPTS=8)
+    assert repo.rows[1].status == "failed"
+    assert "HTTP 404" in repo.rows[1].last_error
+
+
+def test_rate_limited_recipient_is_deferred_without_spending_an_attempt(dispatch):
+    clock = FakeClock()
+    limiter = RateLimiter(rate=1 / 60, burst=1, clock=clock)
+    channel = FakeChannel()
+    repo = dispatch([_row(1, "http://a"), _row(2, "http://a"), _row(3, "http://b")], channel,
+                    limiter=limiter, NOTIFY_MAX_PER_MESSAGE=1)
+    assert len(channel.sent) == 2                       # uno por destinatario
+    deferred = [r for r in repo.rows.values() if r.status == "pending"]
+    assert len(deferred) == 1 and deferred[0].attempts == 0
+    clock.now = 59
+    assert limiter.acquire(("webhook", "http://a")) == pytest.approx(1)
+
+
+def test_backoff_delay_grows_and_is_capped():
+    assert backoff_delay(1, base=10, cap=100, rng=lambda: 1.0) == 10
+    assert backoff_delay(3, base=10, cap=100, rng=lambda: 0.0) == 20
+    assert backoff_delay(10, base=10, cap=100, rng=lambda: 1.0) == 100
+
+
+def test_worker_session_rereads_claimed_rows(db_app):
+    from datetime import datetime
+    from app.extensions import db, worker_session
+    from app.model.models import NotificationOutbox
+    from app.repository.notification_outbox_repository import NotificationOutboxRepository as Repo
+
+    now = datetime(2026, 1, 1, 8, 0, 0)
+    db.session.add(NotificationOutbox(id=1, event="open", channel="webhook", recipient="http://hook",
+                                      payload={}, next_attempt_at=now))
+    db.session.commit()
+    with worker_session():
+        [first] = Repo.claim_due(now, 10)
+        Repo.reschedule([1], now, error="timeout")   # UPDATE sin tocar el objeto ya cargado
+        db.session.commit()
+        [again] = Repo.claim_due(now, 10)
+        assert again is first and (again.status, again.attempts, again.last_error) == ("sending", 1, "timeout")
+    assert db.session().expire_on_commit is False    # la sesión de los requests no cambia
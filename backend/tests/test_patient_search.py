@@ -0,0 +1,68 @@
+from collections import namedtuple
+
+from werkzeug.datastructures import MultiDict
+
+from app.model.dto.request_schemas import PatientSearchQuery
+from app.search import SubstringIndex, normalize, search_terms
+from app.services.patients_service import PatientsService, _search_text
+
+Row = namedtuple("Row", "id first_name last_name email phone birthdate")
+
+ROWS = [Row(1, "Ana", "Pérez", "ana@x.com", None, None),
+        Row(2, "José", "Muñoz", "jose@y.cl", "+56 9 1234 5678", None),
+        Row(3, "Anabel", "Soto", None, "2 2345 6789", None),
+        Row(4, "Juan", "Pereira", "jp@x.com", None, None)]
+
+
+def _index(rows, version=lambda: 1):
+    return SubstringIndex("patients", lambda: [(r.id, _search_text(*r[1:5])) for r in rows], version,
+                          check_every=0)
+
+
+def test_substring_index_matches_all_terms_in_id_order():
+    assert normalize("José PÉREZ\x00") == "jose perez"
+    index = _index(ROWS)
+    assert index.search(search_terms("ana"), 10) == [3, 1]
+    assert index.search(search_terms("PER"), 10) == [4, 1]
+    assert index.search(search_terms("ana per"), 10) == [1]
+    assert index.search(search_terms("12345678"), 10) == [2]      # teléfono sin formato
+    assert index.search(search_terms("@x.com"), 1) == [4]
+    assert index.search(search_terms("@x.com"), 1, after_id=4) == [1]
+    assert index.search(search_terms("zzz"), 10) == []
+
+    rows, version = list(ROWS), [1]
+    index = _index(rows, lambda: version[0])
+    assert index.search(["nueva"], 10) == []
+    rows.append(Row(5, "Nueva", "Paciente", None, None, None))
+    version[0] = 2                                                  # otro worker incrementó cache_versions
+    assert index.search(["nueva"], 10) == [5]
+
+
+class FakeRepo:
+    def list_page(self, limit=50, after_id=None, ids=None):
+        rows = sorted(ROWS, key=lambda r: -r.id)
+        if ids is not None:
+            rows = [r for r in rows if r.id in ids]
+        if after_id is not None:
+            rows = [r for r in rows if r.id < after_id]
+        return rows[:limit]
+
+
+def test_search_pages_with_cursor():
+    service = PatientsService(FakeRepo(), search_index=_index(ROWS))
+    page = service.search(None, limit=3)
+    assert [i["id"] for i in page["items"]] == [4, 3, 2] and page["next_cursor"] == "2"
+    assert [i["id"] for i in service.search(None, 3, cursor=2)["items"]] == [1]
+    page = service.search("ana", limit=1)
+    assert page["items"] == [{"id": 3, "full_name": "Anabel Soto", "email": None, "phone": "2 2345 6789",
+                              "birthdate": None}]
+    assert page["next_cursor"] == "3"
+    page = service.search("ana", limit=1, cursor=3)
+    assert [i["id"] for i in page["items"]] == [1] and page["next_cursor"] is None
+    assert [i["id"] for i in service.search("ana", limit=1, ids=[4, 2])["items"]] == [4, 2]
+
+
+def test_search_query_accepts_ids_as_list_or_repeated():
+    schema = PatientSearchQuery()
+    assert schema.load(MultiDict([("ids", "3,7"), ("ids", "9")]))["ids"] == [3, 7, 9]
+    assert "ids" not in schema.load(MultiDict([("q", "ana")]))
@@ -0,0 +1,97 @@
+from datetime import datetime, timedelta
+
+from app.presence.tracker import PresenceTracker
+from app.services.presence_service import is_online
+
+T0 = datetime(2026, 1, 1, 12, 0, 0)
+
+
+class FakeRepo:
+    def __init__(self):
+        self.touched, self.telemetry = [], []
+
+    def touch(self, last_seen):
+        self.touched.append(dict(last_seen))
+
+    def record_telemetry(self, seen_at, latest):
+        self.telemetry.append((dict(seen_at), dict(latest)))
+
+
+def test_tracker_coalesces_contacts_per_device(app):
+    repo = FakeRepo()
+    tracker = PresenceTracker(flush_every=0, repo=repo)   # sin hilo: flush manual
+    tracker.seen(1, T0)
+    tracker.seen(1, T0 + timedelta(seconds=3))
+    tracker.seen(1, T0 + timedelta(seconds=1))             # llega tarde: no retrocede
+    tracker.seen(2, T0, {"ts": T0, "battery_pct": 50, "rssi_dbm": -70})
+    tracker.seen(2, T0, {"ts": T0 - timedelta(minutes=1), "battery_pct": 90, "rssi_dbm": -40})
+    assert len(tracker) == 2
+    assert tracker.flush() == 2
+    assert repo.touched == [{1: T0 + timedelta(seconds=3)}]
+    assert repo.telemetry == [({2: T0}, {2: {"ts": T0, "battery_pct": 50, "rssi_dbm": -70}})]
+    assert tracker.flush() == 0 and len(tracker) == 0
+
+
+def test_is_online_uses_device_timeout():
+    assert is_online(T0 - timedelta(seconds=299), 300, T0)
+    assert not is_online(T0 - timedelta(seconds=301), 300, T0)
+
+
+def test_sweep_transitions_open_and_resolve_offline_alerts(db_app):
+    from sqlalchemy import select
+    from app.extensions import db
+    from app.model.models import Alert, AlertPendingCount, Device, DeviceLastSeen, Patient, StatsCounter, User
+    from app.repository.device_last_seen_repository import DeviceLastSeenRepository
+    from app.repository.stats_repository import minute_of
+    from app.services.presence_service import PresenceService
+
+    db.session.add(User(id=1, name="U1", email="u1@x.com", pass_hash="-"))
+    db.session.add(Patient(id=1, user_id=1, first_name="Ana", last_name="Pérez"))
+    db.session.add_all([Device(id=3, patient_id=1, model="vb", serial="VB-3"),              # 300 s (config)
+                        Device(id=5, patient_id=1, model="vb", serial="VB-5", offline_after_s=60),
+                        Device(id=9, model="vb", serial="VB-9")])                           # sin paciente
+    db.session.add_all([DeviceLastSeen(device_id=3, last_seen_at=T0, online=True),
+                        DeviceLastSeen(device_id=5, last_seen_at=T0, online=True),
+                        DeviceLastSeen(device_id=9, last_seen_at=T0, online=False)])
+    db.session.commit()
+    config = {**db_app.config, "PRESENCE_ALERTS": True, "PRESENCE_OFFLINE_AFTER_S": 300,
+              "PRESENCE_ALERT_SEVERITY": "moderate"}
+    service = PresenceService()
+
+    def alerts():
+        return [tuple(r) for r in db.session.execute(
+            select(Alert.metric, Alert.type, Alert.severity, Alert.resolved_at.is_(None)).order_by(Alert.id))]
+
+    def pending():
+        return {(r.patient_id, r.severity): r.pending for r in db.session.execute(
+            select(AlertPendingCount.patient_id, AlertPendingCount.severity, AlertPendingCount.pending))}
+
+    t1 = T0 + timedelta(minutes=2)
+    assert service.sweep(now=t1, config=config) == {"online": [9], "offline": [5]}
+    assert alerts() == [("offline:5", "custom", "moderate", True)]
+    assert pending() == {(1, "moderate"): 1}
+    assert db.session.execute(select(StatsCounter.value).where(
+        StatsCounter.name == "alerts.moderate", StatsCounter.bucket == minute_of(t1))).scalar() == 1
+    assert service.sweep(now=t1, config=config) == {"online": [], "offline": []}
+
+    # Dos sweepers con la misma foto: solo el primero registra la transición
+    t2 = T0 + timedelta(minutes=10)
+    snapshot = DeviceLastSeenRepository.list_presence()
+
+    class StaleRepo(DeviceLastSeenRepository):
+        @staticmethod
+        def list_presence():
+            return snapshot
+
+    assert service.sweep(now=t2, config=config) == {"online": [], "offline": [3, 9]}   # la 9 no tiene paciente
+    assert PresenceService(repo=StaleRepo()).sweep(now=t2, config=config) == {"online": [], "offline": []}
+    assert [a[0] for a in alerts()] == ["offline:5", "offline:3"]
+    assert pending() == {(1, "moderate"): 2}
+
+    # La banda 5 vuelve: se resuelve su alerta (sigue pendiente de reconocer)
+    DeviceLastSeenRepository.touch({5: t2})
+    db.session.commit()
+    assert service.sweep(now=t2 + timedelta(seconds=30), config=config) == {"online": [5], "offline": []}
+    assert alerts() == [("offline:5", "custom", "moderate", False), ("offline:3", "custom", "moderate", True)]
+    assert pending() == {(1, "moderate"): 2}
+    assert db.session.execute(select(DeviceLastSeen.online).where(DeviceLastSeen.device_id == 5)).scalar() is True
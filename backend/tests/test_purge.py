@@ -0,0 +1,120 @@
+import pytest
+
+import app.services.devices_service as devices_service
+import app.services.patients_service as patients_service
+from app.jobs import JOB_HANDLERS
+from app.model.models import Device, Patient
+from app.services.devices_service import DevicesService
+from app.services.jobs_service import JobLimitError
+from app.services.patients_service import PatientsService
+
+
+class FakeJobs:
+    def __init__(self, fail=False):
+        self.submitted, self.fail = [], fail
+
+    def __call__(self):
+        return self
+
+    def submit(self, kind, params, user_id=None):
+        if self.fail:
+            raise JobLimitError("Máximo de jobs pendientes por usuario.")
+        self.submitted.append((kind, params, user_id))
+        return type("Job", (), {"id": len(self.submitted)})()
+
+
+class FakePatientsRepo:
+    def get(self, patient_id):
+        return Patient(id=patient_id) if patient_id == 1 else None
+
+
+class FakeDevicesRepo:
+    def __init__(self):
+        self.unassigned = []
+
+    def unassign_patient(self, patient_id):
+        self.unassigned.append(patient_id)
+        return 1
+
+
+def test_delete_relationships_rely_on_db_cascades():
+    for rel in (Device.readings, Device.telemetry, Patient.devices, Patient.alerts, Patient.thresholds):
+        assert rel.property.passive_deletes
+    assert {"purge_device", "purge_patient"} <= set(JOB_HANDLERS)
+
+
+def test_schedule_delete_enqueues_purge_job(app, monkeypatch):
+    jobs = FakeJobs()
+    monkeypatch.setattr(devices_service, "JobsService", jobs)
+    monkeypatch.setattr(patients_service, "JobsService", jobs)
+
+    device = Device(id=7, serial="VB-7", model="vb2", status="active")
+    assert DevicesService().schedule_delete(device, requested_by=3).id == 1
+    assert device.status == "retired"
+
+    devices_repo = FakeDevicesRepo()
+    service = PatientsService(FakePatientsRepo(), devices_repo)
+    assert service.schedule_delete(1, requested_by=3).id == 2
+    assert service.schedule_delete(2) is None
+    assert devices_repo.unassigned == [1]
+    assert jobs.submitted == [("purge_device", {"device_id": 7}, 3), ("purge_patient", {"patient_id": 1}, 3)]
+
+    monkeypatch.setattr(patients_service, "JobsService", FakeJobs(fail=True))
+    with pytest.raises(JobLimitError):
+        service.schedule_delete(1)
+
+
+def test_purge_handlers_delete_history_in_chunks(db_app, monkeypatch, tmp_path):
+    from datetime import date, datetime, timedelta
+    from sqlalchemy import func, insert, select
+    from app.extensions import db
+    from app.jobs import handlers
+    from app.jobs.registry import JobContext
+    from app.model.models import Alert, DeviceLastSeen, DeviceTelemetry, Job, PatientDailySummary, Reading, User
+    from app.repository.cache_versions_repository import CacheVersionsRepository
+
+    t0 = datetime(2026, 1, 1, 8, 0, 0)
+    monkeypatch.setattr(handlers, "_PURGE_CHUNK", 2)
+    db.session.add_all([User(id=u, name=f"U{u}", email=f"u{u}@x.com", pass_hash="-") for u in (1, 2)])
+    db.session.add_all([Patient(id=p, user_id=p, first_name="P", last_name=str(p)) for p in (1, 2)])
+    db.session.add_all([Device(id=3, patient_id=1, model="vb", serial="VB-3"),
+                        Device(id=5, patient_id=1, model="vb", serial="VB-5"),
+                        Device(id=9, patient_id=2, model="vb", serial="VB-9")])
+    db.session.add_all([Reading(device_id=d, ts=t0 + timedelta(minutes=i), heart_rate_bpm=70)
+                        for d, n in ((3, 5), (5, 1), (9, 1)) for i in range(n)])
+    db.session.add_all([DeviceTelemetry(device_id=d, ts=t0 + timedelta(minutes=i), battery_pct=80)
+                        for d, n in ((3, 3), (9, 1)) for i in range(n)])
+    db.session.add_all([DeviceLastSeen(device_id=d, last_seen_at=t0) for d in (3, 9)])
+    db.session.add_all([Alert(patient_id=p, ts=t0 + timedelta(minutes=i), type="tachycardia", severity="high")
+                        for p, n in ((1, 3), (2, 1)) for i in range(n)])
+    db.session.add_all([PatientDailySummary(day=date(2026, 1, d), patient_id=p)
+                        for p, n in ((1, 2), (2, 1)) for d in range(1, n + 1)])
+    job_id = db.session.execute(insert(Job).values(kind="purge", params={}, status="running",
+                                                   progress=0)).inserted_primary_key[0]
+    db.session.commit()
+
+    def count(model, *conds):
+        return db.session.execute(select(func.count()).select_from(model).where(*conds)).scalar()
+
+    ctx = JobContext(job_id, {"device_id": 3}, str(tmp_path))
+    handlers.purge_device(ctx)
+    assert ctx.summary == "Dispositivo VB-3 eliminado (5 lecturas, 3 registros de telemetría)."
+    assert [count(m, m.device_id == 3) for m in (Reading, DeviceTelemetry, DeviceLastSeen)] == [0, 0, 0]
+    assert count(Device, Device.id == 3) == 0
+    assert [count(m, m.device_id == 9) for m in (Reading, DeviceTelemetry, DeviceLastSeen)] == [1, 1, 1]
+    assert CacheVersionsRepository.get("identities") == 1     # la banda sale de la identidad del paciente
+
+    ctx = JobContext(job_id, {"patient_id": 1}, str(tmp_path))
+    handlers.purge_patient(ctx)
+    assert ctx.summary == "Paciente 1 eliminado (3 alertas, 2 resúmenes diarios)."
+    assert count(Patient, Patient.id == 1) == 0
+    assert [count(m, m.patient_id == 1) for m in (Alert, PatientDailySummary)] == [0, 0]
+    assert [count(m, m.patient_id == 2) for m in (Alert, PatientDailySummary)] == [1, 1]
+    assert db.session.execute(select(Device.patient_id).where(Device.id == 5)).scalar() is None
+    assert count(Reading, Reading.device_id == 5) == 1         # la banda conserva su historial
+    assert CacheVersionsRepository.get("identities") == 3      # desasignación + borrado del paciente
+    assert CacheVersionsRepository.get("patients") == 1        # sale del índice de búsqueda
+    assert db.session.execute(select(Job.progress).where(Job.id == job_id)).scalar() == 99
+
+    handlers.purge_patient(ctx)
+    assert ctx.summary == "Paciente 1 ya no existe."
@@ -0,0 +1,49 @@
+import os
+
+import pytest
+
+# Presupuesto de sentencias SQL por endpoint: si un cambio agrega un SELECT por fila
+# (N+1) o vuelve a hacer refresh() tras cada escritura, estos tests lo detectan.
+
+
+def test_login_query_budget(client, count_queries):
+    with count_queries() as q:
+        res = client.post("/api/v1/auth/login",
+                          json={"email": "admin@vitalband.local", "password": "Admin123!"})
+    assert res.status_code == 200
+    assert q.count <= 1, q.statements
+
+
+def test_list_patients_query_budget(client, auth_headers, count_queries):
+    # Calienta la caché de identidad (con la caché fría suma la versión del usuario)
+    assert client.get("/api/v1/auth/me", headers=auth_headers).status_code == 200
+    with count_queries() as q:
+        res = client.get("/api/v1/patients", headers=auth_headers)
+    assert res.status_code == 200
+    assert q.count <= 2, q.statements
+
+
+@pytest.mark.skipif(os.getenv("E2E_WRITE") != "1", reason="set E2E_WRITE=1")
+def test_telemetry_create_query_budget_optional_write(client, auth_headers, count_queries):
+    """Escritura opcional (E2E_WRITE=1): crear telemetría no debe releer la fila insertada."""
+    payload = {"battery_mv": 3890, "battery_pct": 72, "charging": False}
+    with count_queries() as q:
+        res = client.post("/api/v1/devices/1/telemetry", json=payload, headers=auth_headers)
+    assert res.status_code in (201, 404)
+    if res.status_code == 201:
+        # SELECT del dispositivo + INSERT (sin SELECT de refresh)
+        assert q.count <= 2, q.statements
+
+
+def test_me_query_budget(client, auth_headers, query_budget):
+    # Identity del token: a lo sumo la versión del usuario si la caché está fría
+    with query_budget(2):
+        res = client.get("/api/v1/auth/me", headers=auth_headers)
+    assert res.status_code == 200
+
+
+def test_admin_stats_query_budget(client, auth_headers, query_budget):
+    # Contadores agregados + estados de dispositivos + identidad (nunca recorre readings)
+    with query_budget(6):
+        res = client.get("/api/v1/admin/stats", headers=auth_headers)
+    assert res.status_code == 200
@@ -0,0 +1,66 @@
+import json
+import logging
+
+import pytest
+from sqlalchemy import text
+
+from app import Config, create_app
+from app.extensions import db
+from app.instrumentation import QueryStats, capture_queries
+
+
+@pytest.fixture()
+def stats_app(tmp_path):
+    class StatsConfig(Config):
+        TESTING = True
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path}/stats.db"
+        SQLALCHEMY_ENGINE_OPTIONS = {}
+        QUERY_STATS_SAMPLE_RATE = 1.0
+        QUERY_STATS_SLOW_MS = 10_000
+
+    app = create_app(StatsConfig)
+
+    @app.get("/_n_plus_one")
+    def _n_plus_one():
+        for i in range(5):
+            db.session.execute(text("SELECT :i"), {"i": i}).scalar()
+        return {"ok": True}
+
+    return app
+
+
+def test_sampled_request_reports_server_timing_and_logs_repeated_statements(stats_app, caplog):
+    client = stats_app.test_client()
+    with caplog.at_level(logging.INFO, logger="app.instrumentation"):
+        res = client.get("/_n_plus_one")
+    assert res.headers["Server-Timing"].startswith('db;dur=')
+    assert 'desc="5 queries", app;dur=' in res.headers["Server-Timing"]
+
+    [record] = [r for r in caplog.records if r.name == "app.instrumentation"]
+    assert record.levelno == logging.INFO
+    assert record.query_stats == json.loads(record.getMessage())
+    assert record.query_stats["queries"] == 5 and record.query_stats["endpoint"] == "_n_plus_one"
+    assert record.query_stats["repeated"] == {"count": 5, "sql": "SELECT ?"}
+    assert len(record.query_stats["slowest"]) == 3
+
+    stats_app.config["QUERY_STATS_SAMPLE_RATE"] = 0
+    assert "Server-Timing" not in client.get("/_n_plus_one").headers
+
+
+def test_capture_queries_nests_with_request_stats(stats_app):
+    client = stats_app.test_client()
+    with capture_queries() as outer:
+        client.get("/_n_plus_one")
+        with capture_queries() as inner:
+            client.get("/_n_plus_one")
+    assert (outer.count, inner.count) == (10, 5)
+    assert outer.statements == ["SELECT ?"] * 10
+
+
+def test_query_stats_keeps_only_the_slowest():
+    stats = QueryStats(top=2)
+    for sql, seconds in [("a", 0.001), ("b", 0.005), ("c", 0.002), ("d", 0.0005)]:
+        stats.record(sql, seconds)
+    assert stats.slowest == [(0.005, "b"), (0.002, "c")]
+    assert stats.most_repeated is None
+    assert stats.count == 4 and stats.db_time == pytest.approx(0.0085)
@@ -0,0 +1,100 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from flask_jwt_extended import create_access_token
+from werkzeug.exceptions import BadRequest
+
+from app.controller.client_controller import _encode_cursor, _parse_cursor
+from app.extensions import db
+from app.model.models import Device, Patient, Reading, User
+from app.repository.metrics_repository import MetricsRepository
+from app.services.identity_service import identity_claims
+
+T0 = datetime(2026, 1, 1, 12, 0, 0)
+
+
+@pytest.fixture()
+def history(db_app):
+    """Paciente con dos bandas (3 y 5) y otra banda (9) de otro paciente; lecturas con ts repetidos."""
+    db.session.add_all([User(id=u, name=f"U{u}", email=f"u{u}@x.com", pass_hash="-", role="client")
+                        for u in (1, 2)])
+    db.session.add_all([Patient(id=1, user_id=1, first_name="Ana", last_name="Pérez"),
+                        Patient(id=2, user_id=2, first_name="Otro", last_name="Paciente")])
+    db.session.add_all([Device(id=3, patient_id=1, model="vb1", serial="VB-3", status="retired"),
+                        Device(id=5, patient_id=1, model="vb2", serial="VB-5", status="active"),
+                        Device(id=9, patient_id=2, model="vb2", serial="VB-9", status="active")])
+    # ids 1..8: dos lecturas por instante, alternando bandas; la 9 de otro paciente
+    for i in range(8):
+        db.session.add(Reading(id=i + 1, device_id=(3, 5)[i % 2], ts=T0 + timedelta(minutes=i // 2),
+                               heart_rate_bpm=60 + i))
+    db.session.add(Reading(id=20, device_id=9, ts=T0 + timedelta(hours=1), heart_rate_bpm=99))
+    db.session.commit()
+    token = create_access_token(identity="1", additional_claims=identity_claims("client", 0, 1, [3, 5]))
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_cursor_round_trip_and_invalid_cursor(db_app):
+    reading = SimpleNamespace(ts=datetime(2026, 1, 1, 12, 0, 0, 250000), id=42)
+    assert _parse_cursor(_encode_cursor(reading)) == (reading.ts, 42)
+    assert _parse_cursor(None) is None and _parse_cursor("") is None
+    with pytest.raises(BadRequest):
+        _parse_cursor("no-es-un-cursor")
+
+
+def test_history_pages_are_stable_across_equal_timestamps(history):
+    seen, before = [], None
+    while True:
+        page = MetricsRepository.list_range_for_devices([3, 5], limit=3, before=before)
+        seen += [r.id for r in page]
+        if len(page) < 3:
+            break
+        before = _parse_cursor(_encode_cursor(page[-1]))
+    assert seen == [8, 7, 6, 5, 4, 3, 2, 1]   # cada lectura una vez, ts e id descendentes
+
+    assert MetricsRepository.list_range_for_devices([]) == []
+    assert [r.id for r in MetricsRepository.list_range_for_devices(
+        [5], dt_from=T0 + timedelta(minutes=1), dt_to=T0 + timedelta(minutes=2))] == [6, 4]
+
+
+def test_latest_for_devices_picks_highest_id_on_equal_timestamps(history):
+    db.session.add(Reading(id=30, device_id=3, ts=T0 + timedelta(minutes=3)))   # mismo ts que la 7
+    db.session.commit()
+    latest = MetricsRepository.get_latest_for_devices([3, 5, 11])
+    assert {d: r.id for d, r in latest.items()} == {3: 30, 5: 8}
+    assert MetricsRepository.get_latest_for_devices([]) == {}
+
+
+def test_history_endpoint_merges_devices_and_rejects_foreign_device(db_app, history):
+    client = db_app.test_client()
+    res = client.get("/api/v1/me/readings?limit=5", headers=history)
+    body = res.get_json()
+    assert res.status_code == 200 and [r["id"] for r in body["items"]] == [8, 7, 6, 5, 4]
+    res = client.get("/api/v1/me/readings", query_string={"cursor": body["next_cursor"]}, headers=history)
+    assert [r["id"] for r in res.get_json()["items"]] == [3, 2, 1]
+
+    res = client.get("/api/v1/me/readings?device_id=3", headers=history)
+    assert {r["device_id"] for r in res.get_json()["items"]} == {3}
+    assert client.get("/api/v1/me/readings?device_id=9", headers=history).status_code == 403
+
+
+def test_latest_endpoint_reports_every_device(db_app, history):
+    body = db_app.test_client().get("/api/v1/me/readings/latest", headers=history).get_json()
+    assert body["latest_reading"]["id"] == 8 and body["device_status"] == "active"
+    assert {d["device_id"]: d["latest_reading"]["id"] for d in body["devices"]} == {3: 7, 5: 8}
+
+
+def test_reassigned_band_is_authorized_with_the_same_token(db_app, history):
+    from app.repository.cache_versions_repository import CacheVersionsRepository
+    from app.repository.devices_repository import DevicesRepository
+    from app.services import identity_service
+
+    client = db_app.test_client()
+    assert client.get("/api/v1/me/readings?device_id=9", headers=history).status_code == 403
+    DevicesRepository.assign_to_patient(9, 1)
+    db.session.commit()
+    assert CacheVersionsRepository.get("identities") == 1
+    identity_service._cache.invalidate()        # lo que ve cada worker en su próxima revisión de versión
+
+    res = client.get("/api/v1/me/readings?device_id=9", headers=history)   # sin volver a iniciar sesión
+    assert res.status_code == 200 and [r["id"] for r in res.get_json()["items"]] == [20]
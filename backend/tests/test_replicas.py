@@ -0,0 +1,81 @@
+import time
+
+import pytest
+from sqlalchemy import select, update
+
+from app import Config, create_app
+from app.extensions import db
+from app.model.models import ReplicaHeartbeat
+from app.replicas import ReplicaRouter, replica_read
+
+
+@replica_read
+def _read_beat():
+    return db.session.execute(select(ReplicaHeartbeat.beat_ms)).scalar()
+
+
+def _set_beat(engine, beat_ms):
+    with engine.begin() as conn:
+        conn.execute(update(ReplicaHeartbeat).values(beat_ms=beat_ms))
+
+
+@pytest.fixture()
+def replica_app(tmp_path):
+    """Primaria y réplica como dos SQLite con la tabla del latido (sin replicación real)."""
+    class ReplicaConfig(Config):
+        TESTING = True
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path}/primary.db"
+        SQLALCHEMY_ENGINE_OPTIONS = {}
+        SQLALCHEMY_REPLICA_URIS = [f"sqlite:///{tmp_path}/replica.db"]
+        REPLICA_MAX_LAG_S = 5
+        REPLICA_CHECK_S = 0   # chequea en cada lectura
+
+    app = create_app(ReplicaConfig)
+    with app.test_request_context():
+        for engine in db.engines.values():
+            ReplicaHeartbeat.__table__.create(engine)
+            with engine.begin() as conn:
+                conn.execute(ReplicaHeartbeat.__table__.insert().values(id=1, beat_ms=0))
+        yield app
+        db.session.remove()
+    # db es compartido: sin esto, create_all de otra app buscaría la engine de 'replica_0'
+    for key in app.extensions["replicas"].keys:
+        db.metadatas.pop(key, None)
+
+
+def test_history_reads_use_replica_until_it_lags_or_the_session_writes(replica_app):
+    replica = db.engines["replica_0"]
+    fresh = int((time.time() - 1) * 1000)
+    _set_beat(replica, fresh)
+    assert _read_beat() == fresh                       # leído en la réplica
+
+    _set_beat(replica, fresh - 60_000)                 # la réplica quedó 60 s atrás
+    assert _read_beat() != fresh - 60_000
+    _set_beat(replica, fresh)
+    assert _read_beat() == fresh
+
+    db.session.execute(update(ReplicaHeartbeat).values(beat_ms=1))   # escritura en la sesión
+    assert _read_beat() == 1                           # read-your-writes: primaria
+
+
+def test_replica_failures_fall_back_to_primary(replica_app):
+    _set_beat(db.engines["replica_0"], int(time.time() * 1000))
+    router = replica_app.extensions["replicas"]
+    router.check_every = 60
+    assert router.check() == ["replica_0"]
+    ReplicaHeartbeat.__table__.drop(db.engines["replica_0"])
+
+    assert _read_beat() > 0                            # falló en la réplica y se repitió en la primaria
+    assert router.pick() is None
+
+
+def test_router_remembers_recent_writes_per_user():
+    now = [0.0]
+    router = ReplicaRouter(lambda: {}, ["replica_0"], sticky_for=5, clock=lambda: now[0], max_users=2)
+    router.note_write("7")
+    assert router.wrote_recently("7") and not router.wrote_recently("8") and not router.wrote_recently(None)
+    now[0] = 5.0
+    assert not router.wrote_recently("7")
+    for user in ("1", "2", "3"):
+        router.note_write(user)
+    assert not router.wrote_recently("1") and router.wrote_recently("3")
@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.extensions import db
+from app.model.models import Device, DeviceLastSeen, Patient, User
+from app.repository.alert_pending_counts_repository import AlertPendingCountsRepository
+from app.repository.stats_repository import StatsRepository, minute_of
+from app.services import stats_service
+from app.services.stats_service import READINGS_SERIES_MINUTES, StatsService
+
+NOW = datetime(2026, 1, 8, 12, 30, 45)
+MINUTE = minute_of(NOW)
+
+
+class _FrozenDatetime(datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return NOW.replace(tzinfo=tz)
+
+
+@pytest.fixture()
+def counters(db_app, monkeypatch):
+    """Contadores de alertas en las tres ventanas y lecturas en algunos minutos de la última hora."""
+    monkeypatch.setattr(stats_service, "datetime", _FrozenDatetime)
+    StatsRepository.increment({
+        ("alerts.high", MINUTE): 1,                                    # minuto en curso
+        ("alerts.high", MINUTE - timedelta(minutes=59)): 2,            # dentro de 1h
+        ("alerts.high", MINUTE - timedelta(hours=3)): 4,               # solo 24h y 7d
+        ("alerts.critical", MINUTE - timedelta(days=2)): 8,            # solo 7d
+        ("alerts.low", MINUTE - timedelta(days=8)): 16,                # fuera de todas
+        ("readings", MINUTE - timedelta(minutes=60)): 99,              # antes de la serie
+        ("readings", MINUTE - timedelta(minutes=59)): 3,
+        ("readings", MINUTE - timedelta(minutes=10)): 5,
+        ("readings", MINUTE): 7,
+    })
+    StatsRepository.increment({("alerts.high", MINUTE): 1, ("readings", MINUTE): 0})  # se suma a la fila
+    db.session.add(User(id=1, name="U1", email="u1@x.com", pass_hash="-"))
+    db.session.add(Patient(id=1, user_id=1, first_name="P", last_name="1"))
+    db.session.add_all([Device(id=d, model="vb", serial=f"VB-{d}", status=s)
+                        for d, s in ((1, "active"), (2, "active"), (3, "lost"))])
+    db.session.add_all([DeviceLastSeen(device_id=1, last_seen_at=NOW - timedelta(minutes=1)),
+                        DeviceLastSeen(device_id=2, last_seen_at=NOW - timedelta(minutes=6))])
+    AlertPendingCountsRepository.apply({(1, "high"): 2})
+    db.session.commit()
+
+
+def test_totals_by_window_and_series(counters):
+    windows = {"1h": MINUTE - timedelta(hours=1), "7d": MINUTE - timedelta(days=7)}
+    assert StatsRepository.totals_by_window(["alerts.high", "alerts.critical", "alerts.moderate"], windows) == {
+        "1h": {"alerts.high": 4, "alerts.critical": 0, "alerts.moderate": 0},
+        "7d": {"alerts.high": 8, "alerts.critical": 8, "alerts.moderate": 0},
+    }
+    assert StatsRepository.series("readings", MINUTE - timedelta(minutes=10)) == [
+        (MINUTE - timedelta(minutes=10), 5), (MINUTE, 7)]
+
+    assert StatsRepository.purge_before(MINUTE - timedelta(days=7)) == 1
+    db.session.commit()
+    assert StatsRepository.totals_by_window(["alerts.low"], {"all": datetime(2000, 1, 1)}) == {
+        "all": {"alerts.low": 0}}
+
+
+def test_dashboard_windows_and_zero_filled_series(counters):
+    stats = StatsService(cache=stats_service.TTLCache(ttl=60)).dashboard()
+    assert stats["alerts"] == {
+        "1h": {"low": 0, "moderate": 0, "high": 4, "critical": 0},
+        "24h": {"low": 0, "moderate": 0, "high": 8, "critical": 0},
+        "7d": {"low": 0, "moderate": 0, "high": 8, "critical": 8},
+    }
+    assert stats["alerts_pending"] == {"low": 0, "moderate": 0, "high": 2, "critical": 0}
+    assert stats["patients"] == {"total": 1}
+    assert stats["devices"] == {"total": 3, "by_status": {"active": 2, "lost": 1}, "seen_last_5m": 1}
+
+    series = stats["readings_per_minute"]
+    assert len(series) == READINGS_SERIES_MINUTES
+    assert series[0] == {"minute": (MINUTE - timedelta(minutes=59)).isoformat(), "count": 3}
+    assert series[-1] == {"minute": MINUTE.isoformat(), "count": 7}
+    assert series[-11]["count"] == 5
+    assert sum(point["count"] for point in series) == 15        # el resto, ceros
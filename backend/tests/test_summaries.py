@@ -0,0 +1,64 @@
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select
+
+from app.extensions import db
+from app.model.models import Alert, Device, Patient, PatientDailySummary, Reading, Threshold, User
+from app.repository.summaries_repository import SummariesRepository
+from app.services.summaries_service import SummariesService
+
+DAY = date(2026, 1, 1)
+T0 = datetime(2026, 1, 1, 8, 0, 0)
+
+
+@pytest.fixture()
+def readings(db_app):
+    """Pacientes 1 (banda 3) y 2 (banda 5), banda 9 sin asignar; dos umbrales globales de HR repetidos."""
+    db.session.add_all([User(id=u, name=f"U{u}", email=f"u{u}@x.com", pass_hash="-") for u in (1, 2)])
+    db.session.add_all([Patient(id=p, user_id=p, first_name="P", last_name=str(p)) for p in (1, 2)])
+    db.session.add_all([Device(id=3, patient_id=1, model="vb", serial="VB-3"),
+                        Device(id=5, patient_id=2, model="vb", serial="VB-5"),
+                        Device(id=9, model="vb", serial="VB-9")])
+    db.session.add_all([Threshold(id=1, metric="heart_rate", min_value=40, max_value=100),
+                        Threshold(id=2, metric="heart_rate", min_value=50, max_value=110),   # el vigente
+                        Threshold(id=3, patient_id=2, metric="heart_rate", min_value=50, max_value=150)])
+    db.session.add_all([
+        Reading(device_id=3, ts=T0, heart_rate_bpm=105, motion_level=0),       # supera solo el global viejo
+        Reading(device_id=3, ts=T0 + timedelta(minutes=1), heart_rate_bpm=115, motion_level=3),
+        Reading(device_id=3, ts=T0 + timedelta(minutes=1, seconds=30), heart_rate_bpm=116, motion_level=3),
+        Reading(device_id=3, ts=T0 + timedelta(minutes=2), heart_rate_bpm=60, spo2_pct=90,
+                temp_c=Decimal("37.0"), motion_level=1),
+        Reading(device_id=3, ts=T0 + timedelta(days=1), heart_rate_bpm=200),  # otro día
+        Reading(device_id=5, ts=T0, heart_rate_bpm=140, spo2_pct=97),          # dentro de su propio umbral
+        Reading(device_id=9, ts=T0, heart_rate_bpm=200),                        # sin paciente
+    ])
+    db.session.add(Alert(patient_id=1, ts=T0, type="tachycardia", severity="high"))
+    db.session.commit()
+
+
+def test_aggregate_readings_resolves_one_global_threshold(readings):
+    start = datetime.combine(DAY, datetime.min.time())
+    assert SummariesRepository.aggregate_readings(start, start + timedelta(days=1)) == {
+        1: {"readings_count": 4, "resting_hr_bpm": 82.5, "min_spo2_pct": 90, "max_temp_c": Decimal("37.0"),
+            "minutes_out_of_range": 2},
+        2: {"readings_count": 1, "resting_hr_bpm": None, "min_spo2_pct": 97, "max_temp_c": None,
+            "minutes_out_of_range": 0},
+    }
+
+
+def test_build_day_replaces_only_that_day(readings):
+    db.session.add_all([PatientDailySummary(day=DAY, patient_id=2, readings_count=99),
+                        PatientDailySummary(day=DAY - timedelta(days=1), patient_id=1, readings_count=7)])
+    db.session.commit()
+
+    assert SummariesService().build_day(DAY) == 2
+    rows = db.session.execute(select(PatientDailySummary.day, PatientDailySummary.patient_id,
+                                     PatientDailySummary.readings_count, PatientDailySummary.alerts_high)
+                              .order_by(PatientDailySummary.day, PatientDailySummary.patient_id)).all()
+    assert [tuple(r) for r in rows] == [(DAY - timedelta(days=1), 1, 7, 0), (DAY, 1, 4, 1), (DAY, 2, 1, 0)]
+
+    assert SummariesRepository.replace_day(DAY, []) == 0
+    assert db.session.execute(select(PatientDailySummary.day)).scalars().all() == [DAY - timedelta(days=1)]
+
@@ -0,0 +1,114 @@
+from decimal import Decimal
+from types import SimpleNamespace
+
+from app.cache import TTLCache, VersionedCache
+from app.services.thresholds_service import ThresholdsService
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeRepo:
+    """Repositorio en memoria que cuenta las consultas de list_for_patients."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = 0
+
+    def list_for_patients(self, patient_ids, include_global=True):
+        self.calls += 1
+        return [r for r in self.rows
+                if r.patient_id in patient_ids or (include_global and r.patient_id is None)]
+
+
+def _row(id, patient_id, metric, lo, hi):
+    return SimpleNamespace(id=id, patient_id=patient_id, metric=metric, created_at=None,
+                           min_value=Decimal(lo), max_value=Decimal(hi))
+
+
+def _service(rows, version=None):
+    version = version or {"v": 0}
+    cache = VersionedCache("thresholds", ttl=60, check_every=2, version_loader=lambda: version["v"],
+                           clock=FakeClock())
+    return ThresholdsService(repo=FakeRepo(rows), cache=cache)
+
+
+def test_ttl_cache_expires_entries():
+    clock = FakeClock()
+    cache = TTLCache(ttl=10, clock=clock)
+    cache.set("a", 1)
+    clock.now = 9.9
+    assert cache.get("a") == 1
+    clock.now = 10
+    assert cache.get("a") is None
+
+
+def test_stale_generation_is_not_stored():
+    """Lo leído antes de una invalidación no se guarda después de ella."""
+    cache = VersionedCache("x", ttl=60, version_loader=lambda: 0, clock=FakeClock())
+    generation = cache.generation
+    cache.invalidate()
+    cache.set_many({"a": 1}, generation=generation)
+    assert cache.get("a") is None
+
+
+def test_versioned_cache_clears_when_version_changes():
+    clock = FakeClock()
+    version = {"v": 1}
+    loads = []
+
+    def loader():
+        loads.append(clock.now)
+        return version["v"]
+
+    cache = VersionedCache("x", ttl=60, check_every=2, version_loader=loader, clock=clock)
+    cache.get("a")
+    cache.set("a", 1)
+    version["v"] = 2
+    clock.now = 1
+    assert cache.get("a") == 1          # aún no toca revisar la versión
+    clock.now = 2
+    assert cache.get("a") is None       # otro worker incrementó la versión
+    assert loads == [0, 2]
+
+
+def test_effective_thresholds_resolve_patient_global_default_in_one_query():
+    service = _service([_row(1, None, "heart_rate", "40", "130"), _row(2, 7, "heart_rate", "45", "110"),
+                        _row(3, None, "spo2", "90", "100")])
+    effective = service.effective_thresholds(7)
+    assert service.repo.calls == 1
+    assert effective["heart_rate"].max_value == Decimal("110")   # propio del paciente
+    assert effective["spo2"].min_value == Decimal("90")          # global
+    assert effective["temperature"].id is None                   # por defecto
+    assert effective["temperature"].max_value == Decimal("38.0")
+
+    for metric in ("heart_rate", "spo2", "temperature"):
+        service.get_thresholds(7, metric)
+    assert service.repo.calls == 1                               # todo desde la caché
+
+
+def test_bulk_resolution_only_queries_missing_patients():
+    service = _service([_row(1, 3, "heart_rate", "40", "100")])
+    service.effective_thresholds(1)
+    assert service.repo.calls == 1
+    many = service.effective_thresholds_many([1, 2, 3])
+    assert service.repo.calls == 2
+    assert many[3]["heart_rate"].max_value == Decimal("100")
+    assert many[2]["heart_rate"].max_value == Decimal("120")
+
+
+def test_cache_version_bump_creates_then_increments_the_row(db_app):
+    from app.extensions import db
+    from app.repository.cache_versions_repository import CacheVersionsRepository
+
+    assert CacheVersionsRepository.get("identities") == 0
+    CacheVersionsRepository.bump("identities")      # sin fila sembrada: la crea en 1
+    CacheVersionsRepository.bump("identities")
+    db.session.commit()
+    assert CacheVersionsRepository.get("identities") == 2
+    assert CacheVersionsRepository.get("thresholds") == 0
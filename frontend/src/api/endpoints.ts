@@ -30,6 +30,18 @@ export type PatientDetail = {
   weight_kg?: string | null; // Viene como string del backend (Decimal)
   created_at: string; // ISO 8601
 };
+// Fila del listado admin de pacientes (GET /admin/patients): solo lo que muestra la tabla
+export type PatientListItem = {
+  id: number;
+  full_name: string;
+  email?: string | null;
+  phone?: string | null;
+  birthdate?: string | null; // Formato YYYY-MM-DD
+};
+export type PatientPage = {
+  items: PatientListItem[];
+  next_cursor: string | null; // null = no hay más páginas
+};
 export type Device = {
   id: number;
   patient_id: number | null;
@@ -196,6 +208,20 @@ export async function getMyLatestReadings(): Promise<{ latest_reading: Reading |
   return data;
 }
 
+// NUEVO: Panel completo en una sola llamada (perfil, bandas, última lectura, alertas y umbrales)
+export type MyDashboard = {
+  profile: PatientDetail;
+  devices: (Device & { latest_reading: Reading | null })[];
+  latest_reading: Reading | null;
+  device_status: string | null;
+  alerts: { pending: Alert[]; total: number; by_severity: Record<Alert["severity"], number> };
+  thresholds: Omit<Threshold, "created_at">[];
+};
+export async function getMyDashboard(): Promise<MyDashboard> {
+  const { data } = await http.get<MyDashboard>("/me/dashboard");
+  return data;
+}
+
 // NUEVO: Obtener historial de lecturas con filtros
 export async function getMyReadingsHistory(params?: DateRangeParams): Promise<Reading[]> {
   const { data } = await http.get<ListResponse<Reading>>("/me/readings", { params });
@@ -216,9 +242,13 @@ export async function getMyAlerts(params?: { limit?: number; acknowledged?: bool
 // --- Admin: Pacientes ---
 
 // listPatients ahora apunta a la ruta admin
-export async function listPatientsAdmin(params?: { /* filtros? */ }): Promise<PatientDetail[]> {
-  const { data } = await http.get<ListResponse<PatientDetail>>("/admin/patients", { params });
-  return data?.items ?? [];
+// q: búsqueda por nombre, email o teléfono; paginado con limit (máx. 200) y cursor (next_cursor);
+// ids: solo esos pacientes (hasta 200), p. ej. para mostrar nombres en otra tabla
+export async function listPatientsAdmin(params?: { q?: string; limit?: number; cursor?: string | null; ids?: number[] }): Promise<PatientPage> {
+  const { ids, ...rest } = params ?? {};
+  const query = ids ? { ...rest, ids: ids.join(",") } : rest;
+  const { data } = await http.get<PatientPage>("/admin/patients", { params: query });
+  return { items: data?.items ?? [], next_cursor: data?.next_cursor ?? null };
 }
 
 export async function getPatientDetailAdmin(patientId: number): Promise<PatientDetail> {
@@ -244,6 +274,19 @@ export async function deletePatientAdmin(patientId: number): Promise<void> {
   await http.delete(`/admin/patients/${patientId}`);
 }
 
+// --- Admin: Resumen ---
+
+// GET /admin/stats (cacheado unos segundos en el backend); solo los campos que usa el panel
+export type AdminStats = {
+  generated_at: string; // ISO 8601
+  patients: { total: number };
+  devices: { total: number; by_status: Record<string, number>; seen_last_5m: number };
+};
+export async function getAdminStats(): Promise<AdminStats> {
+  const { data } = await http.get<AdminStats>("/admin/stats");
+  return data;
+}
+
 // --- Admin: Dispositivos ---
 
 export async function listDevicesAdmin(params?: { /* filtros? page? per_page? */ }): Promise<Device[]> {
@@ -7,7 +7,13 @@ import {
   deleteDeviceAdmin,
   assignDeviceAdmin,
 } from "../api/endpoints";
-import type { Device, PatientDetail } from "../api/endpoints";
+import type { Device, PatientListItem } from "../api/endpoints";
+
+const NAMES_CHUNK = 200;     // máximo de ids por pedido a /admin/patients
+const SEARCH_LIMIT = 20;     // resultados del buscador del modal
+const SEARCH_DELAY_MS = 300;
+
+type PatientRef = Pick<PatientListItem, "id" | "full_name">;
 
 // --- Helper de formato (Idealmente, mover a utils.ts) ---
 const formatDeviceStatus = (status: Device['status']): string => {
@@ -21,33 +27,85 @@ const formatDeviceStatus = (status: Device['status']): string => {
   return translations[status] || status;
 };
 
+// Nombres de los pacientes con esos ids (en tandas, sin traer el listado completo)
+async function fetchPatientNames(ids: number[]): Promise<Map<number, string>> {
+  const chunks: number[][] = [];
+  for (let i = 0; i < ids.length; i += NAMES_CHUNK) {
+    chunks.push(ids.slice(i, i + NAMES_CHUNK));
+  }
+  const pages = await Promise.all(chunks.map(chunk => listPatientsAdmin({ ids: chunk, limit: chunk.length })));
+  const names = new Map<number, string>();
+  for (const page of pages) {
+    for (const p of page.items) names.set(p.id, p.full_name);
+  }
+  return names;
+}
+
 // ===================================================================
 // --- Componente del Modal de Asignación ---
-// (REEMPLAZA ESTE COMPONENTE COMPLETO)
 // ===================================================================
 type AssignModalProps = {
   device: Device;
-  patients: PatientDetail[];
+  currentPatient: PatientRef | null;
   onClose: () => void;
-  onSave: (deviceId: number, patientId: number | null) => Promise<void>;
+  onSave: (deviceId: number, patient: PatientRef | null) => Promise<void>;
 };
 
-function AssignDeviceModal({ device, patients, onClose, onSave }: AssignModalProps) {
+function AssignDeviceModal({ device, currentPatient, onClose, onSave }: AssignModalProps) {
   // El ID del paciente seleccionado. Puede ser string (del select) o null
   const [selectedPatientId, setSelectedPatientId] = useState<string>(
     device.patient_id?.toString() || ""
   );
+  const [search, setSearch] = useState("");
+  const [results, setResults] = useState<PatientListItem[]>([]);
+  const [searching, setSearching] = useState(false);
   const [isSaving, setIsSaving] = useState(false);
 
+  // Busca en el servidor cuando el usuario deja de escribir
+  useEffect(() => {
+    const q = search.trim();
+    if (!q) {
+      setResults([]);
+      return;
+    }
+    let cancelled = false;
+    const timer = setTimeout(async () => {
+      setSearching(true);
+      try {
+        const page = await listPatientsAdmin({ q, limit: SEARCH_LIMIT });
+        if (!cancelled) setResults(page.items);
+      } catch (err) {
+        console.error("Error searching patients:", err);
+        if (!cancelled) setResults([]);
+      } finally {
+        if (!cancelled) setSearching(false);
+      }
+    }, SEARCH_DELAY_MS);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [search]);
+
+  // Opciones: el paciente actual (aunque no aparezca en la búsqueda) + los resultados
+  const options: PatientRef[] = useMemo(() => {
+    const list: PatientRef[] = currentPatient ? [currentPatient] : [];
+    for (const p of results) {
+      if (p.id !== currentPatient?.id) list.push(p);
+    }
+    return list;
+  }, [currentPatient, results]);
+
   const handleSubmit = async (e: React.FormEvent<HTMLFormElement>) => {
     e.preventDefault();
     setIsSaving(true);
     
     // Convierte el ID a número, o a null si está vacío ("")
     const newPatientId = selectedPatientId ? parseInt(selectedPatientId, 10) : null;
+    const patient = options.find(p => p.id === newPatientId) ?? null;
 
     try {
-      await onSave(device.id, newPatientId);
+      await onSave(device.id, patient);
     } catch (err) {
       // El error se maneja en el componente padre
     } finally {
@@ -67,6 +125,23 @@ function AssignDeviceModal({ device, patients, onClose, onSave }: AssignModalPro
               Asignar dispositivo (Serial: {device.serial})
             </p>
 
+            <div className="mt-4">
+              <label htmlFor="patient-search" className="block text-sm font-medium text-muted">
+                Buscar Paciente
+              </label>
+              <input
+                id="patient-search"
+                type="search"
+                value={search}
+                onChange={(e) => setSearch(e.target.value)}
+                placeholder="Nombre, email o teléfono"
+                className="mt-1 block w-full rounded-md border-slate-400 shadow-sm sm:text-sm bg-white"
+              />
+              <p className="mt-1 text-xs text-muted">
+                {searching ? "Buscando..." : search.trim() && results.length === 0 ? "Sin resultados." : `Hasta ${SEARCH_LIMIT} resultados.`}
+              </p>
+            </div>
+
             <div className="mt-4">
               <label htmlFor="patient" className="block text-sm font-medium text-muted">
                 Seleccionar Paciente
@@ -81,8 +156,8 @@ function AssignDeviceModal({ device, patients, onClose, onSave }: AssignModalPro
                 {/* Opción para des-asignar */}
                 <option value="">-- No Asignado --</option>
                 
-                {/* Lista de pacientes */}
-                {patients.map(p => (
+                {/* Paciente actual y resultados de la búsqueda */}
+                {options.map(p => (
                   <option key={p.id} value={p.id.toString()}>
                     {p.full_name} (ID: {p.id})
                   </option>
@@ -120,7 +195,7 @@ function AssignDeviceModal({ device, patients, onClose, onSave }: AssignModalPro
 
 export default function AdminDevicesPage() {
   const [devices, setDevices] = useState<Device[]>([]);
-  const [patients, setPatients] = useState<PatientDetail[]>([]);
+  const [patientNames, setPatientNames] = useState<Map<number, string>>(new Map());
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
   
@@ -130,18 +205,18 @@ export default function AdminDevicesPage() {
 
   const navigate = useNavigate();
 
-  // Carga inicial de dispositivos Y pacientes
+  // Carga inicial de dispositivos y de los nombres de sus pacientes asignados
   useEffect(() => {
     const fetchData = async () => {
       setLoading(true);
       setError(null);
       try {
-        const [devicesData, patientsData] = await Promise.all([
-          listDevicesAdmin(),
-          listPatientsAdmin(),
-        ]);
+        const devicesData = await listDevicesAdmin();
+        const ids = Array.from(new Set(
+          devicesData.map(d => d.patient_id).filter((id): id is number => id != null)
+        ));
         setDevices(devicesData);
-        setPatients(patientsData);
+        setPatientNames(await fetchPatientNames(ids));
       } catch (err: any) {
         console.error("Error fetching data:", err);
         const msg = err?.response?.data?.message || err?.message || "No se pudieron cargar los datos.";
@@ -153,16 +228,6 @@ export default function AdminDevicesPage() {
     fetchData();
   }, []);
 
-  // Creamos un "mapa" (diccionario) de Pacientes para buscar nombres por ID
-  // useMemo evita que este mapa se recalcule en cada render, solo si 'patients' cambia
-  const patientMap = useMemo(() => {
-    const map = new Map<number, PatientDetail>();
-    for (const patient of patients) {
-      map.set(patient.id, patient);
-    }
-    return map;
-  }, [patients]);
-
   // --- Handlers de Acciones ---
 
   const handleDelete = async (deviceId: number, deviceSerial: string) => {
@@ -194,11 +259,14 @@ export default function AdminDevicesPage() {
   };
 
   // Se ejecuta al guardar desde el modal
-  const handleSaveAssignment = async (deviceId: number, patientId: number | null) => {
+  const handleSaveAssignment = async (deviceId: number, patient: PatientRef | null) => {
     try {
-      const updatedDevice = await assignDeviceAdmin(deviceId, patientId);
+      const updatedDevice = await assignDeviceAdmin(deviceId, patient?.id ?? null);
       // Actualiza la lista de dispositivos localmente
       setDevices(prev => prev.map(d => (d.id === deviceId ? updatedDevice : d)));
+      if (patient) {
+        setPatientNames(prev => new Map(prev).set(patient.id, patient.full_name));
+      }
       handleCloseModal(); // Cierra el modal si tiene éxito
     } catch (err: any) {
       alert(`Error al asignar: ${err?.response?.data?.message || err.message}`);
@@ -251,14 +319,16 @@ export default function AdminDevicesPage() {
             </thead>
             <tbody className="divide-y divide-slate-200">
               {devices.map(device => {
-                const assignedPatient = device.patient_id ? patientMap.get(device.patient_id) : null;
+                const assignedName = device.patient_id ? patientNames.get(device.patient_id) : null;
                 return (
                   <tr key={device.id} className="hover:bg-slate-50">
                     <td className="px-4 py-3 text-sm font-mono text-ink">{device.serial}</td>
                     <td className="px-4 py-3 text-sm text-muted">{device.model}</td>
                     <td className="px-4 py-3 text-sm text-muted">{formatDeviceStatus(device.status)}</td>
                     <td className="px-4 py-3 text-sm font-medium text-ink">
-                      {assignedPatient ? assignedPatient.full_name : <span className="text-slate-400">-- No Asignado --</span>}
+                      {device.patient_id
+                        ? assignedName ?? <span className="text-slate-400">Paciente #{device.patient_id}</span>
+                        : <span className="text-slate-400">-- No Asignado --</span>}
                     </td>
                     <td className="px-4 py-3 text-sm">
                       <div className="flex gap-2">
@@ -293,7 +363,10 @@ export default function AdminDevicesPage() {
       {isModalOpen && selectedDevice && (
         <AssignDeviceModal
           device={selectedDevice}
-          patients={patients}
+          currentPatient={selectedDevice.patient_id
+            ? { id: selectedDevice.patient_id,
+                full_name: patientNames.get(selectedDevice.patient_id) ?? `Paciente #${selectedDevice.patient_id}` }
+            : null}
           onClose={handleCloseModal}
           onSave={handleSaveAssignment}
         />
@@ -3,7 +3,7 @@ import { useEffect, useState } from "react";
 import { Link } from "react-router-dom";
 // Importamos las APIs necesarias
 import {
-  listPatientsAdmin,
+  getAdminStats,
   listDevicesAdmin,
   listPendingAlertsAdmin
 } from "../api/endpoints";
@@ -41,14 +41,15 @@ export default function AdminPanel() {
       setError(null);
       try {
         // Pedimos todo en paralelo
-        const [patientsData, devicesData, alertsData] = await Promise.all([
-          listPatientsAdmin(),
+        // El total de pacientes sale del resumen: el listado viene paginado
+        const [statsData, devicesData, alertsData] = await Promise.all([
+          getAdminStats(),
           listDevicesAdmin(),
           listPendingAlertsAdmin({ limit: 10 }) // Pedimos las 10 más nuevas
         ]);
         
         setStats({
-          patientCount: patientsData.length,
+          patientCount: statsData.patients.total,
           deviceCount: devicesData.length,
         });
         setPendingAlerts(alertsData); // Guardamos las alertas
@@ -2,7 +2,10 @@
 import { useEffect, useState } from "react";
 import { Link, useNavigate } from "react-router-dom";
 import { listPatientsAdmin, deletePatientAdmin } from "../api/endpoints";
-import type { PatientDetail } from "../api/endpoints";
+import type { PatientListItem } from "../api/endpoints";
+
+const PAGE_SIZE = 50;
+const SEARCH_DELAY_MS = 300; // espera a que el usuario deje de escribir
 
 // --- Helper de formato (Idealmente, mover a utils.ts) ---
 const formatSimpleDate = (dateString: string | null | undefined): string => {
@@ -20,32 +23,61 @@ const formatSimpleDate = (dateString: string | null | undefined): string => {
 };
 
 export default function AdminPatientsPage() {
-  const [patients, setPatients] = useState<PatientDetail[]>([]);
+  const [patients, setPatients] = useState<PatientListItem[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [search, setSearch] = useState("");
+  const [query, setQuery] = useState(""); // búsqueda aplicada (con debounce)
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState<string | null>(null);
   const navigate = useNavigate();
 
-  // Función para cargar los pacientes
-  const fetchPatients = async () => {
-    setLoading(true);
-    setError(null);
+  // Aplica la búsqueda cuando el usuario deja de escribir
+  useEffect(() => {
+    const timer = setTimeout(() => setQuery(search.trim()), SEARCH_DELAY_MS);
+    return () => clearTimeout(timer);
+  }, [search]);
+
+  // Primera página (al entrar y con cada búsqueda nueva)
+  useEffect(() => {
+    let cancelled = false;
+    const fetchPatients = async () => {
+      setLoading(true);
+      setError(null);
+      try {
+        const page = await listPatientsAdmin({ q: query || undefined, limit: PAGE_SIZE });
+        if (cancelled) return;
+        setPatients(page.items);
+        setNextCursor(page.next_cursor);
+      } catch (err: any) {
+        if (cancelled) return;
+        console.error("Error fetching patients:", err);
+        const msg = err?.response?.data?.message || err?.message || "No se pudieron cargar los pacientes.";
+        setError(msg);
+      } finally {
+        if (!cancelled) setLoading(false);
+      }
+    };
+    fetchPatients();
+    return () => { cancelled = true; }; // descarta respuestas de búsquedas anteriores
+  }, [query]);
+
+  // Página siguiente (se agrega al final de la tabla)
+  const handleLoadMore = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
     try {
-      const data = await listPatientsAdmin();
-      setPatients(data);
+      const page = await listPatientsAdmin({ q: query || undefined, limit: PAGE_SIZE, cursor: nextCursor });
+      setPatients(prev => [...prev, ...page.items]);
+      setNextCursor(page.next_cursor);
     } catch (err: any) {
       console.error("Error fetching patients:", err);
-      const msg = err?.response?.data?.message || err?.message || "No se pudieron cargar los pacientes.";
-      setError(msg);
+      alert(`Error: ${err?.response?.data?.message || err?.message || "No se pudieron cargar más pacientes."}`);
     } finally {
-      setLoading(false);
+      setLoadingMore(false);
     }
   };
 
-  // Carga inicial
-  useEffect(() => {
-    fetchPatients();
-  }, []);
-
   // Handler para el botón de borrar
   const handleDelete = async (patientId: number, patientName: string) => {
     // Pedir confirmación
@@ -72,18 +104,6 @@ export default function AdminPatientsPage() {
 
   // --- Renderizado ---
 
-  if (loading) {
-    return <div className="p-6 text-center text-muted">Cargando pacientes...</div>;
-  }
-
-  if (error) {
-    return (
-      <div className="p-6 rounded-lg bg-red-50 text-red-700 text-sm">
-        Error al cargar pacientes: {error}
-      </div>
-    );
-  }
-
   return (
     <main className="flex-1 p-6 space-y-6">
       {/* --- Cabecera con Título y Botón --- */}
@@ -99,9 +119,24 @@ export default function AdminPatientsPage() {
         </button>
       </div>
 
+      {/* --- Búsqueda --- */}
+      <input
+        type="search"
+        value={search}
+        onChange={(e) => setSearch(e.target.value)}
+        placeholder="Buscar por nombre, email o teléfono"
+        className="block w-full max-w-md rounded-md border-slate-400 shadow-sm sm:text-sm bg-white"
+      />
+
       {/* --- Tabla de Pacientes --- */}
       <div className="bg-white rounded-xl border shadow-sm overflow-hidden">
-        {patients.length > 0 ? (
+        {loading ? (
+          <div className="p-6 text-center text-muted">Cargando pacientes...</div>
+        ) : error ? (
+          <div className="p-6 rounded-lg bg-red-50 text-red-700 text-sm">
+            Error al cargar pacientes: {error}
+          </div>
+        ) : patients.length > 0 ? (
           <table className="w-full text-left">
             <thead className="bg-slate-50 border-b border-slate-200">
               <tr>
@@ -144,10 +179,23 @@ export default function AdminPatientsPage() {
           </table>
         ) : (
           <div className="text-center text-muted py-10">
-            No hay pacientes registrados.
+            {query ? "Ningún paciente coincide con la búsqueda." : "No hay pacientes registrados."}
           </div>
         )}
       </div>
+
+      {/* --- Paginación --- */}
+      {!loading && !error && nextCursor && (
+        <div className="flex justify-center">
+          <button
+            onClick={handleLoadMore}
+            disabled={loadingMore}
+            className="px-4 py-2 text-sm font-medium text-slate-700 bg-slate-100 rounded-md hover:bg-slate-200 disabled:text-slate-400"
+          >
+            {loadingMore ? "Cargando..." : "Cargar más"}
+          </button>
+        </div>
+      )}
     </main>
   );
 }
\ No newline at end of file
@@ -2,7 +2,7 @@
 import { useEffect, useState } from "react";
 import { useAuth } from "../context/AuthContext";
 // Importa las nuevas funciones de API
-import { getMyLatestReadings, getMyReadingsHistory } from "../api/endpoints";
+import { getMyDashboard, getMyReadingsHistory } from "../api/endpoints";
 // Mantén los tipos (asegúrate que estén actualizados en endpoints.ts)
 import type { Reading } from "../api/endpoints";
 // Importa componentes UI y de Layout
@@ -54,7 +54,7 @@ export default function Dashboard() {
       try {
         // Llama a ambas APIs en paralelo para eficiencia
         const [latest, history] = await Promise.all([
-          getMyLatestReadings(),
+          getMyDashboard(),
           getMyReadingsHistory({ from: get24HoursAgoISO() }) // Pide historial de 24h
         ]);
 